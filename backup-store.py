@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Deduplicated backups of the production backend files (index.js, .env)
+Each distinct file version is stored once on the server; snapshots are labels
+
+Examples:
+  python backup-store.py snapshot before-chime-fix
+  python backup-store.py snapshot dist-20250118 /var/www/summit/dist
+  python backup-store.py list
+  python backup-store.py restore before-chime-fix
+  python backup-store.py import-legacy --remove
+  python backup-store.py gc
+"""
+import argparse
+import sys
+import time
+
+from summit_ops.backup_store import PRODUCTION_FILES, BackupStore, BackupStoreError
+
+parser = argparse.ArgumentParser(description="Content-addressed backup store on the server")
+sub = parser.add_subparsers(dest='action', required=True)
+
+snapshot = sub.add_parser('snapshot', help="Snapshot files or directories under a label")
+snapshot.add_argument('label', nargs='?', default=None, help="Defaults to manual-<timestamp>")
+snapshot.add_argument('paths', nargs='*', default=PRODUCTION_FILES)
+
+sub.add_parser('list', help="List snapshots")
+
+show = sub.add_parser('show', help="Files and hashes in a snapshot")
+show.add_argument('label')
+
+restore = sub.add_parser('restore', help="Restore every file of a snapshot")
+restore.add_argument('label')
+restore.add_argument('--to', help="Restore under this root instead of in place")
+
+drop = sub.add_parser('drop', help="Forget a snapshot (run gc afterwards)")
+drop.add_argument('label')
+
+legacy = sub.add_parser('import-legacy', help="Fold index.js.backup-* / *.WORKING_BACKUP_* copies into the store")
+legacy.add_argument('--remove', action='store_true', help="Delete the loose copies once stored")
+
+sub.add_parser('gc', help="Delete objects no snapshot references")
+sub.add_parser('stats', help="Store size and counts")
+args = parser.parse_args()
+
+store = BackupStore()
+try:
+    if args.action == 'snapshot':
+        print(store.snapshot(args.label or time.strftime('manual-%Y%m%d-%H%M%S'), args.paths))
+    elif args.action == 'list':
+        snapshots = store.list()
+        print(f"{'LABEL':<40} {'CREATED':<22} {'FILES':>5} {'SIZE':>10}")
+        print("=" * 80)
+        for s in snapshots:
+            print(f"{s.label:<40} {s.created:<22} {s.files:>5} {s.bytes / 1024:>8.1f}KB")
+        print(f"\n{len(snapshots)} snapshot(s)")
+    elif args.action == 'show':
+        for entry in store.show(args.label):
+            print(f"{entry.sha256[:12]}  {entry.mode}  {entry.size:>10}  {entry.path}")
+    elif args.action == 'restore':
+        print(f"♻️  Restoring {args.label}...")
+        print(store.restore(args.label, to=args.to))
+    elif args.action == 'drop':
+        print(store.drop(args.label))
+    elif args.action == 'import-legacy':
+        print(store.import_legacy(remove=args.remove))
+    elif args.action == 'gc':
+        print(store.gc())
+    elif args.action == 'stats':
+        stats = store.stats()
+        print(f"📦 {stats['snapshots']} snapshot(s), {stats['objects']} distinct file version(s), "
+              f"{stats['store_bytes'] / 1024 / 1024:.1f} MB on disk")
+except BackupStoreError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
@@ -1,26 +1,11 @@
-import boto3
-import time
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
+from summit_ops.ssm import SSMRunner
+
 instance_id = 'i-0fba58db502cc8d39'
+ssm_runner = SSMRunner(instance_id)
 
 def run_command(command, timeout=60):
-    response = ssm.send_command(
-        InstanceIds=[instance_id],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=timeout
-    )
-    
-    command_id = response['Command']['CommandId']
-    time.sleep(2)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=instance_id
-    )
-    
-    return output['StandardOutputContent']
+    return ssm_runner.run_large(command, timeout=timeout).stdout
 
 print("=" * 60)
 print("CHECKING ALL DATABASE DATA")
@@ -1,11 +1,9 @@
 #!/usr/bin/env python3
 """Check what routes exist in deployed messages.js"""
-import boto3
-import json
-import time
+from summit_ops.ssm import SSMRunner
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
 instance_id = 'i-0fba58db502cc8d39'
+ssm_runner = SSMRunner(instance_id)
 
 # Check what routes exist
 command = """
@@ -21,22 +19,10 @@ echo "=== First 50 lines of messages.js ==="
 head -50 /var/www/summit/dist/routes/messages.js
 """
 
-response = ssm.send_command(
-    InstanceIds=[instance_id],
-    DocumentName='AWS-RunShellScript',
-    Parameters={'commands': [command]}
-)
-
-command_id = response['Command']['CommandId']
-print(f"Command ID: {command_id}")
 print("Waiting for command to complete...")
-time.sleep(3)
-
-output = ssm.get_command_invocation(
-    CommandId=command_id,
-    InstanceId=instance_id
-)
+output = ssm_runner.run_large(command)
+print(f"Command ID: {output.command_id}")
 
-print("\n" + output['StandardOutputContent'])
-if output['StandardErrorContent']:
-    print("STDERR:", output['StandardErrorContent'])
+print("\n" + output.stdout)
+if output.stderr:
+    print("STDERR:", output.stderr)
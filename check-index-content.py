@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-import subprocess, json, time
+"""Dump the deployed and backup index.js in full (no 24 KB SSM truncation)"""
+from summit_ops.ssm import SSMRunner
 
 cmd = """
 echo "=== Current index.js content ==="
@@ -10,27 +11,7 @@ echo "=== Backup index.js content ==="
 cat /var/www/summit-backup-1768663852/server/dist/index.js
 """
 
-result = subprocess.run([
-    "aws", "ssm", "send-command",
-    "--instance-ids", "i-0fba58db502cc8d39",
-    "--document-name", "AWS-RunShellScript",
-    "--parameters", json.dumps({"commands": [cmd]}),
-    "--region", "eu-west-1",
-    "--output", "json"
-], capture_output=True, text=True)
-
-data = json.loads(result.stdout)
-cmd_id = data['Command']['CommandId']
-print(f"Command: {cmd_id}")
-time.sleep(10)
-
-result = subprocess.run([
-    "aws", "ssm", "get-command-invocation",
-    "--command-id", cmd_id,
-    "--instance-id", "i-0fba58db502cc8d39",
-    "--region", "eu-west-1",
-    "--query", "StandardOutputContent",
-    "--output", "text"
-], capture_output=True, encoding='utf-8', errors='replace')
-
+ssm_runner = SSMRunner("i-0fba58db502cc8d39", "eu-west-1")
+result = ssm_runner.run_large(cmd, timeout=120)
+print(f"Command: {result.command_id}")
 print(result.stdout)
@@ -1,35 +1,20 @@
-import boto3
-import time
-
-ssm = boto3.client('ssm', region_name='eu-west-1')
-instance_id = 'i-0fba58db502cc8d39'
-
-commands = '''
-echo "=== Check messages table structure ==="
-sudo -u postgres psql -d summit -c "\\d messages"
-
-echo ""
-echo "=== Check recent messages ==="
-sudo -u postgres psql -d summit -c "SELECT id, chat_id, sender_id, sender_name, content, created_at FROM messages ORDER BY created_at DESC LIMIT 10;"
-'''
-
-response = ssm.send_command(
-    InstanceIds=[instance_id],
-    DocumentName='AWS-RunShellScript',
-    Parameters={'commands': [commands]},
-    TimeoutSeconds=60
-)
-
-command_id = response['Command']['CommandId']
-print(f'Command ID: {command_id}')
-
-time.sleep(15)
-
-output = ssm.get_command_invocation(
-    CommandId=command_id,
-    InstanceId=instance_id
-)
-
-print(f"Status: {output['Status']}")
-print('Output:')
-print(output.get('StandardOutputContent', ''))
+from summit_ops.db import connect
+
+with connect() as db:
+    print("=== Check messages table structure ===")
+    columns = db.fetch("""
+        SELECT column_name, data_type, is_nullable, column_default
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = %s
+        ORDER BY ordinal_position
+    """, ['messages'])
+    for column in columns:
+        nullable = '' if column.is_nullable == 'YES' else 'not null'
+        print(f"{column.column_name:<20} {column.data_type:<28} {nullable:<9} {column.column_default or ''}")
+
+    print("")
+    print("=== Check recent messages ===")
+    for m in db.fetch("SELECT m.id, m.chat_id, m.sender_id, u.name AS sender_name, m.content, m.created_at "
+                      "FROM messages m LEFT JOIN users u ON u.id = m.sender_id "
+                      "ORDER BY m.created_at DESC LIMIT %s", [10]):
+        print(f"{m.created_at:%Y-%m-%d %H:%M:%S}  {m.chat_id}  {m.sender_name or m.sender_id}: {(m.content or '')[:60]}")
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
-import boto3
-import time
+"""
+Check PostgreSQL, PgBouncer, PM2 and the backend on one or more instances
+Usage: python check-services-status.py [instance-id ...]
+"""
+import sys
+
+from summit_ops.fleet import FleetRunner
+from summit_ops.ssm import SSMRunner
 
 INSTANCE_ID = "i-0fba58db502cc8d39"
 REGION = "eu-west-1"
 
-ssm = boto3.client('ssm', region_name=REGION)
+instance_ids = sys.argv[1:] or [INSTANCE_ID]
+fleet = FleetRunner(SSMRunner(INSTANCE_ID, REGION))
 
-print("🔍 Checking Services Status")
+print(f"🔍 Checking Services Status on {len(instance_ids)} instance(s)")
 
 command = """
 export HOME=/home/ubuntu
@@ -36,22 +43,15 @@ echo "=== Check summit_user password type ==="
 sudo -u postgres psql -t -c "SELECT rolname, LEFT(rolpassword, 10) FROM pg_authid WHERE rolname = 'summit_user';"
 """
 
+def print_result(result):
+    print(f"\n{'=' * 20} {result.instance_id} ({result.status}, {result.wall_time:.1f}s) {'=' * 20}")
+    print(result.stdout)
+    if result.stderr:
+        print(f"Error: {result.stderr}")
+
 try:
-    response = ssm.send_command(
-        InstanceIds=[INSTANCE_ID],
-        DocumentName="AWS-RunShellScript",
-        Parameters={'commands': [command]},
-        TimeoutSeconds=30
-    )
-    
-    time.sleep(8)
-    
-    output = ssm.get_command_invocation(
-        CommandId=response['Command']['CommandId'],
-        InstanceId=INSTANCE_ID
-    )
-    
-    print(output['StandardOutputContent'])
-    
+    summary = fleet.run(command, instance_ids=instance_ids, timeout=30, on_result=print_result)
+    print(summary.describe())
+
 except Exception as e:
     print(f"Error: {e}")
@@ -1,47 +1,43 @@
-import boto3
-from datetime import datetime, timezone, timedelta
+#!/usr/bin/env python3
+"""
+Apply the backup retention policy to the summit-backup-* AMIs and their snapshots
+Keeps the newest few, then one per hour/day/week; deletes the rest concurrently
 
-ec2 = boto3.client('ec2', region_name='eu-west-1')
+Examples:
+  python cleanup-old-backups.py --dry-run
+  python cleanup-old-backups.py --keep-last 3 --hourly 6 --daily 7 --weekly 4
+  python cleanup-old-backups.py --snapshots --dry-run
+"""
+import argparse
+import sys
 
-# Delete AMIs older than 4 hours
-MAX_AGE_HOURS = 4
+from summit_ops.retention import MAX_WORKERS, RetentionPolicy, RetentionSweeper
+from summit_ops.snapshots import SnapshotBackup
 
-print(f'Looking for summit backups older than {MAX_AGE_HOURS} hours...')
+defaults = RetentionPolicy()
+parser = argparse.ArgumentParser(description="Tiered retention sweep of summit backup AMIs")
+parser.add_argument('--keep-last', type=int, default=defaults.keep_last)
+parser.add_argument('--hourly', type=int, default=defaults.hourly)
+parser.add_argument('--daily', type=int, default=defaults.daily)
+parser.add_argument('--weekly', type=int, default=defaults.weekly)
+parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+parser.add_argument('--snapshots', action='store_true', help="Sweep incremental snapshot sets instead of AMIs")
+parser.add_argument('--dry-run', action='store_true', help="Show the plan without deleting anything")
+args = parser.parse_args()
 
-# Find all summit backup AMIs
-response = ec2.describe_images(
-    Owners=['self'],
-    Filters=[{'Name': 'name', 'Values': ['summit-backup-*']}]
-)
+policy = RetentionPolicy(keep_last=args.keep_last, hourly=args.hourly, daily=args.daily, weekly=args.weekly)
+print(f"🧹 Retention: last {policy.keep_last}, {policy.hourly} hourly, {policy.daily} daily, {policy.weekly} weekly")
+print("=" * 60)
 
-now = datetime.now(timezone.utc)
-deleted = 0
+sweeper = RetentionSweeper(max_workers=args.workers)
+if args.snapshots:
+    sweeper.source = SnapshotBackup(ec2=sweeper.ec2).backups
+report = sweeper.sweep(policy, dry_run=args.dry_run, on_progress=lambda message: print(f"   {message}"))
+print(report.plan.describe())
 
-for ami in response['Images']:
-    ami_id = ami['ImageId']
-    ami_name = ami['Name']
-    creation_date = datetime.fromisoformat(ami['CreationDate'].replace('Z', '+00:00'))
-    age = now - creation_date
-    age_hours = age.total_seconds() / 3600
-    
-    if age_hours > MAX_AGE_HOURS:
-        print(f'Deleting {ami_name} ({ami_id}) - {age_hours:.1f} hours old')
-        
-        # First deregister the AMI
-        ec2.deregister_image(ImageId=ami_id)
-        
-        # Then delete associated snapshots
-        for block in ami.get('BlockDeviceMappings', []):
-            if 'Ebs' in block and 'SnapshotId' in block['Ebs']:
-                snap_id = block['Ebs']['SnapshotId']
-                print(f'  Deleting snapshot {snap_id}')
-                try:
-                    ec2.delete_snapshot(SnapshotId=snap_id)
-                except Exception as e:
-                    print(f'  Warning: Could not delete snapshot: {e}')
-        
-        deleted += 1
-    else:
-        print(f'Keeping {ami_name} ({ami_id}) - {age_hours:.1f} hours old')
+if args.dry_run:
+    print(f"\nDry run: {len(report.plan.delete)} backup(s) would be deleted")
+    sys.exit(0)
 
-print(f'\n✅ Cleanup complete. Deleted {deleted} old backup(s).')
+print(f"\n{'✅' if not report.failed else '⚠️ '} {report.describe()}")
+sys.exit(1 if report.failed else 0)
@@ -1,27 +1,15 @@
 #!/usr/bin/env python3
 """Clear stale meetings from backend memory and restart"""
-import boto3
 import time
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
+from summit_ops.ssm import SSMRunner
+
 INSTANCE_ID = 'i-0fba58db502cc8d39'
+ssm_runner = SSMRunner(INSTANCE_ID)
 
-def run_command(command):
-    response = ssm.send_command(
-        InstanceIds=[INSTANCE_ID],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=60
-    )
-    command_id = response['Command']['CommandId']
-    time.sleep(5)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=INSTANCE_ID
-    )
-    
-    return output.get('StandardOutputContent', '').strip(), output.get('StandardErrorContent', '').strip()
+def run_command(command, timeout=60):
+    result = ssm_runner.run(command, timeout=timeout)
+    return result.stdout.strip(), result.stderr.strip()
 
 print("Restarting backend to clear stale meetings from memory...")
 stdout, stderr = run_command("pm2 restart summit")
@@ -1,19 +1,77 @@
-import boto3
+#!/usr/bin/env python3
+"""
+Back up the production instance, either as a full AMI or as an incremental snapshot set
+Snapshot sets are cheap pre-deploy safety points; an AMI can be built from one on demand
+
+Examples:
+  python create-ec2-backup.py                              # full NoReboot AMI (waits until available)
+  python create-ec2-backup.py --mode snapshot --label pre-deploy
+  python create-ec2-backup.py --list
+  python create-ec2-backup.py --build-ami summit-snap-20250118-120000-3fa9c1
+"""
+import argparse
+import sys
 from datetime import datetime
 
-ec2 = boto3.client('ec2', region_name='eu-west-1')
-instance_id = 'i-0fba58db502cc8d39'
+import boto3
+
+from summit_ops.snapshots import SnapshotBackup, SnapshotError
+from summit_ops.ssm import INSTANCE_ID, REGION
+
+parser = argparse.ArgumentParser(description="AMI or incremental snapshot backup of the Summit server")
+parser.add_argument('--mode', choices=['ami', 'snapshot'], default='ami')
+parser.add_argument('--label', help="Free-form label stored on snapshot sets (e.g. pre-deploy)")
+parser.add_argument('--no-wait', action='store_true', help="Return as soon as the backup has started")
+parser.add_argument('--list', action='store_true', help="List snapshot sets and their lineage")
+parser.add_argument('--build-ami', metavar='SET_ID', help="Register a launchable AMI from a snapshot set")
+args = parser.parse_args()
+
+ec2 = boto3.client('ec2', region_name=REGION)
+snapshots = SnapshotBackup(ec2=ec2)
+progress = lambda message: print(f"   {message}")
+
+try:
+    if args.list:
+        print(f"{'SET':<32} {'CREATED':<17} {'VOLUMES':>7}  {'PARENT':<32} LABEL / AMI")
+        print("=" * 110)
+        for s in snapshots.sets():
+            status = '' if s.completed else ' (pending)'
+            print(f"{s.id:<32} {s.created:%Y-%m-%d %H:%M} {len(s.snapshots):>7}  {s.parent or '-':<32} "
+                  f"{s.label or ''} {s.ami or ''}{status}")
+        sys.exit(0)
+
+    if args.build_ami:
+        print(f"🏗️  Building AMI from {args.build_ami}...")
+        image_id = snapshots.build_ami(args.build_ami, wait=not args.no_wait, on_progress=progress)
+        print(f"\n✅ AMI {image_id} - launch a new instance from it to restore")
+        sys.exit(0)
+
+    if args.mode == 'snapshot':
+        print(f"📸 Incremental snapshot of {INSTANCE_ID}" + (f" ({args.label})" if args.label else ''))
+        snapshot_set = snapshots.create(label=args.label)
+        print(f"   set {snapshot_set.id}, parent {snapshot_set.parent or 'none (first, full copy)'}")
+        for device, snapshot_id in snapshot_set.snapshots.items():
+            print(f"   {device}: {snapshot_id}")
+        if args.no_wait:
+            print("\n⏳ Started. Usable once every snapshot is completed (see --list)")
+            sys.exit(0)
+        snapshots.wait(snapshot_set, on_progress=progress)
+        print(f"\n✅ Snapshot set {snapshot_set.id} completed and usable")
+        print(f"To get a launchable image: python create-ec2-backup.py --build-ami {snapshot_set.id}")
+        sys.exit(0)
+except SnapshotError as e:
+    print(f"\n❌ {e}")
+    sys.exit(1)
 
-# Create AMI name with timestamp
 timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
 ami_name = f'summit-backup-{timestamp}'
 
 print(f'Creating AMI backup: {ami_name}')
-print(f'Instance: {instance_id}')
+print(f'Instance: {INSTANCE_ID}')
 print('This may take several minutes...')
 
 response = ec2.create_image(
-    InstanceId=instance_id,
+    InstanceId=INSTANCE_ID,
     Name=ami_name,
     Description=f'Summit server backup - {timestamp} - Working state with backend on port 4000',
     NoReboot=True  # Don't reboot the instance during backup
@@ -23,6 +81,13 @@ ami_id = response['ImageId']
 print(f'\n✅ AMI creation started!')
 print(f'AMI ID: {ami_id}')
 print(f'AMI Name: {ami_name}')
-print(f'\nThe AMI is being created in the background.')
-print('You can check its status in the AWS Console under EC2 > AMIs')
+
+if args.no_wait:
+    print('\nThe AMI is being created in the background.')
+    print('You can check its status in the AWS Console under EC2 > AMIs')
+else:
+    print('\nWaiting for the AMI to become available...')
+    ec2.get_waiter('image_available').wait(ImageIds=[ami_id], WaiterConfig={'Delay': 15, 'MaxAttempts': 120})
+    print(f'✅ AMI {ami_id} is available')
+
 print(f'\nTo restore from this backup, launch a new instance using AMI: {ami_id}')
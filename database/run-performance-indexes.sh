@@ -1,6 +1,7 @@
 #!/bin/bash
 # Run performance indexes on RDS database
 # Usage: ./run-performance-indexes.sh
+# Indexes are built CONCURRENTLY (no write locks) and recorded in schema_migrations
 
 echo "Adding performance indexes to Summit database..."
 
@@ -12,7 +13,9 @@ DB_USER="${DB_USER:-postgres}"
 
 echo "Connecting to: $DB_HOST:$DB_PORT/$DB_NAME"
 
-psql -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER" -d "$DB_NAME" -f add_performance_indexes.sql
+cd "$(dirname "$0")/.." || exit 1
+SUMMIT_DB_DSN="host=$DB_HOST port=$DB_PORT dbname=$DB_NAME user=$DB_USER" \
+    python3 migrate-db.py up --local --only add_performance_indexes.sql --only optimize_contacts_query.sql
 
 if [ $? -eq 0 ]; then
     echo "✅ Performance indexes added successfully!"
@@ -20,4 +23,3 @@ else
     echo "❌ Error adding indexes"
     exit 1
 fi
-
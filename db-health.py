@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Database health snapshot in one round trip: sizes, row counts, dead tuples,
+cache hit ratios, connections, locks and the top pg_stat_statements entries
+Each run is kept in .summit-dbhealth.jsonl at the repository root and compared with the previous one
+
+Examples:
+  python db-health.py
+  python db-health.py --json > snapshot.json
+  python db-health.py --history 10
+"""
+import argparse
+import json
+import sys
+
+from summit_ops.dbhealth import (
+    HISTORY_PATH, TOP_STATEMENTS, DatabaseHealth, DatabaseHealthError, HealthHistory, diff_snapshots,
+)
+
+
+def mb(value):
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+def ratio(value):
+    return '-' if value is None else f"{value * 100:.2f}%"
+
+
+parser = argparse.ArgumentParser(description="One-shot database health snapshot")
+parser.add_argument('--json', action='store_true', help="Print the raw snapshot as JSON")
+parser.add_argument('--no-save', action='store_true', help="Do not append to the local history")
+parser.add_argument('--statements', type=int, default=TOP_STATEMENTS, help="Top pg_stat_statements entries")
+parser.add_argument('--history', type=int, metavar='N', help="Show the last N saved snapshots and exit")
+parser.add_argument('--history-file', default=HISTORY_PATH)
+args = parser.parse_args()
+
+history = HealthHistory(args.history_file)
+
+if args.history:
+    print(f"{'COLLECTED':<27} {'SIZE':>10} {'CONNS':>6} {'DB HIT':>8} {'DEADLOCKS':>10}")
+    print("=" * 65)
+    for s in history.load(limit=args.history):
+        print(f"{s['collected_at']:<27} {mb(s['size_bytes']):>10} {s['connections']['total']:>6} "
+              f"{ratio(s['cache']['database_hit_ratio']):>8} {s['cache']['deadlocks']:>10}")
+    sys.exit(0)
+
+try:
+    snapshot = DatabaseHealth(top_statements=args.statements).collect()
+except DatabaseHealthError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+previous = history.latest()
+if not args.no_save:
+    history.append(snapshot)
+
+if args.json:
+    print(json.dumps(snapshot, indent=2))
+    sys.exit(0)
+
+cache, connections, locks = snapshot['cache'], snapshot['connections'], snapshot['locks']
+print(f"🗄️  {snapshot['database']} (PostgreSQL {snapshot['server_version']}) - {mb(snapshot['size_bytes'])}")
+print("=" * 60)
+print(f"Cache hit: heap {ratio(cache['heap_hit_ratio'])}, index {ratio(cache['index_hit_ratio'])}, "
+      f"database {ratio(cache['database_hit_ratio'])}")
+print(f"Connections: {connections['total']}/{connections['max']} {connections['by_state'] or {}}, "
+      f"{connections['idle_in_transaction']} idle in transaction, longest query {connections['longest_query_seconds']}s")
+print(f"Locks: {locks['waiting']} waiting, {len(locks['blocked'])} blocked session(s), deadlocks so far {cache['deadlocks']}")
+for blocked in locks['blocked']:
+    print(f"   ⚠️  pid {blocked['pid']} blocked by {blocked['blocked_by']} for {blocked['waiting_seconds']}s: {blocked['query'][:80]}")
+
+print(f"\n{'TABLE':<28} {'ROWS':>10} {'DEAD':>8} {'TOTAL':>10} {'INDEXES':>10} {'HIT':>8}")
+for table in snapshot['tables']:
+    rows = table['rows'] if table['rows'] is not None else f"~{table['estimated_rows']}"
+    print(f"{table['name']:<28} {rows:>10} {table['dead_tuples']:>8} {mb(table['total_bytes']):>10} "
+          f"{mb(table['index_bytes']):>10} {ratio(table['cache_hit_ratio']):>8}")
+
+if snapshot['statements'] is None:
+    print("\npg_stat_statements is not installed - no per-query statistics")
+else:
+    print(f"\n{'TOTAL MS':>12} {'CALLS':>9} {'MEAN MS':>9}  QUERY")
+    for statement in snapshot['statements']:
+        print(f"{statement['total_ms']:>12.1f} {statement['calls']:>9} {statement['mean_ms']:>9.2f}  {statement['query'][:70]}")
+
+trend = diff_snapshots(previous, snapshot)
+if trend:
+    hours = trend['elapsed_seconds'] / 3600
+    print(f"\n📈 Since previous snapshot ({hours:.1f}h ago): size {trend['database']['size_bytes'] / 1024:+.0f} KB, "
+          f"connections {trend['database']['connections']:+d}, deadlocks {trend['database']['deadlocks']:+d}")
+    for name, change in trend['tables'].items():
+        if change.get('new'):
+            print(f"   {name}: new table")
+        else:
+            print(f"   {name}: rows {change['rows']:+d}, size {change['total_bytes'] / 1024:+.0f} KB, dead {change['dead_tuples']:+d}")
+    for statement in trend['statements'][:5]:
+        print(f"   {statement['calls']:>7} call(s), {statement['mean_ms']:.2f} ms avg: {statement['query'][:60]}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Run SQL against the production database through one pooled SSM tunnel
+Parameters are sent separately (%s placeholders), never pasted into the SQL
+
+Examples:
+  python db-query.py "SELECT id, email FROM users WHERE email ILIKE %s" -p '%@astutetech.co.za'
+  python db-query.py -f report.sql --json > report.json
+  python db-query.py "SELECT * FROM messages" --stream > messages.jsonl   # server-side cursor
+  python db-query.py                                                      # interactive, one tunnel for the session
+  SUMMIT_DB_DSN=postgresql://localhost/summit python db-query.py "SELECT 1"
+"""
+import argparse
+import json
+import sys
+import time
+
+from summit_ops.db import DatabaseError, connect
+
+MAX_WIDTH = 40
+
+
+def print_table(rows):
+    if not rows:
+        print("(no rows)")
+        return
+    columns = rows[0]._fields
+    cells = [[str(value) if value is not None else 'NULL' for value in row] for row in rows]
+    widths = [min(MAX_WIDTH, max(len(column), *(len(row[i]) for row in cells))) for i, column in enumerate(columns)]
+    print('  '.join(column[:MAX_WIDTH].ljust(width) for column, width in zip(columns, widths)))
+    print('  '.join('-' * width for width in widths))
+    for row in cells:
+        print('  '.join(value[:MAX_WIDTH].ljust(width) for value, width in zip(row, widths)))
+
+
+def as_json(row):
+    return json.dumps(row._asdict(), default=str)
+
+
+def run(db, sql, params):
+    started = time.perf_counter()
+    rows = db.fetch(sql, params or None)
+    elapsed = (time.perf_counter() - started) * 1000
+    print_table(rows)
+    print(f"({len(rows)} rows, {elapsed:.1f} ms)")
+
+
+def interactive(db):
+    print("SQL ending in ';' runs it, \\q quits")
+    buffer = []
+    while True:
+        try:
+            line = input('summit> ' if not buffer else '   ...> ')
+        except EOFError:
+            print()
+            return
+        if not buffer and line.strip() in ('\\q', 'quit', 'exit'):
+            return
+        buffer.append(line)
+        if not line.rstrip().endswith(';'):
+            continue
+        sql, buffer = '\n'.join(buffer), []
+        try:
+            run(db, sql, None)
+        except Exception as e:
+            print(f"❌ {e}")
+
+
+parser = argparse.ArgumentParser(description="Pooled SQL access to the Summit database")
+parser.add_argument('sql', nargs='?', help="Statement to run (omit for an interactive session)")
+parser.add_argument('-f', '--file', help="Read the statement from a file")
+parser.add_argument('-p', '--param', action='append', default=[], help="Value for the next %%s (repeatable)")
+parser.add_argument('--json', action='store_true', help="Print the rows as a JSON array")
+parser.add_argument('--stream', action='store_true', help="Stream rows as JSON lines through a server-side cursor")
+parser.add_argument('--direct', action='store_true', help="Tunnel to Postgres (5432) instead of PgBouncer")
+parser.add_argument('--local', action='store_true', help="Use the local Postgres (SUMMIT_DB_DSN or PG* variables)")
+args = parser.parse_args()
+
+sql = args.sql
+if args.file:
+    with open(args.file, encoding='utf-8') as f:
+        sql = f.read()
+
+started = time.perf_counter()
+try:
+    db = connect(local=args.local or None, direct=args.direct)
+except DatabaseError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+print(f"🔌 Connected in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+with db:
+    try:
+        if not sql:
+            interactive(db)
+        elif args.stream:
+            for row in db.stream(sql, args.param or None):
+                print(as_json(row))
+        elif args.json:
+            print(json.dumps([row._asdict() for row in db.fetch(sql, args.param or None)], indent=2, default=str))
+        else:
+            run(db, sql, args.param)
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Delta-deploy the built backend (server/dist) to production
+Only files whose SHA-256 differs from the server are shipped, verified
+on the host and switched in atomically
+
+Examples:
+  cd server && npm run build && cd ..
+  python deploy-dist.py --dry-run
+  python deploy-dist.py
+  python deploy-dist.py --prune          # also delete files no longer in the build
+  python deploy-dist.py --full --via s3  # full restore of the whole build, chunks pulled from S3
+  python deploy-dist.py --rollback
+  python deploy-dist.py --blue-green     # start the new build beside the old one, switch nginx, drain
+
+--blue-green logs in as SUMMIT_SMOKE_EMAIL / SUMMIT_SMOKE_PASSWORD for the smoke test
+"""
+import argparse
+import os
+import sys
+
+from summit_ops.bluegreen import BlueGreenDeployer, BlueGreenError
+from summit_ops.deploy import DeltaDeployer, DeployError, rollback_script
+from summit_ops.ssm import get_runner
+from summit_ops.transfer import CHANNELS, ChunkedTransfer
+
+parser = argparse.ArgumentParser(description="Content-addressed delta deploy of server/dist")
+parser.add_argument('--dist', default='server/dist', help="Local build output")
+parser.add_argument('--dry-run', action='store_true', help="Only show what would be shipped")
+parser.add_argument('--prune', action='store_true', help="Remove server files that are not in the local build")
+parser.add_argument('--no-restart', action='store_true', help="Switch files without restarting PM2")
+parser.add_argument('--rollback', action='store_true', help="Point dist back at the previous release")
+parser.add_argument('--full', action='store_true', help="Ship every file, not just the changed ones")
+parser.add_argument('--via', choices=['ssm', 's3'], default='ssm', help="Channel for the bundle chunks")
+parser.add_argument('--channels', type=int, default=CHANNELS, help="Chunks in flight at once")
+parser.add_argument('--blue-green', action='store_true', help="Zero-downtime swap instead of pm2 restart")
+args = parser.parse_args()
+
+print("🚀 DELTA DEPLOY")
+print("=" * 60)
+
+if args.rollback:
+    result = get_runner().run(rollback_script(), timeout=120)
+    print(result.stdout.strip() or result.stderr.strip())
+    sys.exit(0 if result.ok else 1)
+
+runner = get_runner()
+deployer = DeltaDeployer(args.dist, runner, transfer=ChunkedTransfer(runner, channels=args.channels, via=args.via))
+plan = deployer.plan(full=args.full)
+
+print(f"Local files: {len(plan.local)}, on server: {len(plan.remote)}")
+for label, paths in (("Changed", plan.changed), ("Added", plan.added), ("Removed" if args.prune else "Only on server", plan.removed)):
+    if paths:
+        print(f"\n{label} ({len(paths)}):")
+        for path in paths:
+            print(f"   {path}")
+
+if plan.empty or not (plan.upload or args.prune):
+    print("\n✅ Server already matches the local build - nothing to deploy")
+    sys.exit(0)
+
+if args.dry_run:
+    print("\n(dry run - nothing shipped)")
+    sys.exit(0)
+
+print()
+try:
+    release = deployer.deploy(plan, prune=args.prune, restart=not (args.no_restart or args.blue_green))
+except DeployError as e:
+    print(f"❌ {e}")
+    print("The live release was not touched.")
+    sys.exit(1)
+
+if args.blue_green:
+    # The running colour keeps the old code in memory until it is drained
+    print("\n🔵🟢 Blue/green swap")
+    smoke_email = os.environ.get('SUMMIT_SMOKE_EMAIL')
+    if not smoke_email:
+        print("⚠️  SUMMIT_SMOKE_EMAIL not set - gating on /health only")
+    try:
+        BlueGreenDeployer(runner, smoke_email, os.environ.get('SUMMIT_SMOKE_PASSWORD')).swap()
+    except BlueGreenError as e:
+        print(f"❌ {e}")
+        print("nginx still routes to the previous process. Run --rollback to point dist back.")
+        sys.exit(1)
+
+print(f"\nLive release: {release}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN (ANALYZE, BUFFERS) every SQL statement in server/src against a seeded local Postgres
+and compare the plans with database/plan-baselines.json; exits 1 on a regression or a new big seq scan
+
+Examples:
+  SUMMIT_DB_DSN=postgresql://localhost/summit_bench python explain-queries.py
+  python explain-queries.py --dsn postgresql://localhost/summit_bench --only chats.ts
+  python explain-queries.py --update                  # accept the current plans as the baseline
+  python explain-queries.py --only "GET /api/chats" --verbose
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict
+
+from summit_ops.db import Database, DatabaseError
+from summit_ops.plans import (
+    BASELINE_PATH, BUFFERS_FACTOR, ROWS_FACTOR, SEQ_SCAN_ROWS, PlanCheckError, PlanChecker, load_baselines,
+    plan_targets, save_baselines,
+)
+
+STATUS_ICONS = {'ok': '✅', 'new': '🆕', 'regressed': '❌', 'error': '💥'}
+# Warn when the seeded data differs this much from the baseline's
+DATASET_DRIFT = 2.0
+
+
+def _num(value, digits=0):
+    return '-' if value is None else f"{value:,.{digits}f}"
+
+
+parser = argparse.ArgumentParser(description="Plan regression checks for the backend's SQL")
+parser.add_argument('--dsn', help="Local Postgres to run against (default: SUMMIT_DB_DSN or the PG* variables)")
+parser.add_argument('--baseline', default=BASELINE_PATH)
+parser.add_argument('--update', action='store_true', help="Write the current plans as the new baseline")
+parser.add_argument('--only', action='append', help="Only statements whose file/handler contains this (repeatable)")
+parser.add_argument('--rows-factor', type=float, default=ROWS_FACTOR)
+parser.add_argument('--buffers-factor', type=float, default=BUFFERS_FACTOR)
+parser.add_argument('--seq-scan-rows', type=int, default=SEQ_SCAN_ROWS,
+                    help=f"Seq scans of tables this big fail unless baselined (default {SEQ_SCAN_ROWS:,})")
+parser.add_argument('--verbose', action='store_true', help="Print the plan shape and parameters of every statement")
+parser.add_argument('--json', action='store_true')
+args = parser.parse_args()
+
+try:
+    baselines = load_baselines(args.baseline)
+except PlanCheckError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+targets, skipped = plan_targets()
+if args.only:
+    targets = [t for t in targets if any(part in t.key for part in args.only)]
+
+try:
+    db = Database.local(args.dsn)
+except DatabaseError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+with db:
+    checker = PlanChecker(db, rows_factor=args.rows_factor, buffers_factor=args.buffers_factor,
+                          seq_scan_rows=args.seq_scan_rows)
+
+    if not args.json:
+        print(f"🔬 EXPLAIN ANALYZE of {len(targets)} statements ({len(skipped)} built at runtime, skipped)")
+        print("=" * 60)
+        seeded = checker.dataset()
+        for table, rows in (baselines.get('meta', {}).get('dataset_rows') or {}).items():
+            now = seeded.get(table, 0)
+            if max(rows, now) > 1000 and max(rows, now) > DATASET_DRIFT * max(1, min(rows, now)):
+                print(f"⚠️  {table} has {now:,} rows, the baseline was taken with {rows:,}")
+
+    def report(result):
+        if args.json:
+            return
+        summary = result.summary
+        print(f"{STATUS_ICONS[result.status]} {result.key}")
+        if result.error:
+            print(f"     {result.error}")
+        elif args.verbose or result.flags:
+            print(f"     rows est {_num(summary.estimated_rows)} / actual {_num(summary.actual_rows)}  "
+                  f"buffers {_num(summary.shared_buffers)}  {_num(summary.execution_ms, 2)} ms")
+        for flag in result.flags:
+            print(f"     ⚠️  {flag}")
+        if result.note:
+            print(f"     ℹ️  {result.note}")
+        if args.verbose and summary:
+            print(f"     shape  {summary.shape}")
+            if result.baseline and result.baseline['summary']['shape'] != summary.shape:
+                print(f"     was    {result.baseline['summary']['shape']}")
+            print(f"     params {[str(p) for p in result.params]}")
+
+    results = checker.check(baselines, targets, on_result=report)
+
+    if args.update:
+        save_baselines(results, checker, args.baseline, previous=baselines)
+
+if args.json:
+    print(json.dumps([{
+        'key': r.key, 'status': r.status, 'location': r.target.location, 'flags': r.flags, 'error': r.error,
+        'note': r.note, 'summary': asdict(r.summary) if r.summary else None,
+    } for r in results], indent=2, default=str))
+
+failed = [r for r in results if r.status in ('regressed', 'error')]
+if not args.json:
+    counts = {status: sum(r.status == status for r in results) for status in STATUS_ICONS}
+    print(f"\n{counts['ok']} unchanged, {counts['new']} without baseline, "
+          f"{counts['regressed']} regressed, {counts['error']} failed")
+    if args.update:
+        print(f"💾 Baseline written to {args.baseline}")
+sys.exit(1 if failed and not args.update else 0)
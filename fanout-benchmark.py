@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebSocket fan-out of new messages (messageNotifier.notifyUsers)
+Opens thousands of sockets, sends into group chats of growing size and reports
+POST latency, per-socket delivery latency and server CPU / event-loop delay
+
+Start the local server with EVENT_LOOP_STATS=1 to get the server-side numbers.
+
+Examples:
+  python fanout-benchmark.py
+  python fanout-benchmark.py --sizes 10,100,500,1000 --sockets-per-user 3 --out fanout-$(git rev-parse --short HEAD).json
+  python fanout-benchmark.py --out fanout-new.json --compare fanout-old.json
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+from urllib.parse import urlparse
+
+from summit_ops.fanout import (FanoutBenchmark, GROUP_SIZES, MESSAGES_PER_SIZE, SOCKETS_PER_USER,
+                               compare_artifacts)
+from summit_ops.loadgen import LOCAL_BASE_URL, LoadTestError
+
+
+def raise_file_limit(wanted):
+    """Every socket is a file descriptor; lift the soft limit as far as the hard limit allows"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def _ms(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+parser = argparse.ArgumentParser(description="WebSocket fan-out benchmark for Summit")
+parser.add_argument('--base-url', default=LOCAL_BASE_URL)
+parser.add_argument('--sizes', default=','.join(str(n) for n in GROUP_SIZES),
+                    help="Comma-separated group sizes (members incl. the sender)")
+parser.add_argument('--sockets-per-user', type=int, default=SOCKETS_PER_USER,
+                    help="Connections per user, like one user on several devices")
+parser.add_argument('--messages', type=int, default=MESSAGES_PER_SIZE, help="Messages sent per group size")
+parser.add_argument('--out', help="Write the JSON artifact to this file")
+parser.add_argument('--compare', metavar='BASELINE', help="Compare against an earlier artifact")
+parser.add_argument('--threshold', type=float, default=0.2, help="Relative change reported by --compare")
+parser.add_argument('--allow-remote', action='store_true',
+                    help="Allow a non-local base URL (registers test users and writes messages there!)")
+args = parser.parse_args()
+
+host = urlparse(args.base_url).hostname
+if host not in ('127.0.0.1', 'localhost', '::1') and not args.allow_remote:
+    print(f"❌ {args.base_url} is not local. The benchmark creates users and messages;")
+    print("   run it against a local server, or pass --allow-remote if you really mean it.")
+    sys.exit(2)
+
+sizes = sorted({int(n) for n in args.sizes.split(',') if n.strip()})
+if not sizes or sizes[0] < 2:
+    print("❌ Group sizes must be at least 2 (the sender plus one recipient)")
+    sys.exit(2)
+
+sockets = sizes[-1] * args.sockets_per_user
+limit = raise_file_limit(sockets + 1024)
+print(f"📡 Fan-out benchmark against {args.base_url}")
+print(f"   groups of {', '.join(map(str, sizes))}; {sockets} sockets ({args.sockets_per_user} per user); "
+      f"{args.messages} messages per group")
+if limit < sockets + 64:
+    print(f"⚠️  Open file limit is {limit}; some sockets will fail to connect")
+print("=" * 60)
+
+benchmark = FanoutBenchmark(args.base_url, group_sizes=sizes, sockets_per_user=args.sockets_per_user,
+                            messages=args.messages)
+try:
+    artifact = asyncio.run(benchmark.run(on_progress=lambda message: print(f"   {message}")))
+except LoadTestError as e:
+    print(f"\n❌ {e}")
+    sys.exit(1)
+
+print()
+print(f"{'GROUP':>6} {'SOCKETS':>8} {'RECEIPTS':>13} {'POST P50':>9} {'POST P99':>9} "
+      f"{'DLV P50':>8} {'DLV P99':>8} {'LAST P99':>9} {'LOOP P99':>9} {'CPU%':>6}")
+for row in artifact['results']:
+    server = row['server']
+    loop = (server.get('eventLoopDelayMs') or {}).get('p99')
+    print(f"{row['group_size']:>6} {row['recipient_sockets']:>8} "
+          f"{row['receipts']:>6}/{row['expected_receipts']:<6} "
+          f"{_ms(row['post']['p50_ms']):>9} {_ms(row['post']['p99_ms']):>9} "
+          f"{_ms(row['delivery']['p50_ms']):>8} {_ms(row['delivery']['p99_ms']):>8} "
+          f"{_ms(row['last_receipt']['p99_ms']):>9} {_ms(loop):>9} {_ms(server.get('cpuPercent')):>6}")
+if not any(row['server'] for row in artifact['results']):
+    print("\n💡 No server stats: start the server with EVENT_LOOP_STATS=1 to expose /health/event-loop")
+
+lost = [row for row in artifact['results'] if row['receipts'] < row['expected_receipts']]
+for row in lost:
+    print(f"⚠️  Group of {row['group_size']}: {row['expected_receipts'] - row['receipts']} notifications never arrived")
+
+if args.out:
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, indent=2)
+    print(f"\n💾 Artifact written to {args.out}")
+
+if args.compare:
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    changes = compare_artifacts(artifact, baseline, args.threshold)
+    print(f"\n📊 Compared with {args.compare} (commit {baseline['meta'].get('commit') or '?'})")
+    if not changes:
+        print(f"   No percentile moved by more than {args.threshold:.0%}")
+    for name, key, before, after, change in changes:
+        marker = '🔺' if change > 0 else '🔻'
+        print(f"   {marker} {name} {key}: {before:.1f}ms -> {after:.1f}ms ({change:+.0%})")
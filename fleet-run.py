@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Run one shell command across several Summit instances at once
+Targets explicit instance ids or a tag selector, prints each host as it finishes
+
+Examples:
+  python fleet-run.py "pm2 status" --instances i-0fba58db502cc8d39 i-0123456789abcdef0
+  python fleet-run.py "curl -s localhost:4000/health" --tag Role=summit-backend
+  python fleet-run.py "uptime" --target summit-backend --target 'summit-worker-*'
+"""
+import argparse
+import sys
+
+from summit_ops.fleet import FleetRunner
+from summit_ops.inventory import Inventory
+from summit_ops.ssm import REGION, SSMRunner
+
+def parse_tags(values):
+    tags = {}
+    for value in values or []:
+        key, _, tag_value = value.partition('=')
+        tags[key] = tag_value
+    return tags
+
+def print_result(result):
+    icon = "✅" if result.ok else "❌"
+    print(f"\n{icon} {result.instance_id} [{result.status}, exit {result.exit_code}, {result.wall_time:.1f}s]")
+    if result.stdout.strip():
+        print(result.stdout.rstrip())
+    if result.stderr.strip():
+        print(f"stderr: {result.stderr.rstrip()}")
+
+parser = argparse.ArgumentParser(description="Fan a shell command out over SSM")
+parser.add_argument('command')
+parser.add_argument('--instances', nargs='+', help="Instance ids to target")
+parser.add_argument('--tag', action='append', help="Tag selector Key=Value (repeatable)")
+parser.add_argument('--target', action='append',
+                    help="Running instances by Name (globs allowed), Key=Value tag or id, from the inventory cache (repeatable)")
+parser.add_argument('--region', default=REGION)
+parser.add_argument('--timeout', type=int, default=60)
+parser.add_argument('--max-concurrency', default='50%')
+parser.add_argument('--max-errors', default='25%')
+args = parser.parse_args()
+
+if args.tag and (args.instances or args.target):
+    print("❌ --tag selects instances on its own; combine it with neither --instances nor --target")
+    sys.exit(2)
+
+instance_ids = list(args.instances or [])
+if args.target:
+    inventory = Inventory(regions=[args.region])
+    for target in args.target:
+        found = inventory.resolve(target, running_only=True)
+        if not found:
+            print(f"❌ No running instance matches '{target}' in {args.region}")
+            sys.exit(2)
+        instance_ids += [i.instance_id for i in found if i.instance_id not in instance_ids]
+
+print(f"🚀 Running on fleet: {args.command}")
+print("=" * 60)
+
+fleet = FleetRunner(SSMRunner(region=args.region))
+summary = fleet.run(
+    args.command,
+    instance_ids=instance_ids or None,
+    tags=parse_tags(args.tag),
+    timeout=args.timeout,
+    on_result=print_result,
+    max_concurrency=args.max_concurrency,
+    max_errors=args.max_errors,
+)
+
+print("\n" + "=" * 60)
+print(summary.describe())
+sys.exit(0 if not summary.failed else 1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Generate a deterministic synthetic dataset (users, chats, messages, receipts, requests,
+presence, meetings) in a local Postgres with parallel COPY; the same --seed always gives the same rows
+
+Run migrate-db.py up --local against the target first. Users are loadtest-N@loadtest.summit.local,
+so load-test.py and fanout-benchmark.py can log in as them.
+
+Examples:
+  SUMMIT_DB_DSN=postgresql://localhost/summit_bench python generate-dataset.py --scale tiny
+  python generate-dataset.py --dsn postgresql://localhost/summit_bench --scale large --workers 16 --truncate
+  python generate-dataset.py --scale small --messages 5000000 --seed 7 --truncate
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import asdict
+
+from psycopg.conninfo import conninfo_to_dict
+
+from summit_ops.db import LOCAL_HOSTS
+from summit_ops.synthetic import PRESETS, SyntheticDataError, SyntheticDataset, scaled
+
+parser = argparse.ArgumentParser(description="Deterministic synthetic dataset loader")
+parser.add_argument('--dsn', help="Local Postgres to load (default: SUMMIT_DB_DSN or the PG* variables)")
+parser.add_argument('--scale', choices=list(PRESETS), default='tiny')
+parser.add_argument('--users', type=int, help="Override the preset's users")
+parser.add_argument('--chats', type=int, help="Override the preset's chats")
+parser.add_argument('--messages', type=int, help="Override the preset's messages")
+parser.add_argument('--meetings', type=int, help="Override the preset's meetings")
+parser.add_argument('--days', type=int, help="Days of history (default 365)")
+parser.add_argument('--seed', type=int, default=1)
+parser.add_argument('--workers', type=int, help="Loader processes (default: CPU count)")
+parser.add_argument('--truncate', action='store_true', help="Empty the tables first (required if users has rows)")
+parser.add_argument('--keep-indexes', action='store_true', help="Load with secondary indexes in place (slower)")
+parser.add_argument('--allow-remote', action='store_true', help="Allow a non-local database (truncates and loads it!)")
+args = parser.parse_args()
+
+conninfo = args.dsn or os.environ.get('SUMMIT_DB_DSN', '')
+host = conninfo_to_dict(conninfo).get('host') or os.environ.get('PGHOST', '')
+if host not in LOCAL_HOSTS and not host.startswith('/') and not args.allow_remote:
+    print(f"❌ {host} is not local. The generator truncates and bulk-loads tables;")
+    print("   point it at a local Postgres, or pass --allow-remote if you really mean it.")
+    sys.exit(2)
+
+scale = scaled(args.scale, users=args.users, chats=args.chats, messages=args.messages, meetings=args.meetings,
+               days=args.days)
+dataset = SyntheticDataset(conninfo, scale, seed=args.seed, workers=args.workers)
+
+print(f"🧪 Synthetic dataset '{args.scale}' seed {args.seed} with {dataset.workers} workers")
+print("=" * 60)
+print(', '.join(f"{k}={v:,}" for k, v in asdict(scale).items() if k in ('users', 'chats', 'messages', 'meetings')))
+
+last = [0.0]
+
+
+def on_progress(done):
+    now = time.time()
+    if now - last[0] >= 5:
+        last[0] = now
+        print('   ' + '  '.join(f"{table} {count:,}" for table, count in done.items()), flush=True)
+
+
+started = time.time()
+try:
+    report = dataset.load(truncate=args.truncate, defer_indexes=not args.keep_indexes, on_progress=on_progress)
+except SyntheticDataError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+print()
+for table, (rows, seconds) in report.items():
+    if table.startswith('('):
+        print(f"   {table:<22} {'':>12} {seconds:>8.1f}s")
+    else:
+        print(f"   {table:<22} {rows:>12,} {seconds:>8.1f}s  {rows / max(seconds, 1e-6):>10,.0f} rows/s")
+print(f"\n✅ Loaded in {time.time() - started:.1f}s")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Index advisor: duplicate, covered, invalid and unused indexes to drop, missing indexes for large
+sequential scans, and the index writes per second the drops would save (from live statistics)
+
+Examples:
+  python index-advisor.py                                   # production, through the PgBouncer tunnel
+  python index-advisor.py --local --min-days 0              # local database, any statistics window
+  python index-advisor.py --sql database/drop_redundant_indexes.sql
+  python index-advisor.py --json > index-advice.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from summit_ops.db import DatabaseError, connect
+from summit_ops.indexes import MIN_DAYS, SEQ_SCAN_ROWS, TOP_STATEMENTS, IndexAdviceError, IndexAdvisor
+
+REASON_ICONS = {'duplicate': '👯', 'covered': '🔁', 'invalid': '💥', 'unused': '💤'}
+
+
+def mb(value):
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+def migration_sql(advice):
+    """Proposals as a migration file; migrate-db.py runs the index statements CONCURRENTLY"""
+    lines = [f"-- Index changes proposed by index-advisor.py on {datetime.now(timezone.utc):%Y-%m-%d}",
+             f"-- Statistics window: {advice.window_s / 86400:.1f} days; statements from {advice.statements_source}",
+             "-- Review, then add this file to ORDER in summit_ops/migrations.py", ""]
+    for drop in advice.drops:
+        lines.append(f"-- {drop.reason}: {drop.detail}")
+        lines.append(drop.statement.replace(' CONCURRENTLY', ''))
+    if advice.creates:
+        lines.append("")
+    for create in advice.creates:
+        lines.append(f"-- {create.seq_scans:,} seq scans of {create.table}, {create.rows_per_scan:,} rows each")
+        lines.append(create.statement.replace(' CONCURRENTLY', ''))
+    return '\n'.join(lines) + '\n'
+
+
+parser = argparse.ArgumentParser(description="Redundant and missing index advisor")
+parser.add_argument('--min-days', type=float, default=MIN_DAYS,
+                    help=f"Statistics window needed before proposing unused drops (default {MIN_DAYS})")
+parser.add_argument('--seq-scan-rows', type=int, default=SEQ_SCAN_ROWS,
+                    help=f"Only tables whose seq scans average this many rows get create proposals "
+                         f"(default {SEQ_SCAN_ROWS:,})")
+parser.add_argument('--statements', type=int, default=TOP_STATEMENTS, help="Top pg_stat_statements entries to read")
+parser.add_argument('--sql', metavar='FILE', help="Write the proposals as a migration file")
+parser.add_argument('--json', action='store_true')
+parser.add_argument('--direct', action='store_true', help="Tunnel to Postgres instead of PgBouncer")
+parser.add_argument('--local', action='store_true', help="Use the local Postgres (SUMMIT_DB_DSN or PG* variables)")
+args = parser.parse_args()
+
+try:
+    db = connect(local=args.local or None, direct=args.direct)
+except DatabaseError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+with db:
+    advisor = IndexAdvisor(db, min_days=args.min_days, seq_scan_rows=args.seq_scan_rows,
+                           top_statements=args.statements)
+    try:
+        advice = advisor.advise()
+    except IndexAdviceError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+if args.sql:
+    with open(args.sql, 'w', encoding='utf-8') as f:
+        f.write(migration_sql(advice))
+
+if args.json:
+    print(json.dumps({
+        'window_days': round(advice.window_s / 86400, 2),
+        'statements_source': advice.statements_source,
+        'drops': [{'table': d.index.table, 'index': d.index.name, 'reason': d.reason, 'detail': d.detail,
+                   'bytes': d.index.bytes, 'scans': d.index.scans, 'statement': d.statement} for d in advice.drops],
+        'creates': [{'table': c.table, 'keys': c.keys, 'predicate': c.predicate, 'seq_scans': c.seq_scans,
+                     'rows_per_scan': c.rows_per_scan, 'statement': c.statement,
+                     'queries': [s.source if s.calls is None else s.query for s in c.statements]}
+                    for c in advice.creates],
+        'savings': [{'table': s.table, 'writes_per_s': s.writes_per_s, 'indexes': s.indexes,
+                     'dropped': s.dropped, 'added': s.added, 'index_entries_per_s': s.entries_per_s,
+                     'index_bytes_per_s': s.bytes_per_s, 'reclaimed_bytes': s.reclaimed_bytes}
+                    for s in advice.savings],
+        'notes': advice.notes,
+    }, indent=2))
+    sys.exit(0)
+
+print(f"🗂️  Index advice ({advice.window_s / 86400:.1f} days of statistics, statements from "
+      f"{advice.statements_source})")
+print("=" * 60)
+
+print(f"\n🗑️  Drop ({len(advice.drops)})")
+for drop in advice.drops:
+    index = drop.index
+    print(f"{REASON_ICONS[drop.reason]} {index.table}.{index.name}  {mb(index.bytes)}, {index.scans:,} scans")
+    print(f"     {drop.detail}")
+
+print(f"\n➕ Create ({len(advice.creates)})")
+for create in advice.creates:
+    print(f"   {create.statement}")
+    print(f"     {create.seq_scans:,} seq scans of {create.table} averaging {create.rows_per_scan:,} rows")
+    for statement in create.statements[:3]:
+        where = statement.source if statement.calls is None else \
+            f"{statement.calls:,} calls, {statement.mean_ms:.2f} ms mean"
+        print(f"     ← {' '.join(statement.query.split())[:90]}  ({where})")
+
+if advice.savings:
+    print("\n✍️  Write amplification")
+    print(f"   {'TABLE':<22} {'WRITES/s':>9} {'INDEXES':>9} {'ENTRIES/s SAVED':>16} {'BYTES/s':>10} {'FREED':>10}")
+    for saving in advice.savings:
+        after = saving.indexes - len(saving.dropped) + saving.added
+        written = f"{saving.bytes_per_s / 1024:,.1f} kB"
+        print(f"   {saving.table:<22} {saving.writes_per_s:>9.1f} {f'{saving.indexes} → {after}':>9} "
+              f"{saving.entries_per_s:>16,.1f} {written:>10} {mb(saving.reclaimed_bytes):>10}")
+        for insert in saving.inserts[:2]:
+            print(f"     {' '.join(insert.query.split())[:70]}  {insert.calls:,} calls, "
+                  f"{insert.mean_ms:.2f} ms mean, {saving.share:.0%} fewer index updates each")
+
+if advice.notes:
+    print()
+for note in advice.notes:
+    print(f"ℹ️  {note}")
+
+if args.sql:
+    print(f"\n💾 Migration written to {args.sql}")
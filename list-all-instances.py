@@ -1,28 +1,31 @@
 #!/usr/bin/env python3
-import boto3
+"""
+List every EC2 instance in the configured regions, fresh from AWS
+Same inventory as list-ec2-instances.py, but always refreshes the cache first
+"""
+import sys
 
-ec2 = boto3.client('ec2', region_name='us-east-1')
+from summit_ops.inventory import Inventory, InventoryError
 
+inventory = Inventory()
 try:
-    response = ec2.describe_instances()
-    
-    print("All EC2 instances in us-east-1:")
-    print("-" * 50)
-    
-    for reservation in response['Reservations']:
-        for instance in reservation['Instances']:
-            name = 'No Name'
-            for tag in instance.get('Tags', []):
-                if tag['Key'] == 'Name':
-                    name = tag['Value']
-                    break
-            
-            print(f"ID: {instance['InstanceId']}")
-            print(f"Name: {name}")
-            print(f"State: {instance['State']['Name']}")
-            print(f"Type: {instance['InstanceType']}")
-            print(f"Public IP: {instance.get('PublicIpAddress', 'None')}")
-            print("-" * 30)
-            
-except Exception as e:
-    print(f"Error: {str(e)}")
\ No newline at end of file
+    instances = inventory.instances(refresh=True)
+except InventoryError as e:
+    print(f"Error: {e}")
+    sys.exit(1)
+
+print(f"All EC2 instances in {', '.join(inventory.regions)}:")
+print("-" * 50)
+
+for instance in sorted(instances, key=lambda i: (i.region, i.name)):
+    print(f"ID: {instance.instance_id}")
+    print(f"Region: {instance.region}")
+    print(f"Name: {instance.name or 'No Name'}")
+    print(f"State: {instance.state}")
+    print(f"Type: {instance.instance_type}")
+    print(f"Public IP: {instance.public_ip or 'None'}")
+    print(f"SSM managed: {'unknown' if instance.ssm_managed is None else instance.ssm_managed}")
+    print("-" * 30)
+
+for region, error in inventory.errors.items():
+    print(f"⚠️  {region}: {error}")
@@ -1,34 +1,63 @@
 #!/usr/bin/env python3
 """
-List all EC2 instances to find the correct one
+List EC2 instances across the configured regions (SUMMIT_REGIONS, default eu-west-1,us-east-1)
+Served from the local inventory cache; stale entries are refreshed in the background
+
+Examples:
+  python list-ec2-instances.py
+  python list-ec2-instances.py --refresh
+  python list-ec2-instances.py 'summit-*' --running
+  python list-ec2-instances.py Role=summit-backend --ids
+  python list-ec2-instances.py --region us-east-1 --json
 """
-import boto3
+import argparse
+import json
+import sys
+from dataclasses import asdict
 
-ec2 = boto3.client('ec2', region_name='us-east-1')
+from summit_ops.inventory import REGIONS, Inventory, InventoryError
 
-print("🔍 Listing all EC2 instances in us-east-1...\n")
+parser = argparse.ArgumentParser(description="Cached multi-region EC2 inventory")
+parser.add_argument('target', nargs='?', help="Instance id, Name (globs allowed) or Key=Value tag")
+parser.add_argument('--region', action='append', help="Region to include (repeatable, default: all configured)")
+parser.add_argument('--running', action='store_true', help="Only running instances")
+parser.add_argument('--refresh', action='store_true', help="Query AWS now instead of using the cache")
+parser.add_argument('--ids', action='store_true', help="Print instance ids only, one per line")
+parser.add_argument('--json', action='store_true', help="Print the instances as JSON")
+args = parser.parse_args()
 
+inventory = Inventory(regions=args.region or REGIONS)
 try:
-    response = ec2.describe_instances()
-    
-    if not response['Reservations']:
-        print("❌ No instances found")
-        exit(1)
-    
-    for reservation in response['Reservations']:
-        for instance in reservation['Instances']:
-            instance_id = instance['InstanceId']
-            state = instance['State']['Name']
-            instance_type = instance['InstanceType']
-            tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-            name = tags.get('Name', 'N/A')
-            
-            print(f"Instance: {instance_id}")
-            print(f"  Name: {name}")
-            print(f"  State: {state}")
-            print(f"  Type: {instance_type}")
-            print(f"  Private IP: {instance.get('PrivateIpAddress', 'N/A')}")
-            print()
-            
-except Exception as e:
-    print(f"❌ Error: {e}")
+    instances = inventory.instances(refresh=args.refresh)
+except InventoryError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+if args.target:
+    instances = [i for i in instances if i.matches(args.target)]
+if args.running:
+    instances = [i for i in instances if i.running]
+instances.sort(key=lambda i: (i.region, i.name, i.instance_id))
+
+if args.ids:
+    print('\n'.join(i.instance_id for i in instances))
+    sys.exit(0)
+if args.json:
+    print(json.dumps([asdict(i) for i in instances], indent=2))
+    sys.exit(0)
+
+print(f"🔍 EC2 instances in {', '.join(inventory.regions)} (inventory {inventory.age:.0f}s old)")
+print("=" * 60)
+if not instances:
+    print("❌ No instances found")
+    sys.exit(1)
+
+ssm_icons = {True: '✅', False: '❌', None: '?'}
+print(f"{'ID':<21} {'REGION':<11} {'NAME':<28} {'STATE':<10} {'TYPE':<11} {'PRIVATE IP':<15} {'PUBLIC IP':<15} SSM")
+for i in instances:
+    ssm = ssm_icons[i.ssm_managed] + (f" {i.ssm_ping}" if i.ssm_ping and i.ssm_ping != 'Online' else '')
+    print(f"{i.instance_id:<21} {i.region:<11} {(i.name or '-')[:28]:<28} {i.state:<10} {i.instance_type:<11} "
+          f"{i.private_ip or '-':<15} {i.public_ip or '-':<15} {ssm}")
+
+for region, error in inventory.errors.items():
+    print(f"⚠️  {region}: last refresh failed ({error}); showing the previous listing")
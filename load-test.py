@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Load test the Summit API and WebSocket with simulated desktop clients
+Reports throughput and p50/p95/p99 per endpoint plus end-to-end message delivery latency
+
+Meant for a locally started server + Postgres (it registers loadtest-N users and
+creates group chats). Start the server first, see summit_ops/loadgen.py.
+
+Examples:
+  python load-test.py --scenario smoke
+  python load-test.py --scenario steady --users 500 --duration 120 --json-out load-steady-500.json
+  python load-test.py --scenario burst --base-url http://127.0.0.1:4000
+"""
+import argparse
+import asyncio
+import json
+import sys
+from urllib.parse import urlparse
+
+from summit_ops.latency import format_table
+from summit_ops.loadgen import LOCAL_BASE_URL, SCENARIOS, LoadGenerator, LoadTestError, scenario_with
+
+parser = argparse.ArgumentParser(description="Asyncio load generator for the Summit API")
+parser.add_argument('--base-url', default=LOCAL_BASE_URL)
+parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='smoke')
+parser.add_argument('--users', type=int, help="Override the scenario's virtual users")
+parser.add_argument('--duration', type=float, help="Override the scenario's duration (seconds)")
+parser.add_argument('--ramp-up', type=float, help="Override the scenario's ramp-up (seconds)")
+parser.add_argument('--group-size', type=int, help="Members per load-test group chat")
+parser.add_argument('--json-out', help="Write the results to this JSON file")
+parser.add_argument('--allow-remote', action='store_true',
+                    help="Allow a non-local base URL (registers test users and writes messages there!)")
+args = parser.parse_args()
+
+host = urlparse(args.base_url).hostname
+if host not in ('127.0.0.1', 'localhost', '::1') and not args.allow_remote:
+    print(f"❌ {args.base_url} is not local. The load test creates users and messages;")
+    print("   run it against a local server, or pass --allow-remote if you really mean it.")
+    sys.exit(2)
+
+scenario = scenario_with(args.scenario, users=args.users, duration=args.duration,
+                         ramp_up=args.ramp_up, group_size=args.group_size)
+print(f"🔥 Load test '{scenario.name}' against {args.base_url}")
+print(f"   {scenario.users} users, {scenario.duration:.0f}s, ramp-up {scenario.ramp_up:.0f}s, groups of {scenario.group_size}")
+print("=" * 60)
+
+try:
+    result = asyncio.run(LoadGenerator(args.base_url, scenario).run(on_progress=lambda message: print(f"   {message}")))
+except LoadTestError as e:
+    print(f"\n❌ {e}")
+    sys.exit(1)
+
+print()
+print(format_table(result.summaries))
+print(f"\nMessages sent: {result.messages_sent}, deliveries received: {result.deliveries}, "
+      f"messages with missing deliveries: {result.undelivered}")
+errors = [s for s in result.summaries if s['errors']]
+for s in errors:
+    print(f"⚠️  {s['name']}: {s['error_kinds']}")
+
+if args.json_out:
+    with open(args.json_out, 'w', encoding='utf-8') as f:
+        json.dump(result.to_json(), f, indent=2)
+    print(f"\n💾 Results written to {args.json_out}")
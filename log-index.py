@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local full-text index over backend and nginx logs
+
+Examples:
+  python log-index.py collect                       # pull new PM2 + nginx log bytes from the server
+  python log-index.py ingest pm2-out.log access.log.2.gz
+  python log-index.py search --event NEW_MESSAGE --user 3f0c...-... --limit 1
+  python log-index.py search "chime AND error" --since 2025-01-31T08:00
+  python log-index.py events --since 2025-01-31
+"""
+import argparse
+import os
+
+from summit_ops.logindex import DEFAULT_DB_PATH, LogIndex
+from summit_ops.logtail import PM2_APP, LogFollower, discover_log_files
+
+NGINX_LOG_FILES = ['/var/log/nginx/access.log', '/var/log/nginx/error.log']
+CURSOR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.summit-logs.cursor.json')
+
+def collect(index, paths):
+    """Drain every remote log from its saved cursor into the index"""
+    follower = LogFollower(paths, from_start=True, state_path=CURSOR_FILE)
+    total = 0
+    while True:
+        lines, pending = follower.poll()
+        by_source = {}
+        for line in lines:
+            by_source.setdefault(line.source, []).append(line.text)
+        for source, texts in by_source.items():
+            total += index.add_lines(texts, source)
+        if not pending:
+            return total
+
+parser = argparse.ArgumentParser(description="Index and search Summit logs locally")
+parser.add_argument('--db', default=DEFAULT_DB_PATH)
+sub = parser.add_subparsers(dest='action', required=True)
+
+collect_parser = sub.add_parser('collect', help="Fetch new remote log bytes and index them")
+collect_parser.add_argument('--file', action='append', help="Remote log file (repeatable)")
+collect_parser.add_argument('--app', default=PM2_APP, help="PM2 app whose log paths to discover")
+
+ingest_parser = sub.add_parser('ingest', help="Index local log files (.gz supported)")
+ingest_parser.add_argument('files', nargs='+')
+
+search_parser = sub.add_parser('search', help="Query the index")
+search_parser.add_argument('text', nargs='?', help="FTS5 query, e.g. 'chime AND error'")
+search_parser.add_argument('--event')
+search_parser.add_argument('--user')
+search_parser.add_argument('--level')
+search_parser.add_argument('--since')
+search_parser.add_argument('--until')
+search_parser.add_argument('--limit', type=int, default=50)
+
+events_parser = sub.add_parser('events', help="Count entries per event type")
+events_parser.add_argument('--since')
+events_parser.add_argument('--until')
+
+args = parser.parse_args()
+index = LogIndex(args.db)
+
+if args.action == 'collect':
+    paths = args.file or discover_log_files(args.app) + NGINX_LOG_FILES
+    print(f"📥 Collecting {', '.join(paths)}")
+    print(f"✅ Indexed {collect(index, paths)} new lines")
+elif args.action == 'ingest':
+    for path in args.files:
+        print(f"✅ {path}: indexed {index.ingest_file(path)} new lines")
+elif args.action == 'search':
+    rows = index.search(args.text, since=args.since, until=args.until, event=args.event,
+                        user_id=args.user, level=args.level, limit=args.limit)
+    for row in rows:
+        print(f"{row['ts'] or '-':<28} {row['level']:<5} {row['event'] or '-':<18} {row['line']}")
+    if not rows:
+        print("No matching entries")
+else:
+    for row in index.event_counts(since=args.since, until=args.until):
+        print(f"{row['n']:>8}  {row['event']}")
+
+index.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Apply the SQL migrations in database/ once each, tracked in schema_migrations
+Index builds run CONCURRENTLY outside transactions; other DDL waits at most --lock-timeout per try
+
+Examples:
+  python migrate-db.py                                      # status: applied, pending, changed (drift)
+  python migrate-db.py plan                                 # the steps a run would execute
+  python migrate-db.py up
+  python migrate-db.py up --only add_performance_indexes.sql
+  python migrate-db.py baseline                             # production was migrated by hand: record, don't run
+  python migrate-db.py accept migration_add_chats.sql       # reviewed an edit to an applied file
+  SUMMIT_DB_DSN=postgresql://localhost/summit python migrate-db.py up
+"""
+import argparse
+import sys
+
+from summit_ops.db import DatabaseError, connect
+from summit_ops.migrations import LOCK_TIMEOUT, MigrationError, MigrationRunner
+
+STATE_ICONS = {'applied': '✅', 'pending': '⏳', 'changed': '⚠️ ', 'missing': '❓', 'unlisted': '➕'}
+
+
+def print_step(result):
+    step = result.step
+    kind = 'concurrent' if step.concurrent else 'tx'
+    note = f"  ({result.note})" if result.note else ''
+    print(f"   {result.duration_ms:>9.1f} ms  {kind:<10} {step.summary}{note}")
+
+
+parser = argparse.ArgumentParser(description="Idempotent migration runner for database/")
+parser.add_argument('action', nargs='?', default='status', choices=['status', 'plan', 'up', 'baseline', 'accept'])
+parser.add_argument('names', nargs='*', help="Migration files for accept")
+parser.add_argument('--only', action='append', help="Limit plan/up/baseline to these files (repeatable)")
+parser.add_argument('--allow-drift', action='store_true', help="Apply even if applied files have changed")
+parser.add_argument('--lock-timeout', default=LOCK_TIMEOUT, help=f"Per-try lock wait for DDL (default {LOCK_TIMEOUT})")
+parser.add_argument('--pgbouncer', action='store_true',
+                    help="Tunnel to PgBouncer instead of Postgres (status, plan, baseline and accept only)")
+parser.add_argument('--local', action='store_true', help="Use the local Postgres (SUMMIT_DB_DSN or PG* variables)")
+args = parser.parse_args()
+
+if args.pgbouncer and args.action == 'up':
+    print("❌ up holds a session-level advisory lock, which PgBouncer's transaction pooling cannot keep;")
+    print("   run it without --pgbouncer (direct to Postgres)")
+    sys.exit(2)
+
+try:
+    db = connect(local=args.local or None, direct=not args.pgbouncer)
+except DatabaseError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+with db:
+    runner = MigrationRunner(db, lock_timeout=args.lock_timeout)
+    try:
+        if args.action == 'status':
+            print("🗄️  Migrations")
+            print("=" * 60)
+            for status in runner.status():
+                applied = f"{status.applied_at:%Y-%m-%d %H:%M}" if status.applied_at else ''
+                took = f"{status.duration_ms} ms" if status.duration_ms is not None else ''
+                print(f"{STATE_ICONS[status.state]} {status.name:<42} {status.state:<9} {applied:<17} {took}")
+            for name, reason in sorted(runner.skipped.items()):
+                print(f"   {name:<42} skipped   {reason}")
+
+        elif args.action == 'plan':
+            pending = runner.pending(args.only)
+            if not pending:
+                print("✅ Nothing to apply")
+            for migration in pending:
+                print(f"\n📄 {migration.name}")
+                for step in migration.steps():
+                    kind = 'concurrent' if step.concurrent else 'tx'
+                    print(f"   {kind:<10} {'(rewritten) ' if step.rewritten else ''}{step.summary}")
+
+        elif args.action == 'up':
+            current = None
+
+            def on_step(result):
+                global current
+                if result.migration != current:
+                    current = result.migration
+                    print(f"\n📄 {current}")
+                print_step(result)
+
+            applied = runner.apply(args.only, allow_drift=args.allow_drift, on_step=on_step)
+            if not applied:
+                print("✅ Nothing to apply")
+            else:
+                print(f"\n✅ Applied {len(applied)} migrations in {sum(m.duration_ms for m in applied) / 1000:.1f}s")
+                for migration in applied:
+                    print(f"   {migration.name:<42} {len(migration.steps):>4} steps {migration.duration_ms:>10.0f} ms")
+
+        elif args.action == 'baseline':
+            recorded = runner.baseline(args.only)
+            print(f"✅ Recorded {len(recorded)} migrations as applied without running them")
+            for name in recorded:
+                print(f"   {name}")
+
+        elif args.action == 'accept':
+            accepted = runner.accept(args.names)
+            print(f"✅ Accepted new checksums for {len(accepted)} migrations")
+            for name in accepted:
+                print(f"   {name}")
+    except MigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
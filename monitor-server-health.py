@@ -1,106 +1,72 @@
 #!/usr/bin/env python3
 """
 Continuous server health monitoring
-Checks server status and auto-restarts if needed
+Probes /health, /api/auth/health, the /ws handshake and nginx concurrently
+Drops to fast-interval probing as soon as any probe fails
+Auto-restarts the backend if /health keeps failing
 Run this in background or as a scheduled task
 """
-import boto3
-import time
-import requests
+import asyncio
 from datetime import datetime
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
+from summit_ops.monitor import FAST_INTERVAL, NORMAL_INTERVAL, HealthMonitor, default_probes
+from summit_ops.ssm import SSMRunner
+
 INSTANCE_ID = 'i-0fba58db502cc8d39'
-HEALTH_URL = 'https://summit.api.codingeverest.com/health'
-CHECK_INTERVAL = 300  # 5 minutes
+ssm_runner = SSMRunner(INSTANCE_ID)
+RESTART_AFTER_FAILURES = 2
+RESTART_COOLDOWN = 120  # seconds before another restart may be attempted
 
-def run_command(command):
-    response = ssm.send_command(
-        InstanceIds=[INSTANCE_ID],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=30
-    )
-    command_id = response['Command']['CommandId']
-    time.sleep(3)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=INSTANCE_ID
-    )
-    
-    return output.get('StandardOutputContent', '').strip()
+last_restart = 0.0
 
-def check_health():
-    """Check if server is responding"""
-    try:
-        response = requests.get(HEALTH_URL, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'ok':
-                return True, "Server healthy"
-        return False, f"Unhealthy response: {response.status_code}"
-    except Exception as e:
-        return False, f"Connection failed: {str(e)}"
-
-def restart_server():
-    """Restart the PM2 process"""
-    print(f"[{datetime.now()}] 🔄 Attempting to restart server...")
-    stdout = run_command("cd /var/www/summit && pm2 restart summit")
-    print(stdout)
-    time.sleep(10)  # Wait for server to start
+def run_command(command, timeout=30):
+    return ssm_runner.run(command, timeout=timeout).stdout.strip()
 
 def validate_config():
     """Validate critical configuration"""
     stdout = run_command("/var/www/summit/validate.sh 2>&1")
     return "All validations passed" in stdout, stdout
 
+def restart_server():
+    """Validate config, fix the known region issue if needed, restart PM2"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    config_valid, validation_output = validate_config()
+    if not config_valid:
+        print(f"[{timestamp}] ⚠️ Configuration validation failed:")
+        print(validation_output)
+        print(f"[{timestamp}] 🔧 Attempting to fix configuration...")
+        run_command("cd /var/www/summit && sed -i \"s/region: us-east-1/region: 'us-east-1'/g\" index.js")
+
+    print(f"[{timestamp}] 🔄 Attempting to restart server...")
+    print(run_command("cd /var/www/summit && pm2 restart summit"))
+
+async def on_failure(state):
+    global last_restart
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] ❌ {state.probe.name}: {state.last_error} (Failure #{state.consecutive_failures})")
+
+    if state.probe.name != 'health' or state.consecutive_failures < RESTART_AFTER_FAILURES:
+        return
+    loop = asyncio.get_running_loop()
+    if loop.time() - last_restart < RESTART_COOLDOWN:
+        return
+
+    last_restart = loop.time()
+    print(f"[{timestamp}] 🚨 CRITICAL: Server down, attempting restart...")
+    # SSM calls block, keep them off the event loop so other probes keep running
+    await asyncio.to_thread(restart_server)
+
+async def on_recovery(state):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] ✅ {state.probe.name} recovered")
+
 def main():
     print("🔍 SERVER HEALTH MONITOR STARTED")
-    print(f"Checking every {CHECK_INTERVAL} seconds")
+    print(f"Probing every {NORMAL_INTERVAL}s, every {FAST_INTERVAL}s while degraded")
     print("=" * 60)
-    
-    consecutive_failures = 0
-    
-    while True:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Check health
-        is_healthy, message = check_health()
-        
-        if is_healthy:
-            print(f"[{timestamp}] ✅ {message}")
-            consecutive_failures = 0
-        else:
-            consecutive_failures += 1
-            print(f"[{timestamp}] ❌ {message} (Failure #{consecutive_failures})")
-            
-            # Auto-restart after 2 consecutive failures
-            if consecutive_failures >= 2:
-                print(f"[{timestamp}] 🚨 CRITICAL: Server down, attempting restart...")
-                
-                # Validate config first
-                config_valid, validation_output = validate_config()
-                if not config_valid:
-                    print(f"[{timestamp}] ⚠️ Configuration validation failed:")
-                    print(validation_output)
-                    print(f"[{timestamp}] 🔧 Attempting to fix configuration...")
-                    run_command("cd /var/www/summit && sed -i \"s/region: us-east-1/region: 'us-east-1'/g\" index.js")
-                
-                # Restart server
-                restart_server()
-                
-                # Check if restart worked
-                time.sleep(5)
-                is_healthy, message = check_health()
-                if is_healthy:
-                    print(f"[{timestamp}] ✅ Server successfully restarted")
-                    consecutive_failures = 0
-                else:
-                    print(f"[{timestamp}] ❌ Restart failed, will retry in {CHECK_INTERVAL}s")
-        
-        # Wait before next check
-        time.sleep(CHECK_INTERVAL)
+
+    monitor = HealthMonitor(default_probes(), on_failure=on_failure, on_recovery=on_recovery)
+    asyncio.run(monitor.run())
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Latency probe for the Summit API
+Logs in once (the token is cached in .summit-probe-token.json until it expires), sends every
+endpoint of the matrix N times concurrently over one keep-alive session and prints
+percentiles and a latency histogram per endpoint
+
+Credentials come from SUMMIT_PROBE_EMAIL / SUMMIT_PROBE_PASSWORD or --email and a prompt.
+
+Examples:
+  python probe-api.py
+  python probe-api.py -n 50 --concurrency 20 --only chats,messages,contacts --histogram
+  python probe-api.py --save probe-before.json
+  python probe-api.py --compare probe-before.json --threshold 0.25
+  python probe-api.py --matrix my-endpoints.json --base-url http://127.0.0.1:4000
+"""
+import argparse
+import asyncio
+import getpass
+import json
+import os
+import sys
+
+from summit_ops.latency import compare, format_histogram, format_table
+from summit_ops.monitor import API_BASE
+from summit_ops.probes import (CONCURRENCY, DEFAULT_MATRIX, REQUESTS_PER_ENDPOINT, ProbeError, ProbeRunner,
+                               TokenCache, load_matrix)
+
+parser = argparse.ArgumentParser(description="Latency probe for the Summit API")
+parser.add_argument('--base-url', default=API_BASE)
+parser.add_argument('--email', default=os.environ.get('SUMMIT_PROBE_EMAIL'))
+parser.add_argument('-n', '--requests', type=int, default=REQUESTS_PER_ENDPOINT, help="Requests per endpoint")
+parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="Requests in flight at once")
+parser.add_argument('--matrix', help="JSON file with the endpoints to probe (default: built-in matrix)")
+parser.add_argument('--only', help="Comma-separated endpoint names from the matrix")
+parser.add_argument('--histogram', action='store_true', help="Print a latency histogram per endpoint")
+parser.add_argument('--save', metavar='FILE', help="Write the results to FILE (usable as a baseline)")
+parser.add_argument('--compare', metavar='BASELINE', help="Compare percentiles against a saved run")
+parser.add_argument('--threshold', type=float, default=0.2, help="Relative change reported by --compare")
+parser.add_argument('--no-cache', action='store_true', help="Ignore and do not write the token cache")
+parser.add_argument('--no-warmup', action='store_true', help="Time the first request of every endpoint too")
+args = parser.parse_args()
+
+try:
+    matrix = load_matrix(args.matrix) if args.matrix else DEFAULT_MATRIX
+except ProbeError as e:
+    print(f"❌ {e}")
+    sys.exit(2)
+if args.only:
+    wanted = {name.strip() for name in args.only.split(',')}
+    unknown = wanted - {endpoint.name for endpoint in matrix}
+    if unknown:
+        print(f"❌ Unknown endpoint(s): {', '.join(sorted(unknown))}")
+        print(f"   Available: {', '.join(endpoint.name for endpoint in matrix)}")
+        sys.exit(2)
+    matrix = [endpoint for endpoint in matrix if endpoint.name in wanted]
+
+cache = None if args.no_cache else TokenCache()
+password = os.environ.get('SUMMIT_PROBE_PASSWORD')
+needs_login = any(endpoint.auth for endpoint in matrix)
+if needs_login and not password and not (cache and cache.get(args.base_url.rstrip('/'), args.email)):
+    if not args.email:
+        print("❌ Set SUMMIT_PROBE_EMAIL or pass --email for authenticated endpoints")
+        sys.exit(2)
+    password = getpass.getpass(f"Password for {args.email}: ")
+
+print(f"⏱️  Probing {len(matrix)} endpoints on {args.base_url}")
+print(f"   {args.requests} requests each, {args.concurrency} in flight")
+print("=" * 60)
+
+runner = ProbeRunner(args.base_url, args.email, password, matrix, requests_per_endpoint=args.requests,
+                     concurrency=args.concurrency, token_cache=cache or False, warmup=not args.no_warmup)
+try:
+    result = asyncio.run(runner.run())
+except ProbeError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+
+if needs_login:
+    print(f"🔑 {'Reused cached token' if result.token_cached else 'Logged in'} for {args.email or 'cached account'}")
+for name, reason in result.skipped.items():
+    print(f"⏭️  Skipped {name}: {reason}")
+print()
+print(format_table(result.summaries))
+
+for summary in result.summaries:
+    if summary['errors']:
+        print(f"⚠️  {summary['name']}: {summary['error_kinds']}")
+
+if args.histogram:
+    for name, stats in sorted(result.book.items()):
+        print()
+        print(format_histogram(name, stats.histogram()))
+
+if args.save:
+    with open(args.save, 'w', encoding='utf-8') as f:
+        json.dump(result.to_json(), f, indent=2)
+    print(f"\n💾 Results written to {args.save}")
+
+regressed = False
+if args.compare:
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    changes = compare(result.summaries, baseline['summaries'], args.threshold)
+    print(f"\n📊 Compared with {args.compare} ({baseline.get('timestamp', '?')})")
+    if not changes:
+        print(f"   No percentile moved by more than {args.threshold:.0%}")
+    for name, key, before, after, change in changes:
+        marker = '🔺' if change > 0 else '🔻'
+        print(f"   {marker} {name} {key}: {before:.1f}ms -> {after:.1f}ms ({change:+.0%})")
+    regressed = any(change > 0 for *_, change in changes)
+
+failed = any(summary['errors'] for summary in result.summaries)
+sys.exit(1 if failed or regressed else 0)
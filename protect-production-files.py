@@ -6,6 +6,8 @@ Run this after every deployment to lock down configuration files
 import boto3
 import time
 
+from summit_ops.backup_store import BackupStore
+
 ssm = boto3.client('ssm', region_name='eu-west-1')
 INSTANCE_ID = 'i-0fba58db502cc8d39'
 
@@ -31,13 +33,9 @@ print("=" * 60)
 
 # Create backup of current working configuration
 print("\n1. Creating backup of working configuration...")
-stdout = run_command("""
-cd /var/www/summit
-cp index.js index.js.WORKING_BACKUP_$(date +%Y%m%d_%H%M%S)
-cp .env .env.WORKING_BACKUP_$(date +%Y%m%d_%H%M%S)
-echo "Backups created"
-""")
-print(stdout)
+# Stored in the deduplicated backup store: unchanged files cost nothing extra
+print(BackupStore().snapshot(time.strftime('working-%Y%m%d-%H%M%S')))
+print("Restore with: python backup-store.py restore <label>")
 
 # Make files read-only (but keep writable by root for emergency fixes)
 print("\n2. Setting file permissions to read-only...")
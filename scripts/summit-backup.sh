@@ -0,0 +1,199 @@
+#!/bin/bash
+# Summit content-addressed backup store
+# Keeps every distinct file version once (gzipped, named by SHA-256) and a
+# small manifest per labelled snapshot, so repeated "panic backups" of the
+# same index.js/.env cost almost nothing and restores are a single lookup.
+#
+# Installed on the server as /usr/local/bin/summit-backup by
+# summit_ops/backup_store.py (backup-store.py in the repo root).
+#
+# Layout under $SUMMIT_BACKUP_STORE (default /var/www/summit-backups):
+#   objects/ab/abcdef....gz     file contents, once per distinct version
+#   snapshots/<label>.manifest  "<sha256> <mode> <size> <absolute path>" per file
+#   catalog.tsv                 label, created, files, bytes, manifest sha256
+#
+# Usage:
+#   summit-backup snapshot <label> <file-or-dir>...
+#   summit-backup list
+#   summit-backup show <label>
+#   summit-backup restore <label> [--to <root>]
+#   summit-backup drop <label>
+#   summit-backup gc
+#   summit-backup import-legacy [--remove] [dir]
+#   summit-backup stats
+
+set -euo pipefail
+
+STORE=${SUMMIT_BACKUP_STORE:-/var/www/summit-backups}
+mkdir -p "$STORE/objects" "$STORE/snapshots"
+touch "$STORE/catalog.tsv"
+
+die() { echo "❌ $*" >&2; exit 1; }
+
+valid_label() {
+    [[ "$1" =~ ^[A-Za-z0-9._-]+$ ]] || die "Invalid label '$1' (letters, digits, . _ - only)"
+}
+
+object_path() { echo "$STORE/objects/${1:0:2}/$1.gz"; }
+
+# store_file <source file> -> prints sha256; stores the blob if it is new
+store_file() {
+    local sha obj
+    sha=$(sha256sum "$1" | cut -d' ' -f1)
+    obj=$(object_path "$sha")
+    if [ ! -f "$obj" ]; then
+        mkdir -p "${obj%/*}"
+        gzip -c "$1" > "$obj.tmp" && mv "$obj.tmp" "$obj"
+    fi
+    echo "$sha"
+}
+
+# finish_snapshot <label> <temp manifest> <created>
+finish_snapshot() {
+    local files bytes digest
+    files=$(wc -l < "$2")
+    digest=$(sha256sum "$2" | cut -d' ' -f1)
+    bytes=$(awk '{ s += $3 } END { print s + 0 }' "$2")
+    mv "$2" "$STORE/snapshots/$1.manifest"
+    printf '%s\t%s\t%s\t%s\t%s\n' "$1" "$3" "$files" "$bytes" "$digest" >> "$STORE/catalog.tsv"
+    echo "✅ Snapshot $1: $files file(s)"
+}
+
+cmd_snapshot() {
+    local label=$1; shift
+    valid_label "$label"
+    [ $# -gt 0 ] || die "Nothing to snapshot"
+    [ ! -e "$STORE/snapshots/$label.manifest" ] || die "Snapshot $label already exists"
+
+    local tmp sha abs
+    tmp=$(mktemp)
+    while IFS= read -r -d '' f; do
+        abs=$(readlink -f "$f")
+        sha=$(store_file "$abs")
+        printf '%s %s %s\n' "$sha" "$(stat -c '%a %s' "$abs")" "$abs" >> "$tmp"
+    done < <(find "$@" -type f -print0)
+    finish_snapshot "$label" "$tmp" "$(date -u +%Y-%m-%dT%H:%M:%SZ)"
+}
+
+cmd_list() {
+    sort -t $'\t' -k2 "$STORE/catalog.tsv"
+}
+
+cmd_show() {
+    valid_label "$1"
+    cat "$STORE/snapshots/$1.manifest" 2>/dev/null || die "No snapshot $1"
+}
+
+cmd_restore() {
+    local label=$1 root=""
+    valid_label "$label"
+    [ "${2:-}" = "--to" ] && root=${3:?--to needs a directory}
+    local manifest="$STORE/snapshots/$label.manifest"
+    [ -f "$manifest" ] || die "No snapshot $label"
+
+    # Restores are reversible: the files about to be replaced are snapshotted first
+    if [ -z "$root" ]; then
+        local current=()
+        while read -r _ _ _ path; do [ -f "$path" ] && current+=("$path"); done < "$manifest"
+        if [ ${#current[@]} -gt 0 ]; then
+            cmd_snapshot "pre-restore-$(date -u +%Y%m%d-%H%M%S)" "${current[@]}" >/dev/null
+        fi
+    fi
+
+    local restored=0 target
+    while read -r sha mode _ path; do
+        target="$root$path"
+        mkdir -p "$(dirname "$target")"
+        gunzip -c "$(object_path "$sha")" > "$target.restore-tmp"
+        echo "$sha  $target.restore-tmp" | sha256sum -c --quiet || die "Checksum mismatch for $path"
+        chmod "$mode" "$target.restore-tmp"
+        mv -f "$target.restore-tmp" "$target"
+        restored=$((restored + 1))
+    done < "$manifest"
+    echo "✅ Restored $restored file(s) from $label${root:+ into $root}"
+}
+
+cmd_drop() {
+    valid_label "$1"
+    rm -f "$STORE/snapshots/$1.manifest"
+    awk -F'\t' -v label="$1" '$1 != label' "$STORE/catalog.tsv" > "$STORE/catalog.tsv.tmp"
+    mv "$STORE/catalog.tsv.tmp" "$STORE/catalog.tsv"
+    echo "Dropped $1 (run gc to free unreferenced objects)"
+}
+
+cmd_gc() {
+    local referenced removed=0
+    referenced=$(mktemp)
+    cat "$STORE"/snapshots/*.manifest 2>/dev/null | awk '{ print $1 }' | sort -u > "$referenced"
+    while IFS= read -r obj; do
+        if ! grep -qx "$(basename "$obj" .gz)" "$referenced"; then
+            rm -f "$obj"
+            removed=$((removed + 1))
+        fi
+    done < <(find "$STORE/objects" -type f -name '*.gz')
+    rm -f "$referenced"
+    echo "Removed $removed unreferenced object(s)"
+}
+
+# Fold loose copies (index.js.backup-*, index.js.WORKING_BACKUP_*, .env.WORKING_BACKUP_*)
+# into the store; copies sharing a suffix become one snapshot labelled legacy-<suffix>
+cmd_import_legacy() {
+    local remove=false
+    if [ "${1:-}" = "--remove" ]; then remove=true; shift; fi
+    local dir=${1:-/var/www/summit}
+    local work imported=0
+    work=$(mktemp -d)
+
+    for f in "$dir"/index.js.backup* "$dir"/index.js.WORKING_BACKUP_* "$dir"/.env.backup* "$dir"/.env.WORKING_BACKUP_*; do
+        [ -f "$f" ] || continue
+        local name original suffix label sha
+        name=$(basename "$f")
+        if [[ "$name" == *.WORKING_BACKUP_* ]]; then
+            original=${name%%.WORKING_BACKUP_*}; suffix="WORKING_BACKUP_${name#*.WORKING_BACKUP_}"
+        else
+            original=${name%%.backup*}; suffix="backup${name#*.backup}"
+        fi
+        label="legacy-$(echo "${suffix#-}" | tr -c 'A-Za-z0-9._\n-' '_')"
+        [ -e "$STORE/snapshots/$label.manifest" ] && continue
+
+        sha=$(store_file "$f")
+        printf '%s %s %s\n' "$sha" "$(stat -c '%a %s' "$f")" "$dir/$original" >> "$work/$label"
+        # The oldest copy's mtime stands for the snapshot's creation time
+        date -u -d "@$(stat -c %Y "$f")" +%Y-%m-%dT%H:%M:%SZ > "$work/$label.created"
+        echo "$f" >> "$work/$label.sources"
+    done
+
+    for manifest in "$work"/*; do
+        case "$manifest" in *.created|*.sources|"$work/*") continue ;; esac
+        local label
+        label=$(basename "$manifest")
+        finish_snapshot "$label" "$manifest" "$(cat "$manifest.created")"
+        if $remove; then xargs -r -d '\n' rm -f < "$manifest.sources"; fi
+        imported=$((imported + 1))
+    done
+    rm -rf "$work"
+    echo "Imported $imported legacy backup set(s)"
+    if $remove; then echo "Loose copies removed"; fi
+}
+
+cmd_stats() {
+    local objects snapshots
+    objects=$(find "$STORE/objects" -type f -name '*.gz' | wc -l)
+    snapshots=$(wc -l < "$STORE/catalog.tsv")
+    echo "snapshots=$snapshots objects=$objects store_bytes=$(du -sb "$STORE" | cut -f1)"
+}
+
+action=${1:-}
+[ -n "$action" ] || die "Usage: summit-backup snapshot|list|show|restore|drop|gc|import-legacy|stats"
+shift
+case "$action" in
+    snapshot) cmd_snapshot "$@" ;;
+    list) cmd_list ;;
+    show) cmd_show "$@" ;;
+    restore) cmd_restore "$@" ;;
+    drop) cmd_drop "$@" ;;
+    gc) cmd_gc ;;
+    import-legacy) cmd_import_legacy "$@" ;;
+    stats) cmd_stats ;;
+    *) die "Unknown command $action" ;;
+esac
@@ -2,6 +2,7 @@ import express from "express";
 import cors from "cors";
 import dotenv from "dotenv";
 import { createServer } from "http";
+import { monitorEventLoopDelay } from "perf_hooks";
 import { WebSocketServer } from "ws";
 import authRoutes from "./routes/auth.js";
 import meetingsRoutes from "./routes/meetings.js";
@@ -179,6 +180,39 @@ app.get("/health", (req, res) => {
   res.json({ status: "ok" });
 });
 
+// Runtime stats for benchmarks (opt-in with EVENT_LOOP_STATS=1): event-loop delay, CPU, sockets
+// GET /health/event-loop?reset=1 returns the stats since the previous reset and starts a new window
+if (process.env.EVENT_LOOP_STATS === "1") {
+  const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+  loopDelay.enable();
+  let cpuSince = process.cpuUsage();
+  let wallSince = process.hrtime.bigint();
+
+  app.get("/health/event-loop", (req, res) => {
+    const cpu = process.cpuUsage(cpuSince);
+    const wallMicros = Number(process.hrtime.bigint() - wallSince) / 1000;
+    const ms = (ns: number) => Math.round(ns / 1e4) / 100;
+    res.json({
+      eventLoopDelayMs: {
+        mean: ms(loopDelay.mean),
+        p50: ms(loopDelay.percentile(50)),
+        p99: ms(loopDelay.percentile(99)),
+        max: ms(loopDelay.max),
+      },
+      cpuPercent: Math.round(((cpu.user + cpu.system) / wallMicros) * 10000) / 100,
+      windowSeconds: Math.round(wallMicros / 1e4) / 100,
+      rssBytes: process.memoryUsage().rss,
+      websocketClients: wss.clients.size,
+    });
+    if (req.query.reset === "1") {
+      loopDelay.reset();
+      cpuSince = process.cpuUsage();
+      wallSince = process.hrtime.bigint();
+    }
+  });
+  console.log("📊 Event-loop stats enabled at /health/event-loop");
+}
+
 // Get server hostname (never use localhost in production)
 const HOST = process.env.HOST || '0.0.0.0'; // Listen on all interfaces
 
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Rank the backend's slow queries by fingerprint and map them to the route that issues them
+Reads the "Slow query detected" / "Database query error" lines db.ts writes to the PM2 logs
+
+Examples:
+  python slow-queries.py --remote                               # every (rotated) log PM2 writes for the app
+  python slow-queries.py pm2-logs/pm2-out*.log*                 # local copies, .gz included
+  python slow-queries.py --remote --since 2025-01-31T00:00 --window 15m --by p95
+  python slow-queries.py --remote --json > slow-queries.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from summit_ops.logtail import PM2_APP, discover_log_files
+from summit_ops.slowqueries import RANKINGS, SlowQueryReport, iter_log_lines, remote_log_command
+from summit_ops.ssm import get_runner
+
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(value):
+    try:
+        return int(value[:-1]) * WINDOW_UNITS[value[-1]] if value[-1] in WINDOW_UNITS else int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid window '{value}' (use e.g. 15m, 1h, 1d)")
+
+
+def parse_time(value):
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _ms(value):
+    return '-' if value is None else f"{value:.0f}"
+
+
+parser = argparse.ArgumentParser(description="Slow-query fingerprints from the backend logs")
+parser.add_argument('paths', nargs='*', help="Local log files or globs (rotated and .gz files included)")
+parser.add_argument('--remote', action='store_true', help="Read every backend log on the server over SSM")
+parser.add_argument('--app', default=PM2_APP, help="PM2 app whose log paths to discover (with --remote)")
+parser.add_argument('--window', type=parse_window, default=3600, help="Time window for the trend (default 1h)")
+parser.add_argument('--since', type=parse_time, help="ISO time, UTC unless an offset is given")
+parser.add_argument('--until', type=parse_time)
+parser.add_argument('--by', choices=sorted(RANKINGS), default='total', help="Ranking (default: total time)")
+parser.add_argument('--top', type=int, default=15)
+parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+args = parser.parse_args()
+
+if not args.paths and not args.remote:
+    parser.error("give log files or --remote")
+
+report = SlowQueryReport(window=args.window, since=args.since, until=args.until)
+if args.remote:
+    runner = get_runner()
+    result = runner.run_large(remote_log_command(discover_log_files(args.app, runner)))
+    if not result.ok:
+        print(f"❌ Could not read the remote logs: {result.stderr.strip() or result.status}")
+        sys.exit(1)
+    report.add_lines(result.stdout.splitlines())
+if args.paths:
+    report.add_lines(iter_log_lines(args.paths))
+report.attach_sources()
+
+if args.json:
+    print(json.dumps(report.to_json(args.by), indent=2))
+    sys.exit(0)
+
+ranked = report.ranked(args.by)
+print(f"🐢 Slow queries: {sum(s.count for s in ranked)} in {len(ranked)} fingerprints (ranked by {args.by})")
+print("=" * 60)
+if not ranked:
+    print("✅ No slow queries logged in this range")
+for rank, stats in enumerate(ranked[:args.top], 1):
+    summary = stats.stats.summary()
+    print(f"\n#{rank}  total {stats.total_ms / 1000:.1f}s  count {stats.count}  "
+          f"p50 {_ms(summary['p50_ms'])}ms  p95 {_ms(summary['p95_ms'])}ms  max {_ms(summary['max_ms'])}ms")
+    print(f"    {stats.fingerprint[:150]}{' …' if stats.truncated else ''}")
+    if not stats.sources:
+        print("    ❓ not found in server/src (dynamic SQL or changed since this was logged)")
+    for source in stats.sources[:4]:
+        print(f"    → {source.handler}  ({source.location})")
+    if len(stats.sources) > 4:
+        print(f"    → … and {len(stats.sources) - 4} more call sites")
+    if len(stats.windows) > 1:
+        trend = '  '.join(f"{start:%m-%d %H:%M} {n}" for start, (n, _) in sorted(stats.windows.items())[-8:])
+        print(f"    per window: {trend}")
+
+handlers = report.handler_totals()
+if handlers:
+    print(f"\n{'HANDLER':<50} {'SLOW TIME':>10} {'QUERIES':>8}")
+    for handler, total_ms, count in handlers[:args.top]:
+        print(f"{handler[:50]:<50} {total_ms / 1000:>9.1f}s {count:>8}")
+    print("(a fingerprint with several candidate call sites is split evenly between them)")
+
+windows = report.windows()
+if len(windows) > 1:
+    print(f"\n{'WINDOW (UTC)':<18} {'SLOW':>6} {'TIME':>9}")
+    for start, count, total_ms in windows[-24:]:
+        print(f"{start:%Y-%m-%d %H:%M}  {count:>6} {total_ms / 1000:>8.1f}s")
+
+if report.failures:
+    print("\n❌ Database errors")
+    for failure in sorted(report.failures.values(), key=lambda f: f.count, reverse=True)[:args.top]:
+        print(f"   {failure.count:>5}x  {failure.code or '-':<12} {failure.origin or '(unknown route)':<36} {failure.message[:80]}")
+if report.undated:
+    print(f"\n⚠️  {report.undated} records had no timestamp (PM2 without `time: true`); they count in totals only")
@@ -0,0 +1,25 @@
+"""
+Shared helpers for the Summit ops scripts.
+
+The scripts in the repository root import from here instead of carrying
+their own copy of the SSM plumbing.
+"""
+from summit_ops.fleet import FleetRunner, FleetSummary, run_on_fleet
+from summit_ops.ssm import (
+    CommandResult,
+    CommandTimeout,
+    SSMError,
+    SSMRunner,
+    run_command,
+)
+
+__all__ = [
+    'CommandResult',
+    'CommandTimeout',
+    'FleetRunner',
+    'FleetSummary',
+    'SSMError',
+    'SSMRunner',
+    'run_command',
+    'run_on_fleet',
+]
@@ -0,0 +1,163 @@
+"""
+Parallel, sandboxed evaluation of index.js backups on the host.
+
+Every candidate backup is copied to a throwaway file next to the live
+index.js (so its relative imports, node_modules and .env resolve the
+same way) and started as its own node process on an ephemeral port.
+The same smoke suite then runs against all candidates at once, and the
+results come back as JSON lines from a single SSM invocation. The live
+PM2 process and the live index.js are never touched.
+
+Candidates share the production database, so the suite only reads:
+health checks, login and GET /api/chats.
+
+Usage:
+    from summit_ops.backup_eval import BackupEvaluator
+
+    for result in BackupEvaluator(smoke_email=..., smoke_password=...).evaluate():
+        print(result.name, result.passed, result.median_latency)
+"""
+import base64
+import json
+import shlex
+import statistics
+from dataclasses import dataclass, field
+
+from summit_ops.ssm import get_runner
+
+APP_DIR = '/var/www/summit'
+CANDIDATE_PATTERN = r'^index\.js\.(backup|WORKING_BACKUP)'
+FIRST_PORT = 4100
+# Each candidate is a full Node process with its own DB pool; the
+# instance has 2 GB of RAM, so only a few run at the same time
+PARALLEL = 4
+BOOT_TIMEOUT = 30
+WORK_DIR = '/tmp/summit-backup-eval'
+
+
+@dataclass
+class CandidateResult:
+    name: str
+    booted: bool = False
+    boot_seconds: float = 0.0
+    checks: dict = field(default_factory=dict)
+    log_tail: str = ''
+
+    @property
+    def passed(self):
+        return sum(1 for check in self.checks.values() if check['ok'])
+
+    @property
+    def failed(self):
+        return len(self.checks) - self.passed
+
+    @property
+    def median_latency(self):
+        latencies = [check['seconds'] for check in self.checks.values() if check['ok']]
+        return statistics.median(latencies) if latencies else float('inf')
+
+    @property
+    def healthy(self):
+        return self.booted and bool(self.checks) and not self.failed
+
+
+def rank(results):
+    """Most passing checks first, then fastest"""
+    return sorted(results, key=lambda r: (-r.passed, r.failed, r.median_latency))
+
+
+class BackupEvaluator:
+    """Boots every candidate backup side by side and smoke-tests them"""
+
+    def __init__(self, runner=None, smoke_email=None, smoke_password=None, app_dir=APP_DIR,
+                 pattern=CANDIDATE_PATTERN, parallel=PARALLEL):
+        self.runner = runner or get_runner()
+        self.smoke_email = smoke_email
+        self.smoke_password = smoke_password
+        self.app_dir = app_dir
+        self.pattern = pattern
+        self.parallel = parallel
+
+    def build_script(self, candidates=None):
+        if candidates:
+            listing = 'printf "%s\\n" ' + ' '.join(shlex.quote(c) for c in candidates)
+        else:
+            listing = f"ls -1 | grep -E {shlex.quote(self.pattern)}"
+
+        login = ''
+        if self.smoke_email and self.smoke_password:
+            body = shlex.quote(json.dumps({'email': self.smoke_email, 'password': self.smoke_password}))
+            login = f"""  probe login -X POST "$base/api/auth/login" -H 'Content-Type: application/json' -d {body}
+  token=$(sed -n 's/.*"token":"\\([^"]*\\)".*/\\1/p' "$work/$n.login.body")
+  probe chats "$base/api/chats" -H "Authorization: Bearer $token"
+"""
+
+        return f"""cd {shlex.quote(self.app_dir)} || exit 1
+work={WORK_DIR}; rm -rf "$work"; mkdir -p "$work"
+
+report() {{ printf '{{"candidate":"%s","check":"%s","status":%s,"seconds":%s,"ok":%s}}\\n' "$name" "$1" "$2" "$3" "$4"; }}
+
+probe() {{
+  check=$1; shift
+  r=$(curl -s -o "$work/$n.$check.body" -w '%{{http_code}} %{{time_total}}' --max-time 10 "$@")
+  code=$(expr "${{r% *}}" + 0); secs=${{r#* }}
+  ok=false
+  if [ "$code" -ge 200 ] && [ "$code" -lt 300 ] && ! grep -q '"error"' "$work/$n.$check.body"; then ok=true; fi
+  report "$check" "${{code:-0}}" "${{secs:-0}}" "$ok"
+}}
+
+evaluate() {{
+  n=$1; name=$2; port=$3; base="http://127.0.0.1:$port"
+  file=".eval-$n-index.js"
+  cp "$name" "$file"
+  PORT=$port nohup node "$file" > "$work/$n.log" 2>&1 &
+  pid=$!
+  start=$(date +%s.%N); booted=false
+  for _ in $(seq 1 {BOOT_TIMEOUT * 4}); do
+    if curl -sf "$base/health" >/dev/null 2>&1; then booted=true; break; fi
+    kill -0 "$pid" 2>/dev/null || break
+    sleep 0.25
+  done
+  boot=$(awk "BEGIN {{ print $(date +%s.%N) - $start }}")
+  report boot 0 "$boot" "$booted"
+  if $booted; then
+    probe health "$base/health"
+    probe auth-health "$base/api/auth/health"
+{login}  fi
+  kill "$pid" 2>/dev/null; wait "$pid" 2>/dev/null
+  rm -f "$file"
+  printf '{{"candidate":"%s","log":"%s"}}\\n' "$name" "$(tail -c 2000 "$work/$n.log" | base64 -w0)"
+}}
+
+n=0
+for name in $({listing}); do
+  evaluate "$n" "$name" $(({FIRST_PORT} + n)) > "$work/$n.jsonl" &
+  n=$((n + 1))
+  if [ $((n % {self.parallel})) -eq 0 ]; then wait; fi
+done
+wait
+cat "$work"/*.jsonl 2>/dev/null
+rm -rf "$work"
+"""
+
+    def evaluate(self, candidates=None, timeout=600):
+        """Run the suite against every candidate; returns ranked results"""
+        output = self.runner.run_large(self.build_script(candidates), timeout=timeout).stdout
+        return rank(parse_results(output).values())
+
+
+def parse_results(output):
+    results = {}
+    for line in output.splitlines():
+        if not line.startswith('{'):
+            continue
+        record = json.loads(line)
+        result = results.setdefault(record['candidate'], CandidateResult(record['candidate']))
+        if 'log' in record:
+            result.log_tail = base64.b64decode(record['log']).decode('utf-8', errors='replace')
+        elif record['check'] == 'boot':
+            result.booted = record['ok']
+            result.boot_seconds = record['seconds']
+        else:
+            result.checks[record['check']] = record
+    return results
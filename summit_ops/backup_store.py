@@ -0,0 +1,135 @@
+"""
+Content-addressed store for on-host backend backups.
+
+Wraps scripts/summit-backup.sh, which the store installs on the host as
+/usr/local/bin/summit-backup. Every distinct file version is kept once
+(gzipped, named by its SHA-256); a snapshot is a small manifest under a
+label, and catalog.tsv lists every label with its time and manifest
+hash. Taking a snapshot of unchanged files stores nothing new, and a
+restore is a single lookup by label - no listing and grepping of
+index.js.backup-* copies.
+
+Usage:
+    from summit_ops.backup_store import BackupStore
+
+    store = BackupStore()
+    store.snapshot('before-chime-fix', ['/var/www/summit/index.js', '/var/www/summit/.env'])
+    store.restore('before-chime-fix')
+"""
+import base64
+import hashlib
+import os
+import shlex
+from dataclasses import dataclass
+
+from summit_ops.ssm import get_runner
+
+TOOL_SOURCE = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'summit-backup.sh')
+REMOTE_TOOL = '/usr/local/bin/summit-backup'
+STORE_DIR = '/var/www/summit-backups'
+APP_DIR = '/var/www/summit'
+PRODUCTION_FILES = [f'{APP_DIR}/index.js', f'{APP_DIR}/.env']
+
+
+class BackupStoreError(Exception):
+    """Raised when the host-side store rejects an operation"""
+
+
+@dataclass
+class Snapshot:
+    label: str
+    created: str
+    files: int
+    bytes: int
+    manifest_sha256: str
+
+
+@dataclass
+class SnapshotEntry:
+    sha256: str
+    mode: str
+    size: int
+    path: str
+
+
+def parse_catalog(output):
+    snapshots = []
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) == 5:
+            snapshots.append(Snapshot(fields[0], fields[1], int(fields[2]), int(fields[3]), fields[4]))
+    return snapshots
+
+
+def parse_manifest(output):
+    entries = []
+    for line in output.splitlines():
+        parts = line.split(' ', 3)
+        if len(parts) == 4 and len(parts[0]) == 64:
+            entries.append(SnapshotEntry(parts[0], parts[1], int(parts[2]), parts[3]))
+    return entries
+
+
+class BackupStore:
+    """Snapshot, list and restore backend files through the host-side store"""
+
+    def __init__(self, runner=None, store_dir=STORE_DIR):
+        self.runner = runner or get_runner()
+        self.store_dir = store_dir
+        self._installed = False
+
+    def install(self):
+        """Push summit-backup to the host unless the same version is already there"""
+        with open(TOOL_SOURCE, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha256(source).hexdigest()
+        encoded = base64.b64encode(source).decode()
+        script = f"""[ "$(sha256sum {REMOTE_TOOL} 2>/dev/null | cut -c1-64)" = "{digest}" ] && exit 0
+printf '%s' '{encoded}' | base64 -d > {REMOTE_TOOL}.tmp
+chmod 755 {REMOTE_TOOL}.tmp && mv {REMOTE_TOOL}.tmp {REMOTE_TOOL}
+echo "installed {REMOTE_TOOL}"
+"""
+        result = self.runner.run(script, timeout=60)
+        if not result.ok:
+            raise BackupStoreError(f"Could not install {REMOTE_TOOL}: {result.stderr.strip()}")
+        self._installed = True
+        return result.stdout.strip()
+
+    def snapshot(self, label, paths=PRODUCTION_FILES):
+        return self._call('snapshot', label, *paths)
+
+    def list(self):
+        return parse_catalog(self._call('list', large=True))
+
+    def show(self, label):
+        return parse_manifest(self._call('show', label, large=True))
+
+    def restore(self, label, to=None):
+        """Restore every file of a snapshot; the files it replaces are snapshotted first"""
+        args = ['restore', label] + (['--to', to] if to else [])
+        return self._call(*args, timeout=120)
+
+    def drop(self, label):
+        return self._call('drop', label)
+
+    def gc(self):
+        return self._call('gc', timeout=300)
+
+    def import_legacy(self, directory=APP_DIR, remove=False):
+        """Fold loose index.js/.env backup copies into the store"""
+        args = ['import-legacy'] + (['--remove'] if remove else []) + [directory]
+        return self._call(*args, timeout=300)
+
+    def stats(self):
+        output = self._call('stats')
+        return {key: int(value) for key, _, value in (field.partition('=') for field in output.split())}
+
+    def _call(self, *args, timeout=60, large=False):
+        if not self._installed:
+            self.install()
+        command = f"SUMMIT_BACKUP_STORE={shlex.quote(self.store_dir)} {REMOTE_TOOL} " + ' '.join(shlex.quote(a) for a in args)
+        run = self.runner.run_large if large else self.runner.run
+        result = run(command, timeout=timeout)
+        if not result.ok:
+            raise BackupStoreError(f"summit-backup {args[0]} failed: {result.stderr.strip() or result.stdout.strip()}")
+        return result.stdout.strip()
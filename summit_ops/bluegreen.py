@@ -0,0 +1,227 @@
+"""
+Zero-downtime blue/green backend swap on the single production host.
+
+Two PM2 apps take turns serving traffic:
+    blue  = summit-backend        on port 4000
+    green = summit-backend-green  on port 4001
+
+nginx reaches the backend through `upstream summit_backend`, defined in
+its own small include file, so switching colours is one atomic file
+replace plus a graceful `nginx -s reload`. A swap:
+
+    1. starts the idle colour on the release dist currently points at
+    2. gates on its /health and a login + GET /api/chats smoke test
+    3. points the upstream at it and reloads nginx
+    4. drains the old colour: waits for in-flight requests, then closes
+       the remaining WebSocket connections in small batches so clients
+       reconnect gradually instead of all at once
+    5. stops the old colour
+
+If the gate fails the new process is stopped and nginx is never touched.
+
+Each colour is started from the production ecosystem file with only its
+name, PORT and script (the dist symlink) overridden, so both keep the
+timestamped logs, log paths and memory limit the rest of the tooling
+relies on. Plain deploys and rollbacks restart whichever colour
+.active-color names (restart_live_command) rather than always blue.
+
+Usage:
+    from summit_ops.bluegreen import BlueGreenDeployer
+
+    BlueGreenDeployer(smoke_email=..., smoke_password=...).swap()
+"""
+import json
+import shlex
+from dataclasses import dataclass
+
+from summit_ops.ssm import get_runner
+
+APP_DIR = '/var/www/summit'
+NGINX_SITE = '/etc/nginx/sites-enabled/summit.api.codingeverest.com'
+UPSTREAM_CONF = '/etc/nginx/conf.d/summit-upstream.conf'
+UPSTREAM_NAME = 'summit_backend'
+STATE_FILE = f'{APP_DIR}/.active-color'
+ECOSYSTEM = f'{APP_DIR}/server/ecosystem.config.cjs'
+
+GATE_TIMEOUT = 90
+DRAIN_TIMEOUT = 60
+# WebSocket connections closed per batch, and the pause between batches
+DRAIN_BATCH = 25
+DRAIN_BATCH_INTERVAL = 1
+
+
+class BlueGreenError(Exception):
+    """Raised when a swap step fails; production keeps serving the old colour"""
+
+
+@dataclass(frozen=True)
+class Color:
+    name: str
+    app: str
+    port: int
+
+
+BLUE = Color('blue', 'summit-backend', 4000)
+GREEN = Color('green', 'summit-backend-green', 4001)
+COLORS = {BLUE.name: BLUE, GREEN.name: GREEN}
+
+
+def other(color):
+    return GREEN if color == BLUE else BLUE
+
+
+def restart_live_command(state_file=STATE_FILE):
+    """Shell lines that restart the PM2 app of the colour nginx routes to"""
+    return f"""export HOME=/home/ubuntu
+case "$(cat {shlex.quote(state_file)} 2>/dev/null)" in {GREEN.name}) live={GREEN.app} ;; *) live={BLUE.app} ;; esac
+pm2 restart "$live" >/dev/null"""
+
+
+def ecosystem_config(color, ecosystem=ECOSYSTEM, app_dir=APP_DIR):
+    """PM2 config for a colour: the production app with its name, PORT and script overridden"""
+    return f"""const path = require('path');
+const file = {json.dumps(ecosystem)};
+const base = require(file).apps.find(app => app.name === {json.dumps(BLUE.app)});
+// Relative log paths are relative to the ecosystem file, not to this one
+const logs = {{}};
+for (const key of ['out_file', 'error_file', 'log_file']) {{
+  if (base[key]) logs[key] = path.resolve(path.dirname(file), base[key]);
+}}
+module.exports = {{
+  apps: [{{
+    ...base,
+    ...logs,
+    name: {json.dumps(color.app)},
+    script: {json.dumps(f'{app_dir}/dist/index.js')},
+    cwd: {json.dumps(app_dir)},
+    env: {{ ...base.env, PORT: {color.port} }},
+    env_production: {{ ...base.env_production, PORT: {color.port} }},
+  }}],
+}};
+"""
+
+
+class BlueGreenDeployer:
+    """Orchestrates a blue/green swap over SSM"""
+
+    def __init__(self, runner=None, smoke_email=None, smoke_password=None, on_progress=print):
+        self.runner = runner or get_runner()
+        self.smoke_email = smoke_email
+        self.smoke_password = smoke_password
+        self.on_progress = on_progress
+
+    def active(self):
+        """The colour nginx currently routes to"""
+        result = self._run(f"cat {STATE_FILE} 2>/dev/null || echo {BLUE.name}", "read active colour")
+        return COLORS.get(result.stdout.strip(), BLUE)
+
+    def prepare_nginx(self):
+        """One-time switch of the site's proxy_pass lines to the named upstream"""
+        self._run(f"""set -e
+if grep -q 'proxy_pass http://{UPSTREAM_NAME}' {NGINX_SITE}; then echo "already using upstream"; exit 0; fi
+cp {NGINX_SITE} {NGINX_SITE}.backup-bluegreen-$(date +%s)
+[ -f {UPSTREAM_CONF} ] || printf 'upstream {UPSTREAM_NAME} {{\\n    server 127.0.0.1:{BLUE.port};\\n}}\\n' > {UPSTREAM_CONF}
+sed -i -E 's#proxy_pass http://(localhost|127\\.0\\.0\\.1):{BLUE.port}#proxy_pass http://{UPSTREAM_NAME}#g' {NGINX_SITE}
+if ! nginx -t 2>&1; then
+  cp "$(ls -1t {NGINX_SITE}.backup-bluegreen-* | head -1)" {NGINX_SITE}
+  echo "nginx -t failed, site config restored" >&2; exit 1
+fi
+systemctl reload nginx
+echo "nginx now proxies through upstream {UPSTREAM_NAME}"
+""", "prepare nginx upstream")
+
+    def start(self, color):
+        """Start (or restart) a colour from the ecosystem file, on the release dist points at right now"""
+        config = f'{APP_DIR}/.ecosystem-{color.name}.cjs'
+        script = f"""set -e
+export HOME=/home/ubuntu
+cd {APP_DIR}
+release=$(readlink -f {APP_DIR}/dist)
+cat > {config} <<'EOF'
+{ecosystem_config(color)}EOF
+pm2 delete {color.app} >/dev/null 2>&1 || true
+pm2 start {config} --env production >/dev/null
+echo "started {color.app} on :{color.port} from $release"
+"""
+        self._run(script, f"start {color.name}")
+
+    def gate(self, color):
+        """Wait for the new colour's /health, then run the login smoke test against it"""
+        base = f"http://127.0.0.1:{color.port}"
+        script = f"""deadline=$(( $(date +%s) + {GATE_TIMEOUT} ))
+until curl -sf {base}/health | grep -q '"ok"'; do
+  if [ "$(date +%s)" -ge "$deadline" ]; then echo "health never became ok" >&2; exit 1; fi
+  sleep 1
+done
+echo "health ok"
+"""
+        if self.smoke_email and self.smoke_password:
+            body = shlex.quote(json.dumps({'email': self.smoke_email, 'password': self.smoke_password}))
+            script += f"""token=$(curl -sf -X POST {base}/api/auth/login -H 'Content-Type: application/json' -d {body} \\
+  | sed -n 's/.*"token":"\\([^"]*\\)".*/\\1/p')
+[ -n "$token" ] || {{ echo "login smoke test failed" >&2; exit 1; }}
+curl -sf {base}/api/chats -H "Authorization: Bearer $token" >/dev/null || {{ echo "GET /api/chats failed" >&2; exit 1; }}
+echo "login + chats ok"
+"""
+        self._run(script, f"gate {color.name}", timeout=GATE_TIMEOUT + 60)
+
+    def switch(self, color):
+        """Atomically point the nginx upstream at a colour and reload"""
+        self._run(f"""set -e
+printf 'upstream {UPSTREAM_NAME} {{\\n    server 127.0.0.1:{color.port};\\n}}\\n' > {UPSTREAM_CONF}.new
+cp {UPSTREAM_CONF} {UPSTREAM_CONF}.previous
+mv {UPSTREAM_CONF}.new {UPSTREAM_CONF}
+if ! nginx -t 2>&1; then mv {UPSTREAM_CONF}.previous {UPSTREAM_CONF}; echo "nginx -t failed" >&2; exit 1; fi
+# reload is graceful: old workers finish in-flight requests and keep their sockets
+nginx -s reload
+echo {color.name} > {STATE_FILE}
+echo "nginx now routes to {color.name} (:{color.port})"
+""", f"switch to {color.name}")
+
+    def drain(self, color):
+        """Let requests on the old colour finish, then close its WebSockets in batches"""
+        self._run(f"""port={color.port}
+count() {{ ss -Htn state established "( sport = :$port )" | wc -l; }}
+deadline=$(( $(date +%s) + {DRAIN_TIMEOUT} ))
+# Short-lived HTTP requests finish on their own; only long-lived sockets remain
+while [ "$(count)" -gt 0 ] && [ "$(date +%s)" -lt "$deadline" ]; do sleep 1; done
+echo "$(count) connection(s) left on :$port after drain wait"
+for peer in $(ss -Htn state established "( sport = :$port )" | awk '{{print $4}}' | sed 's/.*://'); do
+  ss -K -tn state established "( sport = :$port and dport = :$peer )" >/dev/null 2>&1
+  closed=$((closed + 1))
+  if [ $((closed % {DRAIN_BATCH})) -eq 0 ]; then sleep {DRAIN_BATCH_INTERVAL}; fi
+done
+echo "closed ${{closed:-0}} lingering connection(s) in batches of {DRAIN_BATCH}"
+""", f"drain {color.name}", timeout=DRAIN_TIMEOUT + 300)
+
+    def stop(self, color):
+        self._run(f"export HOME=/home/ubuntu; pm2 stop {color.app} >/dev/null && pm2 save >/dev/null; echo stopped {color.app}",
+                  f"stop {color.name}")
+
+    def swap(self):
+        """Run a full blue/green swap; returns the colour now serving"""
+        self.prepare_nginx()
+        old = self.active()
+        new = other(old)
+        self.on_progress(f"🔵🟢 {old.name} is live, bringing up {new.name}")
+
+        self.start(new)
+        try:
+            self.gate(new)
+        except BlueGreenError:
+            self.stop(new)
+            raise
+
+        self.switch(new)
+        self.drain(old)
+        self.stop(old)
+        self.on_progress(f"✅ {new.name} ({new.app} on :{new.port}) is live")
+        return new
+
+    def _run(self, script, step, timeout=120):
+        result = self.runner.run(script, timeout=timeout)
+        if not result.ok:
+            raise BlueGreenError(f"{step} failed: {result.stderr.strip() or result.stdout.strip()}")
+        if result.stdout.strip():
+            self.on_progress(f"   {result.stdout.strip()}")
+        return result
@@ -0,0 +1,106 @@
+"""
+Batched remote checks: many checks, one SSM invocation.
+
+Each Check names a shell command to run on the host and a predicate to
+apply to its output locally. compile_script() turns a catalog of checks
+into a single remote script that prints one JSON line per check, so a
+full validation pass costs one round trip however many checks there are.
+
+Usage:
+    from summit_ops.checks import Check, run_checks
+
+    CHECKS = [
+        Check('nginx', "Nginx running", "systemctl is-active nginx",
+              passes=lambda out: out == 'active'),
+    ]
+    for outcome in run_checks(CHECKS):
+        print(outcome.check.title, outcome.passed)
+"""
+import base64
+import json
+import shlex
+from dataclasses import dataclass
+
+from summit_ops.ssm import get_runner
+
+BEGIN_MARKER = '__SUMMIT_CHECKS_BEGIN__'
+END_MARKER = '__SUMMIT_CHECKS_END__'
+
+
+class CheckScriptError(Exception):
+    """Raised when the remote check script did not report every check"""
+
+
+@dataclass
+class Check:
+    name: str
+    title: str
+    command: str
+    passes: object
+    ok_message: str = "CORRECT"
+    fail_message: str = "INCORRECT"
+    critical: bool = True
+
+
+@dataclass
+class CheckOutcome:
+    check: Check
+    passed: bool
+    output: str
+    exit_code: int
+
+
+def compile_script(checks):
+    """Build one shell script that runs every check and reports JSON lines"""
+    names = [check.name for check in checks]
+    if len(names) != len(set(names)):
+        raise ValueError("Check names must be unique")
+
+    lines = [f"echo {BEGIN_MARKER}"]
+    for check in checks:
+        # Each command runs in its own subshell so one failure cannot stop the rest
+        lines.append(f"out=$( ( {check.command} ) 2>&1 ); code=$?")
+        lines.append(
+            "printf '{\"name\":\"%s\",\"exit\":%d,\"output\":\"%s\"}\\n' "
+            f"{shlex.quote(check.name)} \"$code\" \"$(printf '%s' \"$out\" | base64 -w0)\""
+        )
+    lines.append(f"echo {END_MARKER}")
+    return "\n".join(lines)
+
+
+def parse_report(stdout):
+    """Turn the remote script's output into {name: (output, exit_code)}"""
+    if BEGIN_MARKER not in stdout or END_MARKER not in stdout:
+        raise CheckScriptError("Check script output is incomplete")
+
+    body = stdout.split(BEGIN_MARKER, 1)[1].split(END_MARKER, 1)[0]
+    report = {}
+    for line in body.splitlines():
+        if not line.startswith('{'):
+            continue
+        section = json.loads(line)
+        output = base64.b64decode(section['output']).decode('utf-8', errors='replace')
+        report[section['name']] = (output.strip(), section['exit'])
+    return report
+
+
+def evaluate(checks, report):
+    """Apply each check's predicate to its section of the report"""
+    outcomes = []
+    for check in checks:
+        if check.name not in report:
+            raise CheckScriptError(f"No result reported for check '{check.name}'")
+        output, exit_code = report[check.name]
+        try:
+            passed = bool(check.passes(output))
+        except (ValueError, TypeError):
+            passed = False
+        outcomes.append(CheckOutcome(check, passed, output, exit_code))
+    return outcomes
+
+
+def run_checks(checks, runner=None, timeout=60):
+    """Run every check on the host in a single invocation"""
+    runner = runner or get_runner()
+    result = runner.run(compile_script(checks), timeout=timeout)
+    return evaluate(checks, parse_report(result.stdout))
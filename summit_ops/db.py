@@ -0,0 +1,290 @@
+"""
+Pooled database access over an SSM port-forwarding tunnel.
+
+The DB scripts used to send `sudo -u postgres psql -c "..."` over SSM,
+sleep a fixed few seconds and scrape the text table psql printed: one
+new psql process and several seconds per statement, with every value
+pasted into the SQL string. Here a session opens one forwarded port to
+PgBouncer (or Postgres) on the host with `aws ssm start-session`, takes
+the password from SUMMIT_DB_PASSWORD or the SecureString parameter
+PASSWORD_PARAMETER (never over send_command, whose output SSM keeps in
+its command history and in S3), and keeps a psycopg connection pool
+over the tunnel. A query is then one network round trip, parameters
+are sent separately from the SQL, and rows come back with their real
+types (int, datetime, UUID, Decimal, ...), as named tuples or as
+instances of a dataclass passed in `row=`. Large results are streamed
+in batches through a server-side cursor instead of being buffered.
+
+Local mode connects straight to a Postgres given by SUMMIT_DB_DSN, or
+the usual PGHOST/PGPORT/PGUSER/... variables, with no AWS involved; it
+is what tests and local experiments use.
+
+Needs the AWS CLI and the session-manager-plugin for remote sessions.
+
+Usage:
+    from summit_ops.db import connect
+
+    with connect() as db:
+        for user in db.fetch("SELECT id, email FROM users WHERE created_at > %s", [since]):
+            print(user.id, user.email)
+        for message in db.stream("SELECT * FROM messages WHERE chat_id = %s", [chat_id]):
+            ...
+"""
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import class_row, namedtuple_row
+from psycopg_pool import ConnectionPool
+
+from summit_ops.ssm import get_runner
+
+APP_DIR = '/var/www/summit'
+ENV_FILE = f'{APP_DIR}/.env'
+PGBOUNCER_PORT = 6432
+POSTGRES_PORT = 5432
+DATABASE = 'summit'
+USER = 'summit_user'
+# SecureString holding the database password for remote sessions
+PASSWORD_PARAMETER = os.environ.get('SUMMIT_DB_PASSWORD_PARAMETER', '/summit/db/password')
+POOL_SIZE = 4
+# Rows fetched per round trip when streaming through a server-side cursor
+STREAM_BATCH = 2000
+TUNNEL_TIMEOUT = 30
+CONNECT_TIMEOUT = 10
+# session-manager-plugin prints this once the local port is listening
+TUNNEL_READY = 'Waiting for connections'
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+
+class DatabaseError(Exception):
+    """Raised when no database session can be set up"""
+
+
+class TunnelError(DatabaseError):
+    """Raised when the SSM port forward does not come up"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class SSMTunnel:
+    """`aws ssm start-session` forwarding a local port to a port on (or reachable from) an instance"""
+
+    def __init__(self, instance_id, region, remote_port=PGBOUNCER_PORT, remote_host=None, local_port=None,
+                 timeout=TUNNEL_TIMEOUT):
+        self.instance_id = instance_id
+        self.region = region
+        self.remote_port = remote_port
+        self.remote_host = remote_host
+        self.local_port = local_port or free_port()
+        self.timeout = timeout
+        self.process = None
+        self.output = []
+
+    def command(self):
+        parameters = f"portNumber={self.remote_port},localPortNumber={self.local_port}"
+        document = 'AWS-StartPortForwardingSession'
+        if self.remote_host and self.remote_host not in LOCAL_HOSTS:
+            # e.g. RDS: the instance relays the connection
+            document = 'AWS-StartPortForwardingSessionToRemoteHost'
+            parameters = f"host={self.remote_host},{parameters}"
+        return ['aws', 'ssm', 'start-session', '--region', self.region, '--target', self.instance_id,
+                '--document-name', document, '--parameters', parameters]
+
+    def open(self):
+        if not shutil.which('aws'):
+            raise TunnelError("The AWS CLI is not installed (remote sessions also need the session-manager-plugin)")
+        self.process = subprocess.Popen(self.command(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, start_new_session=True)
+        ready = threading.Event()
+
+        def read():
+            for line in self.process.stdout:
+                self.output.append(line.rstrip())
+                if TUNNEL_READY in line:
+                    ready.set()
+
+        threading.Thread(target=read, daemon=True).start()
+        deadline = time.monotonic() + self.timeout
+        while not ready.wait(0.1):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.close()
+                detail = ' | '.join(self.output[-5:]) or 'no output'
+                raise TunnelError(f"Port forward to {self.instance_id}:{self.remote_port} did not start ({detail})")
+        return self
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def remote_settings(runner=None, env_file=ENV_FILE):
+    """Non-secret DB_* settings from the backend's .env on the host (one SSM round trip)
+
+    DB_PASSWORD is deliberately left out: command output is kept in the
+    SSM command history and the output bucket.
+    """
+    runner = runner or get_runner()
+    result = runner.run(f"grep -E '^DB_(HOST|PORT|NAME|USER)=' {shlex.quote(env_file)}")
+    if not result.ok:
+        raise DatabaseError(f"Could not read {env_file}: {result.stderr.strip() or result.status}")
+    settings = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition('=')
+        settings[key.strip()] = value.strip().strip('"\'')
+    return settings
+
+
+def remote_password(runner=None, name=PASSWORD_PARAMETER):
+    """The database password from SUMMIT_DB_PASSWORD, else from Parameter Store"""
+    if os.environ.get('SUMMIT_DB_PASSWORD'):
+        return os.environ['SUMMIT_DB_PASSWORD']
+    runner = runner or get_runner()
+    try:
+        response = runner.ssm.get_parameter(Name=name, WithDecryption=True)
+    except runner.ssm.exceptions.ParameterNotFound:
+        raise DatabaseError(f"No database password: set SUMMIT_DB_PASSWORD or create the SecureString {name}")
+    return response['Parameter']['Value']
+
+
+class Database:
+    """A psycopg connection pool, over an SSM tunnel unless a local conninfo is given"""
+
+    def __init__(self, conninfo='', tunnel=None, pool_size=POOL_SIZE, pgbouncer=False):
+        self.tunnel = tunnel
+        self.pgbouncer = pgbouncer
+        # PgBouncer in transaction mode cannot keep the prepared statements psycopg creates for repeated queries
+        kwargs = {'autocommit': True, 'prepare_threshold': None if pgbouncer else 5}
+        try:
+            # The pool only reports a timeout; a plain connect first surfaces the real error (auth, db name, ...)
+            psycopg.connect(conninfo, connect_timeout=CONNECT_TIMEOUT).close()
+            self.pool = ConnectionPool(conninfo, min_size=1, max_size=pool_size, kwargs=kwargs, open=False,
+                                       name='summit-ops')
+            self.pool.open(wait=True, timeout=CONNECT_TIMEOUT)
+        except Exception as e:
+            if tunnel:
+                tunnel.close()
+            raise DatabaseError(f"Could not connect to the database: {e}") from e
+
+    @classmethod
+    def local(cls, conninfo=None, pool_size=POOL_SIZE):
+        """A local Postgres: conninfo, else SUMMIT_DB_DSN, else the PG* environment variables"""
+        return cls(conninfo or os.environ.get('SUMMIT_DB_DSN', ''), pool_size=pool_size)
+
+    @classmethod
+    def remote(cls, runner=None, direct=False, pool_size=POOL_SIZE):
+        """Tunnel to PgBouncer on the host, or to Postgres itself with direct=True
+
+        Host, port, database and user come from the backend's .env
+        (SUMMIT_DB_USER overrides the user); the password from
+        remote_password().
+        """
+        runner = runner or get_runner()
+        password = remote_password(runner)
+        settings = remote_settings(runner)
+        host = settings.get('DB_HOST')
+        port = POSTGRES_PORT if direct else int(settings.get('DB_PORT') or PGBOUNCER_PORT)
+        tunnel = SSMTunnel(runner.instance_id, runner.region, remote_port=port, remote_host=host).open()
+        conninfo = make_conninfo(
+            host='127.0.0.1',
+            port=tunnel.local_port,
+            dbname=settings.get('DB_NAME') or DATABASE,
+            user=os.environ.get('SUMMIT_DB_USER') or settings.get('DB_USER') or USER,
+            password=password,
+            application_name='summit-ops',
+            connect_timeout=CONNECT_TIMEOUT,
+        )
+        return cls(conninfo, tunnel=tunnel, pool_size=pool_size, pgbouncer=port == PGBOUNCER_PORT)
+
+    @staticmethod
+    def _row_factory(row):
+        return class_row(row) if row else namedtuple_row
+
+    def fetch(self, sql, params=None, row=None):
+        """All rows, as named tuples or instances of the `row` dataclass"""
+        with self.pool.connection() as conn:
+            with conn.cursor(row_factory=self._row_factory(row)) as cur:
+                cur.execute(sql, params)
+                return cur.fetchall() if cur.description else []
+
+    def fetch_one(self, sql, params=None, row=None):
+        """The first row, or None"""
+        with self.pool.connection() as conn:
+            with conn.cursor(row_factory=self._row_factory(row)) as cur:
+                cur.execute(sql, params)
+                return cur.fetchone() if cur.description else None
+
+    def scalar(self, sql, params=None):
+        """The first column of the first row, or None"""
+        with self.pool.connection() as conn:
+            first = conn.execute(sql, params).fetchone()
+            return first[0] if first else None
+
+    def execute(self, sql, params=None):
+        """Run a statement and return the number of rows it affected"""
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def stream(self, sql, params=None, row=None, batch=STREAM_BATCH):
+        """Iterate over a large result through a server-side cursor, `batch` rows per round trip
+
+        A pooled connection (and an open transaction) is held until
+        the iteration finishes or the generator is closed.
+        """
+        with self.pool.connection() as conn:
+            with conn.transaction():
+                with conn.cursor(name=f"summit_ops_{uuid.uuid4().hex[:12]}",
+                                 row_factory=self._row_factory(row)) as cur:
+                    cur.itersize = batch
+                    cur.execute(sql, params)
+                    yield from cur
+
+    @contextmanager
+    def transaction(self):
+        """A pooled connection inside BEGIN ... COMMIT (ROLLBACK on error)"""
+        with self.pool.connection() as conn:
+            with conn.transaction():
+                yield conn
+
+    def close(self):
+        self.pool.close()
+        if self.tunnel:
+            self.tunnel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(local=None, runner=None, direct=False, pool_size=POOL_SIZE):
+    """A Database session: local when asked to or when SUMMIT_DB_DSN is set, else tunnelled"""
+    if local is None:
+        local = bool(os.environ.get('SUMMIT_DB_DSN'))
+    if local:
+        return Database.local(pool_size=pool_size)
+    return Database.remote(runner=runner, direct=direct, pool_size=pool_size)
@@ -0,0 +1,245 @@
+"""
+One-round-trip database health snapshot as structured JSON.
+
+A single SSM invocation runs psql on the host; PostgreSQL itself builds
+the JSON document (json_build_object / json_agg), so nothing is scraped
+from text tables. A snapshot holds:
+
+    tables       exact row counts (small tables) and planner estimates,
+                 table/index/total sizes, live and dead tuples, scans,
+                 last (auto)vacuum/analyze, heap cache hit ratio
+    indexes      size, scans, uniqueness per index
+    cache        heap, index and database-wide hit ratios, commits,
+                 rollbacks, deadlocks, temp bytes
+    connections  totals by state and application, longest query and
+                 transaction, idle-in-transaction sessions
+    locks        waiting locks, locks by mode, blocked pids and blockers
+    statements   top pg_stat_statements entries by total time (when the
+                 extension is installed)
+
+Snapshots are appended to a local JSON-lines history so consecutive
+runs can be diffed for trends.
+
+Usage:
+    from summit_ops.dbhealth import DatabaseHealth, HealthHistory, diff_snapshots
+
+    snapshot = DatabaseHealth().collect()
+    history = HealthHistory()
+    previous = history.latest()
+    history.append(snapshot)
+    print(diff_snapshots(previous, snapshot))
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+from summit_ops.ssm import get_runner
+
+PSQL = 'sudo -u postgres psql -X -q -A -t -v ON_ERROR_STOP=1 -d summit'
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.summit-dbhealth.jsonl')
+TOP_STATEMENTS = 15
+# Tables estimated below this many rows get an exact count(*)
+EXACT_COUNT_LIMIT = 1_000_000
+
+BEGIN_MARKER = '__SUMMIT_DBHEALTH_BEGIN__'
+STATEMENTS_MARKER = '__SUMMIT_DBHEALTH_STATEMENTS__'
+END_MARKER = '__SUMMIT_DBHEALTH_END__'
+
+SNAPSHOT_SQL = f"""
+-- Session-local helper for exact counts; nothing is created in the schema
+CREATE FUNCTION pg_temp.exact_count(schema_name text, table_name text) RETURNS bigint LANGUAGE plpgsql AS $$
+DECLARE n bigint;
+BEGIN
+  EXECUTE format('SELECT count(*) FROM %I.%I', schema_name, table_name) INTO n;
+  RETURN n;
+END $$;
+
+SELECT json_build_object(
+  'database', current_database(),
+  'server_version', current_setting('server_version'),
+  'size_bytes', pg_database_size(current_database()),
+  'tables', (SELECT coalesce(json_agg(t ORDER BY t.total_bytes DESC), '[]') FROM (
+    SELECT s.schemaname AS schema, s.relname AS name,
+           c.reltuples::bigint AS estimated_rows,
+           CASE WHEN c.reltuples < {EXACT_COUNT_LIMIT} THEN pg_temp.exact_count(s.schemaname, s.relname) END AS rows,
+           s.n_live_tup AS live_tuples, s.n_dead_tup AS dead_tuples,
+           pg_total_relation_size(s.relid) AS total_bytes,
+           pg_relation_size(s.relid) AS table_bytes,
+           pg_indexes_size(s.relid) AS index_bytes,
+           s.seq_scan, s.idx_scan,
+           s.last_vacuum, s.last_autovacuum, s.last_analyze, s.last_autoanalyze,
+           round(io.heap_blks_hit::numeric / nullif(io.heap_blks_hit + io.heap_blks_read, 0), 4) AS cache_hit_ratio
+    FROM pg_stat_user_tables s
+    JOIN pg_class c ON c.oid = s.relid
+    JOIN pg_statio_user_tables io ON io.relid = s.relid) t),
+  'indexes', (SELECT coalesce(json_agg(i ORDER BY i.bytes DESC), '[]') FROM (
+    SELECT s.schemaname AS schema, s.relname AS table, s.indexrelname AS name,
+           pg_relation_size(s.indexrelid) AS bytes, s.idx_scan AS scans, s.idx_tup_read AS tuples_read,
+           x.indisunique AS unique, x.indisprimary AS primary
+    FROM pg_stat_user_indexes s JOIN pg_index x ON x.indexrelid = s.indexrelid) i),
+  'cache', (SELECT json_build_object(
+    'heap_hit_ratio', (SELECT round(sum(heap_blks_hit)::numeric / nullif(sum(heap_blks_hit + heap_blks_read), 0), 4) FROM pg_statio_user_tables),
+    'index_hit_ratio', (SELECT round(sum(idx_blks_hit)::numeric / nullif(sum(idx_blks_hit + idx_blks_read), 0), 4) FROM pg_statio_user_indexes),
+    'database_hit_ratio', round(d.blks_hit::numeric / nullif(d.blks_hit + d.blks_read, 0), 4),
+    'commits', d.xact_commit, 'rollbacks', d.xact_rollback,
+    'deadlocks', d.deadlocks, 'temp_bytes', d.temp_bytes)
+    FROM pg_stat_database d WHERE d.datname = current_database()),
+  'connections', (SELECT json_build_object(
+    'max', current_setting('max_connections')::int,
+    'total', count(*),
+    'by_state', (SELECT json_object_agg(state, n) FROM (
+        SELECT coalesce(state, 'background') AS state, count(*) AS n FROM pg_stat_activity GROUP BY 1) s),
+    'by_application', (SELECT json_object_agg(app, n) FROM (
+        SELECT coalesce(nullif(application_name, ''), 'unknown') AS app, count(*) AS n
+        FROM pg_stat_activity WHERE backend_type = 'client backend' GROUP BY 1) a),
+    'idle_in_transaction', count(*) FILTER (WHERE a.state LIKE 'idle in transaction%'),
+    'longest_query_seconds', coalesce(round(extract(epoch FROM max(now() - a.query_start) FILTER (WHERE a.state = 'active' AND a.pid <> pg_backend_pid()))::numeric, 1), 0),
+    'longest_transaction_seconds', coalesce(round(extract(epoch FROM max(now() - a.xact_start) FILTER (WHERE a.pid <> pg_backend_pid()))::numeric, 1), 0))
+    FROM pg_stat_activity a),
+  'locks', json_build_object(
+    'waiting', (SELECT count(*) FROM pg_locks WHERE NOT granted),
+    'by_mode', (SELECT json_object_agg(mode, n) FROM (SELECT mode, count(*) AS n FROM pg_locks GROUP BY mode) m),
+    'blocked', (SELECT coalesce(json_agg(b), '[]') FROM (
+        SELECT pid, pg_blocking_pids(pid) AS blocked_by,
+               round(extract(epoch FROM now() - query_start)::numeric, 1) AS waiting_seconds,
+               left(query, 300) AS query
+        FROM pg_stat_activity WHERE cardinality(pg_blocking_pids(pid)) > 0) b))
+);
+"""
+
+
+class DatabaseHealthError(Exception):
+    """Raised when the remote collector fails or returns something unparseable"""
+
+
+def build_script(psql=PSQL, top_statements=TOP_STATEMENTS):
+    """Shell script printing the snapshot and top statements between markers"""
+    return f"""PSQL="{psql}"
+echo {BEGIN_MARKER}
+$PSQL <<'SQL' || exit 1
+{SNAPSHOT_SQL}
+SQL
+echo {STATEMENTS_MARKER}
+if [ "$($PSQL -c "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")" = "1" ]; then
+  # Renamed in PostgreSQL 13
+  if [ "$($PSQL -c 'SHOW server_version_num')" -ge 130000 ]; then total=total_exec_time; mean=mean_exec_time; else total=total_time; mean=mean_time; fi
+  $PSQL <<SQL
+SELECT coalesce(json_agg(s), '[]') FROM (
+  SELECT queryid, left(regexp_replace(query, '\\s+', ' ', 'g'), 500) AS query, calls, rows,
+         round($total::numeric, 2) AS total_ms, round($mean::numeric, 3) AS mean_ms,
+         shared_blks_hit, shared_blks_read, temp_blks_written
+  FROM pg_stat_statements
+  WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+  ORDER BY $total DESC LIMIT {int(top_statements)}) s;
+SQL
+else
+  echo null
+fi
+echo {END_MARKER}
+"""
+
+
+def parse_output(stdout):
+    if BEGIN_MARKER not in stdout or END_MARKER not in stdout:
+        raise DatabaseHealthError(f"Collector output is incomplete:\n{stdout[-2000:]}")
+    body = stdout.split(BEGIN_MARKER, 1)[1].split(END_MARKER, 1)[0]
+    snapshot_text, _, statements_text = body.partition(STATEMENTS_MARKER)
+    try:
+        snapshot = json.loads(snapshot_text)
+        snapshot['statements'] = json.loads(statements_text.strip() or 'null')
+    except ValueError as e:
+        raise DatabaseHealthError(f"Collector returned invalid JSON: {e}") from e
+    return snapshot
+
+
+class DatabaseHealth:
+    """Collects a health snapshot of the production database in one invocation"""
+
+    def __init__(self, runner=None, psql=PSQL, top_statements=TOP_STATEMENTS):
+        self.runner = runner or get_runner()
+        self.psql = psql
+        self.top_statements = top_statements
+
+    def collect(self, timeout=120):
+        result = self.runner.run_large(build_script(self.psql, self.top_statements), timeout=timeout)
+        if not result.ok:
+            raise DatabaseHealthError(f"Collector failed: {result.stderr.strip() or result.status}")
+        snapshot = parse_output(result.stdout)
+        snapshot['collected_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return snapshot
+
+
+class HealthHistory:
+    """Local JSON-lines history of snapshots"""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+
+    def append(self, snapshot):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, separators=(',', ':')) + '\n')
+
+    def load(self, limit=None):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            snapshots = [json.loads(line) for line in f if line.strip()]
+        return snapshots[-limit:] if limit else snapshots
+
+    def latest(self):
+        snapshots = self.load(limit=1)
+        return snapshots[0] if snapshots else None
+
+
+def _row_count(table):
+    return table['rows'] if table.get('rows') is not None else table['estimated_rows']
+
+
+def diff_snapshots(before, after):
+    """Trend between two snapshots: database-wide deltas, per-table deltas, statement call deltas"""
+    if not before:
+        return None
+    elapsed = (datetime.fromisoformat(after['collected_at']) - datetime.fromisoformat(before['collected_at'])).total_seconds()
+    old_cache, new_cache = before.get('cache') or {}, after.get('cache') or {}
+    diff = {
+        'elapsed_seconds': elapsed,
+        'database': {
+            'size_bytes': after['size_bytes'] - before['size_bytes'],
+            'connections': after['connections']['total'] - before['connections']['total'],
+            'deadlocks': (new_cache.get('deadlocks') or 0) - (old_cache.get('deadlocks') or 0),
+            'database_hit_ratio': round((new_cache.get('database_hit_ratio') or 0) - (old_cache.get('database_hit_ratio') or 0), 4),
+        },
+        'tables': {},
+        'statements': [],
+    }
+
+    old_tables = {(t['schema'], t['name']): t for t in before['tables']}
+    for table in after['tables']:
+        old = old_tables.get((table['schema'], table['name']))
+        if not old:
+            diff['tables'][table['name']] = {'new': True, 'rows': _row_count(table), 'total_bytes': table['total_bytes']}
+            continue
+        change = {
+            'rows': _row_count(table) - _row_count(old),
+            'total_bytes': table['total_bytes'] - old['total_bytes'],
+            'dead_tuples': table['dead_tuples'] - old['dead_tuples'],
+        }
+        if any(change.values()):
+            diff['tables'][table['name']] = change
+
+    old_statements = {s['queryid']: s for s in before.get('statements') or []}
+    for statement in after.get('statements') or []:
+        old = old_statements.get(statement['queryid'])
+        calls = statement['calls'] - (old['calls'] if old else 0)
+        # A drop means pg_stat_statements was reset in between
+        if calls > 0 and (not old or statement['calls'] >= old['calls']):
+            total_ms = statement['total_ms'] - (old['total_ms'] if old else 0)
+            diff['statements'].append({
+                'queryid': statement['queryid'],
+                'query': statement['query'],
+                'calls': calls,
+                'total_ms': round(total_ms, 2),
+                'mean_ms': round(total_ms / calls, 3),
+            })
+    diff['statements'].sort(key=lambda s: s['total_ms'], reverse=True)
+    return diff
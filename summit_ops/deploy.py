@@ -0,0 +1,235 @@
+"""
+Content-addressed delta deployment of the built backend (server/dist).
+
+Every local file is hashed, the host's hashes are fetched in one
+invocation, and only added or changed files are shipped as one gzipped
+tar bundle. On the host the bundle is checked, unpacked into a fresh
+release directory next to the current one, verified file by file
+against the local manifest and switched in with an atomic symlink
+rename; then the PM2 app of the live blue/green colour is restarted.
+Routine deploys move kilobytes; large bundles (a full restore) go
+through the chunked parallel transfer layer.
+
+A release that fails to unpack, verify or restart is deleted again (and
+dist pointed back if it had been switched), so it can never become a
+rollback target. Rollback goes to the release recorded in
+dist.previous at switch time, not to whatever directory is newest.
+
+Host layout after the first deploy:
+    /var/www/summit/dist -> /var/www/summit/releases/<id>
+    /var/www/summit/dist.previous -> /var/www/summit/releases/<previous id>
+
+Usage:
+    from summit_ops.deploy import DeltaDeployer
+
+    plan = DeltaDeployer('server/dist').plan()
+    DeltaDeployer('server/dist').deploy(plan)
+"""
+import hashlib
+import io
+import os
+import shlex
+import tarfile
+import time
+from dataclasses import dataclass, field
+
+from summit_ops.bluegreen import STATE_FILE, restart_live_command
+from summit_ops.ssm import get_runner
+from summit_ops.transfer import ChunkedTransfer
+
+REMOTE_APP_DIR = '/var/www/summit'
+REMOTE_DIST = f'{REMOTE_APP_DIR}/dist'
+RELEASES_DIR = f'{REMOTE_APP_DIR}/releases'
+STAGING_DIR = '/tmp/summit-deploy'
+KEEP_RELEASES = 3
+
+
+class DeployError(Exception):
+    """Raised when the host rejects or fails to apply a bundle"""
+
+
+@dataclass
+class DeployPlan:
+    local: dict
+    remote: dict
+    changed: list = field(default_factory=list)
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+    @property
+    def upload(self):
+        return sorted(self.added + self.changed)
+
+    @property
+    def empty(self):
+        return not (self.changed or self.added or self.removed)
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(local_dir):
+    """{relative posix path: sha256} for every file under local_dir"""
+    manifest = {}
+    for root, _, files in os.walk(local_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, local_dir).replace(os.sep, '/')
+            manifest[relpath] = sha256_file(path)
+    return manifest
+
+
+def parse_sha256sum(output):
+    """Parse `sha256sum` output into {relative path: sha256}"""
+    manifest = {}
+    for line in output.splitlines():
+        digest, _, path = line.partition('  ')
+        if len(digest) == 64 and path:
+            manifest[path[2:] if path.startswith('./') else path] = digest
+    return manifest
+
+
+def build_bundle(local_dir, plan, prune=False):
+    """tar.gz holding the changed files, the full manifest and the removals"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz', compresslevel=9) as tar:
+        for relpath in plan.upload:
+            tar.add(os.path.join(local_dir, relpath), arcname=f'files/{relpath}')
+
+        manifest = ''.join(f'{digest}  ./{path}\n' for path, digest in sorted(plan.local.items()))
+        removed = ''.join(f'{path}\n' for path in plan.removed) if prune else ''
+        for name, text in (('manifest.sha256', manifest), ('removed.txt', removed)):
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class DeltaDeployer:
+    """Ships only the changed part of a local dist tree to the host"""
+
+    def __init__(self, local_dir, runner=None, remote_dist=REMOTE_DIST, releases_dir=RELEASES_DIR,
+                 transfer=None):
+        self.local_dir = local_dir
+        self.runner = runner or get_runner()
+        self.transfer = transfer or ChunkedTransfer(self.runner)
+        self.remote_dist = remote_dist
+        self.releases_dir = releases_dir
+
+    def remote_manifest(self):
+        dist = shlex.quote(self.remote_dist)
+        result = self.runner.run_large(
+            f"[ -e {dist} ] && cd \"$(readlink -f {dist})\" && find . -type f -print0 | xargs -0 -r sha256sum",
+            timeout=120,
+        )
+        return parse_sha256sum(result.stdout)
+
+    def plan(self, full=False):
+        """Compare local and remote hashes; full=True ships every file regardless"""
+        local = build_manifest(self.local_dir)
+        if not local:
+            raise DeployError(f"{self.local_dir} is empty - build the server first")
+        remote = self.remote_manifest()
+        return DeployPlan(
+            local=local,
+            remote=remote,
+            changed=sorted(p for p in local if p in remote and (full or remote[p] != local[p])),
+            added=sorted(p for p in local if p not in remote),
+            removed=sorted(p for p in remote if p not in local),
+        )
+
+    def deploy(self, plan, prune=False, restart=True, on_progress=print):
+        """Upload, verify and switch to a new release; returns its path"""
+        bundle = build_bundle(self.local_dir, plan, prune=prune)
+        release_id = time.strftime('%Y%m%d-%H%M%S')
+        stage = f'{STAGING_DIR}/{release_id}'
+
+        on_progress(f"📦 Bundle: {len(plan.upload)} file(s), {len(bundle) / 1024:.1f} KB compressed")
+        self.transfer.send_bytes(bundle, f'{stage}/bundle.tgz')
+
+        release = f'{self.releases_dir}/{release_id}'
+        result = self.runner.run(self.apply_script(stage, release, hashlib.sha256(bundle).hexdigest(), restart), timeout=180)
+        if not result.ok:
+            raise DeployError(f"Applying release failed:\n{result.stdout}\n{result.stderr}")
+        on_progress(result.stdout.strip())
+        return release
+
+    def apply_script(self, stage, release, bundle_sha256, restart=True):
+        dist = self.remote_dist
+        app_dir = os.path.dirname(dist)
+        restart_cmd = restart_live_command(_state_file(dist)) if restart else 'true'
+        return f"""set -e
+stage={shlex.quote(stage)}; release={shlex.quote(release)}; dist={shlex.quote(dist)}; releases={shlex.quote(self.releases_dir)}
+previous=""
+# On any failure: point dist back if it was already switched, and delete the unverified release
+cleanup() {{
+  status=$?
+  if [ "$status" -ne 0 ]; then
+    if [ -n "$previous" ] && [ "$(readlink -f "$dist")" = "$release" ]; then
+      ln -sfn "$previous" "{app_dir}/.dist.swap" && mv -T "{app_dir}/.dist.swap" "$dist"
+      echo "dist restored to $(basename "$previous")" >&2
+    fi
+    rm -rf "$release"
+  fi
+  rm -rf "$stage"
+  exit "$status"
+}}
+trap cleanup EXIT
+echo "{bundle_sha256}  $stage/bundle.tgz" | sha256sum -c --quiet
+mkdir -p "$stage/unpacked" "$releases"
+tar -xzf "$stage/bundle.tgz" -C "$stage/unpacked"
+
+# First delta deploy: turn the plain dist directory into a release symlink
+if [ -d "$dist" ] && [ ! -L "$dist" ]; then
+  mv "$dist" "$releases/initial" && ln -s "$releases/initial" "$dist"
+fi
+if [ -e "$dist" ]; then previous=$(readlink -f "$dist"); fi
+
+mkdir -p "$release"
+if [ -n "$previous" ]; then cp -a "$previous/." "$release/"; fi
+if [ -d "$stage/unpacked/files" ]; then cp -a "$stage/unpacked/files/." "$release/"; fi
+while IFS= read -r path; do if [ -n "$path" ]; then rm -f "$release/$path"; fi; done < "$stage/unpacked/removed.txt"
+(cd "$release" && sha256sum -c --quiet "$stage/unpacked/manifest.sha256")
+
+# rename(2) over the symlink is atomic: the app sees the old or the new tree, never a mix
+ln -sfn "$release" "{app_dir}/.dist.swap" && mv -T "{app_dir}/.dist.swap" "$dist"
+{restart_cmd}
+if [ -n "$previous" ]; then ln -sfn "$previous" "$dist.previous"; fi
+
+# Keep the live and the previous release plus the newest others, {KEEP_RELEASES} in all
+ls -1dt "$releases"/* | grep -vx -e "$release" -e "${{previous:-$release}}" | tail -n +{KEEP_RELEASES - 1} | xargs -r rm -rf
+echo "✅ Release $(basename "$release") live and verified"
+"""
+
+
+def _state_file(remote_dist):
+    """The blue/green .active-color file beside dist"""
+    return f'{os.path.dirname(remote_dist)}/{os.path.basename(STATE_FILE)}'
+
+
+def rollback_script(remote_dist=REMOTE_DIST):
+    """Shell script that points dist back at the release recorded in dist.previous
+
+    The two swap places, so a second rollback returns to the newer release.
+    """
+    dist = shlex.quote(remote_dist)
+    recorded = shlex.quote(f'{remote_dist}.previous')
+    app_dir = os.path.dirname(remote_dist)
+    return f"""set -e
+current=$(readlink -f {dist})
+previous=$(readlink {recorded} || true)
+if [ -z "$previous" ] || [ ! -d "$previous" ] || [ "$previous" = "$current" ]; then
+  echo "No previous release recorded in {remote_dist}.previous" >&2; exit 1
+fi
+ln -sfn "$previous" "{app_dir}/.dist.swap" && mv -T "{app_dir}/.dist.swap" {dist}
+ln -sfn "$current" {recorded}
+{restart_live_command(_state_file(remote_dist))}
+echo "✅ Rolled back to $(basename "$previous")"
+"""
@@ -0,0 +1,218 @@
+"""
+WebSocket fan-out benchmark for MessageNotifier.
+
+POST /api/messages calls messageNotifier.notifyUsers() before it
+responds, and notifyUsers serializes and sends to every recipient
+socket synchronously. This benchmark measures how that scales:
+
+    1. logs in enough load users (see loadgen) and opens
+       `sockets_per_user` authenticated /ws connections for each, so
+       thousands of sockets cost only a few hundred bcrypt logins
+    2. creates one group chat per size in `group_sizes`
+    3. for each size, sends `messages` messages one after another and
+       records the POST latency and, per receiving socket, the time from
+       the start of the POST to the NEW_MESSAGE frame
+    4. samples server CPU and event-loop delay per group size from
+       GET /health/event-loop (server started with EVENT_LOOP_STATS=1)
+
+Results are a JSON artifact (meta + one row per group size) so runs on
+different commits can be compared number by number.
+
+Usage:
+    from summit_ops.fanout import FanoutBenchmark
+
+    artifact = asyncio.run(FanoutBenchmark('http://127.0.0.1:3000', group_sizes=(10, 100, 500)).run())
+"""
+import asyncio
+import json
+import platform
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+
+import aiohttp
+
+from summit_ops.latency import LatencyStats, compare
+from summit_ops.loadgen import LOCAL_BASE_URL, LoadGenerator
+
+GROUP_SIZES = (2, 10, 50, 200, 500)
+SOCKETS_PER_USER = 4
+MESSAGES_PER_SIZE = 30
+MESSAGE_BYTES = 200
+# How long to wait for every expected frame of one message
+DELIVERY_TIMEOUT = 15
+CONNECT_CONCURRENCY = 100
+ARTIFACT_VERSION = 1
+
+
+class FanoutSocket:
+    """One /ws connection of a benchmark user"""
+
+    def __init__(self, user, number):
+        self.user = user
+        self.number = number
+        self.ws = None
+        self.task = None
+
+
+class FanoutBenchmark:
+    """Measures POST-to-receipt latency over many sockets and group sizes"""
+
+    def __init__(self, base_url=LOCAL_BASE_URL, group_sizes=GROUP_SIZES, sockets_per_user=SOCKETS_PER_USER,
+                 messages=MESSAGES_PER_SIZE, message_bytes=MESSAGE_BYTES):
+        self.base_url = base_url.rstrip('/')
+        self.group_sizes = sorted(group_sizes)
+        self.sockets_per_user = sockets_per_user
+        self.messages = messages
+        self.message_bytes = message_bytes
+        self.accounts = LoadGenerator(base_url)
+        self.sockets = []
+        # message id -> (POST start, {socket: receipt time}, expected socket count, all-received event)
+        self.tracking = {}
+
+    async def run(self, on_progress=print):
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+            self.session = session
+            self.accounts.session = session
+            users = await self.accounts.login_users(max(self.group_sizes))
+            on_progress(f"{len(users)} users logged in")
+
+            await self._connect_all(users)
+            connected = sum(1 for s in self.sockets if s.ws is not None)
+            on_progress(f"{connected}/{len(self.sockets)} sockets connected")
+
+            rows = []
+            for size in self.group_sizes:
+                members = users[:size]
+                chat_id = await self.accounts.ensure_group(f"{self.accounts.prefix}fanout-{size}", members)
+                row = await self._measure(size, members, chat_id)
+                rows.append(row)
+                cpu = row['server'].get('cpuPercent')
+                on_progress(f"group of {size}: delivery p50 {row['delivery']['p50_ms']}ms, "
+                            f"p99 {row['delivery']['p99_ms']}ms" + (f", server CPU {cpu}%" if cpu is not None else ''))
+
+            for socket in self.sockets:
+                if socket.task:
+                    socket.task.cancel()
+                if socket.ws is not None:
+                    await socket.ws.close()
+
+        return {
+            'version': ARTIFACT_VERSION,
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'base_url': self.base_url,
+                'commit': _git_commit(),
+                'client_host': platform.node(),
+                'users': len(users),
+                'sockets': connected,
+                'sockets_per_user': self.sockets_per_user,
+                'messages_per_size': self.messages,
+                'message_bytes': self.message_bytes,
+            },
+            'results': rows,
+        }
+
+    async def _connect_all(self, users):
+        limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+        async def connect(socket):
+            async with limit:
+                url = f"{self.accounts.ws_url}?token={socket.user.token}"
+                try:
+                    socket.ws = await self.session.ws_connect(url, heartbeat=30)
+                    # The server greets every authenticated socket with CONNECTED
+                    await socket.ws.receive_json(timeout=10)
+                except Exception:
+                    socket.ws = None
+                    return
+                socket.task = asyncio.create_task(self._listen(socket))
+
+        self.sockets = [FanoutSocket(user, n) for user in users for n in range(self.sockets_per_user)]
+        await asyncio.gather(*(connect(socket) for socket in self.sockets))
+
+    async def _listen(self, socket):
+        async for message in socket.ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            received = time.monotonic()
+            event = json.loads(message.data)
+            if event.get('type') != 'NEW_MESSAGE':
+                continue
+            tracked = self.tracking.get((event.get('data') or {}).get('messageId'))
+            if tracked:
+                _, receipts, expected, done = tracked
+                receipts[socket] = received
+                if len(receipts) >= expected:
+                    done.set()
+
+    async def _measure(self, size, members, chat_id):
+        sender = members[0]
+        member_ids = {m.user_id for m in members[1:]}
+        # The server skips every socket of the sender, including its other devices
+        expected = sum(1 for s in self.sockets if s.ws is not None and s.user.user_id in member_ids)
+        post, delivery, last_receipt = LatencyStats('post'), LatencyStats('delivery'), LatencyStats('last_receipt')
+        received = 0
+
+        await self._server_stats(reset=True)
+        for _ in range(self.messages):
+            message_id = f"fanout-{uuid.uuid4()}"
+            receipts, done = {}, asyncio.Event()
+            started = time.monotonic()
+            self.tracking[message_id] = (started, receipts, expected, done)
+            body = {'id': message_id, 'chatId': chat_id, 'content': 'x' * self.message_bytes, 'type': 'text'}
+            async with self.session.post(f"{self.base_url}/api/messages", json=body, headers=sender.headers) as response:
+                await response.read()
+                if response.status >= 400:
+                    post.error(f"HTTP {response.status}")
+                else:
+                    post.record(time.monotonic() - started)
+            try:
+                await asyncio.wait_for(done.wait(), DELIVERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                delivery.error('timeout')
+            for at in receipts.values():
+                delivery.record(at - started)
+            if receipts:
+                last_receipt.record(max(receipts.values()) - started)
+            received += len(receipts)
+            del self.tracking[message_id]
+        server = await self._server_stats(reset=True)
+
+        return {
+            'group_size': size,
+            'recipient_sockets': expected,
+            'messages': self.messages,
+            'receipts': received,
+            'expected_receipts': expected * self.messages,
+            'post': post.summary(),
+            'delivery': delivery.summary(),
+            'last_receipt': last_receipt.summary(),
+            'server': server,
+        }
+
+    async def _server_stats(self, reset=False):
+        """Event-loop delay and CPU since the last reset; {} if the server does not expose them"""
+        try:
+            url = f"{self.base_url}/health/event-loop" + ('?reset=1' if reset else '')
+            async with self.session.get(url) as response:
+                return await response.json() if response.status == 200 else {}
+        except aiohttp.ClientError:
+            return {}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare_artifacts(current, baseline, threshold=0.2):
+    """Percentile regressions per group size between two artifacts"""
+    def flatten(artifact):
+        return [dict(row[metric], name=f"{row['group_size']:>4} {metric}")
+                for row in artifact['results'] for metric in ('post', 'delivery', 'last_receipt')]
+    return compare(flatten(current), flatten(baseline), threshold)
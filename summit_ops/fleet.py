@@ -0,0 +1,148 @@
+"""
+Fan a single SSM command out to several instances.
+
+One send_command call targets either an explicit list of instance ids or
+a tag selector, never both; SSM handles the rollout with MaxConcurrency/
+MaxErrors. The invocations the command was sent to (the listed ids, or
+whatever the tag resolved to) are then polled in parallel on a thread
+pool and results are yielded as each host finishes, so a fleet-wide
+sweep takes about as long as the slowest host.
+
+Usage:
+    from summit_ops.fleet import run_on_fleet
+
+    summary = run_on_fleet("pm2 status", tags={'Role': 'summit-backend'})
+    print(summary.describe())
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from summit_ops.ssm import DELIVERY_GRACE, CommandResult, CommandTimeout, SSMRunner, backoff_delays
+
+MAX_WORKERS = 16
+
+
+@dataclass
+class FleetSummary:
+    command_id: str
+    results: list = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def succeeded(self):
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def slowest(self):
+        return max(self.results, key=lambda r: r.wall_time, default=None)
+
+    def describe(self):
+        line = f"{len(self.succeeded)}/{len(self.results)} hosts succeeded in {self.wall_time:.1f}s"
+        if self.slowest:
+            line += f" (slowest: {self.slowest.instance_id} {self.slowest.wall_time:.1f}s)"
+        return line
+
+
+def tag_targets(tags):
+    """Turn {'Role': 'backend'} into the SSM Targets structure"""
+    return [{'Key': f'tag:{key}', 'Values': [value]} for key, value in tags.items()]
+
+
+class FleetRunner:
+    """Sends one command to many instances and collects per-host results"""
+
+    def __init__(self, runner=None, max_workers=MAX_WORKERS):
+        self.runner = runner or SSMRunner()
+        self.max_workers = max_workers
+
+    def send(self, command, instance_ids=None, tags=None, max_concurrency='50%', max_errors='25%', timeout=60):
+        """Start the command on every target and return its CommandId"""
+        if instance_ids and tags:
+            # SSM takes either InstanceIds or Targets; listing both would silently use only one
+            raise ValueError("Target either instance_ids or tags, not both")
+        if not instance_ids and not tags:
+            instance_ids = [self.runner.instance_id]
+        return self.runner.send(
+            command,
+            timeout=timeout,
+            instance_ids=instance_ids,
+            targets=tag_targets(tags) if tags else None,
+            MaxConcurrency=str(max_concurrency),
+            MaxErrors=str(max_errors),
+        )
+
+    def iter_results(self, command, instance_ids=None, tags=None, timeout=60, **send_options):
+        """Yield a CommandResult for each host as soon as it finishes"""
+        started = time.monotonic()
+        command_id = self.send(command, instance_ids=instance_ids, tags=tags, timeout=timeout, **send_options)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}
+            if tags:
+                targets = self._discover_targets(command_id, timeout, started)
+            else:
+                targets = instance_ids or [self.runner.instance_id]
+            for instance_id in targets:
+                future = pool.submit(self.runner.wait, command_id, instance_id, timeout, started)
+                pending[future] = instance_id
+
+            for future in as_completed(pending):
+                try:
+                    yield future.result()
+                except CommandTimeout as e:
+                    yield CommandResult(
+                        command_id=command_id,
+                        instance_id=pending[future],
+                        status='TimedOut',
+                        stdout='',
+                        stderr=str(e),
+                        exit_code=-1,
+                        wall_time=time.monotonic() - started,
+                    )
+
+    def run(self, command, instance_ids=None, tags=None, timeout=60, on_result=None, **send_options):
+        """Run the command across the fleet and return a FleetSummary"""
+        started = time.monotonic()
+        summary = None
+        for result in self.iter_results(command, instance_ids=instance_ids, tags=tags, timeout=timeout, **send_options):
+            if summary is None:
+                summary = FleetSummary(command_id=result.command_id)
+            summary.results.append(result)
+            if on_result:
+                on_result(result)
+        summary = summary or FleetSummary(command_id='')
+        summary.wall_time = time.monotonic() - started
+        return summary
+
+    def _discover_targets(self, command_id, timeout, started):
+        """Resolve which instances a tag-targeted command landed on"""
+        ssm = self.runner.ssm
+        deadline = started + timeout + DELIVERY_GRACE
+        delays = backoff_delays()
+        while True:
+            command = ssm.list_commands(CommandId=command_id)['Commands'][0]
+            instance_ids = []
+            paginator = ssm.get_paginator('list_command_invocations')
+            for page in paginator.paginate(CommandId=command_id):
+                instance_ids.extend(i['InstanceId'] for i in page['CommandInvocations'])
+
+            # TargetCount stays 0 until SSM has resolved the tag selector
+            target_count = command.get('TargetCount', 0)
+            if target_count and len(instance_ids) >= target_count:
+                return instance_ids
+            if command['Status'] in ('Success', 'Failed', 'Cancelled', 'TimedOut') or time.monotonic() > deadline:
+                return instance_ids
+            time.sleep(next(delays))
+
+
+def run_on_fleet(command, instance_ids=None, tags=None, timeout=60, region=None, on_result=None, **send_options):
+    """Run a command on several instances at once and return the rollup"""
+    runner = SSMRunner(region=region) if region else None
+    return FleetRunner(runner).run(
+        command, instance_ids=instance_ids, tags=tags, timeout=timeout, on_result=on_result, **send_options
+    )
@@ -0,0 +1,505 @@
+"""
+Index advisor: redundant indexes to drop, missing ones to add.
+
+Reads the index catalog with pg_stat_user_indexes, pg_stat_user_tables
+and (when the extension is loaded) pg_stat_statements, and proposes:
+
+    duplicate    same method, key columns, INCLUDE list and predicate as
+                 another index; the constraint-backed or most-scanned
+                 copy is kept
+    covered      the key columns are a leading prefix of another btree
+                 index with the same predicate, which serves the same
+                 lookups (one-column prefixes in either direction)
+    invalid      left behind by a failed CONCURRENTLY build: maintained
+                 on every write, never used by the planner
+    unused       no scans since the statistics were reset, over a window
+                 of at least min_days
+
+Indexes backing a primary key, unique or exclusion constraint are never
+dropped, nor an index that is the last one leading with a foreign key's
+columns (ON DELETE CASCADE would scan the child table). idx_scan counts
+only this server's scans; check replicas before dropping "unused".
+
+Tables read mostly by large sequential scans get index proposals built
+from the statements touching them: equality and join columns first
+(most selective first, by pg_stats), then a range or ORDER BY column;
+`col IS NULL` filters become a partial-index predicate. Without
+pg_stat_statements the static SQL in server/src is used instead.
+
+Every index is maintained on each INSERT and non-HOT UPDATE, so the
+savings of a drop are estimated per table as index entries (and bytes)
+no longer written per second over the statistics window.
+
+Usage:
+    from summit_ops.db import connect
+    from summit_ops.indexes import IndexAdvisor
+
+    with connect() as db:
+        advice = IndexAdvisor(db).advise()
+        for drop in advice.drops:
+            print(drop.statement, drop.detail)
+"""
+import re
+from dataclasses import dataclass, field
+
+from psycopg import errors
+
+from summit_ops.plans import TABLE_REF
+from summit_ops.sqlsource import extract_queries
+
+MIN_DAYS = 7
+SEQ_SCAN_ROWS = 10_000
+TOP_STATEMENTS = 200
+MAX_KEYS = 3
+# An index whose best column still matches this share of the table is not worth adding
+MAX_SELECTIVITY = 0.1
+MAX_NAME = 63
+
+_EQUALITY = re.compile(r'(?:(\w+)\.)?(\w+)\s*(?:=\s*(?:ANY\s*\()?|IN\s*\()\s*(?:(\w+)\.(\w+)|\$\d+|\?|\'|\d)', re.I)
+_RANGE = re.compile(r'(?:(\w+)\.)?(\w+)\s*(?:<=|>=|<(?!>)|>|\bBETWEEN\b)', re.I)
+_IS_NULL = re.compile(r'(?:(\w+)\.)?(\w+)\s+IS\s+NULL\b', re.I)
+_ORDER_BY = re.compile(r'\bORDER\s+BY\s+(?:(\w+)\.)?(\w+)(\s+DESC)?', re.I)
+_ASSIGNMENTS = re.compile(r'\bSET\b.*?(?=\bWHERE\b|\bFROM\b|\bRETURNING\b|$)', re.I | re.S)
+_WRITE = re.compile(r'^\s*(?:WITH\b.*?\)\s*)?INSERT\s+INTO\s+(\w+)', re.I | re.S)
+
+INDEXES_SQL = """
+SELECT c.relname AS table, i.relname AS name, am.amname AS method,
+       ARRAY(SELECT pg_get_indexdef(x.indexrelid, k, true) FROM generate_series(1, x.indnkeyatts) k) AS keys,
+       ARRAY(SELECT pg_get_indexdef(x.indexrelid, k, true)
+             FROM generate_series(x.indnkeyatts + 1, x.indnatts) k) AS include,
+       string_to_array(x.indoption::text, ' ')::int[] AS options,
+       pg_get_expr(x.indpred, x.indrelid, true) AS predicate,
+       x.indisunique AS unique, x.indisprimary AS primary, x.indisvalid AS valid, con.conname AS constraint,
+       pg_get_indexdef(x.indexrelid) AS definition, pg_relation_size(x.indexrelid) AS bytes,
+       greatest(i.reltuples, 0)::bigint AS entries, coalesce(s.idx_scan, 0) AS scans
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_class c ON c.oid = x.indrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_am am ON am.oid = i.relam
+LEFT JOIN pg_constraint con ON con.conindid = x.indexrelid AND con.contype IN ('p', 'u', 'x')
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+WHERE n.nspname = %s
+ORDER BY c.relname, i.relname
+"""
+
+TABLES_SQL = """
+SELECT relname AS table, seq_scan, seq_tup_read, coalesce(idx_scan, 0) AS idx_scan, n_tup_ins, n_tup_upd,
+       n_tup_hot_upd, n_tup_del, n_live_tup, pg_relation_size(relid) AS bytes
+FROM pg_stat_user_tables WHERE schemaname = %s
+"""
+
+FOREIGN_KEYS_SQL = """
+SELECT c.relname AS table, r.relname AS parent, con.conname AS name,
+       ARRAY(SELECT a.attname FROM unnest(con.conkey) k(attnum)
+             JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum) AS columns
+FROM pg_constraint con
+JOIN pg_class c ON c.oid = con.conrelid
+JOIN pg_class r ON r.oid = con.confrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE con.contype = 'f' AND n.nspname = %s
+"""
+
+STATEMENTS_SQL = """
+SELECT query, calls, rows, {total} AS total_ms, {mean} AS mean_ms
+FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+ORDER BY {total} DESC LIMIT %s
+"""
+
+
+class IndexAdviceError(Exception):
+    """Raised when the statistics needed for advice cannot be read"""
+
+
+@dataclass
+class IndexInfo:
+    table: str
+    name: str
+    method: str
+    keys: list
+    include: list
+    options: list
+    predicate: str
+    unique: bool
+    primary: bool
+    valid: bool
+    constraint: str
+    definition: str
+    bytes: int
+    entries: int
+    scans: int
+
+    @property
+    def signature(self):
+        return self.method, tuple(self.keys), tuple(self.options), tuple(self.include), self.predicate
+
+    @property
+    def droppable(self):
+        return not self.constraint and not self.primary
+
+    def covers(self, other):
+        """True if this btree index serves every lookup `other` can (other's keys are a prefix of ours)"""
+        if self.method != 'btree' or other.method != 'btree' or not self.valid:
+            return False
+        if len(other.keys) >= len(self.keys) or self.predicate != other.predicate:
+            return False
+        if self.keys[:len(other.keys)] != other.keys:
+            return False
+        # A one-column index can be scanned backwards; longer ones need the same directions
+        if len(other.keys) > 1 and self.options[:len(other.keys)] != other.options:
+            return False
+        return set(other.include) <= set(self.keys) | set(self.include)
+
+    def leads_with(self, columns):
+        return self.valid and self.predicate is None and set(self.keys[:len(columns)]) == set(columns)
+
+
+@dataclass
+class Statement:
+    query: str
+    calls: int = None
+    total_ms: float = None
+    mean_ms: float = None
+    source: str = 'pg_stat_statements'
+
+
+@dataclass
+class DropProposal:
+    index: IndexInfo
+    reason: str
+    detail: str
+    by: str = None
+
+    @property
+    def statement(self):
+        return f"DROP INDEX CONCURRENTLY IF EXISTS {_ident(self.index.name)};"
+
+
+@dataclass
+class CreateProposal:
+    table: str
+    keys: list
+    predicate: str = None
+    seq_scans: int = 0
+    rows_per_scan: int = 0
+    statements: list = field(default_factory=list)
+
+    @property
+    def name(self):
+        columns = '_'.join(k.split()[0] for k in self.keys)
+        suffix = '_' + '_'.join(re.findall(r'(\w+)\s+IS\s+NULL', self.predicate)) + '_null' if self.predicate else ''
+        return f"idx_{self.table}_{columns}{suffix}"[:MAX_NAME]
+
+    @property
+    def statement(self):
+        where = f" WHERE {self.predicate}" if self.predicate else ''
+        return (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {_ident(self.table)} "
+                f"({', '.join(self.keys)}){where};")
+
+
+@dataclass
+class WriteSavings:
+    table: str
+    writes_per_s: float
+    indexes: int
+    dropped: list
+    added: int
+    entries_per_s: float
+    bytes_per_s: float
+    reclaimed_bytes: int
+    inserts: list = field(default_factory=list)
+
+    @property
+    def share(self):
+        """Fraction of this table's index maintenance the drops avoid"""
+        return len(self.dropped) / self.indexes if self.indexes else 0.0
+
+
+@dataclass
+class Advice:
+    window_s: float
+    statements_source: str
+    drops: list
+    creates: list
+    savings: list
+    notes: list = field(default_factory=list)
+
+
+def _ident(name):
+    return name if re.fullmatch(r'[a-z_][a-z0-9_]*', name) else '"' + name.replace('"', '""') + '"'
+
+
+def _aliases(sql):
+    """{alias or table name: table} for the tables a statement reads or writes"""
+    aliases = {}
+    for match in TABLE_REF.finditer(sql):
+        table = match.group(1).lower()
+        aliases[table] = table
+        if match.group(2):
+            aliases[match.group(2).lower()] = table
+    return aliases
+
+
+def _inserted_table(sql):
+    match = _WRITE.match(sql)
+    return match.group(1).lower() if match else None
+
+
+class IndexAdvisor:
+    """Drop and create proposals for one schema, from its live statistics"""
+
+    def __init__(self, db, schema='public', min_days=MIN_DAYS, seq_scan_rows=SEQ_SCAN_ROWS,
+                 top_statements=TOP_STATEMENTS):
+        self.db = db
+        self.schema = schema
+        self.min_days = min_days
+        self.seq_scan_rows = seq_scan_rows
+        self.top_statements = top_statements
+        self._cache = {}
+
+    def _cached(self, key, load):
+        if key not in self._cache:
+            self._cache[key] = load()
+        return self._cache[key]
+
+    @property
+    def indexes(self):
+        return self._cached('indexes', lambda: [IndexInfo(**r._asdict()) for r in
+                                                self.db.fetch(INDEXES_SQL, [self.schema])])
+
+    @property
+    def tables(self):
+        return self._cached('tables', lambda: {r.table: r for r in self.db.fetch(TABLES_SQL, [self.schema])})
+
+    @property
+    def foreign_keys(self):
+        return self._cached('foreign_keys', lambda: self.db.fetch(FOREIGN_KEYS_SQL, [self.schema]))
+
+    @property
+    def columns(self):
+        def load():
+            columns = {}
+            for row in self.db.fetch("SELECT table_name, column_name FROM information_schema.columns "
+                                     "WHERE table_schema = %s", [self.schema]):
+                columns.setdefault(row.table_name, set()).add(row.column_name)
+            return columns
+        return self._cached('columns', load)
+
+    @property
+    def distinct(self):
+        """{(table, column): estimated distinct values} from pg_stats"""
+        def load():
+            estimates = {}
+            for row in self.db.fetch("SELECT tablename, attname, n_distinct FROM pg_stats WHERE schemaname = %s",
+                                     [self.schema]):
+                live = self.tables.get(row.tablename)
+                rows = live.n_live_tup if live else 0
+                estimates[(row.tablename, row.attname)] = (
+                    -row.n_distinct * rows if row.n_distinct < 0 else row.n_distinct)
+            return estimates
+        return self._cached('distinct', load)
+
+    @property
+    def window_s(self):
+        """Seconds the cumulative statistics cover"""
+        return self._cached('window', lambda: float(self.db.scalar(
+            "SELECT extract(epoch FROM now() - coalesce(stats_reset, pg_postmaster_start_time())) "
+            "FROM pg_stat_database WHERE datname = current_database()") or 0))
+
+    def statements(self):
+        """(statements, source): pg_stat_statements if it is loaded, else the static SQL in server/src"""
+        def load():
+            if self.db.scalar("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"):
+                # Renamed in PostgreSQL 13
+                if int(self.db.scalar("SHOW server_version_num")) >= 130000:
+                    sql = STATEMENTS_SQL.format(total='total_exec_time', mean='mean_exec_time')
+                else:
+                    sql = STATEMENTS_SQL.format(total='total_time', mean='mean_time')
+                try:
+                    rows = self.db.fetch(sql, [self.top_statements])
+                    return [Statement(r.query, r.calls, r.total_ms, r.mean_ms) for r in rows], 'pg_stat_statements'
+                except errors.ObjectNotInPrerequisiteState:
+                    pass  # created but not in shared_preload_libraries
+            return ([Statement(q.sql, source=q.location) for q in extract_queries() if not q.dynamic],
+                    'server/src')
+        return self._cached('statements', load)
+
+    # -- drops ----------------------------------------------------------------
+
+    def _fk_supported(self, table, remaining):
+        """Foreign keys of `table` still led by some index in `remaining`"""
+        return {fk.name for fk in self.foreign_keys if fk.table == table
+                and any(index.leads_with(fk.columns) for index in remaining)}
+
+    def redundant(self):
+        """(drop proposals, notes)"""
+        drops, notes = [], []
+        enough_history = self.window_s >= self.min_days * 86400
+        if not enough_history:
+            notes.append(f"Statistics cover {self.window_s / 86400:.1f} days (< {self.min_days}); "
+                         "unused indexes are not proposed")
+        by_table = {}
+        for index in self.indexes:
+            by_table.setdefault(index.table, []).append(index)
+
+        for table, indexes in by_table.items():
+            dropped = {}
+
+            for index in indexes:
+                if not index.valid and index.droppable:
+                    dropped[index.name] = DropProposal(index, 'invalid', "invalid (failed concurrent build): "
+                                                       "maintained on every write, never used")
+
+            groups = {}
+            for index in indexes:
+                if index.name not in dropped:
+                    groups.setdefault(index.signature, []).append(index)
+            for group in groups.values():
+                if len(group) < 2:
+                    continue
+                keeper = max(group, key=lambda i: (bool(i.constraint), i.primary, i.unique, i.scans, -len(i.name)))
+                for index in group:
+                    if index is not keeper and index.droppable and (not index.unique or keeper.unique):
+                        dropped[index.name] = DropProposal(index, 'duplicate', f"same definition as {keeper.name}",
+                                                           keeper.name)
+
+            for index in sorted(indexes, key=lambda i: len(i.keys)):
+                if index.name in dropped or not index.droppable or index.unique:
+                    continue
+                wider = [other for other in indexes if other.name not in dropped and other.covers(index)]
+                if wider:
+                    by = max(wider, key=lambda i: (bool(i.constraint), i.scans))
+                    dropped[index.name] = DropProposal(
+                        index, 'covered', f"leading columns of {by.name} ({', '.join(by.keys)})", by.name)
+
+            coverers = {d.by for d in dropped.values() if d.by}
+            supported = self._fk_supported(table, [i for i in indexes if i.name not in dropped])
+            for index in indexes:
+                if (index.name in dropped or not index.droppable or index.unique or index.scans
+                        or index.name in coverers or not enough_history):
+                    continue
+                remaining = [i for i in indexes if i.name not in dropped and i is not index]
+                lost = supported - self._fk_supported(table, remaining)
+                if lost:
+                    notes.append(f"{index.name} is unused but the only index for foreign key "
+                                 f"{', '.join(sorted(lost))}; kept")
+                    continue
+                dropped[index.name] = DropProposal(index, 'unused',
+                                                   f"0 scans in {self.window_s / 86400:.0f} days")
+            drops.extend(dropped.values())
+        return drops, notes
+
+    # -- creates --------------------------------------------------------------
+
+    def _usage(self, sql, table):
+        """(equality columns, range/order columns with direction, IS NULL columns) of `table` in a statement"""
+        aliases = _aliases(sql)
+        sql = _ASSIGNMENTS.sub(' ', sql)
+        if table not in aliases.values():
+            return [], [], []
+        columns = self.columns.get(table, set())
+        sole = set(aliases.values()) == {table}
+
+        def own(alias, column):
+            column = column.lower()
+            if column not in columns:
+                return None
+            if alias:
+                return column if aliases.get(alias.lower()) == table else None
+            return column if sole else None
+
+        equality, ranges, nulls = [], [], []
+        for match in _EQUALITY.finditer(sql):
+            for alias, column in ((match.group(1), match.group(2)), (match.group(3), match.group(4))):
+                if column and own(alias, column) and own(alias, column) not in equality:
+                    equality.append(own(alias, column))
+        for match in _RANGE.finditer(sql):
+            column = own(match.group(1), match.group(2))
+            if column and column not in equality and column not in ranges:
+                ranges.append(column)
+        for match in _ORDER_BY.finditer(sql):
+            column = own(match.group(1), match.group(2))
+            if column and column not in equality:
+                keyed = column + (' DESC' if match.group(3) else '')
+                ranges = [keyed] + [r for r in ranges if r != column]
+        for match in _IS_NULL.finditer(sql):
+            column = own(match.group(1), match.group(2))
+            if column and column not in nulls:
+                nulls.append(column)
+        return equality, ranges, nulls
+
+    def missing(self):
+        """(create proposals, notes) for tables read by large sequential scans"""
+        statements, _ = self.statements()
+        proposals, notes = {}, []
+        for table, stats in sorted(self.tables.items(), key=lambda t: -(t[1].seq_tup_read or 0)):
+            if not stats.seq_scan or stats.n_live_tup < self.seq_scan_rows:
+                continue
+            rows_per_scan = stats.seq_tup_read // stats.seq_scan
+            if rows_per_scan < self.seq_scan_rows:
+                continue
+            existing = [i for i in self.indexes if i.table == table and i.valid]
+            served = set()
+            for statement in statements:
+                if _inserted_table(statement.query):
+                    continue
+                equality, ranges, nulls = self._usage(statement.query, table)
+                if not equality and not ranges:
+                    continue
+                rows = max(stats.n_live_tup, 1)
+                equality.sort(key=lambda c: -self.distinct.get((table, c), rows))
+                if equality and self.distinct.get((table, equality[0]), rows) < 1 / MAX_SELECTIVITY:
+                    continue
+                keys = (equality + ranges)[:MAX_KEYS]
+                predicate = ' AND '.join(f"{c} IS NULL" for c in nulls if c not in keys) or None
+                # Any index leading with a filtered column already avoids the full scan
+                lead = equality or [ranges[0].split()[0]]
+                index = next((i for i in existing if i.keys[0] in lead and i.predicate in (None, predicate)), None)
+                if index:
+                    served.add(index.name)
+                    continue
+                proposal = proposals.setdefault((table, tuple(keys), predicate), CreateProposal(
+                    table, keys, predicate, stats.seq_scan, rows_per_scan))
+                proposal.statements.append(statement)
+            if served and not any(p.table == table for p in proposals.values()):
+                notes.append(f"{table}: {stats.seq_scan:,} seq scans averaging {rows_per_scan:,} rows although "
+                             f"{', '.join(sorted(served))} match the filters; check the plans (explain-queries.py)")
+
+        creates = list(proposals.values())
+        # A proposal whose keys lead another's on the same table is served by the wider one
+        creates = [p for p in creates if not any(
+            o is not p and o.table == p.table and o.predicate == p.predicate and len(o.keys) > len(p.keys)
+            and o.keys[:len(p.keys)] == p.keys for o in creates)]
+        creates.sort(key=lambda p: -sum(s.total_ms or 0 for s in p.statements) or -len(p.statements))
+        return creates, notes
+
+    # -- write amplification --------------------------------------------------
+
+    def savings(self, drops, creates=()):
+        """WriteSavings per table with drops or creates"""
+        window = max(self.window_s, 1)
+        statements, _ = self.statements()
+        result = []
+        for table in sorted({d.index.table for d in drops} | {c.table for c in creates}):
+            stats = self.tables.get(table)
+            if not stats:
+                continue
+            dropped = [d.index for d in drops if d.index.table == table]
+            writes = (stats.n_tup_ins + stats.n_tup_upd - stats.n_tup_hot_upd) / window
+            entries = writes * len(dropped)
+            bytes_ = sum(writes * i.bytes / max(i.entries, 1) for i in dropped)
+            inserts = [s for s in statements if s.calls and _inserted_table(s.query) == table]
+            result.append(WriteSavings(
+                table, writes, sum(1 for i in self.indexes if i.table == table and i.valid),
+                [i.name for i in dropped], sum(1 for c in creates if c.table == table), entries, bytes_,
+                sum(i.bytes for i in dropped), inserts))
+        return result
+
+    def advise(self):
+        if not self.indexes:
+            raise IndexAdviceError(f"No indexes found in schema {self.schema}")
+        _, source = self.statements()
+        drops, notes = self.redundant()
+        creates, create_notes = self.missing()
+        return Advice(self.window_s, source, drops, creates, self.savings(drops, creates), notes + create_notes)
@@ -0,0 +1,256 @@
+"""
+Cached multi-region EC2 inventory.
+
+Every configured region is queried concurrently with the
+describe_instances and describe_instance_information paginators, and
+the instances are normalized (name, state, type, IPs, SSM status) and
+written to a local JSON cache with one entry per region, so scripts
+asking for different regions share the file. Reads are served from the
+cache:
+
+    fresher than ttl        returned as is
+    older, but < max_stale  returned as is while a detached process
+                            refreshes the file in the background
+    missing or older        refreshed synchronously first
+
+so resolving "summit-backend" to an instance id costs a file read
+instead of a round of AWS calls on every script run.
+
+Usage:
+    from summit_ops.inventory import Inventory
+
+    inventory = Inventory()
+    instance = inventory.resolve_one('summit-backend')
+    print(instance.instance_id, instance.region)
+"""
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import boto3
+from botocore.config import Config
+
+REGIONS = tuple(os.environ.get('SUMMIT_REGIONS', 'eu-west-1,us-east-1').split(','))
+# Beside the scripts, so every working directory shares one cache
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.summit-inventory.json')
+TTL = 300
+MAX_STALE = 24 * 3600
+# A refresh lock older than this is from a process that died
+LOCK_TIMEOUT = 120
+CACHE_VERSION = 1
+
+_client_config = Config(connect_timeout=5, read_timeout=30, retries={'max_attempts': 5, 'mode': 'adaptive'})
+
+
+class InventoryError(Exception):
+    """Raised when no region can be listed or a target does not resolve to exactly one instance"""
+
+
+@dataclass
+class Instance:
+    instance_id: str
+    region: str
+    name: str
+    state: str
+    instance_type: str
+    private_ip: str = None
+    public_ip: str = None
+    launch_time: str = None
+    platform: str = None
+    tags: dict = field(default_factory=dict)
+    ssm_managed: bool = None
+    ssm_ping: str = None
+
+    @property
+    def running(self):
+        return self.state == 'running'
+
+    def matches(self, target):
+        """Instance id, exact or glob Name, or Key=Value tag"""
+        if target == self.instance_id:
+            return True
+        if '=' in target:
+            key, _, value = target.partition('=')
+            return key in self.tags and fnmatch.fnmatchcase(self.tags[key], value)
+        return fnmatch.fnmatchcase(self.name, target)
+
+
+def normalize(raw, region, managed=None):
+    """An Instance from a describe_instances entry; managed is None when SSM could not be asked"""
+    ssm_info = (managed or {}).get(raw['InstanceId'])
+    tags = {tag['Key']: tag['Value'] for tag in raw.get('Tags', [])}
+    launched = raw.get('LaunchTime')
+    return Instance(
+        instance_id=raw['InstanceId'],
+        region=region,
+        name=tags.get('Name', ''),
+        state=raw['State']['Name'],
+        instance_type=raw['InstanceType'],
+        private_ip=raw.get('PrivateIpAddress'),
+        public_ip=raw.get('PublicIpAddress'),
+        launch_time=launched.isoformat() if hasattr(launched, 'isoformat') else launched,
+        platform=raw.get('PlatformDetails') or raw.get('Platform'),
+        tags=tags,
+        ssm_managed=None if managed is None else ssm_info is not None,
+        ssm_ping=(ssm_info or {}).get('PingStatus'),
+    )
+
+
+def fetch_region(region, session=None):
+    """All instances of one region, annotated with their SSM agent status"""
+    session = session or boto3.session.Session()
+    ec2 = session.client('ec2', region_name=region, config=_client_config)
+    ssm = session.client('ssm', region_name=region, config=_client_config)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ssm_future = pool.submit(_managed_instances, ssm)
+        raws = [instance
+                for page in ec2.get_paginator('describe_instances').paginate(PaginationConfig={'PageSize': 1000})
+                for reservation in page['Reservations']
+                for instance in reservation['Instances']]
+        managed = ssm_future.result()
+    return [normalize(raw, region, managed) for raw in raws]
+
+
+def _managed_instances(ssm):
+    # SSM status is a nice-to-have; an account without ssm:Describe* still gets an inventory
+    try:
+        pages = ssm.get_paginator('describe_instance_information').paginate(PaginationConfig={'PageSize': 50})
+        return {info['InstanceId']: info for page in pages for info in page['InstanceInformationList']}
+    except Exception:
+        return None
+
+
+class Inventory:
+    """Instances across regions, served from a TTL cache on disk"""
+
+    def __init__(self, regions=REGIONS, cache_path=CACHE_PATH, ttl=TTL, max_stale=MAX_STALE, session=None,
+                 background=True):
+        self.regions = tuple(regions)
+        self.cache_path = os.path.abspath(cache_path)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.session = session
+        self.background = background
+        self.fetched_at = None
+        self.errors = {}
+
+    @property
+    def age(self):
+        return None if self.fetched_at is None else time.time() - self.fetched_at
+
+    def instances(self, refresh=False):
+        cached = None if refresh else self._load()
+        if cached is None or self.age > self.max_stale:
+            return self.refresh()
+        if self.age > self.ttl and self.background:
+            self.refresh_in_background()
+        return cached
+
+    def refresh(self):
+        """Query every region concurrently and rewrite their cache entries"""
+        def fetch(region):
+            try:
+                return fetch_region(region, self.session), None
+            except Exception as e:
+                return None, str(e)
+
+        with ThreadPoolExecutor(max_workers=len(self.regions)) as pool:
+            outcomes = dict(zip(self.regions, pool.map(fetch, self.regions)))
+
+        self.errors = {region: error for region, (_, error) in outcomes.items() if error}
+        if len(self.errors) == len(self.regions):
+            raise InventoryError("Inventory refresh failed: " + '; '.join(f"{r}: {e}" for r, e in self.errors.items()))
+
+        entries = self._read()
+        now = time.time()
+        for region, (found, error) in outcomes.items():
+            if error:
+                # Keep the last known instances (and their age) of a region that failed this time
+                if region in entries:
+                    entries[region]['error'] = error
+                continue
+            entries[region] = {'fetched_at': now, 'error': None, 'instances': [asdict(i) for i in found]}
+        self._write(entries)
+        return self._load()
+
+    def refresh_in_background(self):
+        """Start a detached refresh unless one is already running"""
+        lock = self.cache_path + '.lock'
+        try:
+            if time.time() - os.path.getmtime(lock) < LOCK_TIMEOUT:
+                return False
+            os.remove(lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+        subprocess.Popen(
+            [sys.executable, '-m', 'summit_ops.inventory', self.cache_path, *self.regions],
+            env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        return True
+
+    def resolve(self, target, running_only=False):
+        matches = [instance for instance in self.instances() if instance.matches(target)]
+        return [instance for instance in matches if instance.running] if running_only else matches
+
+    def resolve_one(self, target):
+        """The single instance a name, tag or id refers to, preferring running ones"""
+        matches = self.resolve(target)
+        if len(matches) > 1:
+            matches = [instance for instance in matches if instance.running] or matches
+        if not matches:
+            raise InventoryError(f"No instance matches '{target}' in {', '.join(self.regions)}")
+        if len(matches) > 1:
+            found = ', '.join(f"{i.instance_id} ({i.name or 'no name'}, {i.region})" for i in matches)
+            raise InventoryError(f"'{target}' is ambiguous: {found}")
+        return matches[0]
+
+    def _read(self):
+        """Cache entries of every region in the file, {region: {fetched_at, error, instances}}"""
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get('regions', {}) if data.get('version') == CACHE_VERSION else {}
+
+    def _load(self):
+        entries = self._read()
+        if any(region not in entries for region in self.regions):
+            return None
+        # The listing is as old as its oldest region
+        self.fetched_at = min(entries[region]['fetched_at'] for region in self.regions)
+        self.errors = {region: entries[region]['error'] for region in self.regions if entries[region].get('error')}
+        return [Instance(**entry) for region in self.regions for entry in entries[region]['instances']]
+
+    def _write(self, entries):
+        # Write to a temporary file and rename so readers never see half a cache
+        temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'regions': entries}, f, indent=1)
+        os.replace(temporary, self.cache_path)
+
+
+if __name__ == '__main__':
+    # Background refresh entry point: python -m summit_ops.inventory CACHE REGION...
+    cache_path, *regions = sys.argv[1:]
+    try:
+        Inventory(regions, cache_path).refresh()
+    finally:
+        try:
+            os.remove(cache_path + '.lock')
+        except OSError:
+            pass
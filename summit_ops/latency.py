@@ -0,0 +1,130 @@
+"""
+Latency bookkeeping shared by the load generator, fan-out benchmark and
+probe runner: per-endpoint samples, error counts, nearest-rank
+percentiles, throughput and a coarse histogram.
+
+Usage:
+    from summit_ops.latency import LatencyBook
+
+    book = LatencyBook()
+    book['GET /api/chats'].record(0.042)
+    book['GET /api/chats'].error('HTTP 500')
+    print(format_table(book.summaries(elapsed=60)))
+"""
+import math
+from collections import Counter
+
+PERCENTILES = (50, 95, 99)
+# Upper bounds in milliseconds; the last bucket is open-ended
+HISTOGRAM_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyStats:
+    """Samples (seconds) and failures for one endpoint"""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.errors = Counter()
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def error(self, kind):
+        self.errors[kind] += 1
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    def percentile(self, pct):
+        """Nearest-rank percentile in milliseconds"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1] * 1000
+
+    def histogram(self, bounds=HISTOGRAM_BOUNDS):
+        """[(label, count)] with one bucket per bound plus an overflow bucket"""
+        counts = [0] * (len(bounds) + 1)
+        for seconds in self.samples:
+            ms = seconds * 1000
+            index = next((i for i, bound in enumerate(bounds) if ms <= bound), len(bounds))
+            counts[index] += 1
+        labels = [f"<={bound}ms" for bound in bounds] + [f">{bounds[-1]}ms"]
+        return list(zip(labels, counts))
+
+    def summary(self, elapsed=None):
+        summary = {
+            'name': self.name,
+            'count': self.count,
+            'errors': sum(self.errors.values()),
+            'error_kinds': dict(self.errors),
+            'mean_ms': round(sum(self.samples) / self.count * 1000, 2) if self.samples else None,
+            'max_ms': round(max(self.samples) * 1000, 2) if self.samples else None,
+        }
+        for pct in PERCENTILES:
+            value = self.percentile(pct)
+            summary[f'p{pct}_ms'] = round(value, 2) if value is not None else None
+        if elapsed:
+            summary['throughput_rps'] = round(self.count / elapsed, 2)
+        return summary
+
+
+class LatencyBook(dict):
+    """LatencyStats by endpoint name, created on first use"""
+
+    def __missing__(self, name):
+        stats = self[name] = LatencyStats(name)
+        return stats
+
+    def summaries(self, elapsed=None):
+        return [stats.summary(elapsed) for _, stats in sorted(self.items())]
+
+
+def _ms(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+def format_table(summaries):
+    lines = [f"{'ENDPOINT':<30} {'COUNT':>7} {'ERR':>5} {'RPS':>7} {'P50':>8} {'P95':>8} {'P99':>8} {'MAX':>8}"]
+    for s in summaries:
+        rps = s.get('throughput_rps')
+        lines.append(
+            f"{s['name']:<30} {s['count']:>7} {s['errors']:>5} {'-' if rps is None else f'{rps:.1f}':>7} "
+            f"{_ms(s['p50_ms']):>8} {_ms(s['p95_ms']):>8} {_ms(s['p99_ms']):>8} {_ms(s['max_ms']):>8}"
+        )
+    return '\n'.join(lines)
+
+
+def format_histogram(name, buckets, width=40):
+    """Text bars for LatencyStats.histogram(), trimmed to the occupied buckets"""
+    occupied = [i for i, (_, count) in enumerate(buckets) if count]
+    if not occupied:
+        return f"{name}: no samples"
+    shown = buckets[occupied[0]:occupied[-1] + 1]
+    peak = max(count for _, count in shown)
+    lines = [f"{name}:"]
+    for label, count in shown:
+        bar = '█' * max(1 if count else 0, round(count / peak * width))
+        lines.append(f"  {label:>9} {count:>6} {bar}")
+    return '\n'.join(lines)
+
+
+def compare(current, baseline, threshold=0.2):
+    """[(name, metric, before, after, change)] for percentiles that moved by more than threshold"""
+    previous = {s['name']: s for s in baseline}
+    changes = []
+    for s in current:
+        old = previous.get(s['name'])
+        if not old:
+            continue
+        for pct in PERCENTILES:
+            key = f'p{pct}_ms'
+            before, after = old.get(key), s.get(key)
+            if before and after is not None:
+                change = (after - before) / before
+                if abs(change) >= threshold:
+                    changes.append((s['name'], key, before, after, change))
+    return changes
@@ -0,0 +1,333 @@
+"""
+Asyncio load generator for the Summit API and WebSocket.
+
+Each virtual user behaves like a desktop client: it logs in through
+/api/auth/login, holds a /ws connection open for the whole run and
+fires API calls as independent Poisson processes at the rates its
+Scenario sets (requests per second per user):
+
+    chats     GET  /api/chats
+    messages  GET  /api/messages/:chatId
+    send      POST /api/messages
+    read      POST /api/messages/read
+    presence  POST /api/presence/batch
+
+Every message a virtual user sends is tracked until the other members'
+sockets receive its NEW_MESSAGE notification, giving end-to-end
+delivery latency next to the per-endpoint latencies.
+
+Load users (loadtest-N@loadtest.summit.local) are registered on first
+use and grouped into group chats, so the generator is meant for a
+locally started server and Postgres, e.g.:
+
+    cd server && PORT=3000 DB_HOST=127.0.0.1 DB_PORT=5432 DB_NAME=summit \\
+        DB_USER=summit_user DB_PASSWORD=... JWT_SECRET=local-load-test npx tsx src/index.ts
+
+Usage:
+    from summit_ops.loadgen import SCENARIOS, LoadGenerator
+
+    result = asyncio.run(LoadGenerator('http://127.0.0.1:3000', SCENARIOS['steady']).run())
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+
+import aiohttp
+
+from summit_ops.latency import LatencyBook
+
+LOCAL_BASE_URL = 'http://127.0.0.1:3000'
+USER_PREFIX = 'loadtest-'
+USER_DOMAIN = 'loadtest.summit.local'
+USER_PASSWORD = 'loadtest-password'
+# bcrypt makes login and register CPU heavy on the server; keep setup gentle
+SETUP_CONCURRENCY = 10
+REQUEST_TIMEOUT = 30
+PRESENCE_BATCH = 20
+
+ENDPOINTS = {
+    'login': 'POST /api/auth/login',
+    'chats': 'GET /api/chats',
+    'messages': 'GET /api/messages/:chatId',
+    'send': 'POST /api/messages',
+    'read': 'POST /api/messages/read',
+    'presence': 'POST /api/presence/batch',
+    'ws': 'WS /ws connect',
+    'delivery': 'message delivery (e2e)',
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    users: int = 50
+    duration: float = 60
+    ramp_up: float = 10
+    group_size: int = 5
+    message_bytes: int = 120
+    # Requests per second per virtual user, by action
+    rates: dict = field(default_factory=dict)
+
+
+SCENARIOS = {
+    # Ordinary office use: a message every 30s, chat list refresh every minute
+    'steady': Scenario('steady', users=50, rates={
+        'chats': 1 / 60, 'messages': 1 / 30, 'send': 1 / 30, 'read': 1 / 30, 'presence': 1 / 15,
+    }),
+    # Everyone busy at once, e.g. the start of a company-wide incident
+    'burst': Scenario('burst', users=200, duration=60, ramp_up=5, rates={
+        'chats': 1 / 10, 'messages': 1 / 5, 'send': 1 / 5, 'read': 1 / 5, 'presence': 1 / 5,
+    }),
+    # Mostly idle clients: many held sockets, little traffic
+    'idle': Scenario('idle', users=500, duration=120, ramp_up=30, rates={'presence': 1 / 30, 'chats': 1 / 120}),
+    # Quick sanity run
+    'smoke': Scenario('smoke', users=5, duration=15, ramp_up=1, group_size=5, rates={
+        'chats': 1, 'messages': 1, 'send': 0.5, 'read': 0.5, 'presence': 1,
+    }),
+}
+
+
+class LoadTestError(Exception):
+    """Raised when setup (registration, login, group creation) cannot complete"""
+
+
+@dataclass
+class VirtualUser:
+    index: int
+    email: str
+    user_id: str = None
+    token: str = None
+    chat_ids: list = field(default_factory=list)
+    unread: list = field(default_factory=list)
+    connected: bool = False
+
+    @property
+    def headers(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+
+@dataclass
+class LoadResult:
+    scenario: Scenario
+    elapsed: float
+    summaries: list
+    messages_sent: int
+    deliveries: int
+    undelivered: int
+
+    def to_json(self):
+        return {
+            'scenario': self.scenario.__dict__,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'messages_sent': self.messages_sent,
+            'deliveries': self.deliveries,
+            'undelivered_messages': self.undelivered,
+            'endpoints': self.summaries,
+        }
+
+
+def scenario_with(name, **overrides):
+    """A named scenario with some fields replaced (None values are ignored)"""
+    return replace(SCENARIOS[name], **{k: v for k, v in overrides.items() if v is not None})
+
+
+class LoadGenerator:
+    """Runs one scenario against a server and collects latency statistics"""
+
+    def __init__(self, base_url=LOCAL_BASE_URL, scenario=None, password=USER_PASSWORD, prefix=USER_PREFIX):
+        self.base_url = base_url.rstrip('/')
+        self.ws_url = self.base_url.replace('http', 'ws', 1) + '/ws'
+        self.scenario = scenario or SCENARIOS['smoke']
+        self.password = password
+        self.prefix = prefix
+        self.book = LatencyBook()
+        self.users = []
+        # message id -> (send time, recipients still expected)
+        self.in_flight = {}
+        self.messages_sent = 0
+        self._stop = asyncio.Event()
+
+    async def run(self, on_progress=None):
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.session = session
+            await self.setup(on_progress)
+            if on_progress:
+                on_progress(f"running '{self.scenario.name}': {len(self.users)} users for {self.scenario.duration:.0f}s")
+
+            started = time.monotonic()
+            tasks = [asyncio.create_task(self._user_session(user, i)) for i, user in enumerate(self.users)]
+            await asyncio.sleep(self.scenario.duration)
+            self._stop.set()
+            # Give notifications for the last messages a moment to arrive
+            await asyncio.sleep(1)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            elapsed = time.monotonic() - started
+
+        delivery = self.book[ENDPOINTS['delivery']]
+        return LoadResult(self.scenario, elapsed, self.book.summaries(elapsed), self.messages_sent,
+                          delivery.count, sum(1 for _, pending in self.in_flight.values() if pending))
+
+    async def setup(self, on_progress=None):
+        """Log in every load user, then make sure each group chat exists"""
+        await self.login_users(self.scenario.users)
+        if on_progress:
+            on_progress(f"{len(self.users)} users logged in")
+
+        size = max(2, self.scenario.group_size)
+        groups = [self.users[i:i + size] for i in range(0, len(self.users), size)]
+        await asyncio.gather(*(self.ensure_group(f"{self.prefix}group-{n}-of-{len(members)}", members)
+                               for n, members in enumerate(groups) if len(members) > 1))
+
+    async def login_users(self, count):
+        """Register (once) and log in load users 0..count-1; needs self.session"""
+        self.users = [VirtualUser(i, f"{self.prefix}{i}@{USER_DOMAIN}") for i in range(count)]
+        limit = asyncio.Semaphore(SETUP_CONCURRENCY)
+
+        async def prepare(user):
+            async with limit:
+                await self._register(user)
+                await self._login(user)
+
+        await asyncio.gather(*(prepare(user) for user in self.users))
+        return self.users
+
+    async def _register(self, user):
+        body = {'email': user.email, 'name': f"Load Test {user.index}", 'password': self.password}
+        async with self.session.post(f"{self.base_url}/api/auth/register", json=body) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200 and 'already exists' not in str(data.get('error', '')):
+                raise LoadTestError(f"Could not register {user.email}: {response.status} {data}")
+
+    async def _login(self, user):
+        started = time.monotonic()
+        body = {'email': user.email, 'password': self.password}
+        async with self.session.post(f"{self.base_url}/api/auth/login", json=body) as response:
+            data = await response.json(content_type=None)
+        if response.status != 200:
+            self.book[ENDPOINTS['login']].error(f"HTTP {response.status}")
+            raise LoadTestError(f"Could not log in {user.email}: {response.status} {data}")
+        self.book[ENDPOINTS['login']].record(time.monotonic() - started)
+        user.token = data['token']
+        user.user_id = data['user']['id']
+
+    async def ensure_group(self, name, members):
+        """Find or create a group chat led by members[0]; returns its id"""
+        leader = members[0]
+        async with self.session.get(f"{self.base_url}/api/chats", headers=leader.headers) as response:
+            chats = await response.json(content_type=None)
+        chat_id = next((c['id'] for c in chats if c.get('name') == name), None)
+        if not chat_id:
+            body = {'name': name, 'memberIds': [m.user_id for m in members[1:]]}
+            async with self.session.post(f"{self.base_url}/api/chats/group", json=body, headers=leader.headers) as response:
+                data = await response.json(content_type=None)
+            if response.status != 200:
+                raise LoadTestError(f"Could not create {name}: {response.status} {data}")
+            chat_id = data['id']
+        for member in members:
+            member.chat_ids.append(chat_id)
+        return chat_id
+
+    async def _user_session(self, user, position):
+        # Spread arrivals over the ramp-up period
+        await asyncio.sleep(self.scenario.ramp_up * position / max(1, len(self.users)))
+        actions = {
+            'chats': self._get_chats, 'messages': self._get_messages, 'send': self._send,
+            'read': self._read, 'presence': self._presence,
+        }
+        loops = [self._action_loop(user, actions[name], rate) for name, rate in self.scenario.rates.items() if rate > 0]
+        await asyncio.gather(self._socket(user), *loops)
+
+    async def _action_loop(self, user, action, rate):
+        while not self._stop.is_set():
+            await asyncio.sleep(random.expovariate(rate))
+            if self._stop.is_set():
+                return
+            await action(user)
+
+    async def _socket(self, user):
+        stats = self.book[ENDPOINTS['ws']]
+        started = time.monotonic()
+        try:
+            async with self.session.ws_connect(f"{self.ws_url}?token={user.token}", heartbeat=30) as ws:
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    event = json.loads(message.data)
+                    if event.get('type') == 'CONNECTED':
+                        stats.record(time.monotonic() - started)
+                        user.connected = True
+                    elif event.get('type') == 'NEW_MESSAGE':
+                        self._delivered(user, event.get('data') or {})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.error(type(e).__name__)
+        finally:
+            user.connected = False
+
+    def _delivered(self, user, data):
+        tracked = self.in_flight.get(data.get('messageId'))
+        if tracked:
+            sent_at, pending = tracked
+            pending.discard(user.user_id)
+            self.book[ENDPOINTS['delivery']].record(time.monotonic() - sent_at)
+        user.unread.append((data.get('chatId'), data.get('messageId')))
+        del user.unread[:-50]
+
+    async def _request(self, name, method, path, user, **kwargs):
+        stats = self.book[ENDPOINTS[name]]
+        started = time.monotonic()
+        try:
+            async with self.session.request(method, f"{self.base_url}{path}", headers=user.headers, **kwargs) as response:
+                data = await response.json(content_type=None)
+                if response.status >= 400:
+                    stats.error(f"HTTP {response.status}")
+                    return None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.error(type(e).__name__)
+            return None
+        stats.record(time.monotonic() - started)
+        return data
+
+    async def _get_chats(self, user):
+        await self._request('chats', 'GET', '/api/chats', user)
+
+    async def _get_messages(self, user):
+        if user.chat_ids:
+            await self._request('messages', 'GET', f"/api/messages/{random.choice(user.chat_ids)}?limit=50", user)
+
+    async def _send(self, user):
+        if not user.chat_ids:
+            return
+        chat_id = random.choice(user.chat_ids)
+        message_id = f"load-{uuid.uuid4()}"
+        # Only members with an open socket can be notified; the server does not queue
+        recipients = {u.user_id for u in self.users if chat_id in u.chat_ids and u is not user and u.connected}
+        self.in_flight[message_id] = (time.monotonic(), recipients)
+        saved = await self._request('send', 'POST', '/api/messages', user,
+                                    json={'id': message_id, 'chatId': chat_id, 'content': 'x' * self.scenario.message_bytes, 'type': 'text'})
+        if saved is None:
+            del self.in_flight[message_id]
+        else:
+            self.messages_sent += 1
+
+    async def _read(self, user):
+        if not user.unread:
+            return
+        chat_id = user.unread[-1][0]
+        message_ids = [mid for cid, mid in user.unread if cid == chat_id]
+        user.unread = [(cid, mid) for cid, mid in user.unread if cid != chat_id]
+        await self._request('read', 'POST', '/api/messages/read', user, json={'messageIds': message_ids, 'chatId': chat_id})
+
+    async def _presence(self, user):
+        others = random.sample(self.users, min(PRESENCE_BATCH, len(self.users)))
+        await self._request('presence', 'POST', '/api/presence/batch', user, json={'userIds': [u.user_id for u in others]})
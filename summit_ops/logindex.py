@@ -0,0 +1,237 @@
+"""
+Local full-text index over collected backend and nginx logs.
+
+Log lines are parsed into (timestamp, level, event, user id) and stored
+in SQLite with an FTS5 index over the raw text, so questions like "when
+did user X last get a NEW_MESSAGE notification" are answered locally in
+milliseconds instead of grepping whatever the server has not rotated
+away yet.
+
+Usage:
+    from summit_ops.logindex import LogIndex
+
+    index = LogIndex()
+    index.ingest_file('summit-backend-out.log')
+    for row in index.search(event='NEW_MESSAGE', user_id=user_id, limit=1):
+        print(row['ts'], row['line'])
+"""
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.summit-logs.db')
+# A file is recognised by the digest of its first HEAD_BYTES (or fewer, if it was shorter) bytes
+HEAD_BYTES = 4096
+
+# `pm2 logs` output prefixes lines with "0|summit-backend | "
+PM2_PREFIX = re.compile(r'^\d+\|[\w.-]+\s*\|\s?')
+# PM2 with `time: true` writes "2025-01-31T14:03:22: message"
+PM2_TIME = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?):?\s?')
+NGINX_ACCESS_TIME = re.compile(r'\[(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4})\]')
+NGINX_ERROR_LINE = re.compile(r'^(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(\w+)\]')
+NGINX_STATUS = re.compile(r'"\s(\d{3})\s')
+
+UUID = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+USER_ID = re.compile(rf'(?:user|User|userId|user_id)\W{{1,4}}({UUID})')
+
+# First match wins; a named group "event" overrides the fixed event name
+EVENT_PATTERNS = [
+    (re.compile(r'Notified user \S+ of (?P<event>[A-Z_]+)'), None),
+    (re.compile(r'Slow query detected'), 'SLOW_QUERY'),
+    (re.compile(r'Database query error'), 'DB_ERROR'),
+    (re.compile(r'WebSocket connected for user'), 'WS_CONNECTED'),
+    (re.compile(r'WebSocket disconnected for user'), 'WS_DISCONNECTED'),
+    (re.compile(r'WebSocket connection attempt'), 'WS_ATTEMPT'),
+    (re.compile(r'Sending call notification'), 'CALL_NOTIFICATION'),
+    (re.compile(r'(?i)chime.*(error|fail)|(error|fail).*chime'), 'CHIME_ERROR'),
+    (re.compile(r'(?i)meeting (created|deleted)'), 'MEETING'),
+    (re.compile(r'Group chat created|Creating group chat'), 'GROUP_CREATED'),
+    (re.compile(r'CORS blocked origin'), 'CORS_BLOCKED'),
+    (re.compile(r'\b(?P<event>[A-Z]{3,}(?:_[A-Z]+)+)\b'), None),
+]
+
+EMOJI_LEVELS = {'❌': 'error', '🚨': 'error', '⚠️': 'warn', '⚠': 'warn'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    ts TEXT,
+    source TEXT NOT NULL,
+    level TEXT NOT NULL,
+    event TEXT,
+    user_id TEXT,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries(ts);
+CREATE INDEX IF NOT EXISTS idx_entries_event_ts ON entries(event, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_user_ts ON entries(user_id, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(line, content='entries', content_rowid='id');
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    head_digest TEXT NOT NULL,
+    head_length INTEGER NOT NULL DEFAULT 4096,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+def _iso(dt):
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def parse_line(line, source='', last_ts=None):
+    """Split one raw log line into its indexed fields"""
+    text = PM2_PREFIX.sub('', line.rstrip('\r\n'))
+    ts = None
+    level = 'error' if 'error' in os.path.basename(source).lower() else 'info'
+
+    match = PM2_TIME.match(text)
+    if match:
+        ts = _iso(datetime.fromisoformat(match.group(1).replace('Z', '+00:00')))
+        text = text[match.end():]
+    elif (match := NGINX_ERROR_LINE.match(text)):
+        ts = _iso(datetime.strptime(match.group(1), '%Y/%m/%d %H:%M:%S'))
+        level = 'error' if match.group(2) in ('error', 'crit', 'alert', 'emerg') else match.group(2)
+    elif (match := NGINX_ACCESS_TIME.search(text)):
+        ts = _iso(datetime.strptime(match.group(1), '%d/%b/%Y:%H:%M:%S %z'))
+
+    stripped = text.lstrip()
+    for emoji, emoji_level in EMOJI_LEVELS.items():
+        if stripped.startswith(emoji):
+            level = emoji_level
+            break
+
+    event = None
+    status = NGINX_STATUS.search(text) if NGINX_ACCESS_TIME.search(text) else None
+    if status:
+        event = f'HTTP_{status.group(1)}'
+        if status.group(1).startswith('5'):
+            level = 'error'
+    else:
+        for pattern, name in EVENT_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                event = match.groupdict().get('event') or name
+                break
+
+    user = USER_ID.search(text)
+    return {
+        'ts': ts or last_ts,
+        'level': level,
+        'event': event,
+        'user_id': user.group(1).lower() if user else None,
+        'line': text,
+    }
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+class LogIndex:
+    """SQLite/FTS5 store of parsed log lines"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        columns = [row['name'] for row in self.db.execute('PRAGMA table_info(sources)')]
+        if 'head_length' not in columns:
+            # Indexes created before head_length always hashed a full HEAD_BYTES
+            with self.db:
+                self.db.execute(f'ALTER TABLE sources ADD COLUMN head_length INTEGER NOT NULL DEFAULT {HEAD_BYTES}')
+
+    def close(self):
+        self.db.close()
+
+    def add_lines(self, lines, source):
+        """Index an iterable of raw lines from one source; returns the count"""
+        last_ts = None
+        rows = []
+        for line in lines:
+            if not line.strip():
+                continue
+            entry = parse_line(line, source, last_ts)
+            last_ts = entry['ts']
+            rows.append((entry['ts'], source, entry['level'], entry['event'], entry['user_id'], entry['line']))
+
+        with self.db:
+            start = self.db.execute('SELECT COALESCE(MAX(id), 0) FROM entries').fetchone()[0]
+            self.db.executemany(
+                'INSERT INTO entries (ts, source, level, event, user_id, line) VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+            self.db.execute(
+                'INSERT INTO entries_fts (rowid, line) SELECT id, line FROM entries WHERE id > ?', (start,)
+            )
+        return len(rows)
+
+    def ingest_file(self, path, source=None):
+        """Append a local log file, skipping whatever an earlier run already indexed"""
+        source = source or os.path.basename(path)
+        with _open(path) as f:
+            row = self.db.execute('SELECT head_digest, head_length, offset FROM sources WHERE path = ?',
+                                  (path,)).fetchone()
+            # The same leading bytes as last time means the same file grown since;
+            # anything else is a rotated or replaced file read from the top
+            offset = 0
+            if row and hashlib.sha256(f.read(row['head_length'])).hexdigest() == row['head_digest']:
+                offset = row['offset']
+            f.seek(offset)
+            data = f.read()
+            # Leave an unterminated last line for the next run
+            complete = data[:data.rfind(b'\n') + 1]
+            end = offset + len(complete)
+            # Hash only what has been indexed, so a small file that grows keeps its identity
+            f.seek(0)
+            head = f.read(min(end, HEAD_BYTES))
+
+        lines = complete.decode('utf-8', errors='replace').splitlines()
+        count = self.add_lines(lines, source)
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO sources (path, head_digest, head_length, offset) VALUES (?, ?, ?, ?)',
+                (path, hashlib.sha256(head).hexdigest(), len(head), end),
+            )
+        return count
+
+    def search(self, text=None, since=None, until=None, event=None, user_id=None, level=None, source=None, limit=100):
+        """Newest-first entries matching every given filter"""
+        clauses = []
+        params = []
+        if text:
+            clauses.append('e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)')
+            params.append(text)
+        for column, value in (('event', event), ('user_id', user_id), ('level', level), ('source', source)):
+            if value:
+                clauses.append(f'e.{column} = ?')
+                params.append(value.lower() if column == 'user_id' else value)
+        if since:
+            clauses.append('e.ts >= ?')
+            params.append(_iso(since) if isinstance(since, datetime) else since)
+        if until:
+            clauses.append('e.ts < ?')
+            params.append(_iso(until) if isinstance(until, datetime) else until)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = f'SELECT e.* FROM entries e {where} ORDER BY e.ts DESC, e.id DESC LIMIT ?'
+        return self.db.execute(sql, params + [limit]).fetchall()
+
+    def event_counts(self, since=None, until=None):
+        """Number of entries per event type within a time range"""
+        sql = 'SELECT event, COUNT(*) AS n FROM entries WHERE event IS NOT NULL'
+        params = []
+        if since:
+            sql += ' AND ts >= ?'
+            params.append(_iso(since) if isinstance(since, datetime) else since)
+        if until:
+            sql += ' AND ts < ?'
+            params.append(_iso(until) if isinstance(until, datetime) else until)
+        sql += ' GROUP BY event ORDER BY n DESC'
+        return self.db.execute(sql, params).fetchall()
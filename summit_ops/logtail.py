@@ -0,0 +1,183 @@
+"""
+Incremental PM2 log follower.
+
+Keeps an (inode, byte offset) cursor per remote log file. Each poll is
+one SSM invocation that ships only the bytes written since the last
+poll, gzipped and base64 encoded, so watching production logs costs
+O(new bytes) instead of re-sending a fixed `pm2 logs --lines N` window.
+A changed inode or a file shorter than the cursor means the log was
+rotated or truncated, and reading restarts from the top of the new file.
+
+Usage:
+    from summit_ops.logtail import LogFollower, grep
+
+    follower = LogFollower()
+    for line in grep(follower.follow(), 'Notified user', 'GROUP_ADDED'):
+        print(line)
+"""
+import base64
+import binascii
+import gzip
+import json
+import os
+import re
+import shlex
+import time
+import zlib
+from dataclasses import dataclass
+
+from summit_ops.ssm import get_runner
+
+PM2_APP = 'summit-backend'
+PM2_LOG_DIR = '/home/ubuntu/.pm2/logs'
+DEFAULT_LOG_FILES = [
+    f'{PM2_LOG_DIR}/{PM2_APP}-out.log',
+    f'{PM2_LOG_DIR}/{PM2_APP}-error.log',
+]
+
+# Raw bytes shipped per poll, shared by all files. Incompressible data grows
+# by about a third once gzipped and base64 encoded, so 12 KB stays inside
+# ssm.INLINE_OUTPUT_LIMIT; a truncated result is re-fetched with run_large()
+MAX_CHUNK_BYTES = 12 * 1024
+
+HEADER = '__SUMMIT_LOG__'
+
+
+@dataclass
+class Cursor:
+    inode: int = 0
+    offset: int = -1  # -1 means "not positioned yet"
+
+
+@dataclass
+class LogLine:
+    source: str
+    text: str
+
+    def __str__(self):
+        return f"[{os.path.basename(self.source)}] {self.text}"
+
+
+def discover_log_files(app=PM2_APP, runner=None):
+    """Ask PM2 where an app writes its logs"""
+    runner = runner or get_runner()
+    stdout = runner.run(f"export HOME=/home/ubuntu; pm2 describe {shlex.quote(app)}", timeout=30).stdout
+    paths = re.findall(r'(?:out|error) log path\s*│\s*(\S+)', stdout)
+    return paths or DEFAULT_LOG_FILES
+
+
+class LogFollower:
+    """Follows remote log files by byte offset"""
+
+    def __init__(self, paths=None, runner=None, from_start=False, state_path=None, max_chunk=MAX_CHUNK_BYTES):
+        self.paths = list(paths or DEFAULT_LOG_FILES)
+        self.runner = runner or get_runner()
+        self.from_start = from_start
+        self.state_path = state_path
+        self.max_chunk = max_chunk
+        self.cursors = {path: Cursor() for path in self.paths}
+        self._partial = {path: b'' for path in self.paths}
+        # The file that gets the first share of the budget, rotated every poll
+        self._turn = 0
+        self._load_state()
+
+    def build_command(self):
+        """One shell script that reports every file's new bytes since its cursor, max_chunk bytes in all"""
+        lines = [f"budget={self.max_chunk}"]
+        order = self.paths[self._turn:] + self.paths[:self._turn]
+        for path in order:
+            index = self.paths.index(path)
+            cursor = self.cursors[path]
+            start_at_end = 'false' if self.from_start else 'true'
+            lines.append(f"""f={shlex.quote(path)}
+inode=$(stat -c %i "$f" 2>/dev/null || echo 0)
+size=$(stat -c %s "$f" 2>/dev/null || echo 0)
+off={cursor.offset}
+if [ "$off" -lt 0 ]; then if {start_at_end}; then off=$size; else off=0; fi
+elif [ "$inode" != "{cursor.inode}" ] || [ "$size" -lt "$off" ]; then off=0; fi
+n=$((size - off)); if [ "$n" -gt "$budget" ]; then n=$budget; fi
+budget=$((budget - n))
+echo "{HEADER} {index} $inode $off $n $size"
+if [ "$n" -gt 0 ]; then tail -c +$((off + 1)) "$f" | head -c "$n" | gzip -c | base64 -w0; fi
+echo""")
+        return "\n".join(lines)
+
+    def poll(self):
+        """Fetch new bytes for every file; returns (lines, bytes still pending)"""
+        command = self.build_command()
+        self._turn = (self._turn + 1) % len(self.paths)
+        result = self.runner.run(command, timeout=60)
+        if result.truncated:
+            result = self.runner.run_large(command, timeout=120)
+        lines = []
+        pending = 0
+        output = result.stdout.splitlines()
+        for position, header in enumerate(output):
+            if not header.startswith(HEADER):
+                continue
+            _, index, inode, offset, length, size = header.split()
+            path = self.paths[int(index)]
+            offset, length = int(offset), int(length)
+            payload = output[position + 1] if position + 1 < len(output) else ''
+            try:
+                data = gzip.decompress(base64.b64decode(payload, validate=True)) if length else b''
+            except (binascii.Error, EOFError, OSError, zlib.error):
+                data = None
+            if data is None or len(data) != length:
+                # Not received intact: keep the cursor so the next poll asks again
+                pending += int(size) - offset
+                continue
+
+            cursor = self.cursors[path]
+            if cursor.offset >= 0 and (int(inode) != cursor.inode or offset < cursor.offset):
+                # Rotated or truncated: whatever was buffered belonged to the old file
+                self._partial[path] = b''
+            cursor.inode, cursor.offset = int(inode), offset + len(data)
+            pending += int(size) - cursor.offset
+            lines.extend(self._split_lines(path, data))
+
+        self._save_state()
+        return lines, pending
+
+    def follow(self, interval=2.0):
+        """Yield LogLines forever, polling again at once while behind"""
+        while True:
+            lines, pending = self.poll()
+            yield from lines
+            if not pending:
+                time.sleep(interval)
+
+    def _split_lines(self, path, data):
+        buffered = self._partial[path] + data
+        *complete, rest = buffered.split(b'\n')
+        self._partial[path] = rest
+        return [LogLine(path, line.decode('utf-8', errors='replace')) for line in complete]
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            saved = json.load(f)
+        for path, (inode, offset) in saved.items():
+            if path in self.cursors:
+                self.cursors[path] = Cursor(inode, offset)
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        # Stop at the last newline: a partial line is read again, whole, on resume
+        saved = {path: [c.inode, c.offset - len(self._partial[path])] for path, c in self.cursors.items()}
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, self.state_path)
+
+
+def grep(lines, *patterns, ignore_case=False, invert=False):
+    """Filter a LogLine stream like grep -e PATTERN [-e PATTERN ...]"""
+    flags = re.IGNORECASE if ignore_case else 0
+    compiled = [re.compile(pattern, flags) for pattern in patterns]
+    for line in lines:
+        matched = not compiled or any(p.search(line.text) for p in compiled)
+        if matched != invert:
+            yield line
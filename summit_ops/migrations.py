@@ -0,0 +1,384 @@
+"""
+Idempotent migration runner for the SQL files in database/.
+
+The files in database/ used to be pasted into psql by hand (or through
+run-performance-indexes.sh), with no record of what had run where, and
+their plain CREATE INDEX statements took a lock that blocked every
+write to the table (messages included) for the whole build. Here:
+
+    ledger       every applied file is recorded in schema_migrations
+                 with its SHA-256, so a second run skips it and an
+                 edited file shows up as drift instead of silently
+                 differing from production
+    no blocking  CREATE INDEX / DROP INDEX are rewritten to CONCURRENTLY
+                 and run on their own outside a transaction; an invalid
+                 index left by an interrupted build is dropped and
+                 rebuilt. Everything else runs in transactions with a
+                 short lock_timeout, retried with backoff, so DDL never
+                 queues behind a long query while writers queue behind it
+    timings      each step (statement or transaction) is timed and
+                 reported as it finishes
+
+Files run in ORDER; SKIPPED files are superseded or read-only, and any
+other .sql file found is reported as unlisted. A file is recorded once
+all its steps succeed. Concurrent steps commit on their own, so a file
+that fails halfway runs again from the top and has to be re-runnable
+(IF NOT EXISTS, CREATE OR REPLACE), as the existing ones are. A run
+holds a session-level advisory lock, so apply() needs connect(direct=True)
+(Postgres itself) and refuses a PgBouncer connection: in transaction
+mode the lock and its unlock can land on different server backends,
+leaving the lock held for every later run. Reading the status and
+baseline/accept work through either.
+
+Usage:
+    from summit_ops.db import connect
+    from summit_ops.migrations import MigrationRunner
+
+    with connect(direct=True) as db:
+        runner = MigrationRunner(db)
+        for status in runner.status():
+            print(status.name, status.state)
+        runner.apply(on_step=print)
+"""
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+from psycopg import errors
+
+from summit_ops.ssm import backoff_delays
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
+LEDGER_TABLE = 'schema_migrations'
+# pg_advisory_lock key shared by every runner
+ADVISORY_LOCK = 0x5e4d17
+LOCK_TIMEOUT = '5s'
+LOCK_RETRIES = 5
+
+# Application order. complete_schema.sql drops and recreates the triggers
+# schema.sql creates, so it can follow it; chat_requests only exists in schema.sql.
+ORDER = (
+    'schema.sql',
+    'complete_schema.sql',
+    'migration_add_chats.sql',
+    'migration_add_messages_table.sql',
+    'migration_add_read_receipts.sql',
+    'migration_add_notifications.sql',
+    'migration_add_profile_fields.sql',
+    'migration_temp_password_signup.sql',
+    'migration_subscription_system.sql',
+    'add_performance_indexes.sql',
+    'optimize_contacts_query.sql',
+)
+SKIPPED = {
+    'migration_add_messages.sql': "superseded by migration_add_messages_table.sql (created_at, not timestamp)",
+    'migrations_001_presence_and_reads.sql': "folded into complete_schema.sql",
+    'verify_tables.sql': "read-only check",
+}
+
+_NAME = r'(?:"(?:[^"]|"")+"|\w+)'
+CREATE_INDEX = re.compile(
+    rf'^(CREATE\s+(?:UNIQUE\s+)?INDEX)\s+(?!CONCURRENTLY\b)((?:IF\s+NOT\s+EXISTS\s+)?)({_NAME}(?:\.{_NAME})?)\s+ON\b',
+    re.I)
+# DROP INDEX CONCURRENTLY takes exactly one index and no CASCADE
+DROP_INDEX = re.compile(
+    rf'^(DROP\s+INDEX)\s+(?!CONCURRENTLY\b)((?:IF\s+EXISTS\s+)?{_NAME}(?:\.{_NAME})?)\s*(?:RESTRICT\s*)?$', re.I)
+_QUALIFIED = re.compile(rf'({_NAME})$')
+# Statements PostgreSQL refuses to run inside a transaction block
+NON_TRANSACTIONAL = re.compile(r'^(?:\w+\s+)*?(?:INDEX|TABLE)\s+CONCURRENTLY\b|^VACUUM\b', re.I)
+_LEADING_COMMENTS = re.compile(r'^(?:\s+|--[^\n]*\n?|/\*.*?\*/)*', re.S)
+_DOLLAR_TAG = re.compile(r'\$(?:[A-Za-z_]\w*)?\$')
+
+
+class MigrationError(Exception):
+    """Raised when migrations cannot be applied (drift, a failing step, another runner)"""
+
+
+def split_statements(sql):
+    """Top-level statements of a SQL script, respecting quotes, comments and $$ bodies"""
+    statements, start, i, n = [], 0, 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if c in ("'", '"'):
+            end = sql.find(c, i + 1)
+            # '' inside a literal is an escaped quote: keep scanning
+            while end != -1 and sql.startswith(c, end + 1):
+                end = sql.find(c, end + 2)
+            i = n if end == -1 else end + 1
+        elif sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = n if end == -1 else end + 1
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c == '$' and _DOLLAR_TAG.match(sql, i) and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] == '_')):
+            tag = _DOLLAR_TAG.match(sql, i).group(0)
+            end = sql.find(tag, i + len(tag))
+            i = n if end == -1 else end + len(tag)
+        elif c == ';':
+            statements.append(sql[start:i])
+            start = i = i + 1
+        else:
+            i += 1
+    statements.append(sql[start:])
+    return [s.strip() for s in statements if _LEADING_COMMENTS.sub('', s).strip()]
+
+
+@dataclass
+class Step:
+    sql: str
+    concurrent: bool = False
+    index: str = None
+    rewritten: bool = False
+
+    @property
+    def summary(self):
+        text = ' '.join(_LEADING_COMMENTS.sub('', self.sql).split())
+        return text if len(text) <= 90 else text[:89] + '…'
+
+
+def plan_step(sql):
+    """A Step for one statement, with index builds and drops rewritten to CONCURRENTLY"""
+    body = _LEADING_COMMENTS.sub('', sql)
+    create = CREATE_INDEX.match(body)
+    if create:
+        verb, if_not_exists, name = create.groups()
+        body = f"{verb} CONCURRENTLY {if_not_exists}{name} ON{body[create.end():]}"
+        index = _QUALIFIED.search(name).group(1)
+        # Unquoted identifiers are folded to lower case in pg_class
+        index = index[1:-1].replace('""', '"') if index.startswith('"') else index.lower()
+        return Step(body, concurrent=True, index=index, rewritten=True)
+    drop = DROP_INDEX.match(body.rstrip())
+    if drop:
+        return Step(f"{drop.group(1)} CONCURRENTLY {drop.group(2)}", concurrent=True, rewritten=True)
+    return Step(sql, concurrent=bool(NON_TRANSACTIONAL.match(body)))
+
+
+@dataclass
+class Migration:
+    name: str
+    path: str
+
+    @property
+    def sql(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    @property
+    def checksum(self):
+        # Line endings depend on who last saved the file
+        return hashlib.sha256(self.sql.replace('\r\n', '\n').encode('utf-8')).hexdigest()
+
+    def steps(self):
+        return [plan_step(statement) for statement in split_statements(self.sql)]
+
+
+@dataclass
+class MigrationStatus:
+    name: str
+    state: str              # applied, pending, changed, missing (ledger only), unlisted (file only)
+    checksum: str = None
+    recorded_checksum: str = None
+    applied_at: object = None
+    duration_ms: int = None
+
+
+@dataclass
+class StepResult:
+    migration: str
+    step: Step
+    duration_ms: float
+    note: str = None
+
+
+@dataclass
+class AppliedMigration:
+    name: str
+    checksum: str
+    duration_ms: float = 0
+    steps: list = field(default_factory=list)
+
+
+class MigrationRunner:
+    """Applies database/ migrations in ORDER and keeps their ledger"""
+
+    def __init__(self, db, directory=MIGRATIONS_DIR, order=ORDER, skipped=SKIPPED, lock_timeout=LOCK_TIMEOUT,
+                 retries=LOCK_RETRIES):
+        self.db = db
+        self.directory = directory
+        self.order = tuple(order)
+        self.skipped = dict(skipped)
+        self.lock_timeout = lock_timeout
+        self.retries = retries
+
+    def migrations(self):
+        return [Migration(name, os.path.join(self.directory, name)) for name in self.order
+                if os.path.exists(os.path.join(self.directory, name))]
+
+    def unlisted(self):
+        known = set(self.order) | set(self.skipped)
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.sql') and name not in known)
+
+    def ensure_ledger(self):
+        self.db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+              name TEXT PRIMARY KEY,
+              checksum TEXT NOT NULL,
+              applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+              duration_ms INTEGER,
+              steps INTEGER,
+              baseline BOOLEAN NOT NULL DEFAULT false
+            )
+        """)
+
+    def ledger(self):
+        self.ensure_ledger()
+        return {row.name: row for row in self.db.fetch(
+            f"SELECT name, checksum, applied_at, duration_ms FROM {LEDGER_TABLE} ORDER BY applied_at")}
+
+    def status(self):
+        ledger = self.ledger()
+        statuses = []
+        for migration in self.migrations():
+            recorded = ledger.pop(migration.name, None)
+            checksum = migration.checksum
+            if recorded is None:
+                statuses.append(MigrationStatus(migration.name, 'pending', checksum))
+                continue
+            state = 'applied' if recorded.checksum == checksum else 'changed'
+            statuses.append(MigrationStatus(migration.name, state, checksum, recorded.checksum,
+                                            recorded.applied_at, recorded.duration_ms))
+        for name, recorded in ledger.items():
+            statuses.append(MigrationStatus(name, 'missing', None, recorded.checksum, recorded.applied_at,
+                                            recorded.duration_ms))
+        statuses.extend(MigrationStatus(name, 'unlisted') for name in self.unlisted())
+        return statuses
+
+    def pending(self, names=None):
+        pending = {s.name for s in self.status() if s.state == 'pending'}
+        return [m for m in self.migrations() if m.name in pending and (not names or m.name in names)]
+
+    def apply(self, names=None, allow_drift=False, on_step=None):
+        """Apply pending migrations (all, or just `names`) in order; returns [AppliedMigration]"""
+        if self.db.pgbouncer:
+            raise MigrationError("Applying migrations needs a direct Postgres session; PgBouncer in transaction "
+                                 "mode would leak the advisory lock")
+        drift = [s.name for s in self.status() if s.state == 'changed']
+        if drift and not allow_drift:
+            raise MigrationError(f"Applied migrations changed since they ran: {', '.join(drift)} "
+                                 "(review them, then accept the new checksums)")
+        applied = []
+        with self.db.pool.connection() as conn:
+            if not conn.execute("SELECT pg_try_advisory_lock(%s)", [ADVISORY_LOCK]).fetchone()[0]:
+                raise MigrationError("Another migration run holds the lock")
+            try:
+                conn.execute("SET statement_timeout = 0")
+                for migration in self.pending(names):
+                    applied.append(self._apply(conn, migration, on_step))
+            finally:
+                conn.execute("SELECT pg_advisory_unlock(%s)", [ADVISORY_LOCK])
+        return applied
+
+    def _apply(self, conn, migration, on_step):
+        result = AppliedMigration(migration.name, migration.checksum)
+        started = time.perf_counter()
+        group = []
+        for step in migration.steps():
+            if not step.concurrent:
+                group.append(step)
+                continue
+            result.steps.extend(self._run_group(conn, migration, group, on_step))
+            group = []
+            result.steps.extend(self._run_concurrent(conn, migration, step, on_step))
+        result.steps.extend(self._run_group(conn, migration, group, on_step))
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        conn.execute(
+            f"INSERT INTO {LEDGER_TABLE} (name, checksum, duration_ms, steps) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (name) DO UPDATE SET checksum = EXCLUDED.checksum, applied_at = NOW(), "
+            "duration_ms = EXCLUDED.duration_ms, steps = EXCLUDED.steps, baseline = false",
+            [migration.name, result.checksum, round(result.duration_ms), len(result.steps)])
+        return result
+
+    def _run_group(self, conn, migration, steps, on_step):
+        """Run statements in one transaction under lock_timeout, retrying when a lock is not granted"""
+        if not steps:
+            return []
+        delays = backoff_delays(initial=0.5, maximum=8.0)
+        for attempt in range(self.retries + 1):
+            results = []
+            try:
+                with conn.transaction():
+                    conn.execute(f"SET LOCAL lock_timeout = '{self.lock_timeout}'")
+                    for step in steps:
+                        started = time.perf_counter()
+                        conn.execute(step.sql)
+                        results.append(StepResult(migration.name, step, (time.perf_counter() - started) * 1000))
+                break
+            except errors.LockNotAvailable:
+                if attempt == self.retries:
+                    raise MigrationError(f"{migration.name}: could not get a lock within {self.lock_timeout} "
+                                         f"after {attempt + 1} attempts; retry when the table is quieter")
+                time.sleep(next(delays))
+            except Exception as e:
+                raise MigrationError(f"{migration.name}: {e}") from e
+        if attempt:
+            results[0].note = f"lock granted on attempt {attempt + 1}"
+        for result in results:
+            if on_step:
+                on_step(result)
+        return results
+
+    def _run_concurrent(self, conn, migration, step, on_step):
+        """Run a CONCURRENTLY statement on its own, replacing an invalid index left by a failed build"""
+        results = []
+        conn.execute("SET lock_timeout = 0")
+        try:
+            if step.index and self.index_valid(conn, step.index) is False:
+                drop = Step(f'DROP INDEX CONCURRENTLY IF EXISTS "{step.index}"', concurrent=True, rewritten=True)
+                started = time.perf_counter()
+                conn.execute(drop.sql)
+                results.append(StepResult(migration.name, drop, (time.perf_counter() - started) * 1000,
+                                          "invalid index from an interrupted build"))
+                if on_step:
+                    on_step(results[-1])
+            started = time.perf_counter()
+            conn.execute(step.sql)
+        except Exception as e:
+            raise MigrationError(f"{migration.name}: {e}") from e
+        finally:
+            conn.execute("RESET lock_timeout")
+        results.append(StepResult(migration.name, step, (time.perf_counter() - started) * 1000))
+        if on_step:
+            on_step(results[-1])
+        return results
+
+    @staticmethod
+    def index_valid(conn, name):
+        """True/False for an existing index in the search path, None when there is none"""
+        row = conn.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)", [name]).fetchone()
+        return row[0] if row else None
+
+    def baseline(self, names=None):
+        """Record migrations as applied without running them (for databases migrated by hand)"""
+        recorded = []
+        for migration in self.pending(names):
+            self.db.execute(
+                f"INSERT INTO {LEDGER_TABLE} (name, checksum, baseline) VALUES (%s, %s, true) "
+                "ON CONFLICT (name) DO NOTHING", [migration.name, migration.checksum])
+            recorded.append(migration.name)
+        return recorded
+
+    def accept(self, names=None):
+        """Record the current checksum of changed migrations after reviewing the edit"""
+        accepted = []
+        for status in self.status():
+            if status.state == 'changed' and (not names or status.name in names):
+                self.db.execute(f"UPDATE {LEDGER_TABLE} SET checksum = %s WHERE name = %s",
+                                [status.checksum, status.name])
+                accepted.append(status.name)
+        return accepted
+
@@ -0,0 +1,180 @@
+"""
+Asyncio health monitor with concurrent probes.
+
+Every probe (HTTP endpoint or WebSocket handshake) runs on its own
+schedule over one pooled keep-alive session. As soon as any probe fails
+the whole monitor drops to the fast interval, so an outage is noticed
+within seconds and confirmed quickly, then relaxes again once every
+probe is healthy.
+
+Usage:
+    import asyncio
+    from summit_ops.monitor import HealthMonitor, default_probes
+
+    asyncio.run(HealthMonitor(default_probes()).run())
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import aiohttp
+
+API_BASE = 'https://summit.api.codingeverest.com'
+WS_URL = 'wss://summit.api.codingeverest.com/ws'
+
+NORMAL_INTERVAL = 30
+FAST_INTERVAL = 5
+SAMPLE_WINDOW = 500
+
+
+@dataclass
+class Probe:
+    name: str
+    url: str
+    kind: str = 'http'
+    interval: float = NORMAL_INTERVAL
+    fast_interval: float = FAST_INTERVAL
+    timeout: float = 10
+    expect_json_status: bool = False
+    max_status: int = 299
+
+
+@dataclass
+class ProbeState:
+    probe: Probe
+    samples: deque = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+    checks: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_error: str = ''
+
+    @property
+    def healthy(self):
+        return self.consecutive_failures == 0
+
+    def percentile(self, pct):
+        """Nearest-rank percentile of recent latencies, in milliseconds"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1] * 1000
+
+    def summary(self):
+        if not self.samples:
+            return f"{self.probe.name}: no successful samples yet"
+        return (
+            f"{self.probe.name}: p50={self.percentile(50):.0f}ms "
+            f"p95={self.percentile(95):.0f}ms p99={self.percentile(99):.0f}ms "
+            f"({self.failures}/{self.checks} failed)"
+        )
+
+
+def default_probes(api_base=API_BASE, ws_url=WS_URL):
+    """The probes the production monitor runs"""
+    return [
+        Probe('health', f'{api_base}/health', expect_json_status=True),
+        Probe('auth-health', f'{api_base}/api/auth/health', expect_json_status=True),
+        Probe('websocket', ws_url, kind='websocket', interval=60),
+        # Any answer below 500 means nginx itself is up and routing
+        Probe('nginx', f'{api_base}/', interval=60, max_status=499),
+    ]
+
+
+class HealthMonitor:
+    """Runs every probe concurrently and tracks their health"""
+
+    def __init__(self, probes, on_failure=None, on_recovery=None, report_every=300):
+        self.states = {probe.name: ProbeState(probe) for probe in probes}
+        self.on_failure = on_failure
+        self.on_recovery = on_recovery
+        self.report_every = report_every
+        self._degraded = asyncio.Event()
+
+    @property
+    def degraded(self):
+        return any(not state.healthy for state in self.states.values())
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=len(self.states) * 2, keepalive_timeout=120)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.create_task(self._probe_loop(session, state)) for state in self.states.values()]
+            tasks.append(asyncio.create_task(self._report_loop()))
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def check(self, session, state):
+        """Run one probe once and record the outcome"""
+        probe = state.probe
+        started = time.perf_counter()
+        try:
+            if probe.kind == 'websocket':
+                await self._check_websocket(session, probe)
+            else:
+                await self._check_http(session, probe)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            return await self._record_failure(state, error)
+
+        state.checks += 1
+        state.samples.append(time.perf_counter() - started)
+        if state.consecutive_failures:
+            state.consecutive_failures = 0
+            if self.on_recovery:
+                await self.on_recovery(state)
+        if not self.degraded:
+            self._degraded.clear()
+        return True
+
+    async def _check_http(self, session, probe):
+        timeout = aiohttp.ClientTimeout(total=probe.timeout)
+        async with session.get(probe.url, timeout=timeout, allow_redirects=False) as response:
+            if response.status > probe.max_status:
+                raise RuntimeError(f"HTTP {response.status}")
+            if probe.expect_json_status:
+                data = await response.json(content_type=None)
+                if data.get('status') != 'ok':
+                    raise RuntimeError(f"Unhealthy response: {data}")
+            else:
+                await response.read()
+
+    async def _check_websocket(self, session, probe):
+        # The handshake alone proves nginx upgrades and Node accepts;
+        # without a token the server closes straight after
+        async with session.ws_connect(probe.url, timeout=probe.timeout, autoping=False):
+            pass
+
+    async def _record_failure(self, state, error):
+        state.checks += 1
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.last_error = error
+        self._degraded.set()
+        if self.on_failure:
+            await self.on_failure(state)
+        return False
+
+    async def _probe_loop(self, session, state):
+        while True:
+            await self.check(session, state)
+            interval = state.probe.fast_interval if self.degraded else state.probe.interval
+            try:
+                # A degradation elsewhere cuts the normal wait short
+                if not self._degraded.is_set():
+                    await asyncio.wait_for(self._degraded.wait(), timeout=interval)
+                else:
+                    await asyncio.sleep(interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_every)
+            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] 📊 Latency report")
+            for state in self.states.values():
+                print(f"   {state.summary()}")
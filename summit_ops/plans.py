@@ -0,0 +1,507 @@
+"""
+EXPLAIN-plan regression checks for the SQL in server/src.
+
+Every query(...) call found by sqlsource.extract_queries() is run as
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) against a seeded local
+Postgres, inside a transaction that is always rolled back (INSERTs and
+UPDATEs included). Parameters are bound to representative values:
+PostgreSQL infers each $n's type from a PREPARE, and a parameter
+compared with (or inserted into) a column gets that column's most
+frequent value, so `cp.user_id = $1` runs for the busiest user and
+`m.chat_id = $2` for the busiest chat. An INSERT's foreign keys get an
+existing referenced value and its other unique columns fresh values;
+function arguments are matched by name (user1_id -> user_id), LIMIT
+gets 50, anything else a plain value of its type.
+A write that still fails on real data falls back to a plain EXPLAIN.
+
+Each plan is reduced to a PlanSummary (node shape, root row estimate,
+shared buffers touched, sequential scans) and compared with a stored
+baseline. Flagged:
+
+    shape        the node tree, join order or index choice changed
+    rows         the root row estimate moved by more than rows_factor
+    buffers      shared buffers grew by more than buffers_factor
+    seq scan     a sequential scan of a table with seq_scan_rows or
+                 more rows that the baseline did not have (or, without
+                 a baseline, any such scan)
+
+Usage:
+    from summit_ops.db import Database
+    from summit_ops.plans import PlanChecker, load_baselines
+
+    with Database.local() as db:
+        checker = PlanChecker(db)
+        for result in checker.check(load_baselines()):
+            print(result.status, result.key, result.flags)
+"""
+import hashlib
+import itertools
+import json
+import os
+import re
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from psycopg import errors, sql as pgsql
+
+from summit_ops.sqlsource import SERVER_SRC, extract_queries, fingerprint
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database',
+                             'plan-baselines.json')
+BASELINE_VERSION = 1
+ROWS_FACTOR = 10.0
+BUFFERS_FACTOR = 1.5
+# Buffer growth below this many 8 kB pages is noise
+MIN_BUFFER_DELTA = 100
+SEQ_SCAN_ROWS = 10_000
+STATEMENT_TIMEOUT = '60s'
+LIMIT_VALUE = 50
+PREPARED = 'summit_plan_check'
+
+OPERATOR = r'(?:=|<>|!=|<=|>=|<|>|(?:NOT\s+)?I?LIKE)'
+TABLE_REF = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|SET|LEFT|RIGHT|INNER|FULL|CROSS|JOIN|'
+    r'USING|GROUP|ORDER|LIMIT|VALUES|SELECT|RETURNING|UNION|AND|OR)\b)(\w+))?', re.I)
+INSERT_COLUMNS = re.compile(r'\bINSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\(', re.I)
+FUNCTION_CALL = re.compile(r'\b(\w+)\s*\(([^()]*\$\d+[^()]*)\)')
+LIMIT_PARAM = re.compile(r'\b(LIMIT|OFFSET)\s+\$(\d+)', re.I)
+# `$${paramIndex}`: a placeholder whose number is counted at runtime
+RUNTIME_PARAM = re.compile(r'\$\$\{[^}]*\}')
+
+
+class PlanCheckError(Exception):
+    """Raised when the baseline file cannot be used"""
+
+
+def _column_before(sql, n):
+    """(alias, column, operator) for `alias.column <op> [ANY(]$n`"""
+    match = re.search(rf'(?:(\w+)\.)?(\w+)(?:::\w+)?\s*({OPERATOR})\s*(?:ANY\s*\(\s*)?\${n}(?!\d)', sql, re.I)
+    return match.groups() if match else None
+
+
+def _column_after(sql, n):
+    """(alias, column, operator) for `$n <op> alias.column`"""
+    match = re.search(rf'\${n}(?!\d)(?:::\w+(?:\[\])?)?\s*({OPERATOR})\s*(?:(\w+)\.)?([a-z_]\w*)', sql, re.I)
+    return (match.group(2), match.group(3), match.group(1)) if match else None
+
+
+def _insert_columns(sql):
+    """{n: (table, column)} for the $n placed directly in an INSERT's VALUES list"""
+    match = INSERT_COLUMNS.search(sql)
+    if not match:
+        return {}
+    table, columns = match.group(1), [c.strip() for c in match.group(2).split(',')]
+    values, depth, i = [], 0, match.end()
+    current = ''
+    while i < len(sql):
+        c = sql[i]
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            if not depth:
+                values.append(current.strip())
+                break
+            depth -= 1
+        elif c == ',' and not depth:
+            values.append(current.strip())
+            current = ''
+            i += 1
+            continue
+        current += c
+        i += 1
+    placed = {}
+    for column, value in zip(columns, values):
+        param = re.fullmatch(r'\$(\d+)(?:::\w+)?', value)
+        if param:
+            placed[int(param.group(1))] = (table.lower(), column.lower())
+    return placed
+
+
+@dataclass
+class PlanSummary:
+    shape: str
+    estimated_rows: float
+    actual_rows: float = None
+    shared_buffers: int = None
+    execution_ms: float = None
+    planning_ms: float = None
+    seq_scans: list = field(default_factory=list)
+    analyzed: bool = True
+
+
+def _shape(node):
+    label = node['Node Type']
+    if node.get('Join Type') and ('Join' in label or label == 'Nested Loop'):
+        label += f"[{node['Join Type']}]"
+    target = node.get('Index Name') or node.get('Relation Name') or node.get('CTE Name') or node.get('Function Name')
+    if target:
+        label += f"({target})"
+    children = node.get('Plans', [])
+    return label + ('{' + ', '.join(_shape(child) for child in children) + '}' if children else '')
+
+
+def _seq_scans(node):
+    found = [node['Relation Name']] if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') else []
+    for child in node.get('Plans', []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def summarize(explain, analyzed=True):
+    """PlanSummary of an EXPLAIN (FORMAT JSON) result"""
+    top = explain[0]
+    plan = top['Plan']
+    return PlanSummary(
+        shape=_shape(plan),
+        estimated_rows=plan.get('Plan Rows'),
+        actual_rows=plan.get('Actual Rows') if analyzed else None,
+        # A node's buffer counts include its children's
+        shared_buffers=plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0) if analyzed else None,
+        execution_ms=top.get('Execution Time'),
+        planning_ms=top.get('Planning Time'),
+        seq_scans=sorted(set(_seq_scans(plan))),
+        analyzed=analyzed,
+    )
+
+
+@dataclass
+class PlanTarget:
+    key: str
+    handler: str
+    location: str
+    sql: str
+
+
+def number_placeholders(sql):
+    """SQL with each `$${...}` numbered in order after the highest literal $n
+
+    The source increments its counter once per appended placeholder, so
+    the longest form of the statement (every `+=` kept) numbers them the
+    same way. Returns None if other ${...} interpolations remain.
+    """
+    counter = itertools.count(max(map(int, re.findall(r'\$(\d+)', sql)), default=0) + 1)
+    numbered = RUNTIME_PARAM.sub(lambda match: f"${next(counter)}", sql)
+    return None if '${' in numbered else numbered
+
+
+def plan_targets(queries=None):
+    """One target per distinct statement, keyed by file, handler and fingerprint (not line numbers)
+
+    Statements built from other ${...} interpolations (column lists,
+    VALUES rows) are returned separately as skipped.
+    """
+    targets, skipped = {}, []
+    for query in extract_queries() if queries is None else queries:
+        sql = number_placeholders(query.sql) if query.dynamic else query.sql
+        if sql is None:
+            skipped.append(query)
+            continue
+        digest = hashlib.sha1(fingerprint(query.sql).encode('utf-8')).hexdigest()[:10]
+        key = f"{os.path.relpath(query.path, SERVER_SRC)} {query.handler} {digest}"
+        targets.setdefault(key, PlanTarget(key, query.handler, query.location, sql))
+    return list(targets.values()), skipped
+
+
+@dataclass
+class CheckResult:
+    target: PlanTarget
+    status: str                     # ok, new, regressed, error
+    summary: PlanSummary = None
+    baseline: dict = None
+    params: list = None
+    flags: list = field(default_factory=list)
+    error: str = None
+    note: str = None
+
+    @property
+    def key(self):
+        return self.target.key
+
+
+class PlanChecker:
+    """Runs EXPLAIN ANALYZE for the backend's statements and compares them with baselines"""
+
+    def __init__(self, db, rows_factor=ROWS_FACTOR, buffers_factor=BUFFERS_FACTOR, seq_scan_rows=SEQ_SCAN_ROWS,
+                 statement_timeout=STATEMENT_TIMEOUT):
+        self.db = db
+        self.rows_factor = rows_factor
+        self.buffers_factor = buffers_factor
+        self.seq_scan_rows = seq_scan_rows
+        self.statement_timeout = statement_timeout
+        self._samples = {}
+        self._columns = None
+        self._unique = None
+        self._table_rows = None
+        self._foreign_keys = None
+
+    # -- schema and data knowledge ------------------------------------------
+
+    @property
+    def table_rows(self):
+        if self._table_rows is None:
+            self._table_rows = {row.relname: max(0, int(row.reltuples)) for row in self.db.fetch(
+                "SELECT c.relname, c.reltuples FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')")}
+        return self._table_rows
+
+    @property
+    def columns(self):
+        """{table: {column, ...}} for the public schema"""
+        if self._columns is None:
+            self._columns = {}
+            for row in self.db.fetch("SELECT table_name, column_name FROM information_schema.columns "
+                                     "WHERE table_schema = 'public'"):
+                self._columns.setdefault(row.table_name, set()).add(row.column_name)
+        return self._columns
+
+    @property
+    def unique_columns(self):
+        """{(table, column)} covered by a unique index"""
+        if self._unique is None:
+            self._unique = {(row.relname, row.attname) for row in self.db.fetch(
+                "SELECT t.relname, a.attname FROM pg_index i "
+                "JOIN pg_class t ON t.oid = i.indrelid JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(i.indkey) "
+                "WHERE i.indisunique AND n.nspname = 'public'")}
+        return self._unique
+
+    @property
+    def foreign_keys(self):
+        """{(table, column): (referenced table, referenced column)} for single-column foreign keys"""
+        if self._foreign_keys is None:
+            self._foreign_keys = {(row.tbl, row.col): (row.ref_tbl, row.ref_col) for row in self.db.fetch(
+                "SELECT t.relname AS tbl, a.attname AS col, rt.relname AS ref_tbl, ra.attname AS ref_col "
+                "FROM pg_constraint c "
+                "JOIN pg_class t ON t.oid = c.conrelid JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+                "JOIN pg_class rt ON rt.oid = c.confrelid "
+                "JOIN pg_attribute ra ON ra.attrelid = c.confrelid AND ra.attnum = c.confkey[1] "
+                "WHERE c.contype = 'f' AND cardinality(c.conkey) = 1 AND n.nspname = 'public'")}
+        return self._foreign_keys
+
+    def function_argument(self, sql, n):
+        """(table, column) guessed from the argument name when $n is passed to a SQL function"""
+        for call in FUNCTION_CALL.finditer(sql):
+            args = [a.strip() for a in call.group(2).split(',')]
+            position = next((i for i, a in enumerate(args) if re.fullmatch(rf'\${n}(?:::\w+)?', a)), None)
+            if position is None:
+                continue
+            names = self.db.scalar("SELECT proargnames FROM pg_proc WHERE proname = %s AND proargnames IS NOT NULL "
+                                   "LIMIT 1", [call.group(1).lower()])
+            if not names or position >= len(names):
+                continue
+            # user1_id -> user_id
+            column = re.sub(r'\d+', '', names[position])
+            tables = [t for t, columns in self.columns.items() if column in columns]
+            table = max(tables, key=lambda t: self.table_rows.get(t, 0), default=None)
+            return (table, column) if table else None
+        return None
+
+    def value_for(self, table, column):
+        """A sample of table.column, else of the column it references (a NULL-only foreign key)"""
+        value = self.sample(table, column)
+        if value is None and (table, column) in self.foreign_keys:
+            value = self.sample(*self.foreign_keys[(table, column)])
+        return value
+
+    def sample(self, table, column):
+        """The most frequent non-null value of table.column (sampled on big tables), or None"""
+        if (table, column) not in self._samples:
+            rows = self.table_rows.get(table, 0)
+            sampling = pgsql.SQL('')
+            if rows > 1_000_000:
+                sampling = pgsql.SQL(' TABLESAMPLE SYSTEM ({})').format(pgsql.Literal(max(0.01, 1e8 / rows)))
+            query = pgsql.SQL("SELECT {col} FROM {table}{sampling} WHERE {col} IS NOT NULL "
+                              "GROUP BY 1 ORDER BY count(*) DESC LIMIT 1").format(
+                col=pgsql.Identifier(column), table=pgsql.Identifier(table), sampling=sampling)
+            try:
+                self._samples[(table, column)] = self.db.scalar(query)
+            except errors.Error:
+                self._samples[(table, column)] = None
+        return self._samples[(table, column)]
+
+    # -- parameters ---------------------------------------------------------
+
+    def _resolve_table(self, sql, alias, column):
+        refs = [(table.lower(), (name or table).lower()) for table, name in TABLE_REF.findall(sql)]
+        if alias:
+            for table, name in refs:
+                if name == alias.lower():
+                    return table
+        for table, _ in refs:
+            if column in self.columns.get(table, ()):
+                return table
+        return None
+
+    def parameter_types(self, conn, sql):
+        conn.execute(f"PREPARE {PREPARED} AS {sql}")
+        return conn.execute("SELECT parameter_types::text[] FROM pg_prepared_statements WHERE name = %s",
+                            [PREPARED]).fetchone()[0]
+
+    def bind(self, sql, types):
+        """A representative value for every parameter, by the column it meets or else by its type"""
+        inserted = _insert_columns(sql)
+        limits = {int(n): kind.upper() for kind, n in LIMIT_PARAM.findall(sql)}
+        values = []
+        for n, type_name in enumerate(types, 1):
+            is_array = type_name.endswith('[]')
+            base = type_name[:-2] if is_array else type_name
+            value = None
+            if n in limits:
+                value = LIMIT_VALUE if limits[n] == 'LIMIT' else 0
+            elif n in inserted:
+                table, column = inserted[n]
+                if (table, column) in self.foreign_keys:
+                    # Must exist in the referenced table; an arbitrary existing row is enough
+                    value = self.sample(*self.foreign_keys[(table, column)])
+                elif (table, column) not in self.unique_columns:
+                    value = self.value_for(table, column)
+            else:
+                found = _column_before(sql, n) or _column_after(sql, n)
+                if found:
+                    alias, column, operator = found
+                    table = self._resolve_table(sql, alias, column.lower())
+                    value = self.value_for(table, column.lower()) if table else None
+                    if value is not None and 'LIKE' in operator.upper():
+                        value = f"%{str(value)[:3]}%"
+                else:
+                    argument = self.function_argument(sql, n)
+                    value = self.value_for(*argument) if argument else None
+            if value is None:
+                value = _fallback(base)
+            values.append([value] if is_array and not isinstance(value, list) else value)
+        return values
+
+    # -- running ------------------------------------------------------------
+
+    def explain(self, target):
+        """(PlanSummary, params, note) for one statement; writes are rolled back"""
+        with self.db.pool.connection() as conn:
+            prepared = False
+            try:
+                with conn.transaction(force_rollback=True):
+                    conn.execute(f"SET LOCAL statement_timeout = '{self.statement_timeout}'")
+                    types = self.parameter_types(conn, target.sql)
+                    prepared = True
+                    params = self.bind(target.sql, types)
+                    execute = pgsql.SQL('EXECUTE {}').format(pgsql.Identifier(PREPARED))
+                    if params:
+                        execute += pgsql.SQL('({})').format(pgsql.SQL(', ').join(
+                            pgsql.SQL('{}::{}').format(pgsql.Literal(value), pgsql.SQL(type_name))
+                            for value, type_name in zip(params, types)))
+                    try:
+                        with conn.transaction():
+                            plan = conn.execute(pgsql.SQL('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ') + execute
+                                                ).fetchone()[0]
+                        return summarize(plan), params, None
+                    except (errors.IntegrityError, errors.DataError) as e:
+                        # A write the sampled values cannot satisfy: keep the estimated plan
+                        plan = conn.execute(pgsql.SQL('EXPLAIN (FORMAT JSON) ') + execute).fetchone()[0]
+                        return summarize(plan, analyzed=False), params, f"not executed: {e.diag.message_primary}"
+            finally:
+                # Prepared statements outlive the rollback
+                if prepared and not conn.closed:
+                    conn.execute(f"DEALLOCATE {PREPARED}")
+
+    def compare(self, summary, baseline):
+        flags = []
+        big_scans = [t for t in summary.seq_scans if self.table_rows.get(t, 0) >= self.seq_scan_rows]
+        accepted = set(baseline['summary']['seq_scans']) if baseline else set()
+        for table in big_scans:
+            if table not in accepted:
+                flags.append(f"seq scan on {table} ({self.table_rows[table]:,} rows)")
+        if not baseline:
+            return flags
+        old = baseline['summary']
+        if summary.shape != old['shape']:
+            flags.append("plan shape changed")
+        if old['estimated_rows'] and summary.estimated_rows:
+            ratio = summary.estimated_rows / old['estimated_rows']
+            if ratio > self.rows_factor or ratio < 1 / self.rows_factor:
+                flags.append(f"estimated rows {old['estimated_rows']:,.0f} → {summary.estimated_rows:,.0f}")
+        if old.get('shared_buffers') is not None and summary.shared_buffers is not None:
+            grown = summary.shared_buffers - old['shared_buffers']
+            if grown >= MIN_BUFFER_DELTA and summary.shared_buffers > old['shared_buffers'] * self.buffers_factor:
+                flags.append(f"shared buffers {old['shared_buffers']:,} → {summary.shared_buffers:,}")
+        return flags
+
+    def check(self, baselines=None, targets=None, on_result=None):
+        """CheckResult for every target (default: all static statements in server/src)"""
+        baselines = (baselines or {}).get('plans', {})
+        if targets is None:
+            targets, _ = plan_targets()
+        results = []
+        for target in targets:
+            baseline = baselines.get(target.key)
+            try:
+                summary, params, note = self.explain(target)
+            except errors.Error as e:
+                result = CheckResult(target, 'error', baseline=baseline, error=str(e).strip().splitlines()[0])
+            else:
+                flags = self.compare(summary, baseline)
+                status = 'regressed' if flags else ('ok' if baseline else 'new')
+                result = CheckResult(target, status, summary, baseline, params, flags, note=note)
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+    def dataset(self):
+        return {table: rows for table, rows in sorted(self.table_rows.items())}
+
+
+def _fallback(type_name):
+    if type_name == 'uuid':
+        return uuid.uuid4()
+    if type_name in ('integer', 'bigint', 'smallint', 'numeric'):
+        return 1
+    if type_name == 'boolean':
+        return True
+    if type_name.startswith('timestamp'):
+        return datetime.now(timezone.utc)
+    if type_name in ('json', 'jsonb'):
+        return '{}'
+    return f"plan-check-{uuid.uuid4().hex[:8]}"
+
+
+def load_baselines(path=BASELINE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        raise PlanCheckError(f"{path} is not valid JSON: {e}")
+    if data.get('version') != BASELINE_VERSION:
+        raise PlanCheckError(f"{path} has baseline version {data.get('version')}, expected {BASELINE_VERSION}")
+    return data
+
+
+def save_baselines(results, checker, path=BASELINE_PATH, previous=None):
+    """Write the plans of the given results over the previous baselines"""
+    plans = dict((previous or {}).get('plans', {}))
+    for result in results:
+        if result.summary is None:
+            continue
+        plans[result.key] = {
+            'handler': result.target.handler,
+            'location': result.target.location,
+            'sql': ' '.join(result.target.sql.split()),
+            'params': [str(p) for p in result.params or []],
+            'summary': asdict(result.summary),
+        }
+    data = {
+        'version': BASELINE_VERSION,
+        'meta': {
+            'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'server_version': checker.db.scalar("SHOW server_version"),
+            'dataset_rows': checker.dataset(),
+        },
+        'plans': dict(sorted(plans.items())),
+    }
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, default=str)
+    os.replace(temporary, path)
+    return data
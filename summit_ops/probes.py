@@ -0,0 +1,280 @@
+"""
+Latency probes against the Summit API over one pooled session.
+
+The old test-*.py scripts log in, make one request and print the body.
+ProbeRunner logs in once (the JWT is cached on disk until shortly
+before it expires), then sends every endpoint of a matrix N times
+concurrently over a single keep-alive aiohttp session and records
+per-endpoint latency with summit_ops.latency. A run is cheap enough to
+repeat after every deploy and its summaries can be saved as a baseline
+for the next run to compare against.
+
+Paths may use {user_id}, {email} and {chat_id}; they are filled from
+the login response and the first chat of GET /api/chats.
+
+Usage:
+    import asyncio
+    from summit_ops.probes import ProbeRunner
+
+    runner = ProbeRunner('https://summit.api.codingeverest.com', email, password)
+    result = asyncio.run(runner.run())
+"""
+import asyncio
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from summit_ops.latency import LatencyBook
+
+# Beside the scripts, where .gitignore covers it: the file holds a live JWT
+TOKEN_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.summit-probe-token.json')
+# Log in again when the cached token has less than this left
+TOKEN_MARGIN = 300
+REQUESTS_PER_ENDPOINT = 20
+CONCURRENCY = 10
+TIMEOUT = 15
+
+
+class ProbeError(Exception):
+    """Raised when the runner cannot log in or a matrix file is invalid"""
+
+
+@dataclass
+class Endpoint:
+    name: str
+    path: str
+    method: str = 'GET'
+    auth: bool = True
+    body: dict = None
+    max_status: int = 399
+
+
+DEFAULT_MATRIX = [
+    Endpoint('health', '/health', auth=False),
+    Endpoint('auth-health', '/api/auth/health', auth=False),
+    Endpoint('me', '/api/auth/me'),
+    Endpoint('chats', '/api/chats'),
+    Endpoint('chat', '/api/chats/{chat_id}'),
+    Endpoint('messages', '/api/messages/{chat_id}'),
+    Endpoint('contacts', '/api/chat-requests/contacts'),
+    Endpoint('requests-received', '/api/chat-requests/received'),
+    Endpoint('meetings', '/api/meetings'),
+    Endpoint('invitations', '/api/meetings/invitations'),
+    Endpoint('presence', '/api/presence/{user_id}'),
+    Endpoint('subscription', '/api/subscriptions/status'),
+    Endpoint('user-search', '/api/users/search?email={email}'),
+    Endpoint('profile', '/api/users/{user_id}/profile'),
+]
+
+
+def load_matrix(path):
+    """Endpoints from a JSON list of {"name", "path", ...} objects"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [Endpoint(**entry) for entry in json.load(f)]
+    except (OSError, ValueError, TypeError) as e:
+        raise ProbeError(f"Invalid endpoint matrix {path}: {e}")
+
+
+def token_expiry(token):
+    """The exp claim of a JWT (epoch seconds), or None if it has none"""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return claims.get('exp')
+    except (IndexError, ValueError):
+        return None
+
+
+class TokenCache:
+    """JWTs by base URL and email, kept in a local file until they expire"""
+
+    def __init__(self, path=TOKEN_CACHE):
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, base_url, email):
+        entry = self._load().get(f"{base_url} {email}")
+        if entry and (entry.get('expires') or 0) - TOKEN_MARGIN > time.time():
+            return entry
+        return None
+
+    def put(self, base_url, email, token, user):
+        entries = {key: entry for key, entry in self._load().items() if (entry.get('expires') or 0) > time.time()}
+        entry = {'token': token, 'user': user, 'expires': token_expiry(token)}
+        entries[f"{base_url} {email}"] = entry
+        # The token is a credential; keep the file private to this user
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        return entry
+
+    def drop(self, base_url, email):
+        entries = self._load()
+        if entries.pop(f"{base_url} {email}", None) is not None:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+
+
+@dataclass
+class ProbeResult:
+    base_url: str
+    requests_per_endpoint: int
+    concurrency: int
+    elapsed: float
+    book: LatencyBook
+    skipped: dict = field(default_factory=dict)
+    token_cached: bool = False
+
+    @property
+    def summaries(self):
+        return self.book.summaries(self.elapsed)
+
+    def to_json(self):
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'base_url': self.base_url,
+            'requests_per_endpoint': self.requests_per_endpoint,
+            'concurrency': self.concurrency,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'skipped': self.skipped,
+            'summaries': self.summaries,
+            'histograms': {name: stats.histogram() for name, stats in sorted(self.book.items())},
+        }
+
+
+class ProbeRunner:
+    """Sends an endpoint matrix N times each, concurrently, over one session"""
+
+    def __init__(self, base_url, email=None, password=None, matrix=None, requests_per_endpoint=REQUESTS_PER_ENDPOINT,
+                 concurrency=CONCURRENCY, token_cache=None, warmup=True):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.password = password
+        self.matrix = DEFAULT_MATRIX if matrix is None else matrix
+        self.requests_per_endpoint = requests_per_endpoint
+        self.concurrency = concurrency
+        # token_cache=False disables caching altogether
+        self.token_cache = TokenCache() if token_cache is None else token_cache
+        self.warmup = warmup
+        self.token = None
+        self.user = {}
+        self.token_cached = False
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.session = session
+            endpoints = self.matrix
+            if any(endpoint.auth for endpoint in endpoints):
+                await self.login()
+            values = await self._placeholders(endpoints)
+            prepared, skipped = self._resolve(endpoints, values)
+
+            if self.warmup:
+                # One untimed request per endpoint opens the pooled connections
+                # and warms server-side caches so the first samples are not outliers
+                await asyncio.gather(*(self._send(endpoint, path) for endpoint, path in prepared))
+
+            book = LatencyBook()
+            limit = asyncio.Semaphore(self.concurrency)
+
+            async def probe(endpoint, path):
+                async with limit:
+                    await self._send(endpoint, path, book[endpoint.name])
+
+            started = time.monotonic()
+            await asyncio.gather(*(probe(endpoint, path) for endpoint, path in prepared
+                                   for _ in range(self.requests_per_endpoint)))
+            elapsed = time.monotonic() - started
+
+        return ProbeResult(self.base_url, self.requests_per_endpoint, self.concurrency, elapsed, book,
+                           skipped, self.token_cached)
+
+    async def login(self):
+        cached = self.token_cache.get(self.base_url, self.email) if self.token_cache else None
+        if cached and await self._token_valid(cached['token']):
+            self.token, self.user, self.token_cached = cached['token'], cached['user'], True
+            return
+        if not self.email or not self.password:
+            raise ProbeError("Authenticated endpoints need an email and password (no cached token)")
+
+        async with self.session.post(f"{self.base_url}/api/auth/login",
+                                     json={'email': self.email, 'password': self.password}) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200 or 'token' not in data:
+                raise ProbeError(f"Login failed: HTTP {response.status} {data.get('error', '')}".rstrip())
+        self.token, self.user = data['token'], data.get('user') or {}
+        if self.token_cache:
+            self.token_cache.put(self.base_url, self.email, self.token, self.user)
+
+    async def _token_valid(self, token):
+        # A cached token survives until exp, but not a JWT_SECRET rotation
+        async with self.session.get(f"{self.base_url}/api/auth/me",
+                                    headers={'Authorization': f"Bearer {token}"}) as response:
+            await response.read()
+            if response.status == 401 or response.status == 403:
+                self.token_cache.drop(self.base_url, self.email)
+                return False
+            return True
+
+    @property
+    def headers(self):
+        return {'Authorization': f"Bearer {self.token}"}
+
+    async def _placeholders(self, endpoints):
+        values = {'user_id': self.user.get('id'), 'email': self.user.get('email') or self.email}
+        if any('{chat_id}' in endpoint.path for endpoint in endpoints) and self.token:
+            async with self.session.get(f"{self.base_url}/api/chats", headers=self.headers) as response:
+                chats = await response.json(content_type=None) if response.status == 200 else []
+            values['chat_id'] = chats[0]['id'] if isinstance(chats, list) and chats else None
+        return values
+
+    def _resolve(self, endpoints, values):
+        prepared, skipped = [], {}
+        for endpoint in endpoints:
+            if endpoint.auth and not self.token:
+                skipped[endpoint.name] = "no token"
+                continue
+            try:
+                path = endpoint.path.format(**{key: value or '' for key, value in values.items()})
+            except KeyError as e:
+                skipped[endpoint.name] = f"unknown placeholder {e}"
+                continue
+            missing = [key for key, value in values.items() if not value and f"{{{key}}}" in endpoint.path]
+            if missing:
+                skipped[endpoint.name] = f"no {', '.join(missing)} for this account"
+                continue
+            prepared.append((endpoint, path))
+        return prepared, skipped
+
+    async def _send(self, endpoint, path, stats=None):
+        """One request; recorded in stats unless it is a warm-up"""
+        headers = self.headers if endpoint.auth else None
+        started = time.perf_counter()
+        try:
+            async with self.session.request(endpoint.method, f"{self.base_url}{path}", headers=headers,
+                                            json=endpoint.body, allow_redirects=False) as response:
+                await response.read()
+                status = response.status
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            if stats is not None:
+                stats.error('timeout' if isinstance(e, asyncio.TimeoutError) else type(e).__name__)
+            return
+        if stats is None:
+            return
+        if status > endpoint.max_status:
+            stats.error(f"HTTP {status}")
+        else:
+            stats.record(time.perf_counter() - started)
@@ -0,0 +1,211 @@
+"""
+Tiered retention for the summit-backup-* AMIs and their snapshots.
+
+A policy keeps the newest `keep_last` backups, then the newest backup of
+each of the last `hourly` hours, `daily` days and `weekly` ISO weeks
+(grandfather-father-son). Everything else is swept:
+
+    - images are listed through the describe_images paginator, so every
+      backup is seen no matter how many there are
+    - deletions run concurrently on a bounded thread pool
+    - EC2 throttling (RequestLimitExceeded) is retried with exponential
+      backoff and jitter
+    - a snapshot that is still InUse right after its AMI was deregistered
+      is retried until the deregistration has propagated
+
+Any other list of Backups (such as incremental snapshot sets) can be
+swept the same way by passing a `source` callable.
+
+The EC2 client is injectable, so sweeps run unchanged against moto.
+
+Usage:
+    from summit_ops.retention import RetentionPolicy, RetentionSweeper
+
+    report = RetentionSweeper().sweep(RetentionPolicy(keep_last=3, daily=7))
+    print(report.describe())
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from summit_ops.ssm import REGION, backoff_delays
+
+NAME_PATTERN = 'summit-backup-*'
+MAX_WORKERS = 8
+# How long one delete keeps retrying throttling and dependency errors
+RETRY_WINDOW = 300
+
+THROTTLING_ERRORS = {'RequestLimitExceeded', 'Throttling', 'ThrottlingException', 'InternalError'}
+# The snapshot still backs an AMI whose deregistration has not propagated yet
+DEPENDENCY_ERRORS = {'InvalidSnapshot.InUse'}
+# Already gone: a previous or concurrent sweep got there first
+GONE_ERRORS = {'InvalidAMIID.NotFound', 'InvalidAMIID.Unavailable', 'InvalidSnapshot.NotFound'}
+
+# Bucket key of each tier, newest backup per bucket is kept
+TIERS = (
+    ('hourly', '%Y-%m-%dT%H'),
+    ('daily', '%Y-%m-%d'),
+    ('weekly', '%G-W%V'),
+)
+
+
+@dataclass
+class RetentionPolicy:
+    keep_last: int = 3
+    hourly: int = 6
+    daily: int = 7
+    weekly: int = 4
+    # Never touch backups younger than this (they may still be pending)
+    min_age: timedelta = timedelta(hours=1)
+
+
+@dataclass
+class Backup:
+    id: str
+    name: str
+    created: datetime
+    snapshot_ids: list = field(default_factory=list)
+    image_id: str = None
+    state: str = 'available'
+
+
+@dataclass
+class RetentionPlan:
+    keep: dict
+    delete: list
+
+    def describe(self):
+        lines = []
+        for backup, reasons in sorted(self.keep.values(), key=lambda item: item[0].created, reverse=True):
+            lines.append(f"keep    {backup.name:<40} {backup.created:%Y-%m-%d %H:%M}  ({', '.join(reasons)})")
+        for backup in self.delete:
+            lines.append(f"delete  {backup.name:<40} {backup.created:%Y-%m-%d %H:%M}")
+        return '\n'.join(lines)
+
+
+@dataclass
+class SweepReport:
+    plan: RetentionPlan
+    deleted: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def describe(self):
+        summary = f"{len(self.plan.keep)} kept, {len(self.deleted)} deleted, {len(self.failed)} failed in {self.seconds:.1f}s"
+        details = [f"  {backup_id}: {error}" for backup_id, error in self.failed.items()]
+        return '\n'.join([summary] + details)
+
+
+def select(backups, policy, now=None):
+    """Split backups into kept (with the reasons) and deletable"""
+    now = now or datetime.now(timezone.utc)
+    ordered = sorted(backups, key=lambda b: b.created, reverse=True)
+    keep = {}
+
+    def mark(backup, reason):
+        keep.setdefault(backup.id, (backup, []))[1].append(reason)
+
+    for backup in ordered:
+        if backup.state != 'available':
+            mark(backup, backup.state)
+        elif now - backup.created < policy.min_age:
+            mark(backup, 'recent')
+    for backup in ordered[:policy.keep_last]:
+        mark(backup, 'last')
+    for tier, bucket_format in TIERS:
+        limit = getattr(policy, tier)
+        buckets = set()
+        for backup in ordered:
+            if len(buckets) >= limit:
+                break
+            bucket = backup.created.strftime(bucket_format)
+            if bucket not in buckets:
+                buckets.add(bucket)
+                mark(backup, tier)
+
+    return RetentionPlan(keep, [b for b in ordered if b.id not in keep])
+
+
+class RetentionSweeper:
+    """Applies a RetentionPolicy to the backup AMIs of an account"""
+
+    def __init__(self, ec2=None, region=REGION, max_workers=MAX_WORKERS, name_pattern=NAME_PATTERN, source=None):
+        self.ec2 = ec2 or boto3.client('ec2', region_name=region,
+                                       config=Config(retries={'mode': 'adaptive', 'max_attempts': 5}))
+        self.max_workers = max_workers
+        self.name_pattern = name_pattern
+        # Callable returning Backups to sweep instead of the AMIs (e.g. snapshot sets)
+        self.source = source
+
+    def list_backups(self):
+        if self.source:
+            return self.source()
+        backups = []
+        paginator = self.ec2.get_paginator('describe_images')
+        pages = paginator.paginate(Owners=['self'], Filters=[{'Name': 'name', 'Values': [self.name_pattern]}])
+        for page in pages:
+            for image in page['Images']:
+                backups.append(Backup(
+                    id=image['ImageId'],
+                    name=image.get('Name', image['ImageId']),
+                    created=datetime.fromisoformat(image['CreationDate'].replace('Z', '+00:00')),
+                    snapshot_ids=[m['Ebs']['SnapshotId'] for m in image.get('BlockDeviceMappings', [])
+                                  if 'SnapshotId' in m.get('Ebs', {})],
+                    image_id=image['ImageId'],
+                    state=image.get('State', 'available'),
+                ))
+        return backups
+
+    def plan(self, policy, now=None):
+        return select(self.list_backups(), policy, now)
+
+    def sweep(self, policy, dry_run=False, now=None, on_progress=None):
+        """Delete everything the policy does not keep; returns a SweepReport"""
+        started = time.monotonic()
+        report = SweepReport(self.plan(policy, now))
+        if dry_run or not report.plan.delete:
+            report.seconds = time.monotonic() - started
+            return report
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.delete_backup, backup): backup for backup in report.plan.delete}
+            for future in as_completed(futures):
+                backup = futures[future]
+                try:
+                    future.result()
+                    report.deleted.append(backup.id)
+                    if on_progress:
+                        on_progress(f"deleted {backup.name} ({backup.id}, {len(backup.snapshot_ids)} snapshot(s))")
+                except ClientError as e:
+                    report.failed[backup.id] = str(e)
+                    if on_progress:
+                        on_progress(f"failed {backup.name} ({backup.id}): {e}")
+        report.seconds = time.monotonic() - started
+        return report
+
+    def delete_backup(self, backup):
+        """Deregister the AMI (if any), then delete its snapshots"""
+        if backup.image_id:
+            self._call(self.ec2.deregister_image, ImageId=backup.image_id)
+        for snapshot_id in backup.snapshot_ids:
+            self._call(self.ec2.delete_snapshot, retry_on=DEPENDENCY_ERRORS, SnapshotId=snapshot_id)
+
+    def _call(self, operation, retry_on=(), **kwargs):
+        delays = backoff_delays(initial=0.5, maximum=20.0)
+        deadline = time.monotonic() + RETRY_WINDOW
+        while True:
+            try:
+                return operation(**kwargs)
+            except ClientError as e:
+                code = e.response['Error']['Code']
+                if code in GONE_ERRORS:
+                    return None
+                if (code in THROTTLING_ERRORS or code in retry_on) and time.monotonic() < deadline:
+                    time.sleep(next(delays))
+                    continue
+                raise
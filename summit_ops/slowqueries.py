@@ -0,0 +1,351 @@
+"""
+Slow-query and database-error aggregation from the backend logs.
+
+query() in server/src/lib/db.ts logs
+
+    Slow query detected: { text: '<first 100 chars>', duration: 1534 }
+
+(split over several lines by Node once the text is long) for every
+query slower than a second, and `Database query error:` followed by the
+pg error, its stack and its fields for every failure. This module
+streams PM2 logs (plain, rotated or gzipped), turns each slow query into
+a fingerprint (see sqlsource.fingerprint) and aggregates count, total
+time and percentiles per fingerprint, overall and per time window.
+Fingerprints are matched back to the query() call in server/src that
+issues them, so the ranking reads as "which handler to fix first".
+Errors are grouped by SQLSTATE, message and the route file in their
+stack trace.
+
+Usage:
+    from summit_ops.slowqueries import SlowQueryReport, iter_log_lines
+
+    report = SlowQueryReport(window=3600)
+    report.add_lines(iter_log_lines(['pm2-out.log', 'pm2-out__2025-01-30_00-00-00.log.gz']))
+    report.attach_sources()
+    for stats in report.ranked()[:10]:
+        print(stats.total_ms, stats.handlers, stats.fingerprint)
+"""
+import glob
+import gzip
+import os
+import re
+import shlex
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from summit_ops.latency import LatencyStats
+from summit_ops.logindex import PM2_PREFIX, PM2_TIME
+from summit_ops.sqlsource import SourceIndex, fingerprint
+
+SLOW_MARKER = 'Slow query detected:'
+ERROR_MARKER = 'Database query error:'
+# db.ts logs text.substring(0, 100)
+LOGGED_SQL_CHARS = 100
+# Node prints the error stack and fields on the lines after the marker
+CONTEXT_LINES = 30
+
+JS_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`(?:[^`\\]|\\.)*`")
+JS_ESCAPE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)', re.S)
+JS_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+DURATION = re.compile(r'\bduration:\s*(\d+)')
+ERROR_CODE = re.compile(r"^\s*code:\s*'([^']*)'")
+STACK_FRAME = re.compile(r'^\s+at\s')
+# dist/routes/chats.js or src/routes/chats.ts in a stack frame (not node_modules/pg/lib)
+SOURCE_FRAME = re.compile(r'/(?:dist|src)/(routes|lib)/(\w+)\.[jt]s:\d+')
+VOLATILE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\b\d+\b')
+
+
+def _unescape(literal):
+    """Value of a JS string literal as util.inspect prints it"""
+    def replace(match):
+        escape = match.group(1)
+        if escape.startswith('u{'):
+            return chr(int(escape[2:-1], 16))
+        if escape[0] in 'ux' and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return JS_ESCAPES.get(escape, escape)
+    return JS_ESCAPE.sub(replace, literal[1:-1])
+
+
+def _timestamp(text):
+    match = PM2_TIME.match(text)
+    if not match:
+        return None, text
+    ts = datetime.fromisoformat(match.group(1).replace('Z', '+00:00'))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts, text[match.end():]
+
+
+@dataclass
+class SlowQuery:
+    ts: datetime
+    sql: str
+    duration_ms: int
+
+    @property
+    def truncated(self):
+        return len(self.sql) >= LOGGED_SQL_CHARS
+
+
+@dataclass
+class QueryFailure:
+    ts: datetime
+    message: str
+    code: str = None
+    origin: str = None
+
+
+def parse_events(lines):
+    """SlowQuery and QueryFailure records from raw log lines, in order"""
+    record, ts = None, None
+    for raw in lines:
+        line_ts, text = _timestamp(PM2_PREFIX.sub('', raw.rstrip('\r\n')))
+        starts = SLOW_MARKER in text or ERROR_MARKER in text
+        if record is not None and (starts or _record_done(record, text)):
+            event = _finish(record, ts)
+            if event:
+                yield event
+            record = None
+            if text.strip() == '}':
+                continue
+        if starts:
+            record, ts = [text], line_ts
+            if SLOW_MARKER in text and text.rstrip().endswith('}'):
+                event = _finish(record, ts)
+                if event:
+                    yield event
+                record = None
+        elif record is not None:
+            record.append(text)
+    if record is not None:
+        event = _finish(record, ts)
+        if event:
+            yield event
+
+
+def _record_done(record, text):
+    """True once a line can no longer belong to the record being collected"""
+    stripped = text.strip()
+    if stripped == '}' or stripped == '--':
+        return True
+    # Continuation lines are indented: object fields, string pieces, stack frames
+    return bool(stripped) and not text[:1].isspace()
+
+
+def _finish(record, ts):
+    first = record[0]
+    if SLOW_MARKER in first:
+        body = '\n'.join(record)
+        duration = DURATION.search(body)
+        if not duration or 'text:' not in body:
+            return None
+        pieces = body[body.index('text:') + len('text:'):duration.start()]
+        sql = ''.join(_unescape(piece) for piece in JS_STRING.findall(pieces))
+        return SlowQuery(ts, sql, int(duration.group(1)))
+
+    message = first.split(ERROR_MARKER, 1)[1].strip()
+    failure = QueryFailure(ts, message or '(no message)')
+    for text in record[1:]:
+        code = ERROR_CODE.match(text)
+        if code:
+            failure.code = code.group(1)
+        elif failure.origin is None and STACK_FRAME.match(text):
+            frame = SOURCE_FRAME.search(text)
+            if frame and frame.group(2) != 'db':
+                failure.origin = f"server/src/{frame.group(1)}/{frame.group(2)}.ts"
+    return failure
+
+
+@dataclass
+class FingerprintStats:
+    fingerprint: str
+    truncated: bool
+    sample: str
+    stats: LatencyStats = None
+    first_seen: datetime = None
+    last_seen: datetime = None
+    windows: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0]))
+    sources: list = field(default_factory=list)
+
+    @property
+    def count(self):
+        return self.stats.count
+
+    @property
+    def total_ms(self):
+        return sum(self.stats.samples) * 1000
+
+    @property
+    def handlers(self):
+        return sorted({source.handler for source in self.sources})
+
+    def summary(self):
+        summary = self.stats.summary()
+        summary.update({
+            'name': self.fingerprint,
+            'total_ms': round(self.total_ms),
+            'truncated': self.truncated,
+            'sample': self.sample,
+            'first_seen': self.first_seen.isoformat() if self.first_seen else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+            'handlers': self.handlers,
+            'sources': [source.location for source in self.sources],
+            'windows': {start.isoformat(): {'count': n, 'total_ms': total} for start, (n, total) in sorted(self.windows.items())},
+        })
+        return summary
+
+
+@dataclass
+class FailureStats:
+    code: str
+    message: str
+    origin: str
+    count: int = 0
+    first_seen: datetime = None
+    last_seen: datetime = None
+
+
+RANKINGS = {
+    'total': lambda s: s.total_ms,
+    'count': lambda s: s.count,
+    'p95': lambda s: s.stats.percentile(95) or 0,
+    'max': lambda s: max(s.stats.samples, default=0),
+}
+
+
+class SlowQueryReport:
+    """Slow queries by fingerprint and failures by cause, optionally limited to [since, until)"""
+
+    def __init__(self, window=3600, since=None, until=None):
+        self.window = window
+        self.since = since
+        self.until = until
+        self.queries = {}
+        self.failures = {}
+        self.undated = 0
+
+    def add_lines(self, lines):
+        for event in parse_events(lines):
+            self.add(event)
+        return self
+
+    def add(self, event):
+        if event.ts is None:
+            self.undated += 1
+        elif (self.since and event.ts < self.since) or (self.until and event.ts >= self.until):
+            return
+        if isinstance(event, SlowQuery):
+            self._add_query(event)
+        else:
+            self._add_failure(event)
+
+    def _add_query(self, event):
+        print_ = fingerprint(event.sql, truncated=event.truncated)
+        stats = self.queries.get(print_)
+        if stats is None:
+            stats = self.queries[print_] = FingerprintStats(print_, event.truncated, event.sql.strip(),
+                                                            LatencyStats(print_))
+        stats.stats.record(event.duration_ms / 1000)
+        if event.ts:
+            stats.first_seen = min(filter(None, (stats.first_seen, event.ts)))
+            stats.last_seen = max(filter(None, (stats.last_seen, event.ts)))
+            bucket = stats.windows[self.window_start(event.ts)]
+            bucket[0] += 1
+            bucket[1] += event.duration_ms
+
+    def _add_failure(self, event):
+        message = VOLATILE.sub('?', event.message)
+        key = (event.code, message, event.origin)
+        stats = self.failures.get(key)
+        if stats is None:
+            stats = self.failures[key] = FailureStats(event.code, message, event.origin)
+        stats.count += 1
+        if event.ts:
+            stats.first_seen = min(filter(None, (stats.first_seen, event.ts)))
+            stats.last_seen = max(filter(None, (stats.last_seen, event.ts)))
+
+    def window_start(self, ts):
+        epoch = int(ts.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % self.window, timezone.utc)
+
+    def attach_sources(self, index=None):
+        """Point every fingerprint at the query() calls in server/src that can produce it"""
+        index = index or SourceIndex()
+        for stats in self.queries.values():
+            stats.sources = index.lookup(stats.fingerprint, stats.truncated)
+        return self
+
+    def ranked(self, by='total'):
+        return sorted(self.queries.values(), key=RANKINGS[by], reverse=True)
+
+    def handler_totals(self):
+        """[(handler, total_ms, count)] with each fingerprint charged to its handlers, split evenly"""
+        totals = defaultdict(lambda: [0.0, 0])
+        for stats in self.queries.values():
+            handlers = stats.handlers or ['(unmatched)']
+            for handler in handlers:
+                totals[handler][0] += stats.total_ms / len(handlers)
+                totals[handler][1] += stats.count
+        return sorted(((h, total, n) for h, (total, n) in totals.items()), key=lambda row: row[1], reverse=True)
+
+    def windows(self):
+        """[(window start, count, total_ms)] over all fingerprints"""
+        merged = defaultdict(lambda: [0, 0])
+        for stats in self.queries.values():
+            for start, (n, total) in stats.windows.items():
+                merged[start][0] += n
+                merged[start][1] += total
+        return [(start, n, total) for start, (n, total) in sorted(merged.items())]
+
+    def to_json(self, by='total'):
+        return {
+            'window_seconds': self.window,
+            'undated_events': self.undated,
+            'queries': [stats.summary() for stats in self.ranked(by)],
+            'failures': [
+                {'code': f.code, 'message': f.message, 'origin': f.origin, 'count': f.count,
+                 'first_seen': f.first_seen.isoformat() if f.first_seen else None,
+                 'last_seen': f.last_seen.isoformat() if f.last_seen else None}
+                for f in sorted(self.failures.values(), key=lambda f: f.count, reverse=True)
+            ],
+        }
+
+
+def expand_paths(patterns):
+    """Log files matching the given paths/globs, oldest first so rotated files stream in order"""
+    paths = {path for pattern in patterns for path in (glob.glob(pattern) or [pattern])}
+    return sorted(paths, key=lambda path: (os.path.getmtime(path) if os.path.exists(path) else 0, path))
+
+
+def iter_log_lines(patterns):
+    for path in expand_paths(patterns):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            yield from f
+
+
+def rotated_patterns(paths):
+    """Shell globs matching each log file and its rotated siblings (pm2-out.log -> pm2-out*.log*)"""
+    patterns = []
+    for path in paths:
+        directory, name = os.path.split(path)
+        stem, ext = os.path.splitext(name)
+        patterns.append(f"{shlex.quote(directory or '.')}/{shlex.quote(stem)}*{shlex.quote(ext)}*")
+    return patterns
+
+
+def remote_log_command(paths):
+    """Shell command printing just the slow-query and error records of the given logs and their rotations
+
+    Fails (exit 1) when none of the files exist, so a wrong log location is
+    not mistaken for a quiet database.
+    """
+    return (
+        f"files=$(ls -1tr -d {' '.join(rotated_patterns(paths))} 2>/dev/null || true)\n"
+        "if [ -z \"$files\" ]; then"
+        f" echo {shlex.quote('No log files match ' + ', '.join(paths))} >&2; exit 1; fi\n"
+        "printf '%s\\n' \"$files\" | while read -r f; do zcat -f \"$f\"; done"
+        f" | grep -E -A{CONTEXT_LINES} --no-group-separator '{SLOW_MARKER}|{ERROR_MARKER}' || true"
+    )
@@ -0,0 +1,219 @@
+"""
+SQL issued by the backend, found in its TypeScript source.
+
+extract_queries() scans server/src for query(...) calls whose first
+argument is a string or template literal, or a variable assigned one
+in the same file (every branch of a ternary, plus any `+=` appends),
+and records the file, line, the Express handler it sits in (with the
+/api prefix from index.ts) and the SQL text. fingerprint() normalizes SQL so the same statement
+compares equal however it was formatted and whatever values it ran
+with: literals, numbers, $n parameters and ${...} interpolations all
+become ?, lists of them (and multi-row VALUES) collapse to one, and
+whitespace and case are folded.
+
+Usage:
+    from summit_ops.sqlsource import extract_queries, fingerprint
+
+    for q in extract_queries():
+        print(q.location, q.handler, fingerprint(q.sql))
+"""
+import os
+import re
+from dataclasses import dataclass
+
+SERVER_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server', 'src')
+
+QUERY_CALL = re.compile(r'(?<![\w.])query\(\s*')
+ROUTE = re.compile(r'\brouter\.(get|post|put|patch|delete)\(\s*["\'`]([^"\'`]*)["\'`]')
+FUNCTION = re.compile(r'\b(?:async\s+)?function\s+(\w+)\s*\(|\b(?:const|let)\s+(\w+)\s*=\s*async\b')
+ROUTE_IMPORT = re.compile(r'import\s+(\w+)\s+from\s+["\']\./routes/(\w+)\.js["\']')
+ROUTE_MOUNT = re.compile(r'app\.use\(\s*["\']([^"\']+)["\']\s*,\s*(\w+)\s*\)')
+IDENTIFIER = re.compile(r'([A-Za-z_]\w*)\s*[,)]')
+
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+# A literal cut off by truncation has no closing quote
+_STRING = re.compile(r"[eE]?'(?:[^']|'')*(?:'|$)")
+# `$${i}` builds a $n placeholder at runtime
+_INTERPOLATION = re.compile(r'\$?\$\{[^}]*\}?')
+_PARAM = re.compile(r'\$\d+')
+_NUMBER = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?(?![\w])')
+_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+_ARRAY = re.compile(r'array\[\s*\?\s*\]')
+# Multi-row VALUES, and `VALUES ${rows}` built from them in the source
+_TUPLES = re.compile(r'\(\?\)(?:,\(\?\))+')
+_VALUES = re.compile(r'\bvalues \?')
+_SPACE = re.compile(r'\s+')
+_PARTIAL_TOKEN = re.compile(r'[\w.$:]+$')
+_PUNCT_SPACE = re.compile(r'\s*([(),=<>!+\-*/;])\s*')
+
+
+@dataclass
+class SourceQuery:
+    path: str
+    line: int
+    handler: str
+    sql: str
+
+    @property
+    def location(self):
+        return f"{os.path.relpath(self.path, os.path.dirname(os.path.dirname(SERVER_SRC)))}:{self.line}"
+
+    @property
+    def dynamic(self):
+        """True if the SQL text is assembled with ${...} at runtime"""
+        return '${' in self.sql
+
+
+def fingerprint(sql, truncated=False):
+    """SQL with values, parameters and formatting normalized away
+
+    A truncated statement (the backend logs only the first 100
+    characters) loses its last, possibly partial, token.
+    """
+    text = _COMMENT.sub(' ', sql)
+    text = _INTERPOLATION.sub('?', text)
+    text = _STRING.sub('?', text)
+    text = _PARAM.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _SPACE.sub(' ', text).strip().lower()
+    text = _PUNCT_SPACE.sub(r'\1', text)
+    text = _LIST.sub('?', text)
+    text = _ARRAY.sub('array[?]', text)
+    text = _TUPLES.sub('(?)', text)
+    text = _VALUES.sub('values(?)', text)
+    if truncated:
+        text = _PARTIAL_TOKEN.sub('', text).rstrip()
+    return text.rstrip(';')
+
+
+def route_prefixes(src_dir=SERVER_SRC):
+    """{'chats': '/api/chats', ...} from the app.use() mounts in index.ts"""
+    try:
+        with open(os.path.join(src_dir, 'index.ts'), encoding='utf-8') as f:
+            index = f.read()
+    except OSError:
+        return {}
+    modules = {name: module for name, module in ROUTE_IMPORT.findall(index)}
+    return {modules[name]: prefix for prefix, name in ROUTE_MOUNT.findall(index) if name in modules}
+
+
+def _literal(text, start):
+    """(content, end) of the string or template literal at text[start], or None"""
+    quote = text[start] if start < len(text) else ''
+    if quote not in ('`', '"', "'"):
+        return None
+    i, depth = start + 1, 0
+    while i < len(text):
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if quote == '`' and text.startswith('${', i):
+            depth += 1
+            i += 2
+            continue
+        if depth and c == '}':
+            depth -= 1
+        elif not depth and c == quote:
+            return text[start + 1:i], i + 1
+        i += 1
+    return None
+
+
+def _expression(text, start):
+    """String variants of the expression at text[start] up to its ';'
+
+    `a ? L1 : L2` yields both literals as alternatives; anything else
+    (`L1 + L2`, a single literal) is concatenated into one.
+    """
+    literals, ternary, depth, i = [], False, 0, start
+    while i < len(text):
+        c = text[i]
+        literal = _literal(text, i)
+        if literal:
+            literals.append(literal[0])
+            i = literal[1]
+            continue
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+        elif not depth and c == ';':
+            break
+        elif not depth and c == '?' and text[i + 1:i + 2] not in ('.', '?') and text[i - 1] != '?':
+            ternary = True
+        i += 1
+    if not literals:
+        return []
+    return literals if ternary else [''.join(literals)]
+
+
+def _variable_sql(text, name, position):
+    """SQL variants a variable holds at a query(name, ...) call"""
+    declarations = list(re.finditer(rf'\b(?:const|let|var)\s+{name}\s*(?::[^=;]+)?=\s*', text[:position]))
+    if not declarations:
+        return []
+    declaration = declarations[-1]
+    variants = _expression(text, declaration.end())
+    # Conditional `+=` appends are all kept: the longest form of the statement
+    for append in re.finditer(rf'\b{name}\s*\+=\s*', text[declaration.end():position]):
+        suffix = ''.join(_expression(text, declaration.end() + append.end()))
+        variants = [variant + suffix for variant in variants]
+    return variants
+
+
+def _handler(text, position, prefix):
+    """The route (or, outside one, the function) a query call sits in"""
+    last = None
+    for pattern in (ROUTE, FUNCTION):
+        for match in pattern.finditer(text, 0, position):
+            if last is None or match.start() > last.start():
+                last = match
+    if last is None:
+        return '(module)'
+    if last.re is ROUTE:
+        method, path = last.groups()
+        return f"{method.upper()} {(prefix + path).rstrip('/') or '/'}"
+    return f"{last.group(1) or last.group(2)}()"
+
+
+def extract_queries(src_dir=SERVER_SRC, subdirs=('routes', 'lib')):
+    """Every query(<literal or variable>, ...) call under the given source subdirectories"""
+    prefixes = route_prefixes(src_dir)
+    found = []
+    for subdir in subdirs:
+        directory = os.path.join(src_dir, subdir)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.ts'):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            prefix = prefixes.get(name[:-3], '') if subdir == 'routes' else ''
+            for call in QUERY_CALL.finditer(text):
+                literal = _literal(text, call.end())
+                if literal:
+                    variants = [literal[0]]
+                else:
+                    identifier = IDENTIFIER.match(text, call.end())
+                    variants = _variable_sql(text, identifier.group(1), call.start()) if identifier else []
+                line = text.count('\n', 0, call.start()) + 1
+                handler = _handler(text, call.start(), prefix)
+                found.extend(SourceQuery(path, line, handler, sql) for sql in variants)
+    return found
+
+
+class SourceIndex:
+    """Looks up the source queries a (possibly truncated) fingerprint belongs to"""
+
+    def __init__(self, queries=None):
+        self.queries = extract_queries() if queries is None else queries
+        self.fingerprints = [(fingerprint(q.sql), q) for q in self.queries]
+
+    def lookup(self, print_, truncated=False):
+        exact = [q for fp, q in self.fingerprints if fp == print_]
+        if exact or not truncated:
+            return exact
+        return [q for fp, q in self.fingerprints if fp.startswith(print_)]
@@ -0,0 +1,319 @@
+"""
+SSM command runner with adaptive completion polling.
+
+Replaces the copy-pasted run_command() helpers that did send_command,
+slept a fixed 2-12 seconds and then read the invocation once. Here the
+invocation is polled with exponential backoff and jitter until it
+reaches a terminal state, so a call costs about as long as the remote
+command actually takes.
+
+get_command_invocation only returns the first ~24 KB of output. For
+commands that print more, run_large() fetches the complete stdout and
+stderr: from S3 when an output bucket is configured (SSM writes the
+full streams there), otherwise by spooling them to a gzipped file on
+the host and paging it back in chunks. Either way the data is
+decompressed and decoded on the fly.
+
+Usage:
+    from summit_ops.ssm import run_command
+
+    result = run_command("pm2 status summit")
+    print(result.stdout)
+
+    dump = get_runner().run_large("cat /var/www/summit/dist/index.js")
+"""
+import base64
+import codecs
+import os
+import random
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import boto3
+from botocore.exceptions import ClientError
+
+REGION = 'eu-west-1'
+INSTANCE_ID = 'i-0fba58db502cc8d39'
+DOCUMENT_NAME = 'AWS-RunShellScript'
+
+# Invocation states after which the output will not change any more
+TERMINAL_STATUSES = {'Success', 'Failed', 'Cancelled', 'TimedOut', 'Undeliverable', 'Terminated'}
+
+# Error codes worth retrying while polling
+RETRYABLE_ERRORS = {'ThrottlingException', 'RequestLimitExceeded', 'InternalServerError'}
+
+# How long to keep waiting beyond the command's own timeout for the
+# agent to report back
+DELIVERY_GRACE = 30
+
+# StandardOutputContent/StandardErrorContent are cut off at this size
+INLINE_OUTPUT_LIMIT = 24000
+
+# Gzipped bytes fetched per spool page; base64 keeps a page under the inline limit
+SPOOL_PAGE_BYTES = 16 * 1024
+SPOOL_DIR = '/tmp/summit-ssm-spool'
+SPOOL_FETCH_WORKERS = 4
+
+# Full command output lands here when an output bucket is configured
+OUTPUT_BUCKET = os.environ.get('SUMMIT_SSM_OUTPUT_BUCKET')
+OUTPUT_PREFIX = 'ssm-output'
+# Point at MinIO/moto or another S3 stand-in when testing
+S3_ENDPOINT = os.environ.get('SUMMIT_S3_ENDPOINT')
+
+
+class SSMError(Exception):
+    """Raised when a command cannot be delivered or its result fetched"""
+
+
+class CommandTimeout(SSMError):
+    """Raised when an invocation never reached a terminal state"""
+
+
+@dataclass
+class CommandResult:
+    command_id: str
+    instance_id: str
+    status: str
+    stdout: str
+    stderr: str
+    exit_code: int
+    wall_time: float
+
+    @property
+    def ok(self):
+        return self.status == 'Success' and self.exit_code == 0
+
+    @property
+    def truncated(self):
+        """True if SSM probably cut the inline output short"""
+        return len(self.stdout) >= INLINE_OUTPUT_LIMIT or len(self.stderr) >= INLINE_OUTPUT_LIMIT
+
+
+def backoff_delays(initial=0.25, maximum=5.0, factor=2.0):
+    """Yield poll delays growing exponentially, with equal jitter"""
+    delay = initial
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(maximum, delay * factor)
+
+
+class SSMRunner:
+    """Sends shell commands to an instance and waits for their results"""
+
+    def __init__(self, instance_id=INSTANCE_ID, region=REGION, client=None,
+                 output_bucket=OUTPUT_BUCKET, output_prefix=OUTPUT_PREFIX, s3_client=None):
+        self.instance_id = instance_id
+        self.region = region
+        self.ssm = client or boto3.client('ssm', region_name=region)
+        self.output_bucket = output_bucket
+        self.output_prefix = output_prefix
+        self._s3 = s3_client
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            self._s3 = boto3.client('s3', region_name=self.region, endpoint_url=S3_ENDPOINT)
+        return self._s3
+
+    def send(self, command, timeout=60, instance_ids=None, targets=None, **kwargs):
+        """Start a command and return its CommandId without waiting"""
+        commands = command if isinstance(command, list) else [command]
+        if targets:
+            kwargs['Targets'] = targets
+        else:
+            kwargs['InstanceIds'] = instance_ids or [self.instance_id]
+        response = self.ssm.send_command(
+            DocumentName=DOCUMENT_NAME,
+            Parameters={'commands': commands},
+            TimeoutSeconds=timeout,
+            **kwargs
+        )
+        return response['Command']['CommandId']
+
+    def wait(self, command_id, instance_id=None, timeout=60, started=None):
+        """Poll an invocation until it finishes and return its CommandResult"""
+        instance_id = instance_id or self.instance_id
+        started = started or time.monotonic()
+        deadline = started + timeout + DELIVERY_GRACE
+        delays = backoff_delays()
+
+        while True:
+            output = self._get_invocation(command_id, instance_id)
+            if output and output['Status'] in TERMINAL_STATUSES:
+                return CommandResult(
+                    command_id=command_id,
+                    instance_id=instance_id,
+                    status=output['Status'],
+                    stdout=output.get('StandardOutputContent', ''),
+                    stderr=output.get('StandardErrorContent', ''),
+                    exit_code=output.get('ResponseCode', -1),
+                    wall_time=time.monotonic() - started,
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                status = output['Status'] if output else 'not delivered'
+                raise CommandTimeout(
+                    f"Command {command_id} on {instance_id} still {status} after {timeout + DELIVERY_GRACE}s"
+                )
+            time.sleep(min(next(delays), remaining))
+
+    def run(self, command, timeout=60, instance_id=None):
+        """Send a command and block until its result is available"""
+        instance_id = instance_id or self.instance_id
+        started = time.monotonic()
+        command_id = self.send(command, timeout=timeout, instance_ids=[instance_id])
+        return self.wait(command_id, instance_id, timeout=timeout, started=started)
+
+    def run_large(self, command, timeout=300, instance_id=None):
+        """Run a command and return its complete, untruncated output"""
+        streams = {'stdout': [], 'stderr': []}
+        result = None
+        for item in self.iter_output(command, timeout=timeout, instance_id=instance_id):
+            if isinstance(item, CommandResult):
+                result = item
+            else:
+                stream, text = item
+                streams[stream].append(text)
+        result.stdout = ''.join(streams['stdout'])
+        result.stderr = ''.join(streams['stderr'])
+        return result
+
+    def iter_output(self, command, timeout=300, instance_id=None):
+        """
+        Yield ('stdout' | 'stderr', text) chunks of a command's full output,
+        then its CommandResult (with empty stdout/stderr) last
+        """
+        if self.output_bucket:
+            return self._iter_s3_output(command, timeout, instance_id or self.instance_id)
+        return self._iter_spooled_output(command, timeout, instance_id or self.instance_id)
+
+    def _iter_s3_output(self, command, timeout, instance_id):
+        started = time.monotonic()
+        command_id = self.send(
+            command,
+            timeout=timeout,
+            instance_ids=[instance_id],
+            OutputS3BucketName=self.output_bucket,
+            OutputS3KeyPrefix=self.output_prefix,
+        )
+        result = self.wait(command_id, instance_id, timeout=timeout, started=started)
+
+        # SSM writes <prefix>/<command>/<instance>/<plugin>/<step>/{stdout,stderr}
+        keys = {}
+        paginator = self.s3.get_paginator('list_objects_v2')
+        prefix = f"{self.output_prefix}/{command_id}/{instance_id}/"
+        for page in paginator.paginate(Bucket=self.output_bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                stream = obj['Key'].rsplit('/', 1)[-1]
+                if stream in ('stdout', 'stderr'):
+                    keys.setdefault(stream, []).append(obj['Key'])
+
+        for stream in ('stdout', 'stderr'):
+            for key in sorted(keys.get(stream, [])):
+                body = self.s3.get_object(Bucket=self.output_bucket, Key=key)['Body']
+                for text in _decode_stream(body.iter_chunks()):
+                    yield stream, text
+        result.stdout = result.stderr = ''
+        yield result
+
+    def _iter_spooled_output(self, command, timeout, instance_id):
+        spool = f"{SPOOL_DIR}/{uuid.uuid4().hex}"
+        script = f"""mkdir -p {SPOOL_DIR}
+( {command}
+) > {spool}.stdout 2> {spool}.stderr
+code=$?
+gzip -f {spool}.stdout {spool}.stderr
+echo "$(stat -c %s {spool}.stdout.gz) $(stat -c %s {spool}.stderr.gz)"
+exit $code"""
+        result = self.run(script, timeout=timeout, instance_id=instance_id)
+        try:
+            sizes = [int(size) for size in result.stdout.split()[-2:]]
+            if len(sizes) != 2:
+                raise SSMError(f"Spooling output failed: {result.stderr.strip()}")
+
+            for stream, size in zip(('stdout', 'stderr'), sizes):
+                pages = [(offset, min(SPOOL_PAGE_BYTES, size - offset)) for offset in range(0, size, SPOOL_PAGE_BYTES)]
+                fetch = lambda page: self._fetch_spool_page(f"{spool}.{stream}.gz", *page, instance_id)
+                with ThreadPoolExecutor(max_workers=SPOOL_FETCH_WORKERS) as pool:
+                    # map() keeps page order while fetching ahead in parallel
+                    for text in _decode_stream(pool.map(fetch, pages)):
+                        yield stream, text
+        finally:
+            self.run(f"rm -f {spool}.stdout.gz {spool}.stderr.gz", timeout=30, instance_id=instance_id)
+
+        result.stdout = result.stderr = ''
+        yield result
+
+    def _fetch_spool_page(self, path, offset, length, instance_id):
+        page = self.run(
+            f"tail -c +{offset + 1} {path} | head -c {length} | base64 -w0",
+            timeout=60,
+            instance_id=instance_id,
+        )
+        if not page.ok:
+            raise SSMError(f"Could not read {path} at {offset}: {page.stderr.strip()}")
+        data = base64.b64decode(page.stdout.strip())
+        if len(data) != length:
+            raise SSMError(f"Short read from {path} at {offset}: {len(data)} of {length} bytes")
+        return data
+
+    def _get_invocation(self, command_id, instance_id):
+        """Fetch the invocation, or None if SSM has not registered it yet"""
+        try:
+            return self.ssm.get_command_invocation(CommandId=command_id, InstanceId=instance_id)
+        except self.ssm.exceptions.InvocationDoesNotExist:
+            # send_command returns before the invocation is visible
+            return None
+        except ClientError as e:
+            if e.response['Error']['Code'] in RETRYABLE_ERRORS:
+                return None
+            raise SSMError(f"Could not fetch result of {command_id}: {e}") from e
+
+
+def _decode_stream(chunks):
+    """Turn byte chunks (gzip or plain) into text as they arrive"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    inflater = None
+    for chunk in chunks:
+        if inflater is None:
+            # gzip magic number on the first chunk decides the mode
+            inflater = zlib.decompressobj(wbits=31) if chunk[:2] == b'\x1f\x8b' else False
+        text = decoder.decode(inflater.decompress(chunk) if inflater else chunk)
+        if text:
+            yield text
+    tail = inflater.flush() if inflater else b''
+    text = decoder.decode(tail, final=True)
+    if text:
+        yield text
+
+
+_default_runner = None
+
+
+def get_runner():
+    """Return the shared runner for the production instance
+
+    SUMMIT_TARGET (an instance Name, Key=Value tag or id) points every
+    script using the shared runner at another host, resolved through the
+    cached inventory.
+    """
+    global _default_runner
+    if _default_runner is None:
+        target = os.environ.get('SUMMIT_TARGET')
+        if target:
+            # Imported here: the inventory is only needed when a target is named
+            from summit_ops.inventory import Inventory
+            instance = Inventory().resolve_one(target)
+            _default_runner = SSMRunner(instance_id=instance.instance_id, region=instance.region)
+        else:
+            _default_runner = SSMRunner()
+    return _default_runner
+
+
+def run_command(command, timeout=60, instance_id=None):
+    """Run a shell command on the production instance"""
+    return get_runner().run(command, timeout=timeout, instance_id=instance_id)
@@ -0,0 +1,475 @@
+"""
+Deterministic synthetic dataset for benchmarking queries and the API.
+
+Builds users, presence, chats, chat_participants, messages (with
+read_receipts), chat_requests, meetings and meeting_participants at a
+chosen Scale, shaped like real use: a few users are in many chats and
+a few chats carry most of the messages (Zipf-distributed), messages
+lean towards the recent end of each chat's lifetime, and group chats,
+file messages, deletions and pending requests appear at fixed rates.
+
+Ids are hashed from (seed, entity index), and chat and meeting
+membership from a generator seeded by the entity itself, so foreign
+keys are computed rather than looked up and depend on the seed alone.
+The remaining values of each chunk of CHUNK_ROWS rows come from its own
+generator seeded by (seed, table, chunk). The same seed and chunk size
+therefore produce the same database whatever the number of workers or
+the order chunks are loaded in. Chunks are streamed into
+Postgres with COPY by a pool of worker processes, one connection each.
+Secondary indexes are dropped for the load and rebuilt afterwards in
+parallel; a superuser also skips the foreign-key triggers.
+
+Synthetic users are loadtest-N@loadtest.summit.local with the load
+generator's password, so loadgen and the fan-out benchmark can log in
+as them directly.
+
+Usage:
+    from summit_ops.synthetic import PRESETS, SyntheticDataset
+
+    dataset = SyntheticDataset('postgresql://localhost/summit_bench', PRESETS['small'], seed=42)
+    report = dataset.load(truncate=True)
+"""
+import bisect
+import functools
+import hashlib
+import itertools
+import multiprocessing
+import random
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import psycopg
+
+from summit_ops.loadgen import USER_DOMAIN, USER_PREFIX
+
+# bcrypt of loadgen.USER_PASSWORD ('loadtest-password'), cost 10 like auth.ts
+PASSWORD_HASH = '$2a$10$6viFBmvTJJ.JqZgCcr8VUelQAy0DZw8fD44AtioPRGSkF4u7Q6Yt2'
+CHUNK_ROWS = 100_000
+COPY_BUFFER = 1 << 20
+STAGED_REQUESTS = 'synthetic_chat_requests'
+
+FIRST_NAMES = ('Ava', 'Ben', 'Chloe', 'Daniel', 'Emma', 'Farai', 'Grace', 'Hugo', 'Ico', 'Jade', 'Kabelo', 'Lerato',
+               'Mia', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Ruan', 'Sipho', 'Thandi', 'Uma', 'Victor', 'Wei', 'Zoe')
+LAST_NAMES = ('Adams', 'Botha', 'Chen', 'Dlamini', 'Evans', 'Fourie', 'Garcia', 'Khumalo', 'Le Roux', 'Mokoena',
+              'Naidoo', 'Nkosi', 'Patel', 'Smith', 'Van Wyk', 'Williams')
+COMPANIES = ('Astute Tech', 'Coding Everest', 'Acme', 'Northwind', 'Globex', None)
+JOB_TITLES = ('Engineer', 'Designer', 'Product Manager', 'Sales', 'Support', 'CTO', None)
+WORDS = ('the', 'meeting', 'is', 'at', 'deploy', 'done', 'ok', 'thanks', 'can', 'you', 'check', 'please', 'tomorrow',
+         'today', 'build', 'fixed', 'review', 'call', 'now', 'later', 'lunch', 'great', 'yes', 'no', 'sure', 'send',
+         'file', 'link', 'update', 'client', 'invoice', 'bug', 'release', 'test', 'server', 'down', 'back', 'up')
+FILES = (('report.pdf', 'application/pdf'), ('screenshot.png', 'image/png'), ('notes.docx',
+         'application/vnd.openxmlformats-officedocument.wordprocessingml.document'), ('photo.jpg', 'image/jpeg'))
+PRESENCE = (('offline', 70), ('online', 20), ('away', 10))
+MEETING_STATUS = (('accepted', 60), ('pending', 30), ('declined', 10))
+REQUEST_STATUS = (('pending', 70), ('declined', 30))
+
+
+@dataclass
+class Scale:
+    users: int
+    chats: int
+    messages: int
+    meetings: int
+    group_ratio: float = 0.1
+    # Zipf exponents: how strongly activity concentrates on the busiest users and chats
+    user_skew: float = 0.8
+    chat_skew: float = 1.1
+    receipt_rate: float = 0.5
+    file_rate: float = 0.02
+    delete_rate: float = 0.005
+    pending_request_rate: float = 0.2
+    days: int = 365
+    # Fixed, so the same seed gives the same timestamps on every run
+    end: str = '2026-01-01T00:00:00+00:00'
+
+
+PRESETS = {
+    'tiny': Scale(users=1_000, chats=5_000, messages=100_000, meetings=1_000),
+    'small': Scale(users=10_000, chats=50_000, messages=2_000_000, meetings=10_000),
+    'medium': Scale(users=50_000, chats=500_000, messages=10_000_000, meetings=50_000),
+    'large': Scale(users=50_000, chats=500_000, messages=100_000_000, meetings=200_000),
+}
+
+# Columns each generator produces; columns a migration has not added yet are left out
+COLUMNS = {
+    'users': ('id', 'email', 'name', 'password_hash', 'company', 'job_title', 'phone', 'requires_password_change',
+              'subscription_status', 'trial_started_at', 'account_created_at', 'created_at', 'updated_at'),
+    'presence': ('user_id', 'status', 'last_seen', 'updated_at'),
+    'chats': ('id', 'name', 'type', 'created_by', 'created_at', 'updated_at'),
+    'chat_participants': ('chat_id', 'user_id', 'joined_at'),
+    'messages': ('id', 'chat_id', 'sender_id', 'content', 'type', 'file_name', 'file_url', 'file_size',
+                 'mime_type', 'created_at', 'deleted_at'),
+    'read_receipts': ('id', 'message_id', 'user_id', 'read_at'),
+    STAGED_REQUESTS: ('id', 'requester_id', 'requestee_id', 'status', 'created_at', 'updated_at'),
+    'meetings': ('id', 'title', 'description', 'start_time', 'end_time', 'room_id', 'created_by', 'recurrence',
+                 'created_at', 'updated_at'),
+    'meeting_participants': ('meeting_id', 'user_id', 'status', 'created_at'),
+}
+TABLES = ('users', 'presence', 'chats', 'chat_participants', 'messages', 'read_receipts', 'chat_requests',
+          'meetings', 'meeting_participants')
+
+# Load order: each phase only references rows of earlier phases
+PHASES = (
+    ('users',),
+    ('presence', 'chats', 'meetings'),
+    ('chat_participants', 'meeting_participants', STAGED_REQUESTS),
+    ('messages',),
+)
+_SALTS = {name: n for n, name in enumerate(('users', 'presence', 'chats', 'chat_meta', 'meetings', 'meeting_meta',
+                                            'chat_participants', 'meeting_participants', STAGED_REQUESTS,
+                                            'messages', 'user_rank', 'chat_rank'), 1)}
+
+
+class SyntheticDataError(Exception):
+    """Raised when the target database is not safe or not ready to load"""
+
+
+def entity_id(seed, kind, index):
+    """Stable UUID of the index-th users/chats/meetings row"""
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+def _rng(seed, kind, index):
+    return random.Random((seed * 1_000_003 + _SALTS[kind]) * 10_000_019 + index)
+
+
+def _random_id(rng):
+    h = f"{rng.getrandbits(128):032x}"
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+
+def _ts(epoch):
+    whole = int(epoch)
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(whole)) + f".{int((epoch - whole) * 1e6):06d}+00"
+
+
+def _weighted(rng, choices):
+    return rng.choices([c for c, _ in choices], [w for _, w in choices])[0]
+
+
+def _zipf_table(count, skew, rng):
+    """(cumulative weights, rank -> index permutation) for Zipf sampling over count items"""
+    cumulative = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+    order = list(range(count))
+    rng.shuffle(order)
+    return cumulative, order
+
+
+class Generator:
+    """Row generator for one (seed, scale); every method is deterministic in its arguments"""
+
+    def __init__(self, scale, seed):
+        self.scale = scale
+        self.seed = seed
+        self.end = datetime.fromisoformat(scale.end).timestamp()
+        self.start = self.end - scale.days * 86400
+        self._user_zipf = _zipf_table(scale.users, scale.user_skew, _rng(seed, 'user_rank', 0))
+        self._chat_zipf = _zipf_table(scale.chats, scale.chat_skew, _rng(seed, 'chat_rank', 0))
+
+    @functools.lru_cache(maxsize=None)
+    def user_id(self, index):
+        return entity_id(self.seed, 'user', index)
+
+    @functools.lru_cache(maxsize=None)
+    def chat_id(self, index):
+        return entity_id(self.seed, 'chat', index)
+
+    @functools.lru_cache(maxsize=None)
+    def meeting_id(self, index):
+        return entity_id(self.seed, 'meeting', index)
+
+    def _pick(self, zipf, rng):
+        cumulative, order = zipf
+        return order[min(bisect.bisect(cumulative, rng.random() * cumulative[-1]), len(order) - 1)]
+
+    def busy_user(self, rng):
+        return self._pick(self._user_zipf, rng)
+
+    def _members(self, rng, size, first=None):
+        members = [first if first is not None else self.busy_user(rng)]
+        while len(members) < min(size, self.scale.users):
+            user = self.busy_user(rng) if rng.random() < 0.7 else rng.randrange(self.scale.users)
+            if user not in members:
+                members.append(user)
+        return members
+
+    @functools.lru_cache(maxsize=None)
+    def chat(self, index):
+        """(is_group, member indexes, created_at epoch) of a chat"""
+        rng = _rng(self.seed, 'chat_meta', index)
+        group = rng.random() < self.scale.group_ratio
+        size = min(50, 3 + int(rng.paretovariate(1.2))) if group else 2
+        created = self.start + (self.end - self.start) * 0.8 * rng.random() ** 2
+        return group, tuple(self._members(rng, size)), created
+
+    @functools.lru_cache(maxsize=None)
+    def meeting(self, index):
+        """(creator, member indexes, start epoch) of a meeting"""
+        rng = _rng(self.seed, 'meeting_meta', index)
+        creator = self.busy_user(rng)
+        members = self._members(rng, rng.randint(2, 10), first=creator)
+        start = self.start + (self.end - self.start + 30 * 86400) * rng.random()
+        return creator, tuple(members), start
+
+    # -- tables, one chunk of entity indexes at a time -----------------------
+
+    def users(self, rng, lo, hi):
+        for i in range(lo, hi):
+            created = self.start + (self.end - self.start) * 0.3 * rng.random()
+            company = rng.choice(COMPANIES)
+            yield (self.user_id(i), f"{USER_PREFIX}{i}@{USER_DOMAIN}",
+                   f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", PASSWORD_HASH, company,
+                   rng.choice(JOB_TITLES), f"+27{rng.randrange(600000000, 849999999)}" if rng.random() < 0.4 else None,
+                   'f', 'active' if company and rng.random() < 0.3 else 'trial', _ts(created), _ts(created),
+                   _ts(created), _ts(created))
+
+    def presence(self, rng, lo, hi):
+        for i in range(lo, hi):
+            seen = self.end - rng.expovariate(1 / 86400)
+            yield self.user_id(i), _weighted(rng, PRESENCE), _ts(seen), _ts(seen)
+
+    def chats(self, rng, lo, hi):
+        for c in range(lo, hi):
+            group, members, created = self.chat(c)
+            name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} #{c}" if group else None
+            yield (self.chat_id(c), name, 'group' if group else 'direct', self.user_id(members[0]), _ts(created),
+                   _ts(created))
+
+    def chat_participants(self, rng, lo, hi):
+        for c in range(lo, hi):
+            _, members, created = self.chat(c)
+            for user in members:
+                yield self.chat_id(c), self.user_id(user), _ts(created + rng.random() * 3600)
+
+    def synthetic_chat_requests(self, rng, lo, hi):
+        """Accepted requests behind every direct chat, plus pending/declined ones (chunked by chat index)"""
+        for c in range(lo, hi):
+            group, members, created = self.chat(c)
+            if not group:
+                yield (_random_id(rng), self.user_id(members[0]), self.user_id(members[1]), 'accepted',
+                       _ts(created - 3600), _ts(created))
+            if rng.random() < self.scale.pending_request_rate * self.scale.users / self.scale.chats:
+                requester, requestee = self.busy_user(rng), rng.randrange(self.scale.users)
+                if requester != requestee:
+                    sent = self.end - rng.expovariate(1 / (14 * 86400))
+                    yield (_random_id(rng), self.user_id(requester), self.user_id(requestee),
+                           _weighted(rng, REQUEST_STATUS), _ts(sent), _ts(sent))
+
+    def meetings(self, rng, lo, hi):
+        for k in range(lo, hi):
+            creator, _, start = self.meeting(k)
+            recurrence = '{"enabled": true, "days_of_week": [1, 3, 5]}' if rng.random() < 0.1 else None
+            created = start - rng.expovariate(1 / (3 * 86400))
+            yield (self.meeting_id(k), f"{rng.choice(WORDS).title()} {rng.choice(('sync', 'review', 'standup'))}",
+                   None if rng.random() < 0.5 else ' '.join(rng.choices(WORDS, k=12)), _ts(start),
+                   _ts(start + rng.choice((900, 1800, 3600))), f"synthetic-{self.seed}-{k}", self.user_id(creator),
+                   recurrence, _ts(created), _ts(created))
+
+    def meeting_participants(self, rng, lo, hi):
+        for k in range(lo, hi):
+            creator, members, start = self.meeting(k)
+            for user in members:
+                status = 'accepted' if user == creator else _weighted(rng, MEETING_STATUS)
+                yield self.meeting_id(k), self.user_id(user), status, _ts(start - 86400 * rng.random())
+
+    def messages(self, rng, lo, hi):
+        """(message rows, read receipt rows) for message indexes lo..hi"""
+        scale = self.scale
+        messages, receipts = [], []
+        for m in range(lo, hi):
+            c = self._pick(self._chat_zipf, rng)
+            _, members, created = self.chat(c)
+            sender = rng.choice(members)
+            # Skewed towards the recent end of the chat's life
+            at = created + (self.end - created) * rng.random() ** 0.5
+            message_id = f"{int(at * 1000)}-{m}"
+            if rng.random() < scale.file_rate:
+                file_name, mime = rng.choice(FILES)
+                row = (message_id, self.chat_id(c), self.user_id(sender), None, 'file', file_name,
+                       f"/uploads/synthetic/{m}/{file_name}", str(rng.randrange(10_000, 20_000_000)), mime)
+            else:
+                words = rng.choices(WORDS, k=min(200, 1 + int(rng.expovariate(1 / 8))))
+                row = (message_id, self.chat_id(c), self.user_id(sender), ' '.join(words), 'text', None, None,
+                       None, None)
+            deleted = _ts(at + 60) if rng.random() < scale.delete_rate else None
+            messages.append(row + (_ts(at), deleted))
+            if rng.random() < scale.receipt_rate:
+                for reader in [u for u in members if u != sender][:3]:
+                    receipts.append((_random_id(rng), message_id, self.user_id(reader),
+                                     _ts(min(self.end, at + rng.expovariate(1 / 600)))))
+        return messages, receipts
+
+
+# -- worker processes ---------------------------------------------------------
+
+_worker = {}
+
+
+def _init_worker(conninfo, scale, seed, columns, replica):
+    _worker['conn'] = psycopg.connect(conninfo, autocommit=True)
+    if replica:
+        # Keys are computed consistently; skip the per-row foreign-key triggers
+        _worker['conn'].execute("SET session_replication_role = replica")
+    _worker['generator'] = Generator(scale, seed)
+    _worker['columns'] = columns
+
+
+def _copy(conn, table, rows, columns):
+    wanted = [i for i, column in enumerate(COLUMNS[table]) if column in columns[table]]
+    names = ', '.join(COLUMNS[table][i] for i in wanted)
+    count = 0
+    with conn.cursor().copy(f"COPY {table} ({names}) FROM STDIN") as copy:
+        buffer = []
+        size = 0
+        for row in rows:
+            line = '\t'.join('\\N' if row[i] is None else row[i] for i in wanted) + '\n'
+            buffer.append(line)
+            size += len(line)
+            count += 1
+            if size >= COPY_BUFFER:
+                copy.write(''.join(buffer))
+                buffer, size = [], 0
+        if buffer:
+            copy.write(''.join(buffer))
+    return count
+
+
+def _load_chunk(task):
+    table, chunk, lo, hi = task
+    generator, conn, columns = _worker['generator'], _worker['conn'], _worker['columns']
+    rng = _rng(generator.seed, table, chunk)
+    started = time.perf_counter()
+    with conn.transaction():
+        if table == 'messages':
+            messages, receipts = generator.messages(rng, lo, hi)
+            counts = {'messages': _copy(conn, 'messages', messages, columns)}
+            if 'read_receipts' in columns:
+                counts['read_receipts'] = _copy(conn, 'read_receipts', receipts, columns)
+        else:
+            counts = {table: _copy(conn, table, getattr(generator, table)(rng, lo, hi), columns)}
+    return counts, time.perf_counter() - started
+
+
+def _build_index(args):
+    conninfo, statement = args
+    started = time.perf_counter()
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute("SET maintenance_work_mem = '512MB'")
+        conn.execute(statement)
+    return statement, time.perf_counter() - started
+
+
+# -- orchestration ------------------------------------------------------------
+
+class SyntheticDataset:
+    """Loads a Scale of synthetic data into a local Postgres with parallel COPY"""
+
+    def __init__(self, conninfo, scale, seed=1, workers=None, chunk_rows=CHUNK_ROWS):
+        self.conninfo = conninfo
+        self.scale = scale
+        self.seed = seed
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_rows = chunk_rows
+
+    def tasks(self, table):
+        total = {'users': self.scale.users, 'presence': self.scale.users, 'chats': self.scale.chats,
+                 'chat_participants': self.scale.chats, STAGED_REQUESTS: self.scale.chats,
+                 'meetings': self.scale.meetings, 'meeting_participants': self.scale.meetings,
+                 'messages': self.scale.messages}[table]
+        return [(table, n, lo, min(total, lo + self.chunk_rows)) for n, lo in enumerate(range(0, total, self.chunk_rows))]
+
+    def _columns(self, conn):
+        columns = {}
+        for table, column in conn.execute("SELECT table_name, column_name FROM information_schema.columns "
+                                          "WHERE table_schema = 'public'"):
+            columns.setdefault(table, set()).add(column)
+        missing = [t for t in ('users', 'chats', 'chat_participants', 'messages') if t not in columns]
+        if missing:
+            raise SyntheticDataError(f"Schema not migrated (missing {', '.join(missing)}); run migrate-db.py up first")
+        return columns
+
+    def _secondary_indexes(self, conn, tables):
+        """CREATE INDEX statements of the non-constraint indexes on the given tables"""
+        return [(name, definition) for name, definition in conn.execute(
+            "SELECT i.indexname, i.indexdef FROM pg_indexes i "
+            "JOIN pg_class c ON c.relname = i.indexname AND c.relkind = 'i' "
+            "WHERE i.schemaname = 'public' AND i.tablename = ANY(%s) "
+            "AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = c.oid)", [list(tables)])]
+
+    def load(self, truncate=False, defer_indexes=True, on_progress=None):
+        """Load every table; returns {table: (rows, seconds)} plus '(indexes)' and '(finish)' timings"""
+        report = {}
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            columns = self._columns(conn)
+            tables = [t for t in TABLES if t in columns]
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM users)").fetchone()[0] and not truncate:
+                raise SyntheticDataError("users is not empty; pass truncate=True to replace its contents")
+            if truncate:
+                conn.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+            replica = conn.execute("SELECT rolsuper FROM pg_roles WHERE rolname = current_user").fetchone()[0]
+            indexes = self._secondary_indexes(conn, tables) if defer_indexes else []
+            for name, _ in indexes:
+                conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+            if 'chat_requests' in columns:
+                conn.execute(f"DROP TABLE IF EXISTS {STAGED_REQUESTS}")
+                conn.execute(f"CREATE UNLOGGED TABLE {STAGED_REQUESTS} (LIKE chat_requests INCLUDING DEFAULTS)")
+                columns[STAGED_REQUESTS] = set(COLUMNS[STAGED_REQUESTS])
+
+            try:
+                with multiprocessing.Pool(self.workers, _init_worker,
+                                          (self.conninfo, self.scale, self.seed, columns, replica)) as pool:
+                    for phase in PHASES:
+                        phase = [t for t in phase if t in columns]
+                        started = time.perf_counter()
+                        tasks = [task for table in phase for task in self.tasks(table)]
+                        done = {}
+                        for counts, _ in pool.imap_unordered(_load_chunk, tasks):
+                            for table, count in counts.items():
+                                done[table] = done.get(table, 0) + count
+                            if on_progress:
+                                on_progress(dict(done))
+                        elapsed = time.perf_counter() - started
+                        for table, count in done.items():
+                            report[table] = (count, elapsed)
+
+                    started = time.perf_counter()
+                    if indexes:
+                        pool.map(_build_index, [(self.conninfo, definition) for _, definition in indexes])
+                    report['(indexes)'] = (len(indexes), time.perf_counter() - started)
+            finally:
+                # Whatever happened, leave the schema with all of its indexes
+                for _, definition in indexes:
+                    conn.execute(definition.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1)
+                                 .replace('CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX IF NOT EXISTS', 1))
+
+            started = time.perf_counter()
+            if STAGED_REQUESTS in columns:
+                # The random pairs can repeat; keep the first request per (requester, requestee)
+                requests = conn.execute(
+                    f"INSERT INTO chat_requests (id, requester_id, requestee_id, status, created_at, updated_at) "
+                    f"SELECT DISTINCT ON (requester_id, requestee_id) id, requester_id, requestee_id, status, "
+                    f"created_at, updated_at FROM {STAGED_REQUESTS} ORDER BY requester_id, requestee_id, "
+                    f"status = 'accepted' DESC, id ON CONFLICT DO NOTHING").rowcount
+                conn.execute(f"DROP TABLE {STAGED_REQUESTS}")
+                report['chat_requests'] = (requests, report.pop(STAGED_REQUESTS)[1])
+            with conn.transaction():
+                # update_chats_updated_at would stamp now() over the generated updated_at
+                conn.execute("ALTER TABLE chats DISABLE TRIGGER USER")
+                conn.execute(
+                    "UPDATE chats c SET last_message = m.content, last_message_at = m.created_at, "
+                    "updated_at = GREATEST(c.updated_at, m.created_at) "
+                    "FROM (SELECT DISTINCT ON (chat_id) chat_id, COALESCE(content, file_name) AS content, created_at "
+                    "      FROM messages WHERE deleted_at IS NULL ORDER BY chat_id, created_at DESC) m "
+                    "WHERE m.chat_id = c.id")
+                conn.execute("ALTER TABLE chats ENABLE TRIGGER USER")
+            conn.execute("ANALYZE")
+            report['(finish)'] = (0, time.perf_counter() - started)
+        return report
+
+
+def scaled(preset, **overrides):
+    """A preset with some fields replaced (None values are ignored)"""
+    return replace(PRESETS[preset], **{k: v for k, v in overrides.items() if v is not None})
@@ -0,0 +1,207 @@
+"""
+Chunked, parallel, resumable transfer of large artifacts to the host.
+
+An artifact is split into fixed-size chunks named by their SHA-256.
+Chunks travel over several concurrent channels - parallel SSM
+invocations, or an S3 bucket the host pulls from - and are verified
+one by one as they land. Chunks the host already holds are skipped, so
+a transfer that failed half way resumes where it stopped. Finally the
+host joins the chunks in manifest order and checks the digest of the
+whole artifact before moving it into place.
+
+Usage:
+    from summit_ops.transfer import ChunkedTransfer
+
+    ChunkedTransfer().send_file('server-dist.tar.gz', '/tmp/server-dist.tar.gz')
+"""
+import base64
+import hashlib
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import boto3
+
+from summit_ops.ssm import S3_ENDPOINT, backoff_delays, get_runner
+
+# Raw bytes per chunk; base64 encoded it still fits one SSM command parameter
+CHUNK_BYTES = 30 * 1024
+CHANNELS = 6
+CHUNK_RETRIES = 4
+REMOTE_CHUNK_DIR = '/tmp/summit-chunks'
+
+DEPLOY_BUCKET = 'summit-deployment'
+DEPLOY_BUCKET_REGION = 'us-east-1'
+S3_CHUNK_PREFIX = 'chunks'
+
+
+class TransferError(Exception):
+    """Raised when a chunk cannot be delivered or the artifact fails verification"""
+
+
+@dataclass
+class Chunk:
+    index: int
+    sha256: str
+    data: bytes
+
+
+@dataclass
+class TransferManifest:
+    chunks: list
+    size: int
+    sha256: str
+
+    @property
+    def hashes(self):
+        return [chunk.sha256 for chunk in self.chunks]
+
+
+def split(data, chunk_bytes=CHUNK_BYTES):
+    """Cut bytes into content-addressed chunks"""
+    chunks = []
+    for index, start in enumerate(range(0, len(data), chunk_bytes)):
+        piece = data[start:start + chunk_bytes]
+        chunks.append(Chunk(index, hashlib.sha256(piece).hexdigest(), piece))
+    return TransferManifest(chunks, len(data), hashlib.sha256(data).hexdigest())
+
+
+class ChunkedTransfer:
+    """Moves an artifact to the host over several channels at once"""
+
+    def __init__(self, runner=None, channels=CHANNELS, chunk_bytes=CHUNK_BYTES,
+                 via='ssm', bucket=DEPLOY_BUCKET, bucket_region=DEPLOY_BUCKET_REGION, s3_client=None):
+        if via not in ('ssm', 's3'):
+            raise ValueError("via must be 'ssm' or 's3'")
+        self.runner = runner or get_runner()
+        self.channels = channels
+        self.chunk_bytes = chunk_bytes
+        self.via = via
+        self.bucket = bucket
+        self.bucket_region = bucket_region
+        self._s3 = s3_client
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            self._s3 = boto3.client('s3', region_name=self.bucket_region, endpoint_url=S3_ENDPOINT)
+        return self._s3
+
+    def send_file(self, local_path, remote_path, on_progress=None):
+        with open(local_path, 'rb') as f:
+            return self.send_bytes(f.read(), remote_path, on_progress)
+
+    def send_bytes(self, data, remote_path, on_progress=None):
+        """Deliver data to remote_path on the host; returns the manifest"""
+        manifest = split(data, self.chunk_bytes)
+        # The chunk order itself travels as chunks, keeping every command small
+        order = split('\n'.join(manifest.hashes).encode() + b'\n', self.chunk_bytes)
+        present = self.remote_chunks()
+        # Identical chunks travel once
+        unique = {chunk.sha256: chunk for chunk in manifest.chunks + order.chunks}
+        missing = [chunk for sha256, chunk in unique.items() if sha256 not in present]
+        if on_progress:
+            on_progress(f"{len(unique)} unique chunk(s), {len(unique) - len(missing)} already on host")
+
+        if self.via == 's3':
+            self._send_via_s3(missing, on_progress)
+        else:
+            self._send_via_ssm(missing, on_progress)
+        self.assemble(manifest, order, remote_path)
+        return manifest
+
+    def remote_chunks(self):
+        """Chunk hashes already stored on the host (left from earlier attempts)"""
+        result = self.runner.run_large(f"ls -1 {REMOTE_CHUNK_DIR} 2>/dev/null || true", timeout=60)
+        return {name for name in result.stdout.split() if len(name) == 64}
+
+    def assemble(self, manifest, order, remote_path):
+        """Join chunks on the host and verify the whole artifact"""
+        order_chunks = ' '.join(order.hashes)
+        order_file = f".order-{manifest.sha256}"
+        path = shlex.quote(remote_path)
+        script = f"""set -e
+cd {REMOTE_CHUNK_DIR}
+mkdir -p "$(dirname {path})"
+cat {order_chunks} > {order_file}
+echo "{order.sha256}  {order_file}" | sha256sum -c --quiet
+xargs cat < {order_file} > {path}.part
+echo "{manifest.sha256}  {path}.part" | sha256sum -c --quiet
+mv {path}.part {path}
+xargs rm -f < {order_file}
+rm -f {order_chunks} {order_file}"""
+        result = self.runner.run_large(script, timeout=300)
+        if not result.ok:
+            raise TransferError(f"Reassembly of {remote_path} failed: {result.stderr.strip()}")
+
+    def _send_via_ssm(self, chunks, on_progress):
+        with ThreadPoolExecutor(max_workers=self.channels) as pool:
+            futures = {pool.submit(self._retry, self._push_chunk, chunk): chunk for chunk in chunks}
+            self._collect(futures, on_progress)
+
+    def _send_via_s3(self, chunks, on_progress):
+        with ThreadPoolExecutor(max_workers=self.channels) as pool:
+            futures = {pool.submit(self._retry, self._put_chunk, chunk): chunk for chunk in chunks}
+            self._collect(futures, on_progress)
+
+        if not chunks:
+            return
+        # The host pulls every chunk in parallel, verifying each one
+        listing = '\n'.join(chunk.sha256 for chunk in chunks)
+        script = f"""mkdir -p {REMOTE_CHUNK_DIR} && cd {REMOTE_CHUNK_DIR}
+cat > .pull <<'EOF'
+{listing}
+EOF
+xargs -P {self.channels} -I{{}} sh -c 'aws s3 cp --quiet --region {self.bucket_region} s3://{self.bucket}/{S3_CHUNK_PREFIX}/{{}} {{}}.tmp && echo "{{}}  {{}}.tmp" | sha256sum -c --quiet && mv {{}}.tmp {{}}' < .pull
+code=$?
+rm -f .pull
+exit $code"""
+        result = self.runner.run(script, timeout=600)
+        if not result.ok:
+            raise TransferError(f"Host could not pull chunks from S3: {result.stderr.strip()}")
+
+    def _push_chunk(self, chunk):
+        encoded = base64.b64encode(chunk.data).decode()
+        target = f"{REMOTE_CHUNK_DIR}/{chunk.sha256}"
+        result = self.runner.run(
+            f"mkdir -p {REMOTE_CHUNK_DIR} && printf '%s' '{encoded}' | base64 -d > {target}.tmp "
+            f"&& echo '{chunk.sha256}  {target}.tmp' | sha256sum -c --quiet && mv {target}.tmp {target}",
+            timeout=60,
+        )
+        if not result.ok:
+            raise TransferError(f"Chunk {chunk.index} rejected: {result.stderr.strip() or result.status}")
+
+    def _put_chunk(self, chunk):
+        key = f"{S3_CHUNK_PREFIX}/{chunk.sha256}"
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+            return
+        except self.s3.exceptions.ClientError:
+            pass
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=chunk.data)
+
+    def _retry(self, action, chunk):
+        delays = backoff_delays(initial=1.0, maximum=10.0)
+        for attempt in range(1, CHUNK_RETRIES + 1):
+            try:
+                return action(chunk)
+            except Exception:
+                if attempt == CHUNK_RETRIES:
+                    raise
+                time.sleep(next(delays))
+
+    def _collect(self, futures, on_progress):
+        done = 0
+        failures = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+                done += 1
+                if on_progress:
+                    on_progress(f"chunk {done}/{len(futures)} delivered")
+            except Exception as e:
+                failures.append(f"chunk {futures[future].index}: {e}")
+        if failures:
+            # Delivered chunks stay on the host, so rerunning resumes from here
+            raise TransferError(f"{len(failures)} chunk(s) failed, rerun to resume:\n" + '\n'.join(failures))
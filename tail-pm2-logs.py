@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Follow the production PM2 logs incrementally
+Only new bytes are fetched on each poll, rotation is handled
+
+Examples:
+  python tail-pm2-logs.py
+  python tail-pm2-logs.py --grep "Notified user" --grep GROUP_ADDED
+  python tail-pm2-logs.py -i --grep "chime.*error" --state-file .pm2-cursor.json
+"""
+import argparse
+
+from summit_ops.logtail import PM2_APP, LogFollower, discover_log_files, grep
+
+parser = argparse.ArgumentParser(description="Incrementally tail PM2 logs over SSM")
+parser.add_argument('--app', default=PM2_APP, help="PM2 app whose log paths to discover")
+parser.add_argument('--file', action='append', help="Explicit remote log file (repeatable)")
+parser.add_argument('--grep', action='append', default=[], help="Only show lines matching this regex (repeatable)")
+parser.add_argument('-i', '--ignore-case', action='store_true')
+parser.add_argument('-v', '--invert', action='store_true', help="Show lines that do NOT match")
+parser.add_argument('--from-start', action='store_true', help="Read existing log contents first")
+parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls when caught up")
+parser.add_argument('--state-file', help="Persist cursors here to resume where the last run stopped")
+args = parser.parse_args()
+
+paths = args.file or discover_log_files(args.app)
+print(f"📜 Following {', '.join(paths)}")
+print("=" * 60)
+
+follower = LogFollower(paths, from_start=args.from_start, state_path=args.state_file)
+try:
+    for line in grep(follower.follow(args.interval), *args.grep, ignore_case=args.ignore_case, invert=args.invert):
+        print(line, flush=True)
+except KeyboardInterrupt:
+    print("\n🛑 Stopped")
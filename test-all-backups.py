@@ -1,83 +1,49 @@
-import boto3
-import time
+#!/usr/bin/env python3
+"""
+Test every index.js backup on the server without touching production
+Each backup boots as a throwaway node process on its own port, all at
+once, and gets the same smoke suite (health, login, GET /api/chats)
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
-instance_id = 'i-0fba58db502cc8d39'
+Usage:
+  SUMMIT_SMOKE_EMAIL=... SUMMIT_SMOKE_PASSWORD=... python test-all-backups.py [backup-file ...]
+"""
+import os
+import sys
 
-def run_command(command, timeout=60):
-    response = ssm.send_command(
-        InstanceIds=[instance_id],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=timeout
-    )
-    
-    command_id = response['Command']['CommandId']
-    time.sleep(2)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=instance_id
-    )
-    
-    return output['StandardOutputContent']
+from summit_ops.backup_eval import BackupEvaluator
 
 print("=" * 60)
-print("TESTING ALL BACKUP FILES")
+print("TESTING ALL BACKUP FILES (in parallel, live process untouched)")
 print("=" * 60)
 
-# List all backups
-stdout = run_command("""
-ls -lh /var/www/summit/*.backup* | grep "Jan 18" | awk '{print $9, $5}' | sort -k2 -rn
-""")
-print("\nBackup files (sorted by size):")
-print(stdout)
+smoke_email = os.environ.get('SUMMIT_SMOKE_EMAIL')
+if not smoke_email:
+    print("⚠️  SUMMIT_SMOKE_EMAIL not set - skipping login and chats checks")
 
-# Test each backup
-backups_to_test = [
-    "index.js.backup-before-endpoint-fix",  # Jan 18 17:40 - 24K
-    "index.js.backup-before-chime-handlers",  # Jan 18 17:37 - 23K
-    "index.js.backup-before-chime-v2",  # Jan 18 15:31 - 19K
-    "index.js.backup-typing",  # Jan 17 18:29 - 17K
-]
+evaluator = BackupEvaluator(smoke_email=smoke_email, smoke_password=os.environ.get('SUMMIT_SMOKE_PASSWORD'))
+results = evaluator.evaluate(sys.argv[1:] or None)
 
-for backup in backups_to_test:
-    print(f"\n{'=' * 60}")
-    print(f"Testing: {backup}")
-    print('=' * 60)
-    
-    stdout = run_command(f"""
-# Use backup
-sudo cp /var/www/summit/{backup} /var/www/summit/index.js
+if not results:
+    print("\nNo backup files found")
+    sys.exit(1)
 
-# Restart PM2
-pm2 restart summit-backend
-sleep 3
+print(f"\n{'Backup':<45} {'Boot':>6} {'Pass':>5} {'Fail':>5} {'Median':>9}")
+print("-" * 74)
+for result in results:
+    icon = "✅" if result.healthy else "❌"
+    boot = f"{result.boot_seconds:.1f}s" if result.booted else "crash"
+    median = f"{result.median_latency * 1000:.0f}ms" if result.passed else "-"
+    print(f"{icon} {result.name:<43} {boot:>6} {result.passed:>5} {result.failed:>5} {median:>9}")
 
-# Test
-TOKEN=$(curl -s -X POST http://localhost:4000/api/auth/login \
-  -H "Content-Type: application/json" \
-  -d '{{"email":"ico@astutetech.co.za","password":"Stacey@1122"}}' | grep -o '"token":"[^"]*"' | cut -d'"' -f4)
-
-if [ -z "$TOKEN" ]; then
-  echo "❌ Login failed"
-else
-  echo "✅ Login successful"
-  echo "Testing chats endpoint..."
-  RESPONSE=$(curl -s http://localhost:4000/api/chats \
-    -H "Authorization: Bearer $TOKEN")
-  
-  if echo "$RESPONSE" | grep -q "error"; then
-    echo "❌ Chats endpoint returned error: $RESPONSE"
-  else
-    echo "✅ Chats endpoint working!"
-    echo "Response: $RESPONSE"
-  fi
-fi
-""")
-    
-    print(stdout)
+for result in results:
+    if not result.booted and result.log_tail:
+        print(f"\n--- {result.name} failed to boot ---")
+        print(result.log_tail.rstrip())
 
+best = results[0]
 print("\n" + "=" * 60)
-print("DONE")
+if best.healthy:
+    print(f"Best candidate: {best.name}")
+else:
+    print("No backup passed every check")
 print("=" * 60)
@@ -0,0 +1,28 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from summit_ops.bluegreen import BLUE, GREEN, ecosystem_config
+
+ECOSYSTEM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server', 'ecosystem.config.cjs')
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason="node is not installed")
+@pytest.mark.parametrize('color', [BLUE, GREEN])
+def test_colour_keeps_the_production_app_settings(tmp_path, color):
+    config = tmp_path / f'.ecosystem-{color.name}.cjs'
+    config.write_text(ecosystem_config(color, ecosystem=ECOSYSTEM, app_dir='/var/www/summit'))
+    loaded = subprocess.run(['node', '-e', f"console.log(JSON.stringify(require({json.dumps(str(config))})))"],
+                            capture_output=True, text=True, check=True)
+    app, = json.loads(loaded.stdout)['apps']
+
+    assert app['name'] == color.app
+    assert app['script'] == '/var/www/summit/dist/index.js'
+    assert app['env_production']['PORT'] == color.port
+    assert app['time'] is True and app['max_memory_restart'] == '1.5G'
+    server = os.path.dirname(ECOSYSTEM)
+    assert app['out_file'] == os.path.join(server, 'logs', 'pm2-out.log')
+    assert app['error_file'] == os.path.join(server, 'logs', 'pm2-error.log')
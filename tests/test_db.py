@@ -0,0 +1,107 @@
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+
+from summit_ops.db import Database, DatabaseError, remote_password, remote_settings
+from summit_ops.ssm import CommandResult
+
+local = pytest.mark.skipif(not os.environ.get('SUMMIT_DB_DSN'), reason="SUMMIT_DB_DSN is not set")
+
+
+@dataclass
+class Member:
+    id: uuid.UUID
+    name: str
+    joined_at: datetime
+
+
+class FakeRunner:
+    instance_id = 'i-test'
+    region = 'us-east-1'
+
+    def __init__(self, stdout='', parameter=None):
+        self.stdout = stdout
+        self.commands = []
+        self.ssm = FakeSSM(parameter)
+
+    def run(self, command, **kwargs):
+        self.commands.append(command)
+        return CommandResult(command_id='c-1', instance_id=self.instance_id, status='Success',
+                             stdout=self.stdout, stderr='', exit_code=0, wall_time=0.0)
+
+
+class FakeSSM:
+    class exceptions:
+        class ParameterNotFound(Exception):
+            pass
+
+    def __init__(self, parameter):
+        self.parameter = parameter
+        self.requests = []
+
+    def get_parameter(self, **kwargs):
+        self.requests.append(kwargs)
+        if self.parameter is None:
+            raise self.exceptions.ParameterNotFound()
+        return {'Parameter': {'Value': self.parameter}}
+
+
+def test_remote_settings_never_reads_the_password():
+    runner = FakeRunner(stdout="DB_HOST=localhost\nDB_NAME='summit'\n")
+    assert remote_settings(runner) == {'DB_HOST': 'localhost', 'DB_NAME': 'summit'}
+    assert 'PASSWORD' not in runner.commands[0]
+
+
+def test_remote_password_comes_from_the_environment_or_parameter_store(monkeypatch):
+    monkeypatch.setenv('SUMMIT_DB_PASSWORD', 'from-env')
+    runner = FakeRunner(parameter='from-ssm')
+    assert remote_password(runner) == 'from-env'
+    assert runner.ssm.requests == []
+
+    monkeypatch.delenv('SUMMIT_DB_PASSWORD')
+    assert remote_password(runner, name='/summit/db/password') == 'from-ssm'
+    assert runner.ssm.requests == [{'Name': '/summit/db/password', 'WithDecryption': True}]
+    assert runner.commands == []
+
+    with pytest.raises(DatabaseError):
+        remote_password(FakeRunner())
+
+
+@local
+def test_local_round_trip():
+    with Database.local(pool_size=2) as db:
+        with db.transaction() as conn:
+            conn.execute("CREATE TEMP TABLE members (id uuid, name text, joined_at timestamptz) ON COMMIT DROP")
+            conn.execute("INSERT INTO members SELECT gen_random_uuid(), 'member ' || n, now() "
+                         "FROM generate_series(1, 3) n")
+            rows = conn.execute("SELECT count(*) FROM members").fetchone()
+            assert rows[0] == 3
+
+        assert db.scalar("SELECT %s::int + 1", [41]) == 42
+        assert db.scalar("SELECT 1 WHERE false") is None
+
+        rows = db.fetch("SELECT n, 'row ' || n AS label FROM generate_series(1, 3) n WHERE n > %s", [1])
+        assert [(r.n, r.label) for r in rows] == [(2, 'row 2'), (3, 'row 3')]
+        assert db.fetch_one("SELECT 1 AS one WHERE false") is None
+
+        member = db.fetch_one("SELECT gen_random_uuid() AS id, %s AS name, now() AS joined_at", ['ada'], row=Member)
+        assert isinstance(member, Member)
+        assert isinstance(member.id, uuid.UUID) and isinstance(member.joined_at, datetime)
+        assert member.name == 'ada'
+
+
+@local
+def test_local_stream_spans_batches():
+    with Database.local(pool_size=1) as db:
+        streamed = db.stream("SELECT gen_random_uuid() AS id, 'm' || n AS name, now() AS joined_at "
+                             "FROM generate_series(1, %s) n ORDER BY n", [25], row=Member, batch=10)
+        members = list(streamed)
+        assert len(members) == 25
+        assert all(isinstance(m, Member) for m in members)
+        assert [m.name for m in members[:3]] == ['m1', 'm2', 'm3']
+
+        # The connection went back to the pool once the stream was exhausted
+        assert db.scalar("SELECT count(*) FROM generate_series(1, 5)") == 5
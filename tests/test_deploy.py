@@ -0,0 +1,105 @@
+import hashlib
+import os
+import subprocess
+
+import pytest
+
+from summit_ops.deploy import DeltaDeployer, DeployPlan, build_bundle, build_manifest, rollback_script
+
+
+class LocalRunner:
+    """Runs the host scripts with the local bash and a stub pm2 that logs its arguments and fails when PM2_FAIL is set"""
+
+    def __init__(self, bin_dir):
+        self.env = dict(os.environ, PATH=f"{bin_dir}:{os.environ['PATH']}")
+
+    def run(self, command, timeout=60):
+        return subprocess.run(['bash', '-c', command], capture_output=True, text=True, env=self.env)
+
+
+@pytest.fixture
+def host(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    (bin_dir / 'pm2').write_text(f'#!/bin/sh\necho "$@" >> {tmp_path}/pm2.log\n[ -z "$PM2_FAIL" ]\n')
+    (bin_dir / 'pm2').chmod(0o755)
+    app = tmp_path / 'app'
+    (app / 'dist').mkdir(parents=True)
+    (app / 'dist' / 'index.js').write_text('v0\n')
+    return tmp_path, LocalRunner(bin_dir)
+
+
+def _deploy(tmp_path, runner, release_id, content, corrupt=False):
+    """Ship index.js with the given content as release_id; returns the script's CompletedProcess"""
+    build = tmp_path / 'build' / release_id
+    build.mkdir(parents=True)
+    (build / 'index.js').write_text(content)
+    local = build_manifest(str(build))
+    if corrupt:
+        local = {path: '0' * 64 for path in local}
+    plan = DeployPlan(local=local, remote={}, changed=['index.js'])
+    bundle = build_bundle(str(build), plan)
+    stage = tmp_path / 'stage' / release_id
+    stage.mkdir(parents=True)
+    (stage / 'bundle.tgz').write_bytes(bundle)
+
+    deployer = DeltaDeployer(str(build), runner, remote_dist=str(tmp_path / 'app' / 'dist'),
+                             releases_dir=str(tmp_path / 'app' / 'releases'), transfer=object())
+    script = deployer.apply_script(str(stage), str(tmp_path / 'app' / 'releases' / release_id),
+                                   hashlib.sha256(bundle).hexdigest())
+    return runner.run(script)
+
+
+def _live(tmp_path):
+    return (tmp_path / 'app' / 'dist' / 'index.js').read_text()
+
+
+def test_failed_release_is_removed_and_never_a_rollback_target(host):
+    tmp_path, runner = host
+    assert _deploy(tmp_path, runner, 'r1', 'v1\n').returncode == 0
+    assert _deploy(tmp_path, runner, 'r2', 'v2\n').returncode == 0
+    assert os.readlink(tmp_path / 'app' / 'dist.previous') == str(tmp_path / 'app' / 'releases' / 'r1')
+
+    failed = _deploy(tmp_path, runner, 'r3', 'v3\n', corrupt=True)
+    assert failed.returncode != 0
+    assert not (tmp_path / 'app' / 'releases' / 'r3').exists()
+    assert not (tmp_path / 'stage' / 'r3').exists()
+    assert _live(tmp_path) == 'v2\n'
+
+    rollback = runner.run(rollback_script(str(tmp_path / 'app' / 'dist')))
+    assert rollback.returncode == 0, rollback.stderr
+    assert _live(tmp_path) == 'v1\n'
+    # A second rollback goes forward again
+    assert runner.run(rollback_script(str(tmp_path / 'app' / 'dist'))).returncode == 0
+    assert _live(tmp_path) == 'v2\n'
+
+
+def test_failed_restart_points_dist_back(host):
+    tmp_path, runner = host
+    assert _deploy(tmp_path, runner, 'r1', 'v1\n').returncode == 0
+    runner.env['PM2_FAIL'] = '1'
+    failed = _deploy(tmp_path, runner, 'r2', 'v2\n')
+    assert failed.returncode != 0
+    assert 'dist restored to r1' in failed.stderr
+    assert _live(tmp_path) == 'v1\n'
+    assert not (tmp_path / 'app' / 'releases' / 'r2').exists()
+
+
+def test_rollback_without_a_recorded_release_fails(host):
+    tmp_path, runner = host
+    assert _deploy(tmp_path, runner, 'r1', 'v1\n').returncode == 0
+    os.remove(tmp_path / 'app' / 'dist.previous')
+    rollback = runner.run(rollback_script(str(tmp_path / 'app' / 'dist')))
+    assert rollback.returncode != 0
+    assert 'No previous release recorded' in rollback.stderr
+    assert _live(tmp_path) == 'v1\n'
+
+
+def test_deploy_and_rollback_restart_the_live_colour(host):
+    tmp_path, runner = host
+    assert _deploy(tmp_path, runner, 'r1', 'v1\n').returncode == 0
+    (tmp_path / 'app' / '.active-color').write_text('green\n')
+    assert _deploy(tmp_path, runner, 'r2', 'v2\n').returncode == 0
+    assert runner.run(rollback_script(str(tmp_path / 'app' / 'dist'))).returncode == 0
+    assert (tmp_path / 'pm2.log').read_text().splitlines() == [
+        'restart summit-backend', 'restart summit-backend-green', 'restart summit-backend-green']
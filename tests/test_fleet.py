@@ -0,0 +1,59 @@
+import pytest
+
+from summit_ops.fleet import FleetRunner
+from summit_ops.ssm import CommandResult
+
+
+class FakeSSM:
+    """list_commands / list_command_invocations for a command whose tag matched two instances"""
+
+    def __init__(self, resolved):
+        self.resolved = resolved
+
+    def list_commands(self, CommandId):
+        return {'Commands': [{'Status': 'InProgress', 'TargetCount': len(self.resolved)}]}
+
+    def get_paginator(self, name):
+        resolved = self.resolved
+
+        class Paginator:
+            def paginate(self, CommandId):
+                return [{'CommandInvocations': [{'InstanceId': i} for i in resolved]}]
+        return Paginator()
+
+
+class FakeRunner:
+    instance_id = 'i-default'
+
+    def __init__(self, resolved=()):
+        self.ssm = FakeSSM(list(resolved))
+        self.sent = []
+
+    def send(self, command, timeout=60, instance_ids=None, targets=None, **kwargs):
+        self.sent.append({'instance_ids': instance_ids, 'targets': targets})
+        return 'cmd-1'
+
+    def wait(self, command_id, instance_id=None, timeout=60, started=None):
+        return CommandResult(command_id=command_id, instance_id=instance_id, status='Success', stdout='ok',
+                             stderr='', exit_code=0, wall_time=0.1)
+
+
+def test_tags_and_instance_ids_together_are_rejected():
+    runner = FakeRunner()
+    with pytest.raises(ValueError):
+        FleetRunner(runner).run('uptime', instance_ids=['i-1'], tags={'Role': 'summit-backend'})
+    assert runner.sent == []
+
+
+def test_tag_targeted_command_polls_every_resolved_instance():
+    runner = FakeRunner(resolved=['i-a', 'i-b'])
+    summary = FleetRunner(runner).run('uptime', tags={'Role': 'summit-backend'})
+    assert sorted(r.instance_id for r in summary.results) == ['i-a', 'i-b']
+    assert runner.sent[0]['targets'] == [{'Key': 'tag:Role', 'Values': ['summit-backend']}]
+
+
+def test_listed_instances_are_polled_without_discovery():
+    runner = FakeRunner(resolved=['i-unrelated'])
+    summary = FleetRunner(runner).run('uptime', instance_ids=['i-1', 'i-2'])
+    assert sorted(r.instance_id for r in summary.results) == ['i-1', 'i-2']
+    assert FleetRunner(FakeRunner()).run('uptime').results[0].instance_id == 'i-default'
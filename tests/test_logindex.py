@@ -0,0 +1,45 @@
+from summit_ops.logindex import LogIndex
+
+USER = '3f2b8c1e-5d4a-4b6f-9e8d-7c6b5a4f3e2d'
+
+
+def _line(n):
+    return f"2025-01-31T14:03:{n % 60:02d}: 📤 Notified user {USER} of NEW_MESSAGE #{n}\n"
+
+
+def test_small_file_that_grows_is_read_from_where_it_stopped(tmp_path):
+    log = tmp_path / 'summit-backend-out.log'
+    log.write_text(_line(0))
+    index = LogIndex(str(tmp_path / 'logs.db'))
+
+    assert index.ingest_file(str(log)) == 1
+    with log.open('a') as f:
+        f.writelines(_line(n) for n in range(1, 201))
+    assert index.ingest_file(str(log)) == 200
+    assert index.ingest_file(str(log)) == 0
+
+    assert index.db.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 201
+    rows = index.search(event='NEW_MESSAGE', text='"#0"')
+    assert len(rows) == 1
+
+
+def test_partial_last_line_waits_for_its_newline(tmp_path):
+    log = tmp_path / 'out.log'
+    log.write_text(_line(0) + '2025-01-31T14:04:00: half a li')
+    index = LogIndex(str(tmp_path / 'logs.db'))
+
+    assert index.ingest_file(str(log)) == 1
+    with log.open('a') as f:
+        f.write('ne\n')
+    assert index.ingest_file(str(log)) == 1
+    assert [r['line'] for r in index.search(text='half')][0].endswith('half a line')
+
+
+def test_replaced_file_is_read_from_the_top(tmp_path):
+    log = tmp_path / 'out.log'
+    log.write_text(''.join(_line(n) for n in range(5)))
+    index = LogIndex(str(tmp_path / 'logs.db'))
+    assert index.ingest_file(str(log)) == 5
+
+    log.write_text('2025-02-01T00:00:00: rotated\n')
+    assert index.ingest_file(str(log)) == 1
@@ -0,0 +1,111 @@
+import os
+import random
+import subprocess
+from dataclasses import dataclass
+
+from summit_ops.logtail import LogFollower
+from summit_ops.ssm import INLINE_OUTPUT_LIMIT
+
+
+@dataclass
+class Result:
+    stdout: str
+
+    @property
+    def truncated(self):
+        return len(self.stdout) >= INLINE_OUTPUT_LIMIT
+
+
+class LocalRunner:
+    """Runs the follower's script with the local bash; `run` cuts output like inline SSM does"""
+
+    def __init__(self):
+        self.large_calls = 0
+
+    def _bash(self, command):
+        return subprocess.run(['bash', '-c', command], capture_output=True, text=True, check=True).stdout
+
+    def run(self, command, timeout=60):
+        return Result(self._bash(command)[:INLINE_OUTPUT_LIMIT])
+
+    def run_large(self, command, timeout=300):
+        self.large_calls += 1
+        return Result(self._bash(command))
+
+
+def _noise(n, seed):
+    rng = random.Random(seed)
+    # Hex digits barely compress, so the encoded payload is larger than the raw bytes
+    return ''.join(f"{rng.getrandbits(256):064x}\n" for _ in range(n))
+
+
+def _drain(follower):
+    lines = []
+    while True:
+        batch, pending = follower.poll()
+        lines.extend(batch)
+        if not pending:
+            return lines
+
+
+def test_budget_is_shared_and_everything_arrives(tmp_path):
+    paths = [str(tmp_path / 'out.log'), str(tmp_path / 'error.log')]
+    for n, path in enumerate(paths):
+        with open(path, 'w') as f:
+            f.write(_noise(1000, n))
+    follower = LogFollower(paths, runner=LocalRunner(), from_start=True)
+
+    first, pending = follower.poll()
+    assert sum(len(line.text) + 1 for line in first) <= follower.max_chunk
+    assert pending > 0
+
+    lines = first + _drain(follower)
+    for path in paths:
+        with open(path) as f:
+            assert [line.text for line in lines if line.source == path] == f.read().splitlines()
+
+
+def test_truncated_inline_output_falls_back_to_run_large(tmp_path):
+    path = str(tmp_path / 'out.log')
+    with open(path, 'w') as f:
+        f.write(_noise(2000, 7))
+    runner = LocalRunner()
+    follower = LogFollower([path], runner=runner, from_start=True, max_chunk=64 * 1024)
+
+    lines = _drain(follower)
+    assert runner.large_calls > 0
+    with open(path) as f:
+        assert [line.text for line in lines] == f.read().splitlines()
+
+
+def test_undecodable_payload_keeps_the_cursor(tmp_path):
+    path = str(tmp_path / 'out.log')
+    with open(path, 'w') as f:
+        f.write('first\nsecond\n')
+
+    class Garbling(LocalRunner):
+        def run(self, command, timeout=60):
+            header, payload, *rest = self._bash(command).split('\n')
+            return Result('\n'.join([header, payload[:len(payload) // 2]] + rest))
+
+    follower = LogFollower([path], runner=Garbling(), from_start=True)
+    lines, pending = follower.poll()
+    assert lines == [] and pending == os.path.getsize(path)
+    assert follower.cursors[path].offset == -1
+
+    follower.runner = LocalRunner()
+    assert [line.text for line in _drain(follower)] == ['first', 'second']
+
+
+def test_partial_line_survives_a_resume(tmp_path):
+    path = str(tmp_path / 'out.log')
+    state = str(tmp_path / 'cursor.json')
+    with open(path, 'w') as f:
+        f.write('first\nsec')
+    follower = LogFollower([path], runner=LocalRunner(), from_start=True, state_path=state)
+    assert [line.text for line in _drain(follower)] == ['first']
+
+    with open(path, 'a') as f:
+        f.write('ond\nthird\n')
+    resumed = LogFollower([path], runner=LocalRunner(), state_path=state)
+    assert [line.text for line in _drain(resumed)] == ['second', 'third']
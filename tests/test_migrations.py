@@ -0,0 +1,77 @@
+import pytest
+
+from summit_ops.migrations import MigrationError, MigrationRunner, plan_step, split_statements
+
+
+def test_split_respects_quotes_and_comments():
+    sql = """
+    -- a comment; not a statement
+    INSERT INTO t (a) VALUES ('semi;colon', 'it''s; fine');
+    /* block; comment */
+    SELECT "odd;name" FROM t;
+    -- trailing comment only
+    """
+    assert split_statements(sql) == [
+        "-- a comment; not a statement\n    INSERT INTO t (a) VALUES ('semi;colon', 'it''s; fine')",
+        '/* block; comment */\n    SELECT "odd;name" FROM t',
+    ]
+
+
+def test_split_keeps_dollar_quoted_bodies_whole():
+    sql = """
+    CREATE OR REPLACE FUNCTION touch() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at = NOW();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql';
+    DO $body$ BEGIN PERFORM 1; END $body$;
+    SELECT price$1 FROM t
+    """
+    statements = split_statements(sql)
+    assert len(statements) == 3
+    assert statements[0].startswith('CREATE OR REPLACE FUNCTION') and statements[0].endswith("language 'plpgsql'")
+    assert statements[1] == 'DO $body$ BEGIN PERFORM 1; END $body$'
+    assert statements[2] == 'SELECT price$1 FROM t'
+
+
+def test_create_index_is_rewritten_concurrently():
+    step = plan_step('CREATE INDEX IF NOT EXISTS idx_Messages_Chat ON messages (chat_id)')
+    assert step.sql == 'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_Messages_Chat ON messages (chat_id)'
+    assert step.concurrent and step.rewritten
+    # Unquoted names are folded to lower case, as pg_class stores them
+    assert step.index == 'idx_messages_chat'
+
+
+def test_unique_and_quoted_index_names():
+    step = plan_step('-- lookups\ncreate unique index "public"."Idx ""Odd""" on t (a) where b is null')
+    assert step.sql == 'create unique index CONCURRENTLY "public"."Idx ""Odd""" ON t (a) where b is null'
+    assert step.index == 'Idx "Odd"'
+
+
+def test_already_concurrent_and_unnamed_indexes_are_left_alone():
+    step = plan_step('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (a)')
+    assert step.concurrent and not step.rewritten
+    assert not plan_step('CREATE INDEX ON t (a)').rewritten
+
+
+def test_drop_index_rewrite_only_when_postgres_allows_it():
+    step = plan_step('DROP INDEX IF EXISTS idx_messages_chat_id')
+    assert step.sql == 'DROP INDEX CONCURRENTLY IF EXISTS idx_messages_chat_id'
+    assert step.concurrent
+    for sql in ('DROP INDEX idx_a, idx_b', 'DROP INDEX IF EXISTS idx_a CASCADE'):
+        step = plan_step(sql)
+        assert step.sql == sql and not step.concurrent
+
+
+def test_other_statements_run_in_transactions():
+    assert not plan_step('ALTER TABLE messages ADD COLUMN IF NOT EXISTS edited_at TIMESTAMPTZ').concurrent
+    assert plan_step('VACUUM ANALYZE messages').concurrent
+
+
+def test_apply_refuses_pgbouncer():
+    class PooledDatabase:
+        pgbouncer = True
+
+    with pytest.raises(MigrationError, match='PgBouncer'):
+        MigrationRunner(PooledDatabase()).apply()
@@ -0,0 +1,26 @@
+import os
+
+from summit_ops.plans import number_placeholders, plan_targets
+from summit_ops.sqlsource import SERVER_SRC, SourceQuery
+
+MESSAGES = os.path.join(SERVER_SRC, 'routes', 'messages.ts')
+
+
+def test_runtime_placeholders_are_numbered_after_the_literal_ones():
+    sql = ("SELECT m.* FROM messages m WHERE m.chat_id = $2 AND cp.user_id = $1"
+           " AND m.created_at < $${paramIndex} ORDER BY m.created_at DESC LIMIT $${paramIndex}")
+    assert number_placeholders(sql).endswith("m.created_at < $3 ORDER BY m.created_at DESC LIMIT $4")
+    assert number_placeholders("SELECT 1 LIMIT $${n}") == "SELECT 1 LIMIT $1"
+    assert number_placeholders("UPDATE users SET ${updates.join(', ')} WHERE id = $${paramIndex}") is None
+
+
+def test_plan_targets_keep_numbered_statements_and_skip_other_interpolations():
+    queries = [
+        SourceQuery(MESSAGES, 50, 'GET /api/messages/:chatId',
+                    "SELECT * FROM messages WHERE chat_id = $1 ORDER BY created_at DESC LIMIT $${paramIndex}"),
+        SourceQuery(MESSAGES, 90, 'POST /api/messages', "INSERT INTO messages (id) VALUES ${values}"),
+    ]
+    targets, skipped = plan_targets(queries)
+    assert [t.sql for t in targets] == ["SELECT * FROM messages WHERE chat_id = $1 ORDER BY created_at DESC LIMIT $2"]
+    assert targets[0].key.startswith('routes/messages.ts GET /api/messages/:chatId ')
+    assert skipped == [queries[1]]
@@ -0,0 +1,138 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from summit_ops import retention
+from summit_ops.retention import Backup, RetentionPolicy, RetentionSweeper, select
+
+REGION = 'eu-west-1'
+NOW = datetime(2025, 3, 14, 12, 30, tzinfo=timezone.utc)
+# Keep only the newest backup, so every other one is swept
+KEEP_ONE = RetentionPolicy(keep_last=1, hourly=0, daily=0, weekly=0, min_age=timedelta(0))
+
+
+class PagedEC2:
+    """The moto client, with describe_images split into small pages (moto ignores PageSize)"""
+
+    def __init__(self, ec2, page_size=4):
+        self.ec2 = ec2
+        self.page_size = page_size
+        self.pages = 0
+        self.in_use = {}
+
+    def __getattr__(self, name):
+        return getattr(self.ec2, name)
+
+    def get_paginator(self, name):
+        assert name == 'describe_images'
+        return self
+
+    def paginate(self, **kwargs):
+        images = self.ec2.describe_images(**kwargs)['Images']
+        for start in range(0, len(images), self.page_size):
+            self.pages += 1
+            yield {'Images': images[start:start + self.page_size]}
+
+    def delete_snapshot(self, SnapshotId):
+        # The first attempts race the deregistration, as they do on EC2
+        if self.in_use.get(SnapshotId, 0):
+            self.in_use[SnapshotId] -= 1
+            raise ClientError({'Error': {'Code': 'InvalidSnapshot.InUse', 'Message': 'in use'}}, 'DeleteSnapshot')
+        return self.ec2.delete_snapshot(SnapshotId=SnapshotId)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(retention, 'backoff_delays', lambda **kwargs: itertools.repeat(0))
+
+
+@pytest.fixture
+def ec2():
+    with mock_aws():
+        client = boto3.client('ec2', region_name=REGION)
+        image = client.describe_images(Owners=['amazon'])['Images'][0]['ImageId']
+        instance = client.run_instances(ImageId=image, MinCount=1, MaxCount=1, InstanceType='t3.small')['Instances'][0]
+        for n in range(10):
+            client.create_image(InstanceId=instance['InstanceId'], Name=f'summit-backup-{n}')
+        client.create_image(InstanceId=instance['InstanceId'], Name='someone-elses-image')
+        yield PagedEC2(client)
+
+
+def _backup(hours_ago, state='available'):
+    created = NOW - timedelta(hours=hours_ago)
+    return Backup(id=f'ami-{hours_ago}', name=f'summit-backup-{hours_ago}', created=created, state=state)
+
+
+def test_select_keeps_last_and_newest_per_tier():
+    backups = [_backup(h) for h in (0.5, 1, 2, 3, 5, 26, 27, 50, 24 * 9, 24 * 30)] + [_backup(400, 'pending')]
+    plan = select(backups, RetentionPolicy(keep_last=2, hourly=3, daily=3, weekly=2), now=NOW)
+    reasons = {backup.id: sorted(why) for backup, why in plan.keep.values()}
+
+    assert reasons == {
+        'ami-0.5': ['daily', 'hourly', 'last', 'recent', 'weekly'],
+        'ami-1': ['hourly', 'last'],
+        'ami-2': ['hourly'],
+        'ami-26': ['daily'],
+        'ami-50': ['daily'],
+        'ami-216': ['weekly'],
+        'ami-400': ['pending'],
+    }
+    assert [b.id for b in plan.delete] == ['ami-3', 'ami-5', 'ami-27', 'ami-720']
+
+
+def test_sweep_lists_every_page_and_deletes_images_and_snapshots(ec2):
+    sweeper = RetentionSweeper(ec2=ec2, max_workers=4)
+    backups = sweeper.list_backups()
+    assert ec2.pages == 3
+    assert sorted(b.name for b in backups) == sorted(f'summit-backup-{n}' for n in range(10))
+    assert all(b.snapshot_ids for b in backups)
+
+    report = sweeper.sweep(KEEP_ONE)
+    assert len(report.deleted) == 9 and not report.failed
+    remaining = ec2.describe_images(Owners=['self'])['Images']
+    kept = [backup.name for backup, _ in report.plan.keep.values()]
+    assert sorted(i['Name'] for i in remaining) == sorted(['someone-elses-image'] + kept)
+    snapshots = {s['SnapshotId'] for s in ec2.describe_snapshots(OwnerIds=['self'])['Snapshots']}
+    assert not snapshots & {s for b in backups if b.id in report.deleted for s in b.snapshot_ids}
+
+
+def test_snapshot_in_use_is_retried_until_the_deregistration_propagates(ec2):
+    sweeper = RetentionSweeper(ec2=ec2)
+    backups = sweeper.list_backups()
+    for backup in backups:
+        for snapshot_id in backup.snapshot_ids:
+            ec2.in_use[snapshot_id] = 2
+
+    report = sweeper.sweep(KEEP_ONE)
+    assert len(report.deleted) == 9 and not report.failed
+    deleted = [s for b in backups if b.id in report.deleted for s in b.snapshot_ids]
+    assert all(ec2.in_use[s] == 0 for s in deleted)
+
+
+def test_already_deleted_backups_count_as_swept(ec2):
+    gone = RetentionSweeper(ec2=ec2).list_backups()[0]
+    # A concurrent sweep removed it between listing and deleting
+    ec2.deregister_image(ImageId=gone.image_id)
+    for snapshot_id in gone.snapshot_ids:
+        ec2.delete_snapshot(SnapshotId=snapshot_id)
+
+    sweeper = RetentionSweeper(ec2=ec2, source=lambda: [gone])
+    report = sweeper.sweep(RetentionPolicy(keep_last=0, hourly=0, daily=0, weekly=0, min_age=timedelta(0)))
+    assert report.deleted == [gone.id] and not report.failed
+
+
+def test_other_errors_are_reported_not_retried(ec2):
+    def denied(**kwargs):
+        denied.calls += 1
+        raise ClientError({'Error': {'Code': 'UnauthorizedOperation', 'Message': 'no'}}, 'DeregisterImage')
+    denied.calls = 0
+    ec2.deregister_image = denied
+
+    report = RetentionSweeper(ec2=ec2).sweep(KEEP_ONE)
+    assert len(report.failed) == 9 and not report.deleted
+    assert denied.calls == 9
+    assert 'UnauthorizedOperation' in report.describe()
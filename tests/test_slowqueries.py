@@ -0,0 +1,153 @@
+import gzip
+import subprocess
+from datetime import datetime, timezone
+
+from summit_ops.slowqueries import QueryFailure, SlowQuery, SlowQueryReport, parse_events, remote_log_command
+from summit_ops.sqlsource import SourceIndex, extract_queries, fingerprint
+
+INDEX_TS = """\
+import chatsRoutes from './routes/chats.js';
+import messagesRoutes from './routes/messages.js';
+app.use('/api/chats', chatsRoutes);
+app.use('/api/messages', messagesRoutes);
+"""
+
+CHATS_TS = """\
+router.get('/', authenticate, async (req, res) => {
+  const result = await query(
+    `SELECT c.id, c.name, c.type, c.last_message, c.last_message_at
+     FROM chats c
+     JOIN chat_participants cp ON cp.chat_id = c.id
+     WHERE cp.user_id = $1 AND c.type = 'group'
+     ORDER BY c.updated_at DESC`,
+    [userId]
+  );
+});
+
+router.post('/:chatId/participants', authenticate, async (req, res) => {
+  const values = participantIds.map((_, i) => `($1, $${i + 2})`).join(', ');
+  await query(`INSERT INTO chat_participants (chat_id, user_id) VALUES ${values}`, [chatId, ...participantIds]);
+});
+"""
+
+MESSAGES_TS = """\
+router.get('/chat/:chatId', authenticate, async (req, res) => {
+  let messagesQuery = 'SELECT m.* FROM messages m WHERE m.chat_id = $1 AND m.deleted_at IS NULL';
+  if (before) {
+    messagesQuery += ` AND m.created_at < $${paramIndex}`;
+  }
+  messagesQuery += ` ORDER BY m.created_at DESC LIMIT $${paramIndex}`;
+  const result = await query(messagesQuery, params);
+});
+"""
+
+# Recorded from summit-backend-out.log / -error.log (ids changed)
+SLOW_ONE_LINE = (
+    "0|summit-b | 2025-01-31T14:03:07: Slow query detected: "
+    "{ text: 'SELECT m.* FROM messages m WHERE m.chat_id = $1 AND m.deleted_at IS NULL AND m.created_at < $2 ORDER', "
+    "duration: 1534 }\n"
+)
+SLOW_INSPECT = """\
+0|summit-b | 2025-01-31T14:05:41: Slow query detected: {
+0|summit-b |   text: 'SELECT c.id, c.name, c.type, c.last_message, c.last_message_at\\n' +
+0|summit-b |     '     FROM chats c\\n' +
+0|summit-b |     '     JOIN chat_participants cp ON cp.c',
+0|summit-b |   duration: 2210
+0|summit-b | }
+"""
+SLOW_INTERPOLATED = (
+    "0|summit-b | 2025-01-31T14:09:12: Slow query detected: "
+    "{ text: 'INSERT INTO chat_participants (chat_id, user_id) VALUES ($1, $2), ($1, $3), ($1, $4)', "
+    "duration: 1022 }\n"
+)
+QUERY_ERROR = """\
+0|summit-b | 2025-01-31T14:10:00: Database query error: duplicate key value violates unique constraint "chat_participants_pkey"
+0|summit-b |     at /var/www/summit/server/node_modules/pg/lib/client.js:535:17
+0|summit-b |     at async query (file:///var/www/summit/server/dist/lib/db.js:40:21)
+0|summit-b |     at async file:///var/www/summit/server/dist/routes/chats.js:212:9 {
+0|summit-b |   length: 246,
+0|summit-b |   severity: 'ERROR',
+0|summit-b |   code: '23505',
+0|summit-b |   detail: 'Key (chat_id, user_id)=(8d0c0a52-3a0c-4c8e-9c55-2f8f4f1a2b3c, 9e1d1b63-4b1d-4d9f-8d66-3a9a5a2b3c4d) already exists.',
+0|summit-b | }
+"""
+LOG = SLOW_ONE_LINE + SLOW_INSPECT + SLOW_INTERPOLATED + QUERY_ERROR
+
+
+def _index(tmp_path):
+    (tmp_path / 'routes').mkdir()
+    (tmp_path / 'index.ts').write_text(INDEX_TS)
+    (tmp_path / 'routes' / 'chats.ts').write_text(CHATS_TS)
+    (tmp_path / 'routes' / 'messages.ts').write_text(MESSAGES_TS)
+    return SourceIndex(extract_queries(str(tmp_path)))
+
+
+def test_parse_events_reads_one_line_multi_line_and_error_records():
+    events = list(parse_events(LOG.splitlines(keepends=True)))
+    assert [type(e) for e in events] == [SlowQuery, SlowQuery, SlowQuery, QueryFailure]
+    one_line, inspected, interpolated, failure = events
+
+    assert one_line.duration_ms == 1534
+    assert one_line.ts == datetime(2025, 1, 31, 14, 3, 7, tzinfo=timezone.utc)
+    assert len(one_line.sql) == 100 and one_line.truncated
+
+    assert inspected.duration_ms == 2210
+    assert inspected.sql.startswith('SELECT c.id, c.name, c.type, c.last_message, c.last_message_at\n     FROM chats c\n')
+    assert inspected.truncated
+
+    assert not interpolated.truncated
+
+    assert failure.code == '23505'
+    assert failure.origin == 'server/src/routes/chats.ts'
+    assert failure.message.startswith('duplicate key value')
+
+
+def test_fingerprints_fold_values_truncation_and_interpolation():
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c' AND id IN (1, 2, 3)") == \
+        fingerprint("select *\n  from users where email = $1 and id in ($2)")
+    # A literal cut off by the 100-character limit has no closing quote
+    assert fingerprint("SELECT id FROM chats WHERE type = 'gro", truncated=True) == \
+        'select id from chats where type=?'
+    # The last token of a truncated statement may be partial and is dropped
+    assert fingerprint("SELECT id FROM chats ORDER BY c.updat", truncated=True) == 'select id from chats order by'
+    assert fingerprint('VALUES ($1, $${i + 2})') == fingerprint('VALUES ($1, $7)') == 'values(?)'
+    assert fingerprint('INSERT INTO t (a, b) VALUES ($1, $2), ($1, $3)') == \
+        fingerprint('INSERT INTO t (a, b) VALUES ${values}') == 'insert into t(a,b)values(?)'
+
+
+def test_slow_queries_match_their_routes(tmp_path):
+    report = SlowQueryReport().add_lines(LOG.splitlines(keepends=True)).attach_sources(_index(tmp_path))
+    handlers = {stats.fingerprint: stats.handlers for stats in report.ranked()}
+    assert handlers == {
+        # 100-character prefix of the longest form of the statement, last partial token dropped
+        'select m.*from messages m where m.chat_id=? and m.deleted_at is null and m.created_at<?':
+            ['GET /api/messages/chat/:chatId'],
+        # Multi-line util.inspect text, cut inside an identifier
+        'select c.id,c.name,c.type,c.last_message,c.last_message_at from chats c join chat_participants cp on':
+            ['GET /api/chats'],
+        # `VALUES ${values}` built from `($1, $${i + 2})` rows
+        'insert into chat_participants(chat_id,user_id)values(?)': ['POST /api/chats/:chatId/participants'],
+    }
+    assert report.ranked()[0].handlers == ['GET /api/chats']
+    assert report.handler_totals()[0] == ('GET /api/chats', 2210.0, 1)
+
+
+def test_remote_log_command_reads_rotated_siblings_and_fails_without_logs(tmp_path):
+    logs = tmp_path / 'server logs'
+    logs.mkdir()
+    (logs / 'pm2-out.log').write_text(SLOW_ONE_LINE)
+    with gzip.open(logs / 'pm2-out__2025-01-30_00-00-00.log.gz', 'wt') as f:
+        f.write(SLOW_INSPECT)
+    (logs / 'pm2-error.log').write_text(QUERY_ERROR)
+    (logs / 'pm2-combined.log').write_text(SLOW_INTERPOLATED)
+    paths = [str(logs / 'pm2-out.log'), str(logs / 'pm2-error.log')]
+
+    result = subprocess.run(['bash', '-c', remote_log_command(paths)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    events = list(parse_events(result.stdout.splitlines()))
+    assert sorted(getattr(e, 'duration_ms', 0) for e in events) == [0, 1534, 2210]
+
+    missing = subprocess.run(['bash', '-c', remote_log_command([str(tmp_path / 'nowhere' / 'pm2-out.log')])],
+                             capture_output=True, text=True)
+    assert missing.returncode == 1
+    assert 'No log files match' in missing.stderr
@@ -0,0 +1,31 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from summit_ops.snapshots import SnapshotBackup
+
+REGION = 'eu-west-1'
+
+
+@pytest.fixture
+def backup():
+    with mock_aws():
+        ec2 = boto3.client('ec2', region_name=REGION)
+        image = ec2.describe_images(Owners=['amazon'])['Images'][0]['ImageId']
+        instance = ec2.run_instances(ImageId=image, MinCount=1, MaxCount=1, InstanceType='t3.small')['Instances'][0]
+        yield SnapshotBackup(ec2=ec2, instance_id=instance['InstanceId'], region=REGION)
+
+
+def test_sets_created_in_the_same_second_stay_apart(backup):
+    first = backup.create(label='pre-deploy')
+    second = backup.create()
+    assert first.id != second.id
+    assert first.parent is None
+    assert second.parent == first.id
+
+    sets = {s.id: s for s in backup.sets()}
+    assert set(sets) == {first.id, second.id}
+    assert sets[first.id].snapshot_ids == first.snapshot_ids
+    assert sets[second.id].snapshot_ids == second.snapshot_ids
+    assert all(s.parent != s.id for s in sets.values())
+    assert {b.name for b in backup.backups()} == {first.id, second.id}
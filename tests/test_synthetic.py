@@ -0,0 +1,73 @@
+import hashlib
+import random
+
+from summit_ops.synthetic import COLUMNS, STAGED_REQUESTS, Generator, Scale, SyntheticDataset, _rng
+
+SCALE = Scale(users=200, chats=500, messages=3_000, meetings=100)
+SEED = 7
+TABLES = ('users', 'presence', 'chats', 'chat_participants', STAGED_REQUESTS, 'meetings', 'meeting_participants',
+          'messages')
+
+
+def _rows(generator, task):
+    """{table: rows} of one loader task, as _load_chunk builds them"""
+    table, chunk, lo, hi = task
+    rng = _rng(generator.seed, table, chunk)
+    if table == 'messages':
+        messages, receipts = generator.messages(rng, lo, hi)
+        return {'messages': messages, 'read_receipts': receipts}
+    return {table: list(getattr(generator, table)(rng, lo, hi))}
+
+
+def _digests(chunk_rows, workers, shuffle=None):
+    """Digest per table with the tasks spread round-robin over `workers` fresh Generators"""
+    tasks = [task for table in TABLES for task in SyntheticDataset('', SCALE, SEED, chunk_rows=chunk_rows).tasks(table)]
+    if shuffle is not None:
+        random.Random(shuffle).shuffle(tasks)
+    generators = [Generator(SCALE, SEED) for _ in range(workers)]
+    chunks = {}
+    for n, task in enumerate(tasks):
+        for table, rows in _rows(generators[n % workers], task).items():
+            chunks[table, task[1]] = rows
+    digests = {}
+    for table, chunk in sorted(chunks):
+        digests.setdefault(table, hashlib.sha256()).update(repr(chunks[table, chunk]).encode())
+    return {table: digest.hexdigest() for table, digest in digests.items()}, chunks
+
+
+def test_rows_do_not_depend_on_workers_or_load_order():
+    serial, _ = _digests(chunk_rows=64, workers=1)
+    assert _digests(chunk_rows=64, workers=4, shuffle=1)[0] == serial
+    assert _digests(chunk_rows=64, workers=3, shuffle=2)[0] == serial
+    assert set(serial) == set(TABLES) | {'read_receipts'}
+
+
+def test_keys_do_not_depend_on_chunk_size():
+    def keys(chunk_rows):
+        _, chunks = _digests(chunk_rows=chunk_rows, workers=2)
+        rows = {}
+        for (table, _), chunk in sorted(chunks.items()):
+            rows.setdefault(table, []).extend(chunk)
+        return {
+            'users': [r[0] for r in rows['users']],
+            'chats': [(r[0], r[2], r[3]) for r in rows['chats']],
+            'chat_participants': [r[:2] for r in rows['chat_participants']],
+            'meetings': [r[0] for r in rows['meetings']],
+            'meeting_participants': [r[:2] for r in rows['meeting_participants']],
+            'messages': len(rows['messages']),
+        }
+
+    assert keys(50) == keys(128) == keys(1_000)
+
+
+def test_rows_line_up_with_columns():
+    _, chunks = _digests(chunk_rows=1_000, workers=1)
+    users = {row[0] for (table, _), rows in chunks.items() if table == 'users' for row in rows}
+    for (table, _), rows in chunks.items():
+        assert rows, table
+        for row in rows:
+            assert len(row) == len(COLUMNS[table]), (table, row)
+        columns = COLUMNS[table]
+        for name in ('user_id', 'sender_id', 'created_by', 'requester_id', 'requestee_id'):
+            if name in columns:
+                assert {row[columns.index(name)] for row in rows} <= users, (table, name)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Upload a large file (deploy bundle, dist tarball) to the server in parallel chunks
+Interrupted uploads resume: chunks already on the server are not sent again
+
+Examples:
+  python upload-artifact.py server-dist-fix.tar.gz /tmp/server-dist-fix.tar.gz
+  python upload-artifact.py server-dist-fix.tar.gz /tmp/server-dist-fix.tar.gz --via s3 --channels 8
+"""
+import argparse
+import os
+import sys
+import time
+
+from summit_ops.transfer import CHANNELS, ChunkedTransfer, TransferError
+
+parser = argparse.ArgumentParser(description="Chunked, parallel, resumable upload to the server")
+parser.add_argument('local_path')
+parser.add_argument('remote_path')
+parser.add_argument('--via', choices=['ssm', 's3'], default='ssm')
+parser.add_argument('--channels', type=int, default=CHANNELS)
+args = parser.parse_args()
+
+size = os.path.getsize(args.local_path)
+print(f"📤 Uploading {args.local_path} ({size / 1024 / 1024:.1f} MB) via {args.via}, {args.channels} channels")
+print("=" * 60)
+
+started = time.monotonic()
+try:
+    manifest = ChunkedTransfer(channels=args.channels, via=args.via).send_file(
+        args.local_path, args.remote_path, on_progress=lambda message: print(f"   {message}")
+    )
+except TransferError as e:
+    print(f"\n❌ {e}")
+    sys.exit(1)
+
+print(f"\n✅ {args.remote_path} written and verified (sha256 {manifest.sha256[:12]}...) in {time.monotonic() - started:.1f}s")
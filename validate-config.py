@@ -2,109 +2,111 @@
 """
 Validate production configuration before deployment
 Run this before any deployment to catch errors early
+
+All checks are compiled into one remote script, so the whole
+validation costs a single SSM round trip. To add a check, append
+it to CHECKS - no extra commands needed.
 """
-import boto3
-import time
+import re
 import sys
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
-INSTANCE_ID = 'i-0fba58db502cc8d39'
-
-def run_command(command):
-    response = ssm.send_command(
-        InstanceIds=[INSTANCE_ID],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=30
-    )
-    command_id = response['Command']['CommandId']
-    time.sleep(3)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=INSTANCE_ID
-    )
-    
-    return output.get('StandardOutputContent', '').strip(), output.get('StandardErrorContent', '').strip()
-
-print("🔍 VALIDATING PRODUCTION CONFIGURATION")
-print("=" * 60)
-
-all_passed = True
+from summit_ops.bluegreen import UPSTREAM_CONF
+from summit_ops.checks import Check, run_checks
+from summit_ops.ssm import SSMRunner
 
-# Check 1: Chime region syntax
-print("\n1. Checking Chime SDK region configuration...")
-stdout, stderr = run_command("grep -n 'region:' /var/www/summit/index.js | head -1")
-if "'us-east-1'" in stdout or '"us-east-1"' in stdout:
-    print("   ✅ Region has quotes: CORRECT")
-else:
-    print("   ❌ Region missing quotes: INCORRECT")
-    print(f"   Found: {stdout}")
-    all_passed = False
+INSTANCE_ID = 'i-0fba58db502cc8d39'
+ssm_runner = SSMRunner(INSTANCE_ID)
 
-# Check 2: Server port
-print("\n2. Checking server port configuration...")
-stdout, stderr = run_command("grep -n 'const PORT' /var/www/summit/index.js")
-if "4000" in stdout:
-    print("   ✅ Server port 4000: CORRECT")
-else:
-    print("   ❌ Server port incorrect")
-    print(f"   Found: {stdout}")
-    all_passed = False
+# With blue/green deploys nginx proxies through an upstream on 4000 or 4001
+ACTIVE_PORT = f"grep -o '127.0.0.1:400[01]' {UPSTREAM_CONF} 2>/dev/null | cut -d: -f2"
 
-# Check 3: Nginx proxy configuration
-print("\n3. Checking nginx proxy configuration...")
-stdout, stderr = run_command("grep 'proxy_pass' /etc/nginx/sites-enabled/summit.api.codingeverest.com | head -1")
-if "127.0.0.1:4000" in stdout:
-    print("   ✅ Nginx proxies to port 4000: CORRECT")
-else:
-    print("   ❌ Nginx proxy configuration incorrect")
-    print(f"   Found: {stdout}")
-    all_passed = False
+def count_at_least_one(output):
+    return int(output) > 0
 
-# Check 4: Database configuration
-print("\n4. Checking database configuration...")
-stdout, stderr = run_command("grep -n 'DB_PORT' /var/www/summit/.env")
-if "6432" in stdout:
-    print("   ✅ Database port 6432 (PgBouncer): CORRECT")
-else:
-    print("   ⚠️  Database port may be incorrect")
-    print(f"   Found: {stdout}")
+def proxies_to_backend(output):
+    if "127.0.0.1:4000" in output:
+        return True
+    return "summit_backend" in output and re.search(r'server 127\.0\.0\.1:400[01];', output) is not None
 
-# Check 5: JWT Secret exists
-print("\n5. Checking JWT secret...")
-stdout, stderr = run_command("grep -c 'JWT_SECRET=' /var/www/summit/.env")
-if int(stdout.strip()) > 0:
-    print("   ✅ JWT secret configured: CORRECT")
-else:
-    print("   ❌ JWT secret missing")
-    all_passed = False
+CHECKS = [
+    Check(
+        'chime_region', "Checking Chime SDK region configuration",
+        "grep -n 'region:' /var/www/summit/index.js | head -1",
+        passes=lambda out: "'us-east-1'" in out or '"us-east-1"' in out,
+        ok_message="Region has quotes: CORRECT",
+        fail_message="Region missing quotes: INCORRECT",
+    ),
+    Check(
+        'server_port', "Checking server port configuration",
+        "grep -n 'const PORT' /var/www/summit/index.js",
+        passes=lambda out: "4000" in out,
+        ok_message="Server port 4000: CORRECT",
+        fail_message="Server port incorrect",
+    ),
+    Check(
+        'nginx_proxy', "Checking nginx proxy configuration",
+        f"grep 'proxy_pass' /etc/nginx/sites-enabled/summit.api.codingeverest.com | head -1; cat {UPSTREAM_CONF} 2>/dev/null",
+        passes=proxies_to_backend,
+        ok_message="Nginx proxies to the backend (4000, or 4000/4001 blue/green): CORRECT",
+        fail_message="Nginx proxy configuration incorrect",
+    ),
+    Check(
+        'db_port', "Checking database configuration",
+        "grep -n 'DB_PORT' /var/www/summit/.env",
+        passes=lambda out: "6432" in out,
+        ok_message="Database port 6432 (PgBouncer): CORRECT",
+        fail_message="Database port may be incorrect",
+        critical=False,
+    ),
+    Check(
+        'jwt_secret', "Checking JWT secret",
+        "grep -c 'JWT_SECRET=' /var/www/summit/.env",
+        passes=count_at_least_one,
+        ok_message="JWT secret configured: CORRECT",
+        fail_message="JWT secret missing",
+    ),
+    Check(
+        'pm2_online', "Checking PM2 is running",
+        "pm2 status | grep summit",
+        passes=lambda out: "online" in out,
+        ok_message="PM2 process online: CORRECT",
+        fail_message="PM2 process not online",
+        critical=False,
+    ),
+    Check(
+        'port_listening', "Checking if the live backend port is listening",
+        f"port=$({ACTIVE_PORT}); netstat -tlnp | grep \":${{port:-4000}} \"",
+        passes=lambda out: re.search(r':400[01] ', out) is not None,
+        ok_message="Server listening on the live port: CORRECT",
+        fail_message="Server not listening on the live port",
+        critical=False,
+    ),
+    Check(
+        'nginx_running', "Checking nginx status",
+        "systemctl is-active nginx",
+        passes=lambda out: out == "active",
+        ok_message="Nginx running: CORRECT",
+        fail_message="Nginx not running",
+    ),
+]
 
-# Check 6: PM2 ecosystem config
-print("\n6. Checking PM2 is running...")
-stdout, stderr = run_command("pm2 status | grep summit")
-if "online" in stdout:
-    print("   ✅ PM2 process online: CORRECT")
-else:
-    print("   ⚠️  PM2 process not online")
-    print(f"   Status: {stdout}")
+print("🔍 VALIDATING PRODUCTION CONFIGURATION")
+print("=" * 60)
 
-# Check 7: Server is actually listening
-print("\n7. Checking if server is listening on port 4000...")
-stdout, stderr = run_command("netstat -tlnp | grep :4000")
-if ":4000" in stdout:
-    print("   ✅ Server listening on port 4000: CORRECT")
-else:
-    print("   ⚠️  Server not listening on port 4000")
+all_passed = True
 
-# Check 8: Nginx is running
-print("\n8. Checking nginx status...")
-stdout, stderr = run_command("systemctl is-active nginx")
-if "active" in stdout:
-    print("   ✅ Nginx running: CORRECT")
-else:
-    print("   ❌ Nginx not running")
-    all_passed = False
+for number, outcome in enumerate(run_checks(CHECKS, runner=ssm_runner, timeout=30), start=1):
+    check = outcome.check
+    print(f"\n{number}. {check.title}...")
+    if outcome.passed:
+        print(f"   ✅ {check.ok_message}")
+    elif check.critical:
+        print(f"   ❌ {check.fail_message}")
+        print(f"   Found: {outcome.output}")
+        all_passed = False
+    else:
+        print(f"   ⚠️  {check.fail_message}")
+        print(f"   Found: {outcome.output}")
 
 print("\n" + "=" * 60)
 if all_passed:
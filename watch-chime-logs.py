@@ -2,28 +2,15 @@
 """
 Clear logs and watch for Chime errors
 """
-import boto3
 import time
 
-ssm = boto3.client('ssm', region_name='eu-west-1')
+from summit_ops.ssm import SSMRunner
+
 INSTANCE_ID = 'i-0fba58db502cc8d39'
+ssm_runner = SSMRunner(INSTANCE_ID)
 
-def run_command(command):
-    response = ssm.send_command(
-        InstanceIds=[INSTANCE_ID],
-        DocumentName='AWS-RunShellScript',
-        Parameters={'commands': [command]},
-        TimeoutSeconds=30
-    )
-    command_id = response['Command']['CommandId']
-    time.sleep(3)
-    
-    output = ssm.get_command_invocation(
-        CommandId=command_id,
-        InstanceId=INSTANCE_ID
-    )
-    
-    return output.get('StandardOutputContent', '').strip()
+def run_command(command, timeout=30):
+    return ssm_runner.run(command, timeout=timeout).stdout.strip()
 
 print("🔍 CLEARING LOGS AND WATCHING FOR CHIME ERRORS")
 print("=" * 60)